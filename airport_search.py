@@ -0,0 +1,129 @@
+import bisect
+import csv
+import unicodedata
+from pathlib import Path
+
+import numpy as np
+
+DEFAULT_AIRPORTS_PATH = Path(__file__).parent / "data" / "airports.csv"
+
+# Share of a query's trigrams an airport must contain to count as a fuzzy match
+MIN_TRIGRAM_SCORE = 0.5
+
+# Prefixes this short match a large share of the index, so their best airports are ranked up front
+SHORT_PREFIX_LENGTH = 2
+SHORT_PREFIX_TOP = 50
+
+
+def normalize_text(text):
+    """Lowercase, strip accents and punctuation, collapse whitespace"""
+    text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode().lower()
+    return " ".join("".join(c if c.isalnum() else " " for c in text).split())
+
+
+def trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def load_airports(path=DEFAULT_AIRPORTS_PATH):
+    """Read the bundled airport list into a list of dicts"""
+    with open(path, newline="", encoding="utf-8") as f:
+        return [
+            {
+                "iata": row["iata"].upper(),
+                "city": row["city"],
+                "name": row["name"],
+                "country": row["country"],
+                "location": (float(row["latitude"]), float(row["longitude"])),
+                "aliases": [alias for alias in row["aliases"].split("|") if alias],
+                "popularity": float(row["passengers_m"])
+            }
+            for row in csv.DictReader(f)
+        ]
+
+
+class AirportIndex:
+    """Typo-tolerant autocomplete over airports, ranked by popularity.
+
+    Every searchable key (IATA code, city, airport name, alternate names and
+    each word of those) is normalized into one sorted list, so a prefix
+    lookup is two ``bisect`` calls over a compact, trie-equivalent array.
+    Queries with no prefix hit (usually a typo) fall back to a trigram
+    index: the posting lists of the query's trigrams are counted with
+    ``bincount`` and airports sharing enough of them are ranked by overlap,
+    then popularity. One- and two-letter prefixes, the first keystrokes of
+    every search, match so many keys that ranking them per query costs more
+    than the rest of the lookup; their top ``SHORT_PREFIX_TOP`` airports are
+    ranked once when the index is built.
+    """
+
+    def __init__(self, airports):
+        self.airports = list(airports)
+        self.labels = [f"{airport['city']} ({airport['iata']})" for airport in self.airports]
+        self.popularity = np.array([airport["popularity"] for airport in self.airports], dtype=np.float64)
+
+        entries = set()
+        grams = {}
+        for i, airport in enumerate(self.airports):
+            names = [airport["iata"], airport["city"], airport["name"], *airport["aliases"]]
+            for name in map(normalize_text, names):
+                entries.add((name, i))
+                entries.update((word, i) for word in name.split())
+                for gram in trigrams(name):
+                    grams.setdefault(gram, set()).add(i)
+        entries = sorted(entries)
+        self.prefix_keys = [key for key, _ in entries]
+        self.prefix_ids = np.array([i for _, i in entries], dtype=np.int32)
+        self.trigram_postings = {gram: np.array(sorted(ids), dtype=np.int32) for gram, ids in grams.items()}
+        self.iata_index = {airport["iata"]: i for i, airport in enumerate(self.airports)}
+        self.short_prefixes = {
+            prefix: self._scan(prefix, SHORT_PREFIX_TOP)
+            for prefix in {key[:length] for key in self.prefix_keys for length in range(1, SHORT_PREFIX_LENGTH + 1)}
+        }
+
+    def __len__(self):
+        return len(self.airports)
+
+    def _ranked(self, ids, limit):
+        # Unique ids come sorted, so a stable sort breaks popularity ties by id, whatever the limit
+        ids = np.unique(ids)
+        return ids[np.argsort(-self.popularity[ids], kind="stable")[:limit]].tolist()
+
+    def prefix_matches(self, query, limit=10):
+        """Airports with a key starting with ``query``, most popular first"""
+        if len(query) <= SHORT_PREFIX_LENGTH and limit <= SHORT_PREFIX_TOP:
+            return self.short_prefixes.get(query, [])[:limit]
+        return self._scan(query, limit)
+
+    def _scan(self, query, limit):
+        low = bisect.bisect_left(self.prefix_keys, query)
+        high = bisect.bisect_left(self.prefix_keys, query + "\uffff", low)
+        return self._ranked(self.prefix_ids[low:high], limit) if high > low else []
+
+    def fuzzy_matches(self, query, limit=10):
+        """Airports sharing enough trigrams with ``query``, best overlap first"""
+        grams = trigrams(query)
+        postings = [self.trigram_postings[gram] for gram in grams if gram in self.trigram_postings]
+        if not postings:
+            return []
+        shared = np.bincount(np.concatenate(postings), minlength=len(self.airports))
+        score = shared / len(grams)
+        ids = np.flatnonzero(score >= MIN_TRIGRAM_SCORE)
+        order = np.lexsort((-self.popularity[ids], -score[ids]))
+        return ids[order[:limit]].tolist()
+
+    def search(self, query, limit=10):
+        """Labels like "Mumbai (BOM)" for the best matches of a partial query"""
+        query = normalize_text(query)
+        if not query:
+            return []
+        ids = []
+        # An exact IATA code always comes first
+        exact = self.iata_index.get(query.upper())
+        if exact is not None:
+            ids.append(exact)
+        ids += [i for i in self.prefix_matches(query, limit) if i != exact]
+        if not ids:
+            ids = self.fuzzy_matches(query, limit)
+        return [self.labels[i] for i in ids[:limit]]
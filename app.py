@@ -1,12 +1,41 @@
 import streamlit as st
-from datetime import datetime, timedelta
-import random
-import pandas as pd
+from datetime import date, timedelta
+import os
 import time
-import base64
-from PIL import Image
-import io
-import uuid
+
+import numpy as np
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from airport_search import AirportIndex, load_airports
+from booking_export import BookingAnalytics, BookingExporter
+from booking_service import validate_passengers
+from fare_calendar import BOOKING_WINDOW_DAYS, CALENDAR_RADIUS_DAYS, FareCalendars, round_trip_matrix
+from flight_inventory import (
+    day_offset_label,
+    format_duration,
+    generate_flight_columns,
+    flight_columns_to_frame,
+    flight_columns_to_records
+)
+from flight_results import FlightResults, ResultView, flight_id_prefix
+from flight_search import FlightSearch
+from html_templates import (
+    BOOKING_DISCOUNT, BOOKING_SUMMARY, BOOKING_SUMMARY_FLIGHT, DAY_OFFSET_NOTE, FARE_BREAKUP_BLOCK, FARE_BREAKUP_ITEM, FARE_RULE_ITEM,
+    FARE_RULES_BLOCK, FLIGHT_CARD, PROGRESS_BAR, PROGRESS_STEP, SEATS_NOTE, SOLD_OUT_NOTE, FragmentCache
+)
+from instrumentation import Recorder, count, span, timed
+from price_alerts import PriceWatcher, new_watch_key
+from pricing import CONVENIENCE_FEE, TAX_RATE, PricingEngine, booking_quote, current_fares, same_airline_discount
+from results_query import SORT_COLUMNS
+from search_cache import make_search_key, normalize_city
+from search_stream import ResultStream
+from session_manager import BOOKING, PERSISTENT, SEARCH, VIEW, SessionKey, SessionStateManager
+from shared_state import backend_from_url
+from reference_data import AIRLINES, AIRPORTS, CITIES, FARE_CLASSES, FARE_RULES
+from round_trip import COMBINATION_SORTS, best_combinations
+from route_network import RouteNetwork
+from static_assets import StaticAssets
+from suppliers import FanOutSearch, simulated_suppliers
 
 # Set page config
 st.set_page_config(
@@ -16,643 +45,1351 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
+@st.cache_resource
+def get_state_backend():
+    """Where searches, seats and bookings are shared: this process ("memory") or every worker on the host ("sqlite[:path]")"""
+    return backend_from_url(os.environ.get("FLIGHT_STATE_BACKEND", "memory"))
+
+@st.cache_resource
+def get_search_cache():
+    """Search results cache shared by every session (and, with a shared backend, every worker)"""
+    return get_state_backend().search_cache(max_entries=256, ttl_seconds=300)
+
+@st.cache_resource
+def get_static_assets():
+    """Logos and stylesheet, encoded once per process"""
+    return StaticAssets(static_serving=st.get_option("server.enableStaticServing"))
+
+@st.cache_resource
+def get_seat_inventory():
+    """Seat counts and holds shared by every session, with expired holds swept in the background"""
+    inventory = get_state_backend().seat_inventory(FARE_CLASSES)
+    inventory.start_sweeper()
+    return inventory
+
+@st.cache_resource
+def get_airport_index():
+    """Airport autocomplete index, built once from the bundled airport list"""
+    return AirportIndex(load_airports())
+
+@st.cache_resource
+def get_pricing_engine():
+    """Fare model and price snapshots shared by every session"""
+    airports = {airport["iata"]: airport for airport in get_airport_index().airports}
+    return PricingEngine(AIRLINES, FARE_CLASSES, airports=dict(airports, **AIRPORTS))
+
+@st.cache_resource
+def get_fare_calendars():
+    """Route fare calendars shared by every session and the price watcher"""
+    return FareCalendars(get_pricing_engine(), len(AIRLINES), FARE_CLASSES, max_routes=256)
+
+def get_fare_calendar(from_city, to_city, today):
+    """A route's flights and lowest daily fares for the booking window starting today"""
+    return get_fare_calendars().get(from_city, to_city, today)
+
+def calendar_day_columns(from_city, to_city, day):
+    """The day's flights on a route, as offered by every carrier"""
+    return get_fare_calendar(normalize_city(from_city), normalize_city(to_city), date.today()).day_columns(day)
+
+@st.cache_resource
+def get_supplier_search():
+    """One simulated supplier per airline, with circuit breakers and latency history shared by every session"""
+    return FanOutSearch(simulated_suppliers(AIRLINES, calendar_day_columns), timeout=1.0)
+
+@st.cache_resource
+def get_flight_search():
+    """Searches over the shared stores, run the same way by every session and the booking service"""
+    return FlightSearch(
+        get_search_cache(), get_fare_calendars(), get_seat_inventory(), get_supplier_search(),
+        get_pricing_engine(), AIRLINES.keys(), FARE_CLASSES
+    )
+
+@st.cache_resource
+def get_booking_repository():
+    """Durable booking store; its connection pool is shared by every session"""
+    return get_state_backend().booking_repository()
+
+@st.cache_resource
+def get_metrics():
+    """Span and counter totals collected from every session's reruns"""
+    return Recorder()
+
+@st.cache_resource
+def get_saved_searches():
+    """Saved searches and price alerts, stored beside the bookings"""
+    return get_state_backend().saved_searches()
+
+@st.cache_resource
+def get_price_watcher():
+    """Re-evaluates every saved search in the background, once per process"""
+    # The watcher thread has no script context, so it is handed the shared objects rather than their getters
+    calendars = get_fare_calendars()
+    inventory = get_seat_inventory()
+    
+    def route_fares(from_city, to_city, days):
+        calendar = calendars.get(from_city, to_city, date.today())
+        calendar.refresh(inventory)
+        return {day: calendar.day_fares(day) if calendar.covers(day) else None for day in days}
+    
+    watcher = PriceWatcher(
+        get_saved_searches(), route_fares,
+        interval=FlightBookingApp.PRICE_WATCH_SECONDS, metrics=get_metrics()
+    )
+    watcher.start()
+    return watcher
+
+@st.cache_resource
+def get_booking_exporter():
+    """Appends completed bookings to the analytics dataset in the background, once per process (None without pyarrow)"""
+    try:
+        exporter = BookingExporter(get_booking_repository())
+    except ImportError:
+        return None
+    exporter.start()
+    return exporter
+
+@st.cache_resource
+def get_booking_analytics():
+    """Revenue, load factor and class mix queries over the exported bookings (None without pyarrow)"""
+    try:
+        return BookingAnalytics()
+    except ImportError:
+        return None
+
 class FlightBookingApp:
+    # Flight cards drawn per results page before "Load more"
+    RESULTS_PAGE_SIZE = 20
+    
+    BOOKING_STEPS = ["Search", "Passengers", "Payment", "Confirmation"]
+    
+    # Outbound/return pairs listed under "Best combinations"
+    COMBINATIONS_SHOWN = 10
+    
+    # Airports offered for a typed city or airport query
+    AIRPORT_MATCHES = 20
+    
+    # How often saved searches are re-evaluated for price alerts
+    PRICE_WATCH_SECONDS = 120
+    
+    # Where the admin panel writes metrics exports
+    METRICS_JSONL_PATH = "metrics.jsonl"
+    METRICS_PROMETHEUS_PATH = "metrics.prom"
+    
     def __init__(self):
-        # Initialize city and airline data
-        self.cities = [
-            "Mumbai (BOM)", "Delhi (DEL)", "Bangalore (BLR)", 
-            "Chennai (MAA)", "Kolkata (CCU)", "Hyderabad (HYD)",
-            "Pune (PNQ)", "Ahmedabad (AMD)", "Goa (GOI)", "Jaipur (JAI)",
-            "Lucknow (LKO)", "Kochi (COK)", "Guwahati (GAU)"
-        ]
+        # Reference data is read-only and shared; the app object itself is built once per process
+        self.cities = CITIES
         
-        # Airline data with logos encoded as base64 to avoid external URL dependencies
+        # Airline data; logos come from the process-wide asset registry
+        assets = get_static_assets()
         self.airlines = {
-            "IndiGo": {
-                "code": "6E", 
-                "color": "#0052CC",
-                "logo": self.get_indigo_logo()
-            },
-            "Air India": {
-                "code": "AI", 
-                "color": "#e31837",
-                "logo": self.get_air_india_logo()
-            },
-            "SpiceJet": {
-                "code": "SG", 
-                "color": "#ff4e00",
-                "logo": self.get_spicejet_logo()
-            },
-            "Vistara": {
-                "code": "UK", 
-                "color": "#4b286d",
-                "logo": self.get_vistara_logo()
-            },
-            "Akasa Air": {
-                "code": "QP", 
-                "color": "#FF6D38",
-                "logo": self.get_akasa_logo()
-            },
-            "Alliance Air": {
-                "code": "9I", 
-                "color": "#2B3990",
-                "logo": self.get_alliance_logo()
-            }
+            name: dict(info, logo=assets.logo_uris[info["code"]])
+            for name, info in AIRLINES.items()
         }
         
-        self.fare_classes = ["Economy", "Premium Economy", "Business"]
-        
-        self.fare_rules = {
-            "Economy": {
-                "Cancellation Fee": "₹3,500 per passenger",
-                "Date Change Fee": "₹3,000 per passenger",
-                "Seat Selection": "Chargeable",
-                "Baggage Allowance": "15 kg",
-                "Meal": "Not Included",
-                "Refundable": "Partial"
-            },
-            "Premium Economy": {
-                "Cancellation Fee": "₹2,500 per passenger",
-                "Date Change Fee": "₹2,000 per passenger",
-                "Seat Selection": "Free",
-                "Baggage Allowance": "20 kg",
-                "Meal": "Included",
-                "Refundable": "Yes"
-            },
-            "Business": {
-                "Cancellation Fee": "₹2,000 per passenger",
-                "Date Change Fee": "₹1,500 per passenger",
-                "Seat Selection": "Free",
-                "Baggage Allowance": "35 kg",
-                "Meal": "Included",
-                "Refundable": "Yes"
-            }
+        self.fare_classes = FARE_CLASSES
+        
+        self.fare_rules = FARE_RULES
+        
+        # Fragments that only depend on reference data are rendered once
+        self.fare_rules_html = {
+            fare_class: FARE_RULES_BLOCK.render(items="".join(
+                FARE_RULE_ITEM.render(rule=rule, value=value) for rule, value in rules.items()
+            ))
+            for fare_class, rules in self.fare_rules.items()
+        }
+        self.progress_bars = {
+            step: self.render_progress_bar(step) for step in range(1, len(self.BOOKING_STEPS) + 1)
         }
+        # Per-flight fragments (card templates, fare breakups, summary rows), shared by every session
+        self.fragments = FragmentCache(max_entries=4096)
         
+        # Every session key and its lifetime; reference data above is shared, not counted per session
+        self.session_manager = SessionStateManager(
+            self.session_keys(),
+            on_enter={2: (VIEW,), 4: (SEARCH, VIEW)},
+            shared_roots=(self.cities, self.airlines, self.fare_classes, self.fare_rules),
+            shared_types=(FlightResults,)
+        )
+    
+    def session_keys(self):
+        """Declared session-state keys, grouped by lifetime"""
+        return [
+            SessionKey("view_booking", PERSISTENT, False),
+            SessionKey("view_alerts", PERSISTENT, False),
+            SessionKey("alerts_email", PERSISTENT),
+            SessionKey("alerts_key", PERSISTENT),
+            SessionKey("passengers", PERSISTENT, 1),
+            SessionKey("sort_by", PERSISTENT, "price"),
+            SessionKey("filter_airlines", PERSISTENT, lambda: list(self.airlines.keys())),
+            SessionKey("filter_classes", PERSISTENT, lambda: list(self.fare_classes)),
+            SessionKey("trip_type", PERSISTENT, "one_way"),
+            SessionKey("from_city", PERSISTENT),
+            SessionKey("to_city", PERSISTENT),
+            SessionKey("depart_date", PERSISTENT),
+            SessionKey("return_date", PERSISTENT),
+            SessionKey("perf_session_totals", PERSISTENT, dict),
+            
+            SessionKey("search_performed", SEARCH, False),
+            SessionKey("flight_results", SEARCH),
+            SessionKey("return_flight_results", SEARCH),
+            SessionKey("connection_results", SEARCH),
+            SessionKey("search_timing", SEARCH),
+            
+            SessionKey("show_fare_rules", VIEW, dict, max_entries=self.RESULTS_PAGE_SIZE),
+            SessionKey("show_fare_breakup", VIEW, dict, max_entries=self.RESULTS_PAGE_SIZE),
+            SessionKey("selected_flight_pages", VIEW, (None, 0)),
+            SessionKey("selected_return_flight_pages", VIEW, (None, 0)),
+            SessionKey("render_stats", VIEW),
+            SessionKey("perf_profile", VIEW),
+            
+            SessionKey("progress_step", BOOKING, 1),
+            SessionKey("selected_flight", BOOKING),
+            SessionKey("selected_return_flight", BOOKING),
+            SessionKey("seat_holds", BOOKING, list),
+            SessionKey("passenger_details", BOOKING, list),
+            SessionKey("payment_method", BOOKING),
+            SessionKey("booking_complete", BOOKING, False),
+            SessionKey("booking_reference", BOOKING)
+        ]
+    
+    def run(self):
+        """Draw the page for the current rerun"""
         # Apply custom CSS
         self.apply_custom_css()
         
         # Initialize session state
         self.initialize_session_state()
+        self.session_manager.begin_rerun(st.session_state, st.session_state.progress_step)
+        
+        self.display_header()
+        if st.session_state.view_booking:
+            self.display_booking_lookup()
+            return
+        if st.session_state.view_alerts:
+            self.display_price_alerts()
+            return
+        
+        self.display_progress_bar()
+        step = st.session_state.progress_step
+        if step == 1:
+            self.display_search_form()
+            if st.session_state.search_performed:
+                self.display_search_results()
+        elif step == 2:
+            self.display_passenger_form()
+        elif step == 3:
+            self.display_payment()
+        else:
+            self.display_confirmation()
     
-    def get_indigo_logo(self):
-        return "data:image/svg+xml;base64,PHN2ZyB4bWxucz0iaHR0cDovL3d3dy53My5vcmcvMjAwMC9zdmciIHZpZXdCb3g9IjAgMCAyMDAgNjAiPjxwYXRoIGZpbGw9IiMwMDUyQ0MiIGQ9Ik0yMCwxMGg2MHY0MEgyMFYxMHoiLz48cGF0aCBmaWxsPSIjZmZmIiBkPSJNMzUsMjBoMzB2MjBIMzVWMjB6Ii8+PHBhdGggZmlsbD0iIzAwNTJDQyIgZD0iTTQ1LDI1aDEwdjEwSDQ1VjI1eiIvPjxwYXRoIGZpbGw9IiMwMDUyQ0MiIGQ9Ik0xMDUsMzBsLTUtMTBoMTBMMTA1LDMweiIvPjxwYXRoIGZpbGw9IiMwMDUyQ0MiIGQ9Ik0xMjUsMjBoLTE1djIwaDVWMzBoMTBjMywwLDUtMiw1LTV2MGMwLTMtMi01LTUtNVoiLz48cGF0aCBmaWxsPSIjMDA1MkNDIiBkPSJNMTQwLDIwaC01djIwaDVWMjBaIi8+PHBhdGggZmlsbD0iIzAwNTJDQyIgZD0iTTE2MCwyMGgtMTV2MjBoNVYzMGgxMGMzLDAsNS0yLDUtNXYwYzAtMy0yLTUtNS01WiIvPjwvc3ZnPg=="
+    def initialize_session_state(self):
+        """Initialize session state variables"""
+        self.session_manager.initialize(st.session_state)
     
-    def get_air_india_logo(self):
-        return "data:image/svg+xml;base64,PHN2ZyB4bWxucz0iaHR0cDovL3d3dy53My5vcmcvMjAwMC9zdmciIHZpZXdCb3g9IjAgMCAyMDAgNjAiPjxwYXRoIGZpbGw9IiNlMzE4MzciIGQ9Ik0xMDAsMTBjMjAsMCw0MCwxMCw0MCwzMGMwLDUtMTAsNS0xMCwwYzAtMTUtMTUtMjAtMzAtMjBzLTMwLDUtMzAsMjBjMCw1LTEwLDUtMTAsMEMxMCwyMCwzMCwxMCwxMDAsMTBaIi8+PHBhdGggZmlsbD0iI2UzMTgzNyIgZD0iTTUwLDQ1aDEwMHY1SDUwVjQ1WiIvPjxjaXJjbGUgZmlsbD0iI2UzMTgzNyIgY3g9IjEwMCIgY3k9IjMwIiByPSIxMCIvPjwvc3ZnPg=="
+    @timed("apply_custom_css")
+    def apply_custom_css(self):
+        """Apply custom CSS styling for better UI"""
+        st.markdown(get_static_assets().stylesheet_tag, unsafe_allow_html=True)
+        
+    def format_duration(self, minutes):
+        """Format minutes to hours and minutes"""
+        return format_duration(minutes)
+
+    @timed("generate_flights")
+    def generate_flights(self, from_city, to_city, date, count=10, rng=None, as_frame=False):
+        """Generate random flight data as a DataFrame or as the flight dicts the UI uses"""
+        # Searches build their stores from generate_flight_columns directly; this is for scripts and load tests
+        columns = generate_flight_columns(len(self.airlines), self.fare_classes, count, rng)
+        
+        if as_frame:
+            return flight_columns_to_frame(columns, list(self.airlines.keys()), self.fare_classes)
+        
+        return flight_columns_to_records(columns, self.airlines, self.fare_classes, from_city, to_city, date)
+
+    @timed("search")
+    def search_flights(self, from_city, to_city, date, count=10, on_answer=None):
+        """Return this session's view onto the shared results for a search.
+
+        On a cache miss served by the suppliers, ``on_answer(day_columns, answer)``
+        is called as each supplier answers, before the full result exists.
+        """
+        return ResultView(get_flight_search().search(from_city, to_city, date, count=count, on_answer=on_answer))
     
-    def get_spicejet_logo(self):
-        return "data:image/svg+xml;base64,PHN2ZyB4bWxucz0iaHR0cDovL3d3dy53My5vcmcvMjAwMC9zdmciIHZpZXdCb3g9IjAgMCAyMDAgNjAiPjxwYXRoIGZpbGw9IiNmZjRlMDAiIGQ9Ik0yMCwxMGg4MHY0MEgyMFYxMHoiLz48cGF0aCBmaWxsPSIjZmZmIiBkPSJNMzUsMjVoNTB2MTBIMzVWMjV6Ii8+PHBhdGggZmlsbD0iI2ZmZiIgZD0iTTExMCwzMGwtMTAtMjBoMjBMMTEwLDMweiIvPjxwYXRoIGZpbGw9IiNmZjRlMDAiIGQ9Ik0xMzAsMTBoNDB2NDBIMTMwVjEweiIvPjxwYXRoIGZpbGw9IiNmZmYiIGQ9Ik0xNDAsMjVoMjB2MTBoLTIwVjI1eiIvPjwvc3ZnPg=="
+    def fare_calendar(self, from_city, to_city):
+        """The route's fare calendar, repriced for any seat changes on searched days"""
+        return get_flight_search().calendar(from_city, to_city)
     
-    def get_vistara_logo(self):
-        return "data:image/svg+xml;base64,PHN2ZyB4bWxucz0iaHR0cDovL3d3dy53My5vcmcvMjAwMC9zdmciIHZpZXdCb3g9IjAgMCAyMDAgNjAiPjxwYXRoIGZpbGw9IiM0YjI4NmQiIGQ9Ik0yMCwxMGgxNjB2NDBIMjBWMTB6Ii8+PHBhdGggZmlsbD0iI2ZmZiIgZD0iTTEwMCwxNWMxMCwwLDIwLDUsMjAsMTVjMCwxMC0xMCwxNS0yMCwxNXMtMjAtNS0yMC0xNUExNSwxNSwwLDAsMSwxMDAsMTVaIi8+PHBhdGggZmlsbD0iIzRiMjg2ZCIgZD0iTTEwMCwyNWM1LDAsNSw1LDAsNXMtNS01LDAtNVoiLz48cGF0aCBmaWxsPSIjZmZmIiBkPSJNNTAsMjBoMjB2MjBINTBWMjB6Ii8+PHBhdGggZmlsbD0iI2ZmZiIgZD0iTTEzMCwyMGgyMHYyMGgtMjBWMjB6Ii8+PC9zdmc+"
+    def route_network(self, date):
+        """The day's flights between the app's cities, with the ids and fares their results pages show"""
+        codes = [normalize_city(city) for city in self.cities]
+        flights = []
+        for origin in codes:
+            for destination in codes:
+                if origin == destination:
+                    continue
+                calendar = self.fare_calendar(origin, destination)
+                if calendar.covers(date):
+                    flights.append((
+                        origin, destination, calendar.day_columns(date), calendar.day_fares(date), calendar.flight_ids(date)
+                    ))
+        return RouteNetwork.from_flights(codes, flights) if flights else None
     
-    def get_akasa_logo(self):
-        return "data:image/svg+xml;base64,PHN2ZyB4bWxucz0iaHR0cDovL3d3dy53My5vcmcvMjAwMC9zdmciIHZpZXdCb3g9IjAgMCAyMDAgNjAiPjxwYXRoIGZpbGw9IiNGRjZEMzgiIGQ9Ik0yMCwxMGgxNjB2NDBIMjBWMTB6Ii8+PHBhdGggZmlsbD0iI2ZmZiIgZD0iTTM1LDIwTDUwLDQwSDIwTDM1LDIweiIvPjxwYXRoIGZpbGw9IiNmZmYiIGQ9Ik03MCwyMEw4NSw0MEg1NUw3MCwyMHoiLz48cGF0aCBmaWxsPSIjZmZmIiBkPSJNMTA1LDIwTDEyMCw0MEg5MEwxMDUsMjB6Ii8+PHBhdGggZmlsbD0iI2ZmZiIgZD0iTTE0MCwyMEwxNTUsNDBIMTI1TDE0MCwyMHoiLz48L3N2Zz4="
+    def find_connections(self, from_city, to_city, date, max_stops=2, sort_by="arrival", limit=10):
+        """Find direct and connecting itineraries over the flights on sale for the day"""
+        network = self.route_network(date)
+        if network is None or normalize_city(from_city) not in network.airport_index or normalize_city(to_city) not in network.airport_index:
+            return []
+        legs = network.find_itineraries(
+            normalize_city(from_city), normalize_city(to_city),
+            max_stops=max_stops, sort_by=sort_by, limit=limit
+        )
+        airline_codes = {name: info["code"] for name, info in self.airlines.items()}
+        return [network.describe(row, list(self.airlines.keys()), airline_codes) for row in legs]
     
-    def get_alliance_logo(self):
-        return "data:image/svg+xml;base64,PHN2ZyB4bWxucz0iaHR0cDovL3d3dy53My5vcmcvMjAwMC9zdmciIHZpZXdCb3g9IjAgMCAyMDAgNjAiPjxwYXRoIGZpbGw9IiMyQjM5OTAiIGQ9Ik0yMCwxMGgxNjB2NDBIMjBWMTB6Ii8+PHBhdGggZmlsbD0iI2ZmZiIgZD0iTTQwLDMwYzAtNSw1LTEwLDEwLTEwaDEwMGM1LDAsMTAsNSwxMCwxMHMtNSwxMC0xMCwxMEg1MEM0NSw0MCw0MCwzNSw0MCwzMFoiLz48cGF0aCBmaWxsPSIjMkIzOTkwIiBkPSJNNjAsMjVoMjB2MTBINjBWMjV6Ii8+PHBhdGggZmlsbD0iIzJCMzk5MCIgZD0iTTEwMCwyNWgyMHYxMGgtMjBWMjV6Ii8+PHBhdGggZmlsbD0iIzJCMzk5MCIgZD0iTTE0MCwyNWgyMHYxMGgtMjBWMjV6Ii8+PC9zdmc+"
+    def shared_connections(self, from_city, to_city, date):
+        """Connecting itineraries for a search, computed once and shared by every session asking for them"""
+        key = ("connections",) + make_search_key(from_city, to_city, date)
+        return get_search_cache().get_or_compute(key, lambda: tuple(self.find_connections(from_city, to_city, date)))
     
-    def initialize_session_state(self):
-        """Initialize session state variables"""
-        if 'search_performed' not in st.session_state:
-            st.session_state.search_performed = False
-        if 'selected_flight' not in st.session_state:
-            st.session_state.selected_flight = None
-        if 'selected_return_flight' not in st.session_state:
-            st.session_state.selected_return_flight = None
-        if 'flight_results' not in st.session_state:
-            st.session_state.flight_results = []
-        if 'return_flight_results' not in st.session_state:
-            st.session_state.return_flight_results = []
-        if 'view_booking' not in st.session_state:
-            st.session_state.view_booking = False
-        if 'passengers' not in st.session_state:
-            st.session_state.passengers = 1
-        if 'sort_by' not in st.session_state:
-            st.session_state.sort_by = "price"
-        if 'filter_airlines' not in st.session_state:
-            st.session_state.filter_airlines = list(self.airlines.keys())
-        if 'filter_classes' not in st.session_state:
-            st.session_state.filter_classes = self.fare_classes.copy()
-        if 'show_fare_rules' not in st.session_state:
-            st.session_state.show_fare_rules = {}
-        if 'show_fare_breakup' not in st.session_state:
-            st.session_state.show_fare_breakup = {}
-        if 'progress_step' not in st.session_state:
-            st.session_state.progress_step = 1
-        if 'trip_type' not in st.session_state:
-            st.session_state.trip_type = "one_way"
-        if 'from_city' not in st.session_state:
-            st.session_state.from_city = None
-        if 'to_city' not in st.session_state:
-            st.session_state.to_city = None
-        if 'depart_date' not in st.session_state:
-            st.session_state.depart_date = None
-        if 'return_date' not in st.session_state:
-            st.session_state.return_date = None
-        if 'payment_method' not in st.session_state:
-            st.session_state.payment_method = None
-        if 'passenger_details' not in st.session_state:
-            st.session_state.passenger_details = []
-        if 'booking_complete' not in st.session_state:
-            st.session_state.booking_complete = False
-        if 'booking_reference' not in st.session_state:
-            st.session_state.booking_reference = None
+    def calculate_fare_breakup(self, price, passengers):
+        """Split a per-passenger fare into base fare, taxes and fees"""
+        base_fare = price * passengers
+        taxes = round(base_fare * TAX_RATE)
+        convenience_fee = CONVENIENCE_FEE * passengers
+        return {
+            "Base Fare": base_fare,
+            "Taxes & Surcharges": taxes,
+            "Convenience Fee": convenience_fee,
+            "Total": base_fare + taxes + convenience_fee
+        }
     
-    def apply_custom_css(self):
-        """Apply custom CSS styling for better UI"""
+    @timed("pricing")
+    def price_snapshot(self, results):
+        """Current fares for a result store, shared until one of its flights' inventory changes"""
+        return get_pricing_engine().snapshot(results, st.session_state.passengers, date.today(), get_seat_inventory())
+    
+    def flight_card_template(self, results, row):
+        """The parts of a flight card that never change for a flight, leaving its price and seats open"""
+        airline = results.airline_name(row)
+        airline_code = self.airlines[airline]["code"]
+        offset = results.arrival_day_offset(row)
+        return FLIGHT_CARD.partial(
+            logo=get_static_assets().logo_html(airline_code),
+            airline=airline,
+            airline_code=airline_code,
+            flight_number=results.flight_number[row],
+            departure=results.departure_label(row),
+            from_city=results.from_city,
+            date_label=results.date.strftime("%d %b") if results.date else "",
+            duration=self.format_duration(int(results.duration_mins[row])),
+            arrival=results.arrival_clock(row),
+            arrival_note=DAY_OFFSET_NOTE.render(label=day_offset_label(offset)) if offset else "",
+            to_city=results.to_city,
+            fare_class=results.fare_class_name(row)
+        )
+    
+    def render_flight_card(self, results, row, selected=False, seats_left=None, price=None):
+        """Build the HTML for one flight card, reusing the flight's cached template"""
+        if price is None:
+            price = int(results.price[row])
+        # Every search of a day shows its flights under the same ids and schedule, whatever the party
+        # size or trip type, so their cards are shared; the store itself would stay pinned in the cache
+        template = self.fragments.get_or_render(
+            ("card", results.flight_id(row)), results.flight_version,
+            lambda: self.flight_card_template(results, row)
+        )
+        seats_note = ""
+        if seats_left is not None and seats_left < 10:
+            seats_note = SOLD_OUT_NOTE if seats_left == 0 else SEATS_NOTE.render(seats_left=seats_left)
+        return template.render(
+            card_class="flight-card selected-flight" if selected else "flight-card",
+            price=price,
+            seats_note=seats_note
+        )
+    
+    def render_fare_rules(self, fare_class):
+        """The fare rules block for a fare class, rendered once at startup"""
+        return self.fare_rules_html[fare_class]
+    
+    def render_fare_breakup(self, breakup):
+        """Build the fare breakup block from a breakup dict"""
+        return FARE_BREAKUP_BLOCK.render(items="".join(
+            FARE_BREAKUP_ITEM.render(label=label, amount=amount) for label, amount in breakup.items()
+        ))
+    
+    def cached_fare_breakup(self, results, row, price, passengers, prices=None):
+        """The fare breakup block for a flight and party size, rendered again only when its price changes"""
+        def render():
+            if prices is not None:
+                return self.render_fare_breakup(prices.row_breakup(row))
+            return self.render_fare_breakup(self.calculate_fare_breakup(price, passengers))
+        
+        return self.fragments.get_or_render(("breakup", results.flight_id(row), passengers), price, render)
+    
+    def seats_left(self, results, rows):
+        """Seats still on sale for each row, in its fare class"""
+        return get_seat_inventory().available_many(
+            [results.flight_id(row) for row in rows],
+            [results.fare_class_name(row) for row in rows]
+        )
+    
+    def hold_seats(self):
+        """Hold seats on every selected flight for the whole party; False if any is full"""
+        inventory = get_seat_inventory()
+        self.release_seats()
+        holds = []
+        for flight in self.selected_flights():
+            hold_id = inventory.hold(flight["id"], flight["fare_class"], st.session_state.passengers)
+            if hold_id is None:
+                for held in holds:
+                    inventory.release(held)
+                return False
+            holds.append(hold_id)
+        st.session_state.seat_holds = holds
+        return True
+    
+    def release_seats(self):
+        """Give back any seats this session is holding"""
+        inventory = get_seat_inventory()
+        for hold_id in st.session_state.seat_holds:
+            inventory.release(hold_id)
+        st.session_state.seat_holds = []
+    
+    def flight_label(self, results, row, price):
+        """Short one-line description of a flight for pickers (without a price if None)"""
+        airline = results.airline_name(row)
+        label = (
+            f"{self.airlines[airline]['code']} {results.flight_number[row]} · {airline} · "
+            f"{results.departure_label(row)} → {results.arrival_label(row)}"
+        )
+        return label if price is None else f"{label} · ₹{price:,}"
+    
+    @timed("render_cards")
+    def render_results_page(self, results, rows, selected_id=None, passengers=1, expanded_rules=(), expanded_breakup=(), seats_left=None, prices=None):
+        """Build a single HTML block for one page of flight cards"""
+        count("cards_rendered", len(rows))
+        parts = []
+        for i, row in enumerate(rows):
+            flight_id = results.flight_id(row)
+            seats = seats_left[i] if seats_left is not None else None
+            price = int(prices.price[row]) if prices is not None else None
+            parts.append(self.render_flight_card(results, row, flight_id == selected_id, seats, price))
+            if flight_id in expanded_rules:
+                parts.append(self.render_fare_rules(results.fare_class_name(row)))
+            if flight_id in expanded_breakup:
+                price = price if price is not None else int(results.price[row])
+                parts.append(self.cached_fare_breakup(results, row, price, passengers, prices))
+        return "".join(parts)
+    
+    def display_flight_results(self, view, selected_key="selected_flight", page_size=None):
+        """Filter, sort and draw the visible pages of a result view"""
+        results = view.results
+        page_size = page_size or self.RESULTS_PAGE_SIZE
+        prices = self.price_snapshot(results)
+        with span("filter_sort"):
+            filtered = view.filtered(
+                st.session_state.filter_airlines,
+                st.session_state.filter_classes,
+                st.session_state.sort_by,
+                prices
+            )
+        
+        if len(filtered) == 0:
+            st.info("No flights match the selected filters.")
+            return
+        
+        # Start again from the first page whenever the search changes
+        pages_key = f"{selected_key}_pages"
+        if st.session_state.get(pages_key, (None, 0))[0] != view.key:
+            st.session_state[pages_key] = (view.key, 1)
+        pages = st.session_state[pages_key][1]
+        visible_rows = filtered.rows[:pages * page_size]
+        st.caption(f"Showing {len(visible_rows)} of {len(filtered)} flights")
+        
+        selected = st.session_state[selected_key]
+        selected_id = selected["id"] if selected is not None else None
+        expanded_rules = {k for k, v in st.session_state.show_fare_rules.items() if v}
+        expanded_breakup = {k for k, v in st.session_state.show_fare_breakup.items() if v}
+        
+        # One markdown element per page; rows past the last visible page are never rendered
+        render_stats = []
+        for page, start in enumerate(range(0, len(visible_rows), page_size)):
+            started = time.perf_counter()
+            page_rows = visible_rows[start:start + page_size]
+            html = self.render_results_page(
+                results, page_rows, selected_id,
+                st.session_state.passengers, expanded_rules, expanded_breakup,
+                self.seats_left(results, page_rows), prices
+            )
+            st.markdown(html, unsafe_allow_html=True)
+            render_stats.append({
+                "page": page + 1,
+                "cards": min(page_size, len(visible_rows) - start),
+                "bytes": len(html.encode()),
+                "render_ms": (time.perf_counter() - started) * 1000
+            })
+        st.session_state.render_stats = render_stats
+        
+        # A single set of controls acts on whichever visible flight is picked
+        row = st.selectbox(
+            "Choose a flight",
+            visible_rows.tolist(),
+            format_func=lambda row: self.flight_label(results, row, int(prices.price[row])),
+            key=f"{selected_key}_choice"
+        )
+        flight_id = results.flight_id(row)
+        col1, col2, col3 = st.columns([1, 1, 1])
+        with col1:
+            if st.button("Fare rules", key=f"rules_{selected_key}"):
+                st.session_state.show_fare_rules[flight_id] = not st.session_state.show_fare_rules.get(flight_id, False)
+                st.rerun()
+        with col2:
+            if st.button("Fare breakup", key=f"breakup_{selected_key}"):
+                st.session_state.show_fare_breakup[flight_id] = not st.session_state.show_fare_breakup.get(flight_id, False)
+                st.rerun()
+        with col3:
+            if st.button("Select", key=f"select_{selected_key}", type="primary"):
+                if self.seats_left(results, [row])[0] < st.session_state.passengers:
+                    st.error("Not enough seats left on this flight for your party.")
+                else:
+                    st.session_state[selected_key] = results.record(row, self.airlines, int(prices.price[row]))
+                    st.rerun()
+        
+        if len(visible_rows) < len(filtered):
+            if st.button(f"Load {min(page_size, len(filtered) - len(visible_rows))} more flights", key=f"more_{selected_key}"):
+                st.session_state[pages_key] = (view.key, pages + 1)
+                st.rerun()
+    
+    def display_header(self):
+        """Draw the app header"""
         st.markdown("""
-        <style>
-            .main {
-                padding: 0 !important;
-                margin: 0 !important;
-            }
-            
-            .app-header {
-                background: linear-gradient(135deg, #FF6D38, #FF4E00);
-                padding: 1.5rem;
-                color: white;
-                border-radius: 0px;
-                margin-bottom: 1rem;
-                box-shadow: 0 4px 6px rgba(0,0,0,0.1);
-            }
-            
-            .search-form {
-                background-color: white;
-                padding: 1.5rem;
-                border-radius: 10px;
-                box-shadow: 0 2px 10px rgba(0,0,0,0.05);
-                margin-bottom: 1.5rem;
-                border: 1px solid #e0e0e0;
-            }
-            
-            .flight-card {
-                border: 1px solid #e0e0e0;
-                border-radius: 8px;
-                padding: 1rem;
-                margin-bottom: 1rem;
-                transition: transform 0.2s;
-                background-color: white;
-            }
-            
-            .flight-card:hover {
-                transform: translateY(-2px);
-                box-shadow: 0 4px 10px rgba(0,0,0,0.1);
-            }
-            
-            .selected-flight {
-                border: 2px solid #FF6D38;
-                background-color: #fff9f5;
-            }
-            
-            .flight-time {
-                font-size: 1.2rem;
-                font-weight: bold;
-            }
-            
-            .airline-name {
-                font-weight: bold;
-            }
-            
-            .flight-price {
-                color: #FF4E00;
-                font-size: 1.3rem;
-                font-weight: bold;
-            }
-            
-            .flight-detail {
-                color: #616161;
-                font-size: 0.9rem;
-            }
-            
-            .flight-duration {
-                text-align: center;
-                color: #616161;
-                font-weight: bold;
-                font-size: 0.9rem;
-                position: relative;
-            }
-            
-            .flight-class-tag {
-                background-color: #fff0eb;
-                color: #FF4E00;
-                padding: 0.2rem 0.6rem;
-                border-radius: 4px;
-                font-size: 0.8rem;
-                font-weight: bold;
-            }
-            
-            .filter-panel {
-                background-color: white;
-                padding: 1rem;
-                border-radius: 8px;
-                border: 1px solid #e0e0e0;
-                margin-bottom: 1rem;
-            }
-            
-            .progress-container {
-                display: flex;
-                justify-content: space-between;
-                margin-bottom: 2rem;
-                position: relative;
-            }
-            
-            .progress-step {
-                display: flex;
-                flex-direction: column;
-                align-items: center;
-                z-index: 2;
-            }
-            
-            .step-circle {
-                width: 35px;
-                height: 35px;
-                border-radius: 50%;
-                background-color: #e0e0e0;
-                display: flex;
-                align-items: center;
-                justify-content: center;
-                color: #616161;
-                font-weight: bold;
-                margin-bottom: 8px;
-            }
-            
-            .active-step .step-circle {
-                background-color: #FF4E00;
-                color: white;
-            }
-            
-            .completed-step .step-circle {
-                background-color: #4CAF50;
-                color: white;
-            }
-            
-            .step-title {
-                font-size:.8rem;
-                color: #616161;
-                text-align: center;
-            }
-            
-            .active-step .step-title {
-                color: #FF4E00;
-                font-weight: bold;
-            }
-            
-            .completed-step .step-title {
-                color: #4CAF50;
-                font-weight: bold;
-            }
-            
-            .progress-line {
-                position: absolute;
-                top: 17px;
-                left: 15%;
-                right: 15%;
-                height: 2px;
-                background-color: #e0e0e0;
-                z-index: 1;
-            }
-            
-            .progress-line-filled {
-                position: absolute;
-                top: 17px;
-                left: 15%;
-                height: 2px;
-                background-color: #4CAF50;
-                z-index: 1;
-                transition: width 0.5s;
-            }
-            
-            .divider {
-                display: flex;
-                align-items: center;
-                margin: 1rem 0;
-            }
-            
-            .divider-line {
-                flex-grow: 1;
-                height: 1px;
-                background-color: #e0e0e0;
-            }
-            
-            .divider-text {
-                margin: 0 10px;
-                color: #616161;
-                font-size: 0.9rem;
-            }
-            
-            .price-breakdown {
-                background-color: #fff9f5;
-                padding: 1rem;
-                border-radius: 8px;
-                margin-top: 1rem;
-                border: 1px solid #ffe0d0;
-            }
-            
-            .fare-rules {
-                background-color: #f9f9f9;
-                padding: 1rem;
-                border-radius: 8px;
-                margin-top: 1rem;
-                border: 1px solid #e0e0e0;
-            }
-            
-            .fare-breakup {
-                background-color: #f9f9f9;
-                padding: 1rem;
-                border-radius: 8px;
-                margin-top: 0.5rem;
-                border: 1px solid #e0e0e0;
-            }
-            
-            .fare-rule-item {
-                display: flex;
-                justify-content: space-between;
-                padding: 0.5rem 0;
-                border-bottom: 1px solid #e0e0e0;
-            }
-            
-            .fare-rule-item:last-child {
-                border-bottom: none;
-            }
-            
-            .fare-breakup-item {
-                display: flex;
-                justify-content: space-between;
-                padding: 0.5rem 0;
-                border-bottom: 1px solid #e0e0e0;
-            }
-            
-            .fare-breakup-item:last-child {
-                border-bottom: none;
-                font-weight: bold;
-            }
-            
-            /* Button styling */
-            .primary-button {
-                background-color: #FF4E00;
-                color: white;
-                border: none;
-                padding: 10px 20px;
-                border-radius: 4px;
-                font-weight: bold;
-                cursor: pointer;
-                width: 100%;
-                text-align: center;
-                transition: background-color 0.3s;
-            }
-            
-            .primary-button:hover {
-                background-color: #E84600;
-            }
-            
-            .secondary-button {
-                background-color: #f0f0f0;
-                color: #333;
-                border: 1px solid #ddd;
-                padding: 8px 16px;
-                border-radius: 4px;
-                cursor: pointer;
-                transition: background-color 0.3s;
-            }
-            
-            .secondary-button:hover {
-                background-color: #e0e0e0;
-            }
-            
-            .text-button {
-                background: none;
-                color: #FF4E00;
-                border: none;
-                padding: 0;
-                font: inherit;
-                cursor: pointer;
-                outline: inherit;
-                text-decoration: underline;
-            }
-            
-            .link-button {
-                color: #FF4E00;
-                text-decoration: none;
-                font-size: 0.9rem;
-                cursor: pointer;
-            }
-            
-            .link-button:hover {
-                text-decoration: underline;
-            }
-            
-            /* Add animation to loading spinner */
-            @keyframes spin {
-                0% { transform: rotate(0deg); }
-                100% { transform: rotate(360deg); }
-            }
-            
-            .loading-spinner {
-                border: 4px solid rgba(0, 0, 0, 0.1);
-                width: 36px;
-                height: 36px;
-                border-radius: 50%;
-                border-left-color: #FF4E00;
-                animation: spin 1s linear infinite;
-                margin: 0 auto;
-            }
-            
-            .logo-img {
-                max-height: 30px;
-                max-width: 80px;
-            }
-            
-            .airline-logo-container {
-                display: flex;
-                align-items: center;
-                gap: 10px;
-            }
-            
-            /* Booking summary styles */
-            .booking-summary {
-                background-color: white;
-                border-radius: 8px;
-                border: 1px solid #e0e0e0;
-                padding: 1rem;
-                margin-bottom: 1.5rem;
-            }
-            
-            .booking-flight-info {
-                display: flex;
-                align-items: center;
-                margin-bottom: 1rem;
-                padding-bottom: 1rem;
-                border-bottom: 1px solid #f0f0f0;
-            }
-            
-            .booking-flight-info:last-child {
-                margin-bottom: 0;
-                padding-bottom: 0;
-                border-bottom: none;
-            }
-            
-            .passenger-form {
-                background-color: white;
-                border-radius: 8px;
-                border: 1px solid #e0e0e0;
-                padding: 1.5rem;
-                margin-bottom: 1.5rem;
-            }
-            
-            .passenger-section {
-                margin-bottom: 1.5rem;
-                padding-bottom: 1.5rem;
-                border-bottom: 1px solid #f0f0f0;
-            }
-            
-            .passenger-section:last-child {
-                margin-bottom: 0;
-                padding-bottom: 0;
-                border-bottom: none;
-            }
-            
-            .form-section-title {
-                font-size: 1.2rem;
-                font-weight: bold;
-                margin-bottom: 1rem;
-                color: #333;
-            }
-            
-            .payment-method {
-                padding: 1rem;
-                border: 1px solid #e0e0e0;
-                border-radius: 8px;
-                margin-bottom: 1rem;
-                cursor: pointer;
-                transition: border-color 0.3s;
-            }
-            
-            .payment-method:hover {
-                border-color: #FF4E00;
-            }
-            
-            .payment-method.selected {
-                border-color: #FF4E00;
-                background-color: #fff9f5;
-            }
-            
-            /* Responsive fixes */
-            @media (max-width: 768px) {
-                .flight-card {
-                    padding: 0.8rem;
-                }
-                .flight-time {
-                    font-size: 1rem;
-                }
-                .flight-price {
-                    font-size: 1.1rem;
-                }
-            }
-            
-            /* Styling for the fare details toggle */
-            .fare-details-toggle {
-                display: flex;
-                justify-content: space-between;
-                padding: 0.5rem 0;
-                cursor: pointer;
-                font-size: 0.9rem;
-                color: #FF4E00;
-            }
-            
-            /* Arrival and departure styling */
-            .date-info {
-                font-size: 0.8rem;
-                color: #616161;
-                margin-top: 2px;
-            }
-            
-            /* Tooltip styling */
-            .tooltip {
-                position: relative;
-                display: inline-block;
-                cursor: pointer;
-            }
-            
-            .tooltip .tooltiptext {
-                visibility: hidden;
-                width: 200px;
-                background-color: #333;
-                color: white;
-                text-align: center;
-                border-radius: 4px;
-                padding: 5px;
-                position: absolute;
-                z-index: 1;
-                bottom: 125%;
-                left: 50%;
-                margin-left: -100px;
-                opacity: 0;
-                transition: opacity 0.3s;
-                font-size: 0.8rem;
-            }
-            
-            .tooltip:hover .tooltiptext {
-                visibility: visible;
-                opacity: 1;
-            }
-            
-            /* Hide default Streamlit elements */
-            #MainMenu {visibility: hidden;}
-            footer {visibility: hidden;}
-            
-            /* Improve form inputs */
-            .stTextInput input, .stSelectbox select, .stDateInput input {
-                padding: 0.5rem;
-                border-radius: 4px;
-                border: 1px solid #ddd;
-            }
-            
-            .stTextInput input:focus, .stSelectbox select:focus, .stDateInput input:focus {
-                border-color: #FF4E00;
-                box-shadow: 0 0 0 2px rgba(255, 78, 0, 0.2);
-            }
-        </style>
+        <div class="app-header">
+            <h1 style="margin: 0; color: white;">✈️ Flight Booking</h1>
+            <div>Search and book domestic flights across India</div>
+        </div>
         """, unsafe_allow_html=True)
         
-    def format_duration(self, minutes):
-        """Format minutes to hours and minutes"""
-        hours = minutes // 60
-        mins = minutes % 60
-        return f"{hours}h {mins}m"
+        col1, col2, _ = st.columns([1, 1, 4])
+        with col1:
+            label = "Back to booking" if st.session_state.view_booking else "Find my booking"
+            if st.button(label, key="view_booking_toggle"):
+                st.session_state.view_booking = not st.session_state.view_booking
+                st.session_state.view_alerts = False
+                st.rerun()
+        with col2:
+            watch_key = st.session_state.alerts_key
+            unread = get_saved_searches().unread(watch_key) if watch_key else 0
+            label = "Back to booking" if st.session_state.view_alerts else f"Price alerts ({unread})" if unread else "Price alerts"
+            if st.button(label, key="view_alerts_toggle"):
+                st.session_state.view_alerts = not st.session_state.view_alerts
+                st.session_state.view_booking = False
+                st.rerun()
+    
+    def display_search_form(self):
+        """Draw the search form and run a search when it is submitted"""
+        trip_type = st.radio(
+            "Trip type", ["one_way", "round_trip"],
+            format_func=lambda value: "One way" if value == "one_way" else "Round trip",
+            horizontal=True, key="trip_type_input"
+        )
+        
+        col1, col2, col3, col4, col5 = st.columns([2, 2, 1.5, 1.5, 1])
+        with col1:
+            from_city = self.airport_picker("From", "from", default_index=0)
+        with col2:
+            to_city = self.airport_picker("To", "to", default_index=1)
+        with col3:
+            depart_date = st.date_input(
+                "Departure", value=date.today() + timedelta(days=7),
+                min_value=date.today(), max_value=date.today() + timedelta(days=BOOKING_WINDOW_DAYS - 1),
+                key="depart_date_input"
+            )
+        with col4:
+            return_date = None
+            if trip_type == "round_trip":
+                return_date = st.date_input(
+                    "Return", value=depart_date + timedelta(days=3),
+                    min_value=depart_date, max_value=date.today() + timedelta(days=BOOKING_WINDOW_DAYS - 1),
+                    key="return_date_input"
+                )
+        with col5:
+            passengers = st.number_input("Passengers", min_value=1, max_value=9, value=1, key="passengers_input")
+        
+        include_connections = st.checkbox("Include connecting flights", key="include_connections_input")
+        
+        if st.button("Search Flights", type="primary", key="search_button"):
+            if from_city is None or to_city is None:
+                st.error("Choose a departure and an arrival airport.")
+                return
+            if from_city == to_city:
+                st.error("Departure and arrival cities must be different.")
+                return
+            self.perform_search(trip_type, from_city, to_city, depart_date, return_date, int(passengers), include_connections)
+    
+    def airport_picker(self, label, prefix, default_index=0):
+        """A city/airport query box over a picker of its best matches (the featured cities when empty)"""
+        query = st.text_input(
+            f"{label} city or airport", placeholder="City, airport or code",
+            key=f"{prefix}_query_input", label_visibility="collapsed"
+        )
+        options = get_airport_index().search(query, limit=self.AIRPORT_MATCHES) if query.strip() else self.cities
+        return st.selectbox(label, options, index=min(default_index, len(options) - 1) if options else None, key=f"{prefix}_city_input")
+    
+    def perform_search(self, trip_type, from_city, to_city, depart_date, return_date, passengers, include_connections=False):
+        """Run a search and point this session at its shared results"""
+        # Drop the previous search and its expanded cards before pointing at the new one
+        self.session_manager.reset(st.session_state, SEARCH, VIEW)
+        st.session_state.trip_type = trip_type
+        st.session_state.from_city = from_city
+        st.session_state.to_city = to_city
+        st.session_state.depart_date = depart_date
+        st.session_state.return_date = return_date
+        st.session_state.passengers = passengers
+        
+        # The price watcher pauses while a user is waiting on a search
+        with get_price_watcher().interactive():
+            st.session_state.flight_results, st.session_state.search_timing = self.stream_search(
+                from_city, to_city, depart_date
+            )
+            st.session_state.return_flight_results = None
+            if trip_type == "round_trip":
+                st.session_state.return_flight_results, _ = self.stream_search(to_city, from_city, return_date)
+            
+            st.session_state.connection_results = None
+            if include_connections:
+                st.session_state.connection_results = self.shared_connections(from_city, to_city, depart_date)
+        
+        st.session_state.selected_flight = None
+        st.session_state.selected_return_flight = None
+        st.session_state.search_performed = True
+    
+    def stream_search(self, from_city, to_city, search_date):
+        """Run a search, redrawing its first page after every supplier answer.
 
-    def generate_flights(self, from_city, to_city, date, count=10):
-        """Generate random flight data"""
-        flights = []
+        Returns the result view and the time to the first result and to the
+        complete result, in milliseconds.
+        """
+        started = time.perf_counter()
+        placeholder = st.empty()
+        stream = None
         
-        # Get random times throughout the day
-        departure_times = sorted([f"{random.randint(0, 23):02d}:{random.randint(0, 59):02d}" for _ in range(count)])
+        def on_answer(day_columns, answer):
+            nonlocal stream
+            if stream is None:
+                # The day's calendar rows, under the ids and schedule the finished results will use
+                preview = FlightResults(
+                    ("preview", from_city, to_city, search_date), from_city, to_city, search_date,
+                    self.airlines.keys(), self.fare_classes, day_columns,
+                    id_prefix=flight_id_prefix(from_city, to_city, search_date),
+                    schedule=self.fare_calendar(from_city, to_city).schedule(search_date)
+                )
+                # New flights have no seats held yet, so their fares are the calendar fares for the day
+                prices = current_fares(preview.price, (search_date - date.today()).days, 0.0)
+                sort_by = st.session_state.sort_by
+                sort_keys = prices if sort_by == "price" else getattr(preview, SORT_COLUMNS[sort_by])
+                stream = ResultStream(preview, sort_keys, prices, started)
+            stream.add(answer)
+            placeholder.markdown(self.render_stream(stream), unsafe_allow_html=True)
         
-        for i in range(count):
-            # Randomly select an airline
-            airline = random.choice(list(self.airlines.keys()))
-            airline_code = self.airlines[airline]["code"]
-            
-            # Generate random flight number
-            flight_number = f"{airline_code} {random.randint(100, 999)}"
-            
-            # Assign departure time
-            departure_time = departure_times[i]
-            
-            # Generate duration between 1h to 4h
-            duration_mins = random.randint(60, 240)
-            
-            # Calculate arrival time
-            departure_dt = datetime.strptime(departure_time, "%H:%M")
-            arrival_dt = departure_dt + timedelta(minutes=duration_mins)
-            arrival_time = arrival_dt.strftime("%H:%M")
-            
-            # Randomly select fare class
-            fare_class = random.choice(self.fare_classes)
-            
-            # Assign price based on class
-            if fare_class == "Economy":
-                price = random.randint(2500, 5000)
-            elif fare_class == "Premium Economy":
-                price = random.randint(5)
+        view = self.search_flights(from_city, to_city, search_date, on_answer=on_answer)
+        total_ms = (time.perf_counter() - started) * 1000
+        placeholder.empty()
+        timing = {
+            "first_result_ms": stream.first_result_ms if stream is not None and stream.first_result_ms is not None else total_ms,
+            "total_ms": total_ms,
+            "streamed": stream is not None
+        }
+        return view, timing
+    
+    def render_stream(self, stream):
+        """Build the in-progress results block: progress line, filter counts and the first page so far"""
+        suppliers = len(get_supplier_search().suppliers)
+        airlines = st.session_state.filter_airlines
+        fare_classes = st.session_state.filter_classes
+        matching = stream.matching(airlines, fare_classes)
+        answered = len(stream.answers)
+        spinner = '<div class="loading-spinner stream-spinner"></div>' if answered < suppliers else ""
+        first = f" · first result in {stream.first_result_ms:.0f} ms" if stream.first_result_ms is not None else ""
+        counts = " · ".join(
+            f"{name} {count}" for name, count in zip(stream.preview.airline_names, stream.airline_counts.tolist()) if count
+        )
+        cards = "".join(
+            self.render_flight_card(stream.preview, row, price=int(stream.prices[row]))
+            for row in matching[:self.RESULTS_PAGE_SIZE].tolist()
+        )
+        return f"""
+        <div class="stream-status">
+            {spinner}
+            <div>
+                <div class="flight-detail">Searching… {answered} of {suppliers} airlines answered{first}</div>
+                <div class="date-info">{len(stream)} flights found, {len(matching)} match your filters{' · ' + counts if counts else ''}</div>
+            </div>
+        </div>
+        {cards}
+        """
+    
+    def display_supplier_status(self, results):
+        """Note which airlines did not answer the search"""
+        missing = [answer for answer in results.suppliers if not answer.ok]
+        if not missing:
+            return
+        reasons = {"timeout": "timed out", "error": "unavailable", "circuit_open": "temporarily skipped"}
+        names = {info["code"]: name for name, info in self.airlines.items()}
+        st.caption(
+            f"{len(results.suppliers) - len(missing)} of {len(results.suppliers)} airlines answered · "
+            + ", ".join(f"{names[answer.code]} {reasons[answer.status]}" for answer in missing)
+        )
+    
+    def display_search_results(self):
+        """Draw the sort/filter panel and the outbound and return results"""
+        with st.expander("Sort & filter", expanded=False):
+            st.selectbox(
+                "Sort by", ["price", "departure", "arrival", "duration"],
+                format_func=str.capitalize, key="sort_by"
+            )
+            st.multiselect("Airlines", list(self.airlines.keys()), key="filter_airlines")
+            st.multiselect("Fare classes", self.fare_classes, key="filter_classes")
+        
+        with st.expander("Fare calendar", expanded=False):
+            self.display_fare_calendar()
+        
+        with st.expander("Watch this route", expanded=False):
+            self.display_watch_form()
+        
+        timing = st.session_state.search_timing
+        if timing is not None:
+            st.caption(
+                f"First results in {timing['first_result_ms']:,.0f} ms · complete in {timing['total_ms']:,.0f} ms"
+                + ("" if timing["streamed"] else " (cached)")
+            )
+        
+        st.subheader(f"{st.session_state.from_city} → {st.session_state.to_city}")
+        self.display_supplier_status(st.session_state.flight_results.results)
+        self.display_flight_results(st.session_state.flight_results)
+        
+        if st.session_state.connection_results:
+            st.subheader("Connecting itineraries")
+            self.display_connections(st.session_state.connection_results)
+        
+        if st.session_state.return_flight_results is not None:
+            st.subheader(f"{st.session_state.to_city} → {st.session_state.from_city}")
+            self.display_supplier_status(st.session_state.return_flight_results.results)
+            self.display_flight_results(st.session_state.return_flight_results, "selected_return_flight")
+            with st.expander("Best combinations", expanded=False):
+                self.display_best_combinations()
+        
+        selected = st.session_state.selected_flight
+        selected_return = st.session_state.selected_return_flight
+        if selected is None or (st.session_state.trip_type == "round_trip" and selected_return is None):
+            return
+        
+        self.display_booking_summary()
+        if st.button("Continue to passenger details", type="primary", key="continue_to_passengers"):
+            if not self.hold_seats():
+                st.error("Sorry, those seats were just taken. Please choose another flight.")
+                return
+            st.session_state.progress_step = 2
+            st.rerun()
+    
+    def display_watch_form(self):
+        """Save the current search so fare drops on it are filed in the user's price alerts"""
+        col1, col2 = st.columns([2, 1])
+        with col1:
+            email = st.text_input("Email", value=st.session_state.alerts_email or "", key="watch_email_input")
+        with col2:
+            target = st.number_input("Only below (₹, optional)", min_value=0, value=0, step=500, key="watch_max_price_input")
+        if not st.button("Save search", key="watch_button"):
+            return
+        if "@" not in email:
+            st.error("Enter the email to file alerts under.")
+            return
+        
+        legs = [(st.session_state.from_city, st.session_state.to_city, st.session_state.depart_date)]
+        if st.session_state.trip_type == "round_trip":
+            legs.append((st.session_state.to_city, st.session_state.from_city, st.session_state.return_date))
+        # One key per session files every search it saves together
+        watch_key = st.session_state.alerts_key or new_watch_key()
+        store = get_saved_searches()
+        for from_city, to_city, day in legs:
+            store.save(watch_key, email, from_city, to_city, day, st.session_state.passengers, int(target) or None)
+        st.session_state.alerts_email = email.strip()
+        st.session_state.alerts_key = watch_key
+        get_price_watcher()
+        st.success(
+            f"Saved. Fare drops will appear under Price alerts. To open them from another browser, "
+            f"keep your watch key: `{watch_key}`"
+        )
+    
+    def render_combinations(self, outbound, inbound, combinations):
+        """Build one block of cards for ranked outbound/return pairs"""
+        cards = []
+        for rank, combination in enumerate(combinations, start=1):
+            out_row, in_row = combination["outbound_row"], combination["return_row"]
+            discount = f" · saves ₹{combination['discount']:,}" if combination["discount"] else ""
+            cards.append(f"""
+            <div class="flight-card">
+                <div style="display: flex; justify-content: space-between; align-items: center;">
+                    <div class="flight-time">#{rank}</div>
+                    <div>
+                        <div class="airline-name">{self.flight_label(outbound, out_row, None)}</div>
+                        <div class="airline-name">{self.flight_label(inbound, in_row, None)}</div>
+                    </div>
+                    <div class="flight-duration">{self.format_duration(combination['duration_mins'])} flying · {self.format_duration(combination['stay_mins'])} stay</div>
+                    <div style="text-align: right;">
+                        <div class="flight-price">₹{combination['price']:,}</div>
+                        <div class="date-info">per passenger{discount}</div>
+                    </div>
+                </div>
+            </div>
+            """)
+        return "".join(cards)
+    
+    def display_best_combinations(self):
+        """Rank outbound/return pairs by price, time or a weighted score and let the user pick one"""
+        outbound = st.session_state.flight_results
+        inbound = st.session_state.return_flight_results
+        col1, col2 = st.columns([2, 1])
+        with col1:
+            sort_by = st.radio(
+                "Rank by", COMBINATION_SORTS,
+                format_func=lambda value: {"price": "Total price", "duration": "Travel time", "score": "Best value"}[value],
+                horizontal=True, key="combination_sort"
+            )
+        with col2:
+            min_stay = st.number_input("Minimum stay (hours)", min_value=0, max_value=24 * 30, value=0, key="combination_min_stay")
+        
+        outbound_prices = self.price_snapshot(outbound.results)
+        inbound_prices = self.price_snapshot(inbound.results)
+        filters = (st.session_state.filter_airlines, st.session_state.filter_classes)
+        combinations = best_combinations(
+            outbound.filtered(*filters), inbound.filtered(*filters),
+            outbound_prices.price, inbound_prices.price,
+            k=self.COMBINATIONS_SHOWN, sort_by=sort_by, min_stay_mins=int(min_stay) * 60
+        )
+        if not combinations:
+            st.info("No outbound and return flights fit together with these filters.")
+            return
+        st.markdown(self.render_combinations(outbound.results, inbound.results, combinations), unsafe_allow_html=True)
+        
+        choice = st.selectbox(
+            "Choose a combination", range(len(combinations)),
+            format_func=lambda i: f"#{i + 1} · ₹{combinations[i]['price']:,} · {self.format_duration(combinations[i]['duration_mins'])}",
+            key="combination_choice"
+        )
+        if st.button("Select this pair", key="select_combination", type="primary"):
+            combination = combinations[choice]
+            out_row, in_row = combination["outbound_row"], combination["return_row"]
+            passengers = st.session_state.passengers
+            if self.seats_left(outbound.results, [out_row])[0] < passengers or self.seats_left(inbound.results, [in_row])[0] < passengers:
+                st.error("Not enough seats left on these flights for your party.")
+                return
+            st.session_state.selected_flight = outbound.results.record(out_row, self.airlines, int(outbound_prices.price[out_row]))
+            st.session_state.selected_return_flight = inbound.results.record(in_row, self.airlines, int(inbound_prices.price[in_row]))
+            st.rerun()
+    
+    def render_fare_calendar(self, dates, fares, selected):
+        """Build a strip of day cells with the lowest fare on each"""
+        cheapest = int(fares.min())
+        cells = []
+        for day, fare in zip(dates, fares.tolist()):
+            cell_class = "calendar-day"
+            if day == selected:
+                cell_class += " selected-day"
+            elif fare == cheapest:
+                cell_class += " cheapest-day"
+            cells.append(
+                f'<div class="{cell_class}"><div class="date-info">{day.strftime("%a %d %b")}</div>'
+                f'<div class="calendar-fare">₹{fare:,}</div></div>'
+            )
+        return f'<div class="fare-calendar">{"".join(cells)}</div>'
+    
+    def render_fare_matrix(self, matrix, depart_dates, return_dates, selected):
+        """Build a table of combined round-trip fares, departures down and returns across"""
+        header = "".join(f"<th>{day.strftime('%d %b')}</th>" for day in return_dates)
+        rows = []
+        for i, depart in enumerate(depart_dates):
+            cells = []
+            for j, back in enumerate(return_dates):
+                fare = matrix[i, j]
+                cell_class = ' class="selected-day"' if (depart, back) == selected else ""
+                cells.append(f"<td{cell_class}>{'–' if np.isnan(fare) else f'₹{int(fare):,}'}</td>")
+            rows.append(f"<tr><th>{depart.strftime('%d %b')}</th>{''.join(cells)}</tr>")
+        return f'<table class="fare-matrix"><tr><th>Depart ↓ Return →</th>{header}</tr>{"".join(rows)}</table>'
+    
+    def display_fare_calendar(self):
+        """Draw the lowest fare per day around the chosen dates and offer to search another date"""
+        from_city, to_city = st.session_state.from_city, st.session_state.to_city
+        depart_date, return_date = st.session_state.depart_date, st.session_state.return_date
+        outbound = self.fare_calendar(from_city, to_city)
+        if not outbound.covers(depart_date):
+            st.info("The fare calendar covers departures in the current booking window only.")
+            return
+        depart_dates, depart_fares = outbound.window(depart_date)
+        st.markdown(self.render_fare_calendar(depart_dates, depart_fares, depart_date), unsafe_allow_html=True)
+        
+        if st.session_state.trip_type != "round_trip":
+            new_depart = st.selectbox(
+                "Depart on", depart_dates, index=depart_dates.index(depart_date),
+                format_func=lambda day: f"{day.strftime('%a %d %b')} · from ₹{int(depart_fares[depart_dates.index(day)]):,}",
+                key="calendar_depart_date"
+            )
+            new_return = None
+        else:
+            inbound = self.fare_calendar(to_city, from_city)
+            return_dates, return_fares = inbound.window(return_date)
+            matrix = round_trip_matrix(depart_fares, return_fares, depart_dates, return_dates)
+            best_depart, best_return = np.unravel_index(np.nanargmin(matrix), matrix.shape)
+            st.caption(
+                f"Cheapest round trip within {CALENDAR_RADIUS_DAYS} days of your dates: "
+                f"{depart_dates[best_depart].strftime('%d %b')} → {return_dates[best_return].strftime('%d %b')} "
+                f"for ₹{int(matrix[best_depart, best_return]):,} per passenger"
+            )
+            # Show the week around the chosen pair; the cheapest pair above covers the whole window
+            i, j = depart_dates.index(depart_date), return_dates.index(return_date)
+            rows = slice(max(i - 3, 0), i + 4)
+            cols = slice(max(j - 3, 0), j + 4)
+            st.markdown(self.render_fare_matrix(
+                matrix[rows, cols], depart_dates[rows], return_dates[cols], (depart_date, return_date)
+            ), unsafe_allow_html=True)
+            new_depart, new_return = st.selectbox(
+                "Travel dates",
+                [(depart_date, return_date), (depart_dates[best_depart], return_dates[best_return])],
+                format_func=lambda pair: f"{pair[0].strftime('%d %b')} → {pair[1].strftime('%d %b')}",
+                key="calendar_dates"
+            )
+        
+        if st.button("Search these dates", key="calendar_search"):
+            self.perform_search(
+                st.session_state.trip_type, from_city, to_city, new_depart, new_return, st.session_state.passengers
+            )
+            st.rerun()
+    
+    def render_progress_bar(self, step):
+        """Build the booking progress steps with ``step`` active"""
+        items = []
+        for number, title in enumerate(self.BOOKING_STEPS, start=1):
+            state = "completed-step" if number < step else "active-step" if number == step else ""
+            circle = "✓" if number < step else number
+            items.append(PROGRESS_STEP.render(state=state, circle=circle, title=title))
+        filled = 70 * (step - 1) / (len(self.BOOKING_STEPS) - 1)
+        return PROGRESS_BAR.render(filled=filled, items="".join(items))
+    
+    def display_progress_bar(self):
+        """Draw the booking progress steps, rendered once per step at startup"""
+        st.markdown(self.progress_bars[st.session_state.progress_step], unsafe_allow_html=True)
+    
+    def selected_flights(self):
+        """The flights chosen for this booking, outbound first"""
+        flights = [st.session_state.selected_flight]
+        if st.session_state.trip_type == "round_trip" and st.session_state.selected_return_flight is not None:
+            flights.append(st.session_state.selected_return_flight)
+        return flights
+    
+    def booking_discount(self):
+        """Same-airline round-trip discount on the selected flights, for the whole party"""
+        flights = self.selected_flights()
+        if len(flights) < 2 or flights[0]["airline"] != flights[1]["airline"]:
+            return 0
+        return same_airline_discount(flights[0]["price"], flights[1]["price"]) * st.session_state.passengers
+    
+    def booking_total(self):
+        """Total payable for the selected flights and passenger count"""
+        return booking_quote(self.selected_flights(), st.session_state.passengers)["Total"]
+    
+    def render_summary_flight(self, flight):
+        """Build one selected flight's row of the booking summary"""
+        return BOOKING_SUMMARY_FLIGHT.render(
+            logo=get_static_assets().logo_html(flight["airline_code"]),
+            flight_number=flight["flight_number"],
+            fare_class=flight["fare_class"],
+            from_city=flight["from_city"],
+            departure_time=flight["departure_time"],
+            to_city=flight["to_city"],
+            arrival_time=flight["arrival_time"],
+            date_label=flight["date"].strftime("%a, %d %b %Y") if flight["date"] else ""
+        )
+    
+    def display_booking_summary(self):
+        """Draw the selected flights and the amount payable"""
+        # Keyed by flight id; the record itself is the version, so a changed flight renders again
+        rows = [
+            self.fragments.get_or_render(("summary", flight["id"]), flight, lambda flight=flight: self.render_summary_flight(flight))
+            for flight in self.selected_flights()
+        ]
+        passengers = st.session_state.passengers
+        discount = self.booking_discount()
+        st.markdown(BOOKING_SUMMARY.render(
+            flights="".join(rows),
+            discount=BOOKING_DISCOUNT.render(discount=discount) if discount else "",
+            passengers=passengers,
+            plural="s" if passengers > 1 else "",
+            total=self.booking_total()
+        ), unsafe_allow_html=True)
+    
+    def display_passenger_form(self):
+        """Collect passenger names and contact details"""
+        self.display_booking_summary()
+        
+        previous = st.session_state.passenger_details
+        details = []
+        with st.form("passenger_form"):
+            for i in range(st.session_state.passengers):
+                saved = previous[i] if i < len(previous) else {}
+                st.markdown(f'<div class="form-section-title">Passenger {i + 1}</div>', unsafe_allow_html=True)
+                col1, col2, col3, col4 = st.columns([2, 2, 1, 1])
+                with col1:
+                    first_name = st.text_input("First name", value=saved.get("first_name", ""), key=f"passenger_{i}_first_name")
+                with col2:
+                    last_name = st.text_input("Last name", value=saved.get("last_name", ""), key=f"passenger_{i}_last_name")
+                with col3:
+                    age = st.number_input("Age", min_value=0, max_value=120, value=saved.get("age", 30), key=f"passenger_{i}_age")
+                with col4:
+                    genders = ["Female", "Male", "Other"]
+                    gender = st.selectbox("Gender", genders, index=genders.index(saved.get("gender", "Female")), key=f"passenger_{i}_gender")
+                details.append({"first_name": first_name.strip(), "last_name": last_name.strip(), "age": int(age), "gender": gender})
+            
+            st.markdown('<div class="form-section-title">Contact details</div>', unsafe_allow_html=True)
+            contact = previous[0] if previous else {}
+            col1, col2 = st.columns(2)
+            with col1:
+                email = st.text_input("Email", value=contact.get("email") or "", key="contact_email")
+            with col2:
+                phone = st.text_input("Mobile number", value=contact.get("phone") or "", key="contact_phone")
+            submitted = st.form_submit_button("Continue to payment", type="primary")
+        
+        if st.button("Back to flights", key="back_to_flights"):
+            self.release_seats()
+            st.session_state.progress_step = 1
+            st.rerun()
+        
+        if not submitted:
+            return
+        
+        errors = validate_passengers(details, email, phone)
+        if errors:
+            for error in errors:
+                st.error(error)
+            return
+        
+        details[0].update(email=email.strip(), phone=phone.strip())
+        st.session_state.passenger_details = details
+        st.session_state.progress_step = 3
+        st.rerun()
+    
+    def display_payment(self):
+        """Choose a payment method and complete the booking"""
+        self.display_booking_summary()
+        
+        method = st.radio("Payment method", ["Credit/Debit Card", "UPI", "Net Banking"], key="payment_method_input")
+        col1, col2 = st.columns([1, 4])
+        with col1:
+            if st.button("Back", key="back_to_passengers"):
+                st.session_state.progress_step = 2
+                st.rerun()
+        with col2:
+            if st.button(f"Pay ₹{self.booking_total():,}", type="primary", key="pay_button"):
+                if not self.complete_booking(method):
+                    st.error("Your seat hold expired. Please select your flights again.")
+                    return
+                st.rerun()
+    
+    def complete_booking(self, payment_method):
+        """Confirm the held seats, persist the booking and move to confirmation"""
+        holds = st.session_state.seat_holds
+        if not holds or not get_seat_inventory().confirm_all(holds):
+            self.release_seats()
+            st.session_state.progress_step = 1
+            return False
+        st.session_state.seat_holds = []
+        
+        flights = self.selected_flights()
+        booking = {
+            "trip_type": st.session_state.trip_type,
+            "flight": flights[0],
+            "return_flight": flights[1] if len(flights) > 1 else None,
+            "payment_method": payment_method,
+            "total_price": self.booking_total()
+        }
+        st.session_state.booking_reference = get_booking_repository().create_booking(
+            booking, st.session_state.passenger_details
+        )
+        # Started on first use; it picks up this booking once it has settled
+        get_booking_exporter()
+        st.session_state.payment_method = payment_method
+        st.session_state.booking_complete = True
+        st.session_state.progress_step = 4
+        return True
+    
+    def display_confirmation(self):
+        """Show the booking reference and summary"""
+        st.success(f"Booking confirmed! Your reference is **{st.session_state.booking_reference}**.")
+        self.display_booking_summary()
+        names = ", ".join(f"{p['first_name']} {p['last_name']}" for p in st.session_state.passenger_details)
+        st.markdown(f"**Passengers:** {names}  \n**Paid with:** {st.session_state.payment_method}")
+        
+        if st.button("Book another flight", type="primary", key="book_another"):
+            self.reset_booking()
+            st.rerun()
+    
+    def reset_booking(self):
+        """Clear the finished booking and return to search"""
+        self.release_seats()
+        self.session_manager.reset(st.session_state, BOOKING, SEARCH, VIEW)
+    
+    def display_booking_lookup(self):
+        """Find a stored booking by its reference and a passenger's last name or the booking email"""
+        repository = get_booking_repository()
+        st.subheader("Find my booking")
+        col1, col2 = st.columns(2)
+        with col1:
+            reference = st.text_input("Booking reference", key="lookup_reference")
+        with col2:
+            last_name_or_email = st.text_input("Passenger last name or booking email", key="lookup_name_or_email")
+        
+        if not reference.strip() or not last_name_or_email.strip():
+            st.caption("Enter your booking reference with a passenger's last name or the email you booked with.")
+            return
+        booking = repository.get_for_passenger(reference, last_name_or_email)
+        if booking is None:
+            st.info("No booking matches that reference and name or email.")
+            return
+        
+        route = f"{booking['from_city']} → {booking['to_city']}"
+        dates = booking["depart_date"] + (f" / {booking['return_date']}" if booking["return_date"] else "")
+        st.markdown(f"""
+        <div class="booking-summary">
+            <div class="airline-name">{booking['reference']} · {route}</div>
+            <div class="flight-detail">{booking['flight_number']}{' / ' + booking['return_flight_number'] if booking['return_flight_number'] else ''} · {dates}</div>
+            <div class="flight-detail">{booking['passengers']} passenger(s) · ₹{booking['total_price']:,}</div>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    def display_price_alerts(self):
+        """The alerts inbox and saved searches filed under this session's watch key"""
+        store = get_saved_searches()
+        watcher = get_price_watcher()
+        st.subheader("Price alerts")
+        watch_key = st.session_state.alerts_key
+        if not watch_key:
+            entered = st.text_input("Watch key", type="password", key="alerts_key_input").strip()
+            if not entered:
+                st.caption("Save a search to get price alerts, or enter the watch key shown when you saved one.")
+                return
+            if not store.for_key(entered):
+                st.error("No saved searches for that watch key.")
+                return
+            st.session_state.alerts_key = watch_key = entered
+        
+        last_round = watcher.last_round
+        if last_round is not None:
+            st.caption(
+                f"Fares last checked {time.time() - last_round['finished_at']:,.0f} s ago · "
+                f"{last_round['days']} route-days for {last_round['watchers']} changed watches in {last_round['ms']:,.0f} ms"
+            )
+        
+        alerts = store.inbox(watch_key)
+        if not alerts:
+            st.info("No price alerts yet. Saved searches are checked every few minutes.")
+        elif any(not alert["read"] for alert in alerts):
+            if st.button("Mark all as read", key="alerts_mark_read"):
+                store.mark_read(watch_key)
+                st.rerun()
+        for alert in alerts:
+            received = time.strftime("%d %b %H:%M", time.localtime(alert["created_at"]))
+            st.markdown(f"""
+            <div class="booking-summary">
+                <div class="airline-name">{'🔔 ' if not alert['read'] else ''}{alert['message']}</div>
+                <div class="date-info">{received}</div>
+            </div>
+            """, unsafe_allow_html=True)
+        
+        searches = store.for_key(watch_key)
+        if searches:
+            st.markdown('<div class="form-section-title">Saved searches</div>', unsafe_allow_html=True)
+        for search in searches:
+            col1, col2 = st.columns([5, 1])
+            with col1:
+                lowest = f"lowest ₹{search['last_price']:,}" if search["last_price"] is not None else "not checked yet"
+                target = f" · alert below ₹{search['max_price']:,}" if search["max_price"] else ""
+                st.markdown(
+                    f"**{search['from_city']} → {search['to_city']}** · {search['depart_date']:%a, %d %b %Y} · "
+                    f"{search['passengers']} passenger(s) · {lowest}{target}"
+                )
+            with col2:
+                if st.button("Remove", key=f"alerts_remove_{search['id']}"):
+                    store.delete(watch_key, search["id"])
+                    st.rerun()
+    
+    def display_connections(self, itineraries):
+        """Draw connecting itineraries as one block of cards"""
+        cards = []
+        for itinerary in itineraries:
+            stops = "Non-stop" if itinerary["stops"] == 0 else f"{itinerary['stops']} stop via {', '.join(itinerary['via'])}"
+            legs = " → ".join(f"{leg['flight_number']} {leg['from']} {leg['departure_time']}" for leg in itinerary["legs"])
+            cards.append(f"""
+            <div class="flight-card">
+                <div style="display: flex; justify-content: space-between; align-items: center;">
+                    <div class="flight-time">{itinerary['departure_time']} – {itinerary['arrival_time']}</div>
+                    <div class="flight-duration">{self.format_duration(itinerary['duration_mins'])} · {stops}</div>
+                    <div class="flight-price">₹{itinerary['price']:,}</div>
+                </div>
+                <div class="flight-detail">{legs}</div>
+            </div>
+            """)
+        st.markdown("".join(cards), unsafe_allow_html=True)
+    
+    def display_admin_panel(self, trace, footprint):
+        """Timings of this rerun, this session and the process, with exports and a one-rerun profiler"""
+        metrics = get_metrics()
+        st.divider()
+        st.subheader("Performance")
+        st.caption(f"This rerun took {trace.wall_ms:.1f} ms · {len(metrics.recent)} recent reruns kept")
+    
+        tab_rerun, tab_session, tab_process, tab_profile, tab_bookings = st.tabs(
+            ["This rerun", "This session", "Process", "Profile", "Bookings"]
+        )
+        with tab_rerun:
+            st.dataframe([
+                {"span": "· " * depth + name, "start_ms": round(start, 2), "ms": round(elapsed, 3)}
+                for name, depth, start, elapsed in sorted(trace.spans, key=lambda s: s[2])
+            ], width="stretch")
+            if trace.counters:
+                st.json(trace.counters)
+        with tab_session:
+            totals = st.session_state.get("perf_session_totals", {})
+            st.dataframe(sorted((
+                {"span": name, "calls": calls, "total_ms": round(total, 2), "mean_ms": round(total / calls, 3)}
+                for name, (calls, total) in totals.items()
+            ), key=lambda row: -row["total_ms"]), width="stretch")
+            per_key, shared_bytes = footprint
+            st.caption(
+                f"Session state holds {sum(per_key.values()) / 1024:,.1f} KiB in {len(per_key)} keys "
+                f"and refers to {shared_bytes / 1024:,.1f} KiB of shared results"
+            )
+            st.dataframe(sorted((
+                {
+                    "key": name,
+                    "lifetime": self.session_manager.keys[name].lifetime if name in self.session_manager.keys else "widget",
+                    "bytes": size
+                }
+                for name, size in per_key.items()
+            ), key=lambda row: -row["bytes"]), width="stretch")
+        with tab_process:
+            exporter, analytics = get_booking_exporter(), get_booking_analytics()
+            st.dataframe(metrics.summary(), width="stretch")
+            st.json({
+                "events": dict(metrics.counters),
+                "search_cache": get_search_cache().stats(),
+                "fragments": self.fragments.stats(),
+                "price_watcher": get_price_watcher().stats(),
+                "booking_export": exporter.stats() if exporter is not None else None,
+                "booking_analytics": dict(analytics.counters) if analytics is not None else None,
+                "pricing": dict(get_pricing_engine().counters),
+                "session_state": dict(self.session_manager.totals(), **self.session_manager.counters)
+            })
+            prometheus = metrics.to_prometheus() + get_search_cache().to_prometheus()
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.download_button("Download Prometheus metrics", prometheus, file_name="metrics.prom", key="metrics_download")
+            with col2:
+                if st.button(f"Write {self.METRICS_PROMETHEUS_PATH}", key="metrics_write"):
+                    with open(self.METRICS_PROMETHEUS_PATH, "w", encoding="utf-8") as f:
+                        f.write(prometheus)
+                    st.success(f"Wrote {self.METRICS_PROMETHEUS_PATH}")
+            with col3:
+                logging = st.toggle(
+                    f"Log reruns to {self.METRICS_JSONL_PATH}",
+                    value=metrics.jsonl_path is not None, key="metrics_jsonl"
+                )
+                metrics.jsonl_path = self.METRICS_JSONL_PATH if logging else None
+        with tab_profile:
+            if st.button("Profile this request", key="profile_rerun"):
+                st.session_state.profile_next_rerun = True
+                st.rerun()
+            profile = st.session_state.get("perf_profile")
+            if profile is not None:
+                if profile.peak_kb is not None:
+                    st.caption(f"Peak traced memory {profile.peak_kb:,.0f} KiB")
+                st.code(profile.stats_text or "", language="text")
+                if profile.allocations:
+                    st.dataframe(profile.allocations, width="stretch")
+        with tab_bookings:
+            self.display_booking_analytics()
+    
+    def display_booking_analytics(self):
+        """Revenue per airline, load factor per route and class mix per day over the exported bookings"""
+        exporter, analytics = get_booking_exporter(), get_booking_analytics()
+        if analytics is None:
+            st.info("Install pyarrow to export and analyse bookings.")
+            return
+        if st.button("Export new bookings now", key="analytics_export"):
+            exported = exporter.run_once()
+            st.caption("Another worker is exporting." if exported is None else f"Exported {exported['bookings']:,} bookings.")
+        exported_days = analytics.day_range()
+        if exported_days is None:
+            st.caption(f"No bookings exported yet. New bookings are exported every {exporter.interval} s once settled.")
+            return
+        
+        first, last = exported_days
+        selected = st.date_input("Departure dates", value=(first, last), min_value=first, max_value=last, key="analytics_dates")
+        if len(selected) < 2:
+            return
+        start, end = selected
+        airlines = st.multiselect("Airlines", list(self.airlines.keys()), key="analytics_airlines")
+        
+        started = time.perf_counter()
+        load_factors = analytics.load_factor_by_route(start, end, airlines=airlines).to_pandas()
+        routes = st.multiselect("Routes", load_factors["route"].tolist(), key="analytics_routes")
+        revenue = analytics.revenue_by_airline(start, end, routes=routes, airlines=airlines).to_pandas()
+        mix = analytics.class_mix_by_day(start, end, routes=routes, airlines=airlines).to_pandas()
+        files, size = analytics.size()
+        st.caption(f"{files:,} files · {size / 2**20:,.1f} MiB exported · queried in {(time.perf_counter() - started) * 1000:,.0f} ms")
+        
+        st.markdown('<div class="form-section-title">Revenue per airline</div>', unsafe_allow_html=True)
+        st.bar_chart(revenue, x="airline", y="revenue")
+        st.dataframe(revenue, width="stretch", hide_index=True)
+        st.markdown('<div class="form-section-title">Load factor per route</div>', unsafe_allow_html=True)
+        st.dataframe(
+            load_factors[load_factors["route"].isin(routes)] if routes else load_factors, width="stretch", hide_index=True,
+            column_config={"load_factor": st.column_config.ProgressColumn("Load factor", min_value=0, max_value=1, format="percent")}
+        )
+        st.markdown('<div class="form-section-title">Class mix per day</div>', unsafe_allow_html=True)
+        st.bar_chart(mix, x="day", y="share", color="fare_class")
+
+
+@st.cache_resource
+def get_app():
+    """The app object, built once per process and shared by every session"""
+    with span("app_init"):
+        return FlightBookingApp()
+
+
+def main():
+    # ?admin=1 shows the performance panel under the page
+    admin = st.query_params.get("admin") == "1"
+    metrics = get_metrics()
+    ctx = get_script_run_ctx()
+    trace = metrics.start_rerun(
+        session=ctx.session_id if ctx is not None else None,
+        profile=admin and st.session_state.pop("profile_next_rerun", False)
+    )
+    try:
+        get_app().run()
+    finally:
+        # Also runs when st.rerun() cuts the script short
+        metrics.finish_rerun(trace)
+        session_totals = st.session_state.setdefault("perf_session_totals", {})
+        for name, (calls, total) in trace.totals().items():
+            prev_calls, prev_total = session_totals.get(name, (0, 0.0))
+            session_totals[name] = (prev_calls + calls, prev_total + total)
+        if trace.profile is not None:
+            st.session_state.perf_profile = trace.profile
+        with span("session_accounting"):
+            # The walk grows with the session's results, so only the admin panel measures every rerun
+            footprint = get_app().session_manager.report(trace.session, st.session_state, force=admin)
+    if admin:
+        get_app().display_admin_panel(trace, footprint)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Time airport autocomplete lookups on the bundled list and on 10k airports.
+
+The large index is the bundled list padded with synthetic airports whose
+names are built from the real ones, so prefixes and trigrams overlap the
+way they do in real data.
+
+Run from the repository root:
+
+    python -m benchmarks.airports
+"""
+import time
+
+import numpy as np
+
+from airport_search import AirportIndex, load_airports
+
+SIZES = [None, 10_000]
+QUERIES = ["m", "mu", "mum", "bom", "new", "lon", "bangaluru", "mumbia", "kolkatta", "heathro", "zzzz"]
+
+
+def synthetic_airports(real, size, rng):
+    """Pad ``real`` to ``size`` airports with made-up names mixed from real ones"""
+    airports = list(real)
+    words = sorted({word for airport in real for word in airport["name"].split()})
+    cities = [airport["city"] for airport in real]
+    letters = np.array(list("ABCDEFGHIJKLMNOPQRSTUVWXYZ"))
+    codes = {airport["iata"] for airport in real}
+    while len(airports) < size:
+        code = "".join(rng.choice(letters, 3))
+        if code in codes:
+            continue
+        codes.add(code)
+        city = f"{rng.choice(cities)}{rng.choice(['pur', 'abad', 'ganj', 'nagar', 'ville', 'ton', ''])}"
+        airports.append({
+            "iata": code,
+            "city": city,
+            "name": " ".join(rng.choice(words, 3)),
+            "country": "Synthetic",
+            "location": (0.0, 0.0),
+            "aliases": [],
+            "popularity": float(rng.pareto(2.0))
+        })
+    return airports
+
+
+def time_lookups(index, repeat=200):
+    """Mean and worst per-query lookup time in microseconds"""
+    timings = []
+    for query in QUERIES:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            index.search(query)
+        timings.append((time.perf_counter() - start) / repeat * 1e6)
+    return float(np.mean(timings)), float(np.max(timings)), QUERIES[int(np.argmax(timings))]
+
+
+def run():
+    rng = np.random.default_rng(3)
+    real = load_airports()
+    rows = []
+    for size in SIZES:
+        airports = real if size is None else synthetic_airports(real, size, rng)
+        start = time.perf_counter()
+        index = AirportIndex(airports)
+        build_ms = (time.perf_counter() - start) * 1000
+        mean_us, worst_us, worst_query = time_lookups(index)
+        rows.append({
+            "airports": len(index),
+            "build_ms": build_ms,
+            "mean_us": mean_us,
+            "worst_us": worst_us,
+            "worst_query": worst_query,
+            "sample": {query: index.search(query, limit=3) for query in ("mumbia", "lon")}
+        })
+    return rows
+
+
+if __name__ == "__main__":
+    for row in run():
+        print(
+            f"{row['airports']:>6} airports  build {row['build_ms']:7.1f} ms  lookup mean {row['mean_us']:6.1f} us  "
+            f"worst {row['worst_us']:6.1f} us ({row['worst_query']!r})  {row['sample']}"
+        )
@@ -0,0 +1,199 @@
+"""Measure the bookings export and the analytics queries over it, against
+loading the same data into pandas.
+
+A year of synthetic flight legs is written through the exporter, one file
+per month for each million legs, and then compacted. The analytics queries
+(revenue per airline, load factor per route, class mix per day) run over
+the whole year, over 30 days, and over 30 days on one route, then once
+more as a page rerun would, from the result cache. Each set runs
+in a fresh process and reports how far its peak resident memory rose
+(Linux only) and the most Arrow held at once. The baseline reads the
+columns those queries need into a DataFrame and groups it.
+
+Exporting from the booking store is timed separately, on bookings written
+through the repository as the app stores them.
+
+Run from the repository root:
+
+    python -m benchmarks.analytics [legs]
+"""
+import multiprocessing
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from benchmarks.bookings import make_booking
+from booking_export import BookingAnalytics, BookingExporter, leg_schema
+from booking_store import BookingRepository
+from reference_data import AIRLINES, CITIES
+from search_cache import normalize_city
+from seat_inventory import DEFAULT_CAPACITY
+
+FIRST_DAY = date(2026, 1, 1)
+DAYS = 365
+CHUNK_LEGS = 1_000_000
+FLIGHTS_PER_AIRLINE_DAY = 2
+STORE_BOOKINGS = 20_000
+CLASS_SHARES = {"Economy": 0.8, "Premium Economy": 0.14, "Business": 0.06}
+
+CODES = [normalize_city(city) for city in CITIES]
+ROUTES = [f"{a}-{b}" for a in CODES for b in CODES if a != b]
+
+
+def _strings(values, indices):
+    return pa.DictionaryArray.from_arrays(pa.array(indices, pa.int32()), pa.array(values)).cast(pa.string())
+
+
+def synthetic_legs(offset, count, rng):
+    """``count`` legs spread over the year, on every route, airline and class"""
+    airlines = list(AIRLINES)
+    classes = list(CLASS_SHARES)
+    route = rng.integers(len(ROUTES), size=count)
+    airline = rng.integers(len(airlines), size=count)
+    fare_class = rng.choice(len(classes), size=count, p=list(CLASS_SHARES.values()))
+    day = rng.integers(DAYS, size=count)
+    flight = rng.integers(FLIGHTS_PER_AIRLINE_DAY, size=count)
+    passengers = rng.integers(1, 5, size=count)
+    fare = rng.integers(2_500, 25_000, size=count)
+
+    route_names = _strings(ROUTES, route)
+    day_values = pa.array(day + (FIRST_DAY - date(1970, 1, 1)).days, pa.int32()).cast(pa.date32())
+    flight_number = _strings([f"{AIRLINES[name]['code']} " for name in airlines], airline)
+    flight_number = pc.binary_join_element_wise(flight_number, pc.cast(pa.array(100 + flight), pa.string()), "")
+    references = pc.binary_join_element_wise("FB", pc.cast(pa.array(np.arange(offset, offset + count)), pa.string()), "")
+    return pa.table({
+        "reference": references,
+        "booked_at": pa.array((day - rng.integers(1, 90, size=count)) * 86_400_000, pa.int64()).cast(pa.timestamp("ms")),
+        "day": day_values,
+        "route": route_names,
+        "airline": _strings(airlines, airline),
+        "flight_number": flight_number,
+        "flight_id": pc.binary_join_element_wise(route_names, flight_number, pc.cast(day_values, pa.string()), " "),
+        "fare_class": _strings(classes, fare_class),
+        "trip_type": _strings(["one_way"], np.zeros(count, np.int32)),
+        "payment_method": _strings(["UPI", "Card", "Net banking"], rng.integers(3, size=count)),
+        "leg": np.zeros(count, np.int8),
+        "passengers": passengers.astype(np.int16),
+        "fare": fare.astype(np.int32),
+        "revenue": (fare * passengers * 1.18).astype(np.int64),
+        "capacity": np.array([DEFAULT_CAPACITY[name] for name in classes], np.int16)[fare_class]
+    }, schema=leg_schema())
+
+
+def build_dataset(exporter, legs):
+    rng = np.random.default_rng(11)
+    started = time.perf_counter()
+    for offset in range(0, legs, CHUNK_LEGS):
+        exporter.write_table(synthetic_legs(offset, min(CHUNK_LEGS, legs - offset), rng), f"synthetic-{offset}")
+    write_s = time.perf_counter() - started
+    started = time.perf_counter()
+    for month in BookingAnalytics(exporter.root).months():
+        exporter.compact(month)
+    return write_s, time.perf_counter() - started
+
+
+def _peak_mib():
+    # VmHWM starts afresh in each process, where ru_maxrss carries over the parent's through exec
+    with open("/proc/self/status") as status:
+        return next(int(line.split()[1]) for line in status if line.startswith("VmHWM")) / 1024
+
+
+def query_set(root, scope):
+    """Time the three queries for one scope; runs in its own process so peak memory is its own"""
+    analytics = BookingAnalytics(root)
+    base_mib = _peak_mib()
+    start, end, routes = None, None, None
+    if scope != "year":
+        start, end = FIRST_DAY + timedelta(days=150), FIRST_DAY + timedelta(days=179)
+    if scope == "30 days, 1 route":
+        routes = ["BOM-DEL"]
+    queries = (
+        ("revenue_ms", lambda: analytics.revenue_by_airline(start, end, routes=routes)),
+        ("load_factor_ms", lambda: analytics.load_factor_by_route(start, end)),
+        ("class_mix_ms", lambda: analytics.class_mix_by_day(start, end, routes=routes))
+    )
+    timings = {}
+    for name, query in queries:
+        started = time.perf_counter()
+        query()
+        timings[name] = (time.perf_counter() - started) * 1000
+    # A page rerun with the same filters, answered from the result cache
+    started = time.perf_counter()
+    for _, query in queries:
+        query()
+    timings["rerun_ms"] = (time.perf_counter() - started) * 1000
+    return dict(timings, scope=scope, base_mib=base_mib, peak_mib=_peak_mib(), arrow_mib=pa.default_memory_pool().max_memory() / 2**20)
+
+
+def pandas_baseline(root):
+    """Load the needed columns of the whole year into pandas, then group as the queries do"""
+    import pandas as pd
+
+    base_mib = _peak_mib()
+    started = time.perf_counter()
+    frame = pd.read_parquet(root, columns=["airline", "route", "flight_id", "fare_class", "day", "passengers", "revenue", "capacity"])
+    load_ms = (time.perf_counter() - started) * 1000
+    started = time.perf_counter()
+    frame.groupby("airline")["revenue"].sum()
+    flights = frame.groupby(["route", "flight_id", "fare_class"]).agg(passengers=("passengers", "sum"), capacity=("capacity", "max"))
+    flights.groupby("route").sum()
+    frame.groupby(["day", "fare_class"])["passengers"].sum()
+    return {
+        "scope": "pandas, year", "load_ms": load_ms, "group_ms": (time.perf_counter() - started) * 1000,
+        "base_mib": base_mib, "peak_mib": _peak_mib(), "arrow_mib": pa.default_memory_pool().max_memory() / 2**20
+    }
+
+
+def store_export(path, bookings=STORE_BOOKINGS):
+    """Bookings/second exported from the booking store"""
+    repository = BookingRepository(Path(path) / "bookings.db")
+    for offset in range(0, bookings, 1_000):
+        repository.create_bookings([make_booking(i) for i in range(offset, offset + 1_000)])
+    exporter = BookingExporter(repository, Path(path) / "store-export", settle_seconds=0)
+    exported = exporter.run_once()
+    return exported["bookings"] / (exported["ms"] / 1000)
+
+
+def run(legs=2_000_000):
+    context = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as path:
+        exporter = BookingExporter(BookingRepository(Path(path) / "bookings.db"), Path(path) / "export", compact_after=2)
+        write_s, compact_s = build_dataset(exporter, legs)
+        files, size = BookingAnalytics(exporter.root).size()
+        rows = [{
+            "legs": legs, "files": files, "mib": size / 2**20,
+            "write_legs_per_s": legs / write_s, "compact_ms": compact_s * 1000,
+            "store_export_bookings_per_s": store_export(path)
+        }]
+        with context.Pool(1, maxtasksperchild=1) as pool:
+            for scope in ("year", "30 days", "30 days, 1 route"):
+                rows.append(pool.apply(query_set, (str(exporter.root), scope)))
+            rows.append(pool.apply(pandas_baseline, (str(exporter.root),)))
+        return rows
+
+
+if __name__ == "__main__":
+    dataset, *queries = run(*map(int, sys.argv[1:2]))
+    print(
+        f"{dataset['legs']:,} legs in {dataset['files']} files, {dataset['mib']:.1f} MiB  "
+        f"written {dataset['write_legs_per_s']:,.0f} legs/s, compacted in {dataset['compact_ms']:,.0f} ms  "
+        f"exported from the store {dataset['store_export_bookings_per_s']:,.0f} bookings/s"
+    )
+    for row in queries:
+        if "load_ms" in row:
+            timings = f"load {row['load_ms']:8.1f} ms  group {row['group_ms']:8.1f} ms"
+        else:
+            timings = (
+                f"revenue {row['revenue_ms']:7.1f} ms  load factor {row['load_factor_ms']:7.1f} ms  "
+                f"class mix {row['class_mix_ms']:7.1f} ms  rerun {row['rerun_ms']:5.2f} ms"
+            )
+        print(
+            f"{row['scope']:<18} {timings}  peak RSS +{row['peak_mib'] - row['base_mib']:6.0f} MiB  "
+            f"Arrow buffers {row['arrow_mib']:6.0f} MiB"
+        )
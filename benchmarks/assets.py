@@ -0,0 +1,44 @@
+"""Bytes pushed per results-page rerun for stylesheet + logos, before and after.
+
+Run from the repository root (Streamlit runs in bare mode):
+
+    python -m benchmarks.assets
+"""
+import re
+from datetime import date
+
+from app import FlightBookingApp
+from static_assets import StaticAssets
+
+_LOGO_SPAN = re.compile(r'<span class="airline-logo logo-([^"]+)"></span>')
+_LOGO_RULES = re.compile(r'\.logo-[^{]+\{[^}]*\}\s*')
+
+
+def run(page_size=FlightBookingApp.RESULTS_PAGE_SIZE):
+    app = FlightBookingApp()
+    inline = StaticAssets(static_serving=False)
+    served = StaticAssets(static_serving=True)
+
+    view = app.search_flights("Mumbai (BOM)", "Delhi (DEL)", date(2026, 1, 15), count=page_size)
+    page = app.render_results_page(view.results, view.rows)
+
+    # Before: full stylesheet inline and every card embedding its logo data URI
+    legacy_css = "<style>" + _LOGO_RULES.sub("", inline.inline_stylesheet) + "</style>"
+    legacy_page = _LOGO_SPAN.sub(
+        lambda m: f'<img src="{inline.logo_uris[m.group(1)]}" class="logo-img">', page
+    )
+
+    def size(*parts):
+        return sum(len(part.encode()) for part in parts)
+
+    return {
+        "legacy_bytes": size(legacy_css, legacy_page),
+        "inline_registry_bytes": size(inline.stylesheet_tag, page),
+        "static_serving_bytes": size(served.stylesheet_tag, page)
+    }
+
+
+if __name__ == "__main__":
+    result = run()
+    for name, value in result.items():
+        print(f"{name:<24} {value / 1024:8.1f} KiB")
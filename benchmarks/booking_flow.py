@@ -0,0 +1,148 @@
+"""Drive the whole booking flow headlessly across concurrent sessions and
+report per-step latency.
+
+Each simulated session is an AppTest scripted through load -> search ->
+select -> passenger details -> payment. AppTest patches process-wide
+Streamlit state, so sessions cannot run on parallel threads; instead
+``concurrency`` worker processes (like several server processes) each
+interleave their share of the sessions step by step, so sessions in one
+process share its search cache, seat inventory and booking store as browser
+sessions would.
+
+Run from the repository root:
+
+    python -m benchmarks.booking_flow [sessions] [concurrency]
+"""
+import multiprocessing
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from streamlit.testing.v1 import AppTest
+
+APP_SCRIPT = str(Path(__file__).resolve().parent.parent / "app.py")
+
+STEPS = ["load", "search", "select", "passengers", "details", "payment"]
+
+# Routes the simulated users spread over, so both cached and fresh searches occur
+ROUTES = [
+    ("Mumbai (BOM)", "Delhi (DEL)"),
+    ("Delhi (DEL)", "Bangalore (BLR)"),
+    ("Chennai (MAA)", "Kolkata (CCU)"),
+    ("Pune (PNQ)", "Goa (GOI)")
+]
+
+
+class FlowError(Exception):
+    """A simulated session did not reach the next booking step"""
+
+
+def _timed(timings, step, action):
+    started = time.perf_counter()
+    at = action()
+    timings[step] = (time.perf_counter() - started) * 1000
+    if at.exception:
+        raise FlowError(f"{step}: {at.exception[0].message}")
+    return at
+
+
+def booking_steps(session, timings, passengers=1):
+    """One session's booking flow, paused after every step so sessions can be interleaved"""
+    from_city, to_city = ROUTES[session % len(ROUTES)]
+    at = AppTest.from_file(APP_SCRIPT, default_timeout=60)
+    _timed(timings, "load", at.run)
+    yield
+
+    at.selectbox(key="from_city_input").set_value(from_city)
+    at.selectbox(key="to_city_input").set_value(to_city)
+    at.number_input(key="passengers_input").set_value(passengers)
+    _timed(timings, "search", at.button(key="search_button").click().run)
+    yield
+    _timed(timings, "select", at.button(key="select_selected_flight").click().run)
+    yield
+    _timed(timings, "passengers", at.button(key="continue_to_passengers").click().run)
+    if at.session_state.progress_step != 2:
+        raise FlowError("passengers: still on the search step")
+    yield
+
+    for i in range(passengers):
+        at.text_input(key=f"passenger_{i}_first_name").input(f"Guest{session}")
+        at.text_input(key=f"passenger_{i}_last_name").input(f"Traveller{i}")
+    at.text_input(key="contact_email").input(f"guest{session}@example.com")
+    at.text_input(key="contact_phone").input("9876543210")
+    continue_button = next(button for button in at.button if button.label == "Continue to payment")
+    _timed(timings, "details", continue_button.click().run)
+    yield
+
+    at.radio(key="payment_method_input").set_value("UPI")
+    _timed(timings, "payment", at.button(key="pay_button").click().run)
+    if not at.session_state.booking_reference:
+        raise FlowError("payment: no booking reference")
+
+
+def run_sessions(sessions):
+    """Interleave the given sessions round-robin in this process; returns (timings, errors)"""
+    completed, errors = [], []
+    active = []
+    for session in sessions:
+        timings = {}
+        active.append((session, booking_steps(session, timings, 1 + session % 3), timings))
+    while active:
+        for flow in list(active):
+            session, steps, timings = flow
+            try:
+                next(steps)
+            except StopIteration:
+                completed.append(timings)
+                active.remove(flow)
+            except Exception as exc:
+                errors.append(f"session {session}: {exc}")
+                active.remove(flow)
+    return completed, errors
+
+
+def _percentile(values, q):
+    values = sorted(values)
+    return values[min(int(q * len(values)), len(values) - 1)]
+
+
+def run(sessions=16, concurrency=4):
+    shares = [list(range(worker, sessions, concurrency)) for worker in range(concurrency)]
+    started = time.perf_counter()
+    with multiprocessing.get_context("spawn").Pool(concurrency) as pool:
+        outcomes = pool.map(run_sessions, shares)
+    wall_s = time.perf_counter() - started
+
+    completed = [timings for done, _ in outcomes for timings in done]
+    errors = [error for _, failed in outcomes for error in failed]
+    rows = []
+    for step in STEPS:
+        timings = [flow[step] for flow in completed]
+        if timings:
+            rows.append({
+                "step": step,
+                "p50_ms": statistics.median(timings),
+                "p95_ms": _percentile(timings, 0.95),
+                "max_ms": max(timings)
+            })
+    return {
+        "sessions": sessions,
+        "concurrency": concurrency,
+        "completed": len(completed),
+        "errors": errors,
+        "bookings_per_s": len(completed) / wall_s,
+        "steps": rows
+    }
+
+
+if __name__ == "__main__":
+    summary = run(*map(int, sys.argv[1:3]))
+    for row in summary["steps"]:
+        print(f"{row['step']:<11} p50 {row['p50_ms']:8.1f} ms  p95 {row['p95_ms']:8.1f} ms  max {row['max_ms']:8.1f} ms")
+    print(
+        f"{summary['completed']}/{summary['sessions']} bookings at concurrency {summary['concurrency']}, "
+        f"{summary['bookings_per_s']:.2f} bookings/s"
+    )
+    for error in summary["errors"]:
+        print("error:", error)
@@ -0,0 +1,86 @@
+"""Load-test the booking repository with many concurrent writers.
+
+Run from the repository root:
+
+    python -m benchmarks.bookings
+"""
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from booking_store import BookingRepository
+
+WRITER_THREADS = [1, 8, 32, 64]
+BOOKINGS_PER_THREAD = 200
+
+FLIGHT_COUNT = 300
+
+
+def make_booking(i, passengers=2):
+    flight = {
+        "from_city": "Mumbai (BOM)", "to_city": "Delhi (DEL)", "date": "2026-01-15",
+        "flight_number": f"6E {100 + i % FLIGHT_COUNT}", "fare_class": "Economy", "price": 4200
+    }
+    booking = {"flight": flight, "payment_method": "UPI", "total_price": 9500}
+    people = [
+        {"first_name": f"Guest{i}", "last_name": f"Family{i % 500}", "age": 30 + p, "gender": "Other"}
+        for p in range(passengers)
+    ]
+    return booking, people
+
+
+def concurrent_writes(repository, threads, per_thread):
+    """Bookings/second with ``threads`` sessions each writing bookings one at a time"""
+    barrier = threading.Barrier(threads + 1)
+
+    def writer(offset):
+        barrier.wait()
+        for i in range(per_thread):
+            repository.create_booking(*make_booking(offset + i))
+
+    workers = [threading.Thread(target=writer, args=(t * per_thread,)) for t in range(threads)]
+    for worker in workers:
+        worker.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for worker in workers:
+        worker.join()
+    return threads * per_thread / (time.perf_counter() - start)
+
+
+def run():
+    with tempfile.TemporaryDirectory() as directory:
+        repository = BookingRepository(Path(directory) / "bench.db", pool_size=16)
+        result = {"concurrent_bookings_per_s": {}}
+        for threads in WRITER_THREADS:
+            result["concurrent_bookings_per_s"][threads] = concurrent_writes(repository, threads, BOOKINGS_PER_THREAD)
+
+        start = time.perf_counter()
+        repository.create_bookings([make_booking(i) for i in range(10_000)])
+        result["batched_bookings_per_s"] = 10_000 / (time.perf_counter() - start)
+
+        def lookup_ms(fn):
+            timings = []
+            for i in range(200):
+                start = time.perf_counter()
+                fn(i)
+                timings.append((time.perf_counter() - start) * 1000)
+            return statistics.median(timings)
+
+        references = [b["reference"] for b in repository.find_by_flight("6E 100", limit=200)]
+        result["total_bookings"] = repository.count()
+        result["lookup_reference_ms"] = lookup_ms(lambda i: repository.get_by_reference(references[i % len(references)]))
+        result["lookup_passenger_ms"] = lookup_ms(lambda i: repository.find_by_passenger(f"Family{i}"))
+        result["lookup_flight_ms"] = lookup_ms(lambda i: repository.find_by_flight(f"6E {100 + i % FLIGHT_COUNT}", "2026-01-15", limit=50))
+        repository.pool.close()
+        return result
+
+
+if __name__ == "__main__":
+    result = run()
+    for threads, rate in result.pop("concurrent_bookings_per_s").items():
+        print(f"{threads:>3} writer threads       {rate:10.0f} bookings/s")
+    for name, value in result.items():
+        print(f"{name:<26} {value:10.3f}")
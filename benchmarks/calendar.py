@@ -0,0 +1,83 @@
+"""Time the fare calendar: one batched pass against a search per day.
+
+Run from the repository root:
+
+    python -m benchmarks.calendar
+"""
+from datetime import date, timedelta
+
+import numpy as np
+
+from benchmarks.generation import AIRLINES, FARE_CLASSES, best_of
+from fare_calendar import CALENDAR_RADIUS_DAYS, FareCalendar, round_trip_matrix
+from flight_inventory import generate_flight_columns
+from flight_results import FlightResults, flight_id_prefix
+from pricing import PricingEngine, current_fares
+from seat_inventory import SeatInventory
+
+TODAY = date(2026, 1, 1)
+FLIGHTS_PER_DAY = [10, 100]
+
+
+def per_day_searches(engine, days, flights_per_day, rng):
+    """Lowest fare per day by running a separate search for every date"""
+    lowest = []
+    for day in range(days):
+        columns = generate_flight_columns(len(AIRLINES), FARE_CLASSES, flights_per_day, rng)
+        base = engine.base_fares("Mumbai (BOM)", "Delhi (DEL)", columns["airline"], columns["fare_class"], rng)
+        lowest.append(int(current_fares(base, day, 0.0).min()))
+    return lowest
+
+
+def run():
+    rng = np.random.default_rng(42)
+    engine = PricingEngine(AIRLINES, FARE_CLASSES)
+    days = 2 * CALENDAR_RADIUS_DAYS + 1
+    rows = []
+    for flights_per_day in FLIGHTS_PER_DAY:
+        def build():
+            return FareCalendar("BOM", "DEL", TODAY, engine, len(AIRLINES), FARE_CLASSES,
+                                flights_per_day=flights_per_day, rng=rng)
+
+        outbound, inbound = build(), build()
+        center = TODAY + timedelta(days=CALENDAR_RADIUS_DAYS)
+
+        def matrix():
+            depart_dates, depart_fares = outbound.window(center)
+            return_dates, return_fares = inbound.window(center)
+            return round_trip_matrix(depart_fares, return_fares, depart_dates, return_dates)
+
+        # Search one day, fill most of its cheapest flight and reprice just that day
+        inventory = SeatInventory(FARE_CLASSES)
+        day = TODAY + timedelta(days=10)
+        results = FlightResults(
+            ("BOM", "DEL", day), "BOM", "DEL", day, AIRLINES, FARE_CLASSES, outbound.day_columns(day),
+            id_prefix=flight_id_prefix("BOM", "DEL", day)
+        )
+        outbound.refresh(inventory)
+        before = outbound.lowest.copy()
+        row = int(np.argmin(outbound.fares[outbound.bounds[10]:outbound.bounds[11]]))
+        fare_class = results.fare_class_name(row)
+        inventory.hold(results.flight_id(row), fare_class, inventory.available(results.flight_id(row), fare_class) - 1)
+        refresh_ms = best_of(lambda: outbound.refresh(inventory), repeat=1)
+        changed_days = np.flatnonzero(outbound.lowest != before).tolist()
+
+        rows.append({
+            "flights_per_day": flights_per_day,
+            "per_day_searches_ms": best_of(lambda: per_day_searches(engine, days, flights_per_day, rng)),
+            "calendar_build_ms": best_of(build),
+            "matrix_ms": best_of(matrix),
+            "incremental_refresh_ms": refresh_ms,
+            "changed_days": changed_days
+        })
+    return rows
+
+
+if __name__ == "__main__":
+    for row in run():
+        print(
+            f"{row['flights_per_day']:>4} flights/day  {2 * CALENDAR_RADIUS_DAYS + 1} searches "
+            f"{row['per_day_searches_ms']:7.2f} ms  calendar build (whole window) {row['calendar_build_ms']:7.2f} ms  "
+            f"round-trip matrix {row['matrix_ms']:6.3f} ms  one-day refresh {row['incremental_refresh_ms']:6.3f} ms "
+            f"(changed days {row['changed_days']})"
+        )
@@ -0,0 +1,69 @@
+"""Time the round-trip combination ranking against the full cross product.
+
+Run from the repository root:
+
+    python -m benchmarks.combinations
+"""
+from datetime import date
+
+import numpy as np
+
+from benchmarks.generation import AIRLINES, FARE_CLASSES, best_of
+from flight_inventory import MINUTES_PER_DAY, generate_flight_columns
+from flight_results import FlightResults, ResultView
+from pricing import SAME_AIRLINE_DISCOUNT
+from round_trip import DEFAULT_MINUTE_VALUE, best_combinations
+
+SIZES = [1_000, 3_000, 10_000]
+K = 10
+MIN_STAY_MINS = 36 * 60
+DEPART, RETURN = date(2026, 1, 15), date(2026, 1, 17)
+
+
+def cross_product(outbound, inbound, sort_by):
+    """Score every pair with NumPy and keep the best ``K``"""
+    out_price, in_price = outbound.price.astype(np.int64), inbound.price.astype(np.int64)
+    price = out_price[:, None] + in_price[None, :]
+    same = outbound.airline[:, None] == inbound.airline[None, :]
+    price -= np.where(same, np.rint(SAME_AIRLINE_DISCOUNT * price).astype(np.int64), 0)
+    duration = outbound.duration_mins[:, None].astype(np.int64) + inbound.duration_mins[None, :]
+    score = {"price": price, "duration": duration, "score": price + DEFAULT_MINUTE_VALUE * duration}[sort_by]
+    stay = (inbound.departure_mins[None, :] + (RETURN - DEPART).days * MINUTES_PER_DAY) - outbound.arrival_mins[:, None]
+    score = np.where(stay >= MIN_STAY_MINS, score, np.iinfo(np.int64).max)
+    best = np.argpartition(score, K, axis=None)[:K]
+    return np.sort(score.ravel()[best])
+
+
+def run():
+    rng = np.random.default_rng(7)
+    rows = []
+    for size in SIZES:
+        stores = []
+        for day in (DEPART, RETURN):
+            columns = generate_flight_columns(len(AIRLINES), FARE_CLASSES, size, rng)
+            stores.append(FlightResults(("BOM", "DEL", day, size), "BOM", "DEL", day, AIRLINES, FARE_CLASSES, columns))
+        outbound, inbound = stores
+        for sort_by in ("price", "score"):
+            def ranked():
+                return best_combinations(
+                    ResultView(outbound), ResultView(inbound), outbound.price, inbound.price,
+                    k=K, sort_by=sort_by, min_stay_mins=MIN_STAY_MINS
+                )
+
+            heap_scores = [combination["score"] for combination in ranked()]
+            rows.append({
+                "size": size,
+                "sort_by": sort_by,
+                "cross_product_ms": best_of(lambda: cross_product(outbound, inbound, sort_by), repeat=3),
+                "heap_ms": best_of(ranked),
+                "same_top_k": np.allclose(heap_scores, cross_product(outbound, inbound, sort_by))
+            })
+    return rows
+
+
+if __name__ == "__main__":
+    for row in run():
+        print(
+            f"{row['size']:>6} x {row['size']:<6} {row['sort_by']:>5}  cross product {row['cross_product_ms']:9.2f} ms  "
+            f"heap k-best {row['heap_ms']:7.2f} ms  same top {K} {row['same_top_k']}"
+        )
@@ -0,0 +1,48 @@
+"""Time schedule generation and connection queries on the route network.
+
+Run from the repository root:
+
+    python -m benchmarks.connections
+"""
+import time
+
+import numpy as np
+
+from route_network import RouteNetwork
+
+LEGS_PER_DAY = [10_000, 20_000, 50_000]
+ROUTES = [("GAU", "GOI"), ("BOM", "DEL"), ("COK", "LKO"), ("JAI", "MAA")]
+
+
+def run():
+    rows = []
+    for legs in LEGS_PER_DAY:
+        start = time.perf_counter()
+        network = RouteNetwork.generate(legs, rng=np.random.default_rng(legs))
+        generate_ms = (time.perf_counter() - start) * 1000
+
+        timings = {"one_stop_ms": [], "two_stop_ms": [], "earliest_arrival_ms": []}
+        for origin, destination in ROUTES:
+            for name, query in [
+                ("one_stop_ms", lambda: network.find_itineraries(origin, destination, max_stops=1)),
+                ("two_stop_ms", lambda: network.find_itineraries(origin, destination, max_stops=2)),
+                ("earliest_arrival_ms", lambda: network.earliest_arrival(origin))
+            ]:
+                start = time.perf_counter()
+                query()
+                timings[name].append((time.perf_counter() - start) * 1000)
+
+        rows.append(dict(
+            {"legs": legs, "generate_ms": generate_ms},
+            **{name: float(np.median(values)) for name, values in timings.items()}
+        ))
+    return rows
+
+
+if __name__ == "__main__":
+    for row in run():
+        print(
+            f"{row['legs']:>6} legs  generate {row['generate_ms']:7.2f} ms  "
+            f"1-stop {row['one_stop_ms']:6.2f} ms  2-stop {row['two_stop_ms']:6.2f} ms  "
+            f"CSA {row['earliest_arrival_ms']:6.2f} ms"
+        )
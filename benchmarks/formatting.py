@@ -0,0 +1,95 @@
+"""Time the per-flight text formatting done while drawing results: durations,
+clock labels and booking records.
+
+Every size also checks the time labels against the integer columns they
+come from: arrival = departure + duration, each label parses back to its
+minute and day offset, red-eyes (arrival past midnight) and only red-eyes
+read "+1 day", and sorting by arrival on the integers matches sorting on
+(day offset, clock). The run stops at the first flight that breaks one.
+
+Run from the repository root:
+
+    python -m benchmarks.formatting
+"""
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from app import FlightBookingApp
+from benchmarks.generation import AIRLINES, FARE_CLASSES, best_of
+from flight_inventory import MINUTES_PER_DAY, format_duration, generate_flight_columns, time_label
+from flight_results import FlightResults
+
+SIZES = [1_000, 10_000, 100_000]
+
+
+def strftime_labels(minutes):
+    """Clock labels the way the original per-flight loop built them"""
+    midnight = datetime(2026, 1, 1)
+    return [(midnight + timedelta(minutes=int(m))).strftime("%H:%M") for m in minutes]
+
+
+def parse_time_label(label):
+    """Minutes after the departure day's midnight for a label like "01:35 +1 day"""
+    clock, _, note = label.partition(" ")
+    hours, minutes = clock.split(":")
+    offset = int(note.split()[0]) if note else 0
+    return offset * MINUTES_PER_DAY + int(hours) * 60 + int(minutes)
+
+
+def parse_duration(label):
+    hours, minutes = label.split()
+    return int(hours[:-1]) * 60 + int(minutes[:-1])
+
+
+def check_time_labels(results):
+    """Fail on the first flight whose labels disagree with its integer times; returns the red-eye count"""
+    arrivals = results.arrival_mins.astype(np.int64)
+    if not np.array_equal(arrivals, results.departure_mins.astype(np.int64) + results.duration_mins):
+        raise AssertionError("arrival_mins is not departure_mins + duration_mins")
+    for row in range(len(results)):
+        label = results.arrival_label(row)
+        offset = results.arrival_day_offset(row)
+        if parse_time_label(label) != arrivals[row] or (offset > 0) != label.endswith(("day", "days")):
+            raise AssertionError(f"row {row}: {arrivals[row]} minutes labelled {label!r} (offset {offset})")
+        if results.record(row, AIRLINES)["arrival_time"] != label or results.arrival_clock(row) != label[:5]:
+            raise AssertionError(f"row {row}: record and card disagree with {label!r}")
+        if parse_duration(format_duration(int(results.duration_mins[row]))) != results.duration_mins[row]:
+            raise AssertionError(f"row {row}: duration {results.duration_mins[row]} mislabelled")
+
+    by_integers = results.index.query(None, None, "arrival")
+    by_labels = sorted(range(len(results)), key=lambda row: (results.arrival_day_offset(row), results.arrival_clock(row)))
+    if not np.array_equal(arrivals[by_integers], arrivals[by_labels]):
+        raise AssertionError("arrival sort on integers differs from (day offset, clock) order")
+    return int((arrivals >= MINUTES_PER_DAY).sum())
+
+
+def run():
+    app = FlightBookingApp()
+    rng = np.random.default_rng(11)
+    rows = []
+    for size in SIZES:
+        columns = generate_flight_columns(len(AIRLINES), FARE_CLASSES, size, rng)
+        results = FlightResults(("bench", size), "BOM", "DEL", None, AIRLINES.keys(), FARE_CLASSES, columns)
+        durations = columns["duration_mins"].tolist()
+        records = min(size, 1_000)
+        rows.append({
+            "size": size,
+            "format_duration_ms": best_of(lambda: [app.format_duration(m) for m in durations]),
+            "strftime_labels_ms": best_of(lambda: strftime_labels(columns["departure_mins"]), repeat=3),
+            "clock_labels_ms": best_of(lambda: [results.departure_label(row) for row in range(size)]),
+            "arrival_labels_ms": best_of(lambda: [time_label(m) for m in columns["arrival_mins"].tolist()]),
+            "red_eyes": check_time_labels(results),
+            "records_per_1k_ms": best_of(lambda: [results.record(row, AIRLINES) for row in range(records)]) * 1000 / records
+        })
+    return rows
+
+
+if __name__ == "__main__":
+    for row in run():
+        print(
+            f"{row['size']:>7} flights  format_duration {row['format_duration_ms']:8.2f} ms  "
+            f"strftime {row['strftime_labels_ms']:8.2f} ms  lookup labels {row['clock_labels_ms']:8.2f} ms  "
+            f"arrival labels {row['arrival_labels_ms']:8.2f} ms  records {row['records_per_1k_ms']:6.2f} ms/1k  "
+            f"{row['red_eyes']:,} red-eyes checked"
+        )
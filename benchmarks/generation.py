@@ -0,0 +1,82 @@
+"""Time flight inventory generation at several batch sizes.
+
+Run from the repository root:
+
+    python -m benchmarks.generation
+"""
+import random
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+import reference_data
+from flight_inventory import (
+    generate_flight_columns,
+    flight_columns_to_frame,
+    flight_columns_to_records
+)
+
+AIRLINES = {name: dict(info, logo="") for name, info in reference_data.AIRLINES.items()}
+FARE_CLASSES = reference_data.FARE_CLASSES
+SIZES = [1_000, 10_000, 100_000]
+
+
+def legacy_generate(count):
+    """Per-flight loop equivalent to the original generate_flights"""
+    flights = []
+    departure_times = sorted([f"{random.randint(0, 23):02d}:{random.randint(0, 59):02d}" for _ in range(count)])
+    for i in range(count):
+        airline = random.choice(list(AIRLINES.keys()))
+        flight_number = f"{AIRLINES[airline]['code']} {random.randint(100, 999)}"
+        duration_mins = random.randint(60, 240)
+        departure_dt = datetime.strptime(departure_times[i], "%H:%M")
+        arrival_time = (departure_dt + timedelta(minutes=duration_mins)).strftime("%H:%M")
+        fare_class = random.choice(FARE_CLASSES)
+        flights.append({
+            "airline": airline,
+            "flight_number": flight_number,
+            "departure_time": departure_times[i],
+            "arrival_time": arrival_time,
+            "duration_mins": duration_mins,
+            "fare_class": fare_class,
+            "price": random.randint(2500, 5000)
+        })
+    return flights
+
+
+def best_of(fn, repeat=5):
+    """Return the fastest wall time of ``repeat`` calls, in milliseconds"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+
+def run():
+    rng = np.random.default_rng(42)
+    names = list(AIRLINES.keys())
+    rows = []
+    for size in SIZES:
+        rows.append({
+            "size": size,
+            "legacy_loop_ms": best_of(lambda: legacy_generate(size), repeat=3),
+            "columns_ms": best_of(lambda: generate_flight_columns(len(AIRLINES), FARE_CLASSES, size, rng)),
+            "frame_ms": best_of(lambda: flight_columns_to_frame(
+                generate_flight_columns(len(AIRLINES), FARE_CLASSES, size, rng), names, FARE_CLASSES)),
+            "records_ms": best_of(lambda: flight_columns_to_records(
+                generate_flight_columns(len(AIRLINES), FARE_CLASSES, size, rng),
+                AIRLINES, FARE_CLASSES, "Mumbai (BOM)", "Delhi (DEL)", None), repeat=3)
+        })
+    return rows
+
+
+if __name__ == "__main__":
+    for row in run():
+        print(
+            f"{row['size']:>7} flights  legacy {row['legacy_loop_ms']:9.2f} ms  "
+            f"columns {row['columns_ms']:7.2f} ms  frame {row['frame_ms']:7.2f} ms  "
+            f"records {row['records_ms']:9.2f} ms"
+        )
@@ -0,0 +1,174 @@
+"""Book group manifests through the booking service, as a Python API and over
+HTTP, and through the UI, and compare throughput.
+
+Through the service a group books with one search and one booking request,
+either one request at a time or ``batch`` manifests per request, stored in
+one transaction. Through the UI the same group takes one complete AppTest
+flow (load, search, select, passenger form, payment) per 9 passengers, the
+most its form allows. Each mode starts from empty stores, and groups are
+spread over routes and dates so they do not sell out a flight.
+
+Latency per group is the time to book it: its search and booking
+requests, or its UI flows. A group in a batch waits for the whole batch.
+Most of it is the first search of a route and date, answered by the
+simulated airline suppliers, so the booking request (or the UI's payment
+step) is also timed on its own.
+
+Run from the repository root:
+
+    python -m benchmarks.group_booking [groups] [party]
+"""
+import http.client
+import json
+import socket
+import multiprocessing
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+
+from benchmarks.booking_flow import ROUTES, booking_steps
+from booking_service import build_service, make_server
+from search_cache import normalize_city
+from shared_state import InProcessBackend
+
+# Passengers the UI's search form accepts per booking
+UI_MAX_PARTY = 9
+DAYS_OUT = range(7, 17)
+BATCH = 10
+
+
+def manifest(group, party):
+    return [
+        {"first_name": f"Traveller{i}", "last_name": f"Group{group}", "age": 25 + i % 40, "gender": "Other"}
+        for i in range(party)
+    ]
+
+
+def group_trip(group):
+    from_city, to_city = ROUTES[group % len(ROUTES)]
+    return from_city, to_city, date.today() + timedelta(days=DAYS_OUT[group // len(ROUTES) % len(DAYS_OUT)])
+
+
+def booking_request(group, party, flights):
+    """A booking request for the cheapest flight found with seats for the whole group"""
+    from_city, to_city, day = group_trip(group)
+    flight = next(flight for flight in flights if flight["seats_left"] >= party)
+    return {
+        "flights": [{"from_city": from_city, "to_city": to_city, "date": day.isoformat(), "flight_id": flight["id"]}],
+        "passengers": manifest(group, party),
+        "email": f"desk{group}@example.com",
+        "phone": "+919876543210"
+    }
+
+
+def api_groups(path, groups, party, batch=1):
+    """Groups booked through the Python API; returns (wall seconds, ms per group, ms per booking request)"""
+    service = build_service(InProcessBackend(Path(path) / f"api-{batch}.db"))
+    latencies, book_latencies = [], []
+    started = time.perf_counter()
+    for first in range(0, groups, batch):
+        batch_started = time.perf_counter()
+        requests = []
+        for group in range(first, min(first + batch, groups)):
+            from_city, to_city, day = group_trip(group)
+            requests.append(booking_request(group, party, service.search(from_city, to_city, day, party)))
+        results = service.book_many(requests)
+        if any("errors" in result for result in results):
+            raise RuntimeError(next(result["errors"] for result in results if "errors" in result))
+        latencies.extend([(time.perf_counter() - batch_started) * 1000] * len(requests))
+        book_latencies.append(results[0]["ms"])
+    return time.perf_counter() - started, latencies, book_latencies
+
+
+def http_groups(path, groups, party):
+    """Groups booked over HTTP on one keep-alive connection; returns (wall seconds, ms per group, ms per booking request)"""
+    server = make_server(build_service(InProcessBackend(Path(path) / "http.db")), port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    conn = http.client.HTTPConnection("127.0.0.1", server.server_address[1])
+    conn.connect()
+    # http.client sends a large body after its headers, which Nagle would hold back for an ACK
+    conn.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def call(method, url, body=None):
+        conn.request(method, url, body=None if body is None else json.dumps(body))
+        response = conn.getresponse()
+        payload = json.loads(response.read())
+        if response.status >= 400:
+            raise RuntimeError(payload["errors"])
+        return payload
+
+    latencies, book_latencies = [], []
+    try:
+        started = time.perf_counter()
+        for group in range(groups):
+            group_started = time.perf_counter()
+            from_city, to_city, day = group_trip(group)
+            flights = call("GET", (
+                f"/flights?from_city={normalize_city(from_city)}&to_city={normalize_city(to_city)}"
+                f"&date={day}&passengers={party}"
+            ))
+            request = booking_request(group, party, flights["flights"])
+            book_started = time.perf_counter()
+            call("POST", "/bookings", request)
+            book_latencies.append((time.perf_counter() - book_started) * 1000)
+            latencies.append((time.perf_counter() - group_started) * 1000)
+        return time.perf_counter() - started, latencies, book_latencies
+    finally:
+        conn.close()
+        server.shutdown()
+        server.server_close()
+
+
+def ui_groups(groups, party):
+    """Groups booked through AppTest flows of at most 9 passengers; runs in its own process"""
+    flows = [min(UI_MAX_PARTY, party - start) for start in range(0, party, UI_MAX_PARTY)]
+    latencies, book_latencies = [], []
+    started = time.perf_counter()
+    for group in range(groups):
+        group_started = time.perf_counter()
+        for flow, passengers in enumerate(flows):
+            timings = {}
+            for _ in booking_steps(group * len(flows) + flow, timings, passengers):
+                pass
+            book_latencies.append(timings["payment"])
+        latencies.append((time.perf_counter() - group_started) * 1000)
+    return time.perf_counter() - started, latencies, book_latencies
+
+
+def _row(mode, groups, party, wall_s, latencies, book_latencies):
+    return {
+        "mode": mode,
+        "groups_per_s": groups / wall_s,
+        "passengers_per_s": groups * party / wall_s,
+        "booking_requests": len(book_latencies),
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p95_ms": float(np.percentile(latencies, 95)),
+        "book_p50_ms": float(np.percentile(book_latencies, 50)),
+        "book_p95_ms": float(np.percentile(book_latencies, 95))
+    }
+
+
+def run(groups=40, party=30, ui_runs=2):
+    rows = []
+    with tempfile.TemporaryDirectory() as path:
+        rows.append(_row("api", groups, party, *api_groups(path, groups, party)))
+        rows.append(_row(f"api x{BATCH}", groups, party, *api_groups(path, groups, party, BATCH)))
+        rows.append(_row("http", groups, party, *http_groups(path, groups, party)))
+    # AppTest patches process-wide Streamlit state, so the UI flows run in a process of their own
+    with multiprocessing.get_context("spawn").Pool(1) as pool:
+        rows.append(_row("ui", ui_runs, party, *pool.apply(ui_groups, (ui_runs, party))))
+    return rows
+
+
+if __name__ == "__main__":
+    for row in run(*map(int, sys.argv[1:3])):
+        print(
+            f"{row['mode']:<8} {row['groups_per_s']:8.2f} groups/s  {row['passengers_per_s']:9.1f} passengers/s  "
+            f"per group p50 {row['p50_ms']:8.1f} ms  p95 {row['p95_ms']:8.1f} ms  "
+            f"{row['booking_requests']:3d} booking requests p50 {row['book_p50_ms']:7.2f} ms  p95 {row['book_p95_ms']:7.2f} ms"
+        )
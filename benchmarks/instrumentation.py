@@ -0,0 +1,58 @@
+"""Measure what the instrumentation layer costs per span, inside and outside
+a traced rerun, and how long a Prometheus export takes.
+
+Run from the repository root:
+
+    python -m benchmarks.instrumentation
+"""
+import time
+
+from instrumentation import Recorder, span, timed
+
+CALLS = 200_000
+
+
+def noop():
+    pass
+
+
+@timed("noop")
+def timed_noop():
+    pass
+
+
+def per_call_ns(func, calls=CALLS):
+    started = time.perf_counter()
+    for _ in range(calls):
+        func()
+    return (time.perf_counter() - started) / calls * 1e9
+
+
+def with_span():
+    with span("block"):
+        pass
+
+
+def run():
+    recorder = Recorder()
+    rows = {
+        "bare call": per_call_ns(noop),
+        "span, no rerun": per_call_ns(with_span),
+        "timed, no rerun": per_call_ns(timed_noop)
+    }
+    trace = recorder.start_rerun()
+    rows["span, traced"] = per_call_ns(with_span)
+    rows["timed, traced"] = per_call_ns(timed_noop)
+    recorder.finish_rerun(trace)
+
+    started = time.perf_counter()
+    text = recorder.to_prometheus()
+    export_ms = (time.perf_counter() - started) * 1000
+    return rows, export_ms, len(text)
+
+
+if __name__ == "__main__":
+    rows, export_ms, size = run()
+    for label, ns in rows.items():
+        print(f"{label:<16} {ns:8.0f} ns/call")
+    print(f"Prometheus export {export_ms:.2f} ms ({size} bytes)")
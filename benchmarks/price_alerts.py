@@ -0,0 +1,148 @@
+"""Time the price watcher against per-watcher searches, and measure what it
+costs interactive searches running at the same time.
+
+Watchers are spread over a few routes and dates, as saved searches cluster
+on popular routes. A grouped round evaluates each watched day once from
+the route's fare calendar; the per-watcher baseline runs one search per
+saved search, as users re-running Search do. A repeat round with nothing
+changed shows the snapshot diff skipping the work.
+
+Interactive latency is a search (generate, price, sort) timed while the
+watcher is idle, while it loops flat out with no rate limit, and while it
+loops with its defaults (rate limited, pausing during ``interactive()``).
+
+Run from the repository root:
+
+    python -m benchmarks.price_alerts [watchers]
+"""
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+
+from benchmarks.generation import AIRLINES, FARE_CLASSES
+from fare_calendar import FareCalendars
+from flight_inventory import generate_flight_columns
+from price_alerts import PriceWatcher, SavedSearchStore, new_watch_key
+from pricing import PricingEngine, current_fares
+from seat_inventory import SeatInventory
+
+TODAY = date.today()
+ROUTES = [
+    ("Mumbai (BOM)", "Delhi (DEL)"), ("Delhi (DEL)", "Bangalore (BLR)"), ("Chennai (MAA)", "Kolkata (CCU)"),
+    ("Pune (PNQ)", "Goa (GOI)"), ("Hyderabad (HYD)", "Jaipur (JAI)"), ("Bangalore (BLR)", "Mumbai (BOM)")
+]
+DATES = [TODAY + timedelta(days=7 + i) for i in range(30)]
+INTERACTIVE_SEARCHES = 150
+
+
+def setup(path, watchers, seed=7):
+    rng = np.random.default_rng(seed)
+    store = SavedSearchStore(Path(path) / "alerts.db")
+    for i in range(watchers):
+        from_city, to_city = ROUTES[rng.integers(len(ROUTES))]
+        store.save(new_watch_key(), f"user{i}@example.com", from_city, to_city, DATES[rng.integers(len(DATES))])
+    engine = PricingEngine(AIRLINES, FARE_CLASSES)
+    calendars = FareCalendars(engine, len(AIRLINES), FARE_CLASSES)
+    inventory = SeatInventory(FARE_CLASSES)
+
+    def route_fares(from_city, to_city, days):
+        calendar = calendars.get(from_city, to_city, TODAY)
+        calendar.refresh(inventory)
+        return {day: calendar.day_fares(day) if calendar.covers(day) else None for day in days}
+
+    return store, engine, route_fares
+
+
+def per_watcher_searches(store, engine):
+    """Lowest fare for every saved search by running its search again"""
+    lowest = []
+    for (from_code, to_code), days in store.watched(TODAY).items():
+        for day, searches in days.items():
+            for _ in searches:
+                columns = generate_flight_columns(len(AIRLINES), FARE_CLASSES, 10)
+                base = engine.base_fares(from_code, to_code, columns["airline"], columns["fare_class"])
+                lowest.append(int(current_fares(base, (day - TODAY).days, 0.0).min()))
+    return lowest
+
+
+def interactive_search(engine, rng):
+    columns = generate_flight_columns(len(AIRLINES), FARE_CLASSES, 5_000, rng)
+    fares = current_fares(engine.base_fares("BOM", "DEL", columns["airline"], columns["fare_class"], rng), 7, 0.0)
+    return np.argsort(fares, kind="stable")
+
+
+def interactive_latency(engine, watcher=None):
+    """p50/p95 of interactive searches, with ``watcher`` (if any) looping in the background"""
+    stop = threading.Event()
+    if watcher is not None:
+        def loop():
+            while not stop.is_set():
+                watcher._snapshots.clear()
+                watcher.run_once(TODAY)
+        thread = threading.Thread(target=loop, daemon=True)
+        thread.start()
+        time.sleep(0.2)
+    rng = np.random.default_rng(1)
+    latencies = []
+    for _ in range(INTERACTIVE_SEARCHES):
+        started = time.perf_counter()
+        if watcher is not None:
+            with watcher.interactive():
+                interactive_search(engine, rng)
+        else:
+            interactive_search(engine, rng)
+        latencies.append((time.perf_counter() - started) * 1000)
+        # Users pause between searches; this is when the watcher gets its turn
+        time.sleep(0.002)
+    if watcher is not None:
+        stop.set()
+        thread.join()
+    return float(np.percentile(latencies, 50)), float(np.percentile(latencies, 95))
+
+
+def run(watchers=2_000):
+    with tempfile.TemporaryDirectory() as path:
+        store, engine, route_fares = setup(path, watchers)
+        unlimited = PriceWatcher(store, route_fares, max_days_per_second=0, max_defer=0)
+
+        started = time.perf_counter()
+        per_watcher_searches(store, engine)
+        baseline_ms = (time.perf_counter() - started) * 1000
+        first = unlimited.run_once(TODAY)
+        unchanged = unlimited.run_once(TODAY)
+
+        idle = interactive_latency(engine)
+        flat_out = interactive_latency(engine, unlimited)
+        polite = interactive_latency(engine, PriceWatcher(store, route_fares))
+        return {
+            "watchers": watchers,
+            "route_days": first["days"],
+            "per_watcher_ms": baseline_ms,
+            "grouped_round_ms": first["ms"],
+            "unchanged_round_ms": unchanged["ms"],
+            "alerts_first_round": first["alerts"],
+            "interactive_idle_p50_ms": idle[0],
+            "interactive_idle_p95_ms": idle[1],
+            "interactive_unlimited_p50_ms": flat_out[0],
+            "interactive_unlimited_p95_ms": flat_out[1],
+            "interactive_limited_p50_ms": polite[0],
+            "interactive_limited_p95_ms": polite[1]
+        }
+
+
+if __name__ == "__main__":
+    row = run(*map(int, sys.argv[1:2]))
+    print(
+        f"{row['watchers']} watchers on {row['route_days']} route-days: per-watcher searches {row['per_watcher_ms']:8.1f} ms  "
+        f"grouped round {row['grouped_round_ms']:7.1f} ms  unchanged round {row['unchanged_round_ms']:6.1f} ms"
+    )
+    for mode in ("idle", "unlimited", "limited"):
+        print(
+            f"interactive search, watcher {mode:<9}  p50 {row[f'interactive_{mode}_p50_ms']:6.2f} ms  "
+            f"p95 {row[f'interactive_{mode}_p95_ms']:6.2f} ms"
+        )
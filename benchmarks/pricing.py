@@ -0,0 +1,81 @@
+"""Time price snapshots: first build, memoized reruns and rebuilds after a hold.
+
+Run from the repository root:
+
+    python -m benchmarks.pricing
+"""
+from datetime import date
+
+import numpy as np
+
+from benchmarks.generation import AIRLINES, FARE_CLASSES, best_of
+from flight_inventory import generate_flight_columns
+from flight_results import FlightResults
+from pricing import PricingEngine
+from seat_inventory import SeatInventory
+
+SIZES = [1_000, 10_000, 100_000]
+TODAY = date(2026, 1, 1)
+
+
+def per_row_breakups(prices, passengers):
+    """The per-card calculation the UI used to repeat on every rerun"""
+    breakups = []
+    for price in prices.tolist():
+        base_fare = price * passengers
+        taxes = round(base_fare * 0.12)
+        breakups.append({
+            "Base Fare": base_fare,
+            "Taxes & Surcharges": taxes,
+            "Convenience Fee": 250 * passengers,
+            "Total": base_fare + taxes + 250 * passengers
+        })
+    return breakups
+
+
+def run(passengers=2):
+    rng = np.random.default_rng(42)
+    engine = PricingEngine(AIRLINES, FARE_CLASSES)
+    rows = []
+    for size in SIZES:
+        columns = generate_flight_columns(len(AIRLINES), FARE_CLASSES, size, rng)
+        columns["price"] = engine.base_fares("Mumbai (BOM)", "Delhi (DEL)", columns["airline"], columns["fare_class"], rng)
+        key = ("BOM", "DEL", date(2026, 1, 15), size)
+        results = FlightResults(key, "Mumbai (BOM)", "Delhi (DEL)", date(2026, 1, 15), AIRLINES, FARE_CLASSES, columns)
+        inventory = SeatInventory(FARE_CLASSES)
+
+        def rebuild():
+            engine._snapshots.clear()
+            return engine.snapshot(results, passengers, TODAY, inventory)
+
+        build_ms = best_of(rebuild)
+        first = engine.snapshot(results, passengers, TODAY, inventory)
+        memo_ms = best_of(lambda: engine.snapshot(results, passengers, TODAY, inventory), repeat=20)
+        unrelated_hold = inventory.hold("other-flight", "Economy", 1)
+        unrelated_kept = engine.snapshot(results, passengers, TODAY, inventory) is first
+
+        # Fill most of one flight's class; its fare must go up in a fresh snapshot
+        fare_class = results.fare_class_name(0)
+        hold_id = inventory.hold(results.flight_id(0), fare_class, inventory.available(results.flight_id(0), fare_class) - 1)
+        after = engine.snapshot(results, passengers, TODAY, inventory)
+        inventory.release(hold_id)
+        inventory.release(unrelated_hold)
+
+        rows.append({
+            "size": size,
+            "per_row_ms": best_of(lambda: per_row_breakups(first.price, passengers), repeat=3),
+            "snapshot_build_ms": build_ms,
+            "snapshot_memo_ms": memo_ms,
+            "unrelated_change_kept": unrelated_kept,
+            "invalidated": after is not first and after.price[0] > first.price[0]
+        })
+    return rows
+
+
+if __name__ == "__main__":
+    for row in run():
+        print(
+            f"{row['size']:>7} flights  per-row breakups {row['per_row_ms']:8.2f} ms  "
+            f"snapshot {row['snapshot_build_ms']:7.2f} ms  memoized {row['snapshot_memo_ms']:6.3f} ms  "
+            f"kept on unrelated change {row['unrelated_change_kept']}  invalidated {row['invalidated']}"
+        )
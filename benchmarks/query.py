@@ -0,0 +1,71 @@
+"""Compare the indexed results query against list comprehension + sorted.
+
+Run from the repository root:
+
+    python -m benchmarks.query
+"""
+import time
+
+import numpy as np
+
+from flight_inventory import generate_flight_columns, flight_columns_to_records
+from flight_results import FlightResults
+from results_query import ResultsIndex
+from benchmarks.generation import AIRLINES, FARE_CLASSES, best_of
+
+SIZES = [1_000, 10_000, 100_000]
+
+# A handful of filter/sort combinations a user clicks through on the results page
+QUERIES = [
+    (list(AIRLINES), FARE_CLASSES, "price"),
+    (["IndiGo", "Vistara"], FARE_CLASSES, "departure"),
+    (["Air India"], ["Business"], "duration"),
+    (list(AIRLINES)[:4], ["Economy", "Premium Economy"], "arrival")
+]
+
+SORT_KEYS = {"price": "price", "departure": "departure_time", "arrival": "arrival_time", "duration": "duration_mins"}
+
+
+def naive_query(flights, airlines, fare_classes, sort_by):
+    filtered = [f for f in flights if f["airline"] in airlines and f["fare_class"] in fare_classes]
+    return sorted(filtered, key=lambda f: f[SORT_KEYS[sort_by]])
+
+
+def run():
+    rng = np.random.default_rng(7)
+    rows = []
+    for size in SIZES:
+        columns = generate_flight_columns(len(AIRLINES), FARE_CLASSES, size, rng)
+        flights = flight_columns_to_records(columns, AIRLINES, FARE_CLASSES, "BOM", "DEL", None)
+        results = FlightResults(("bench", size), "BOM", "DEL", None, AIRLINES.keys(), FARE_CLASSES, columns)
+
+        start = time.perf_counter()
+        index = ResultsIndex(results)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        def cold():
+            index._memo.clear()
+            for query in QUERIES:
+                index.query(*query)
+
+        def warm():
+            for query in QUERIES:
+                index.query(*query)
+
+        rows.append({
+            "size": size,
+            "naive_ms": best_of(lambda: [naive_query(flights, *q) for q in QUERIES]) / len(QUERIES),
+            "index_build_ms": build_ms,
+            "index_query_ms": best_of(cold) / len(QUERIES),
+            "memoized_query_ms": best_of(warm) / len(QUERIES)
+        })
+    return rows
+
+
+if __name__ == "__main__":
+    for row in run():
+        print(
+            f"{row['size']:>7} flights  naive {row['naive_ms']:8.3f} ms  "
+            f"index build {row['index_build_ms']:7.3f} ms  query {row['index_query_ms']:7.3f} ms  "
+            f"memoized {row['memoized_query_ms']:7.4f} ms"
+        )
@@ -0,0 +1,108 @@
+"""Measure results-page payload and render time with and without paging, and
+what the fragment cache and precompiled templates save.
+
+A cold page render builds each flight's card template; a warm one, as on
+every later rerun of the same search, only fills in prices and seats. The
+expanded variants also show fare rules and a fare breakup under every card.
+Booking steps compare building the progress bar and summary rows with
+reading them from the app's memoized fragments.
+
+Run from the repository root (Streamlit runs in bare mode):
+
+    python -m benchmarks.rendering
+"""
+import time
+from datetime import date
+
+from app import FlightBookingApp
+
+SIZES = [100, 1_000, 10_000]
+REPEAT = 20
+
+
+def best_ms(fn, repeat=REPEAT):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, (time.perf_counter() - start) * 1000)
+    return best
+
+
+def cold_ms(app, fn, repeat=REPEAT):
+    """Best time of ``fn`` with an empty fragment cache each time"""
+    best = float("inf")
+    for _ in range(repeat):
+        app.fragments.clear()
+        start = time.perf_counter()
+        fn()
+        best = min(best, (time.perf_counter() - start) * 1000)
+    return best
+
+
+def run(page_size=FlightBookingApp.RESULTS_PAGE_SIZE):
+    app = FlightBookingApp()
+    rows = []
+    for size in SIZES:
+        view = app.search_flights("Mumbai (BOM)", "Delhi (DEL)", date(2026, 1, 15), count=size)
+        results = view.results
+        ordered = view.filtered(sort_by="price").rows
+
+        # Unpaged: every card is its own element and all of them are sent
+        app.fragments.clear()
+        start = time.perf_counter()
+        all_cards = [app.render_flight_card(results, row) for row in ordered]
+        unpaged_ms = (time.perf_counter() - start) * 1000
+
+        # Paged: the first page is one element and nothing else is rendered
+        page = ordered[:page_size]
+        page_html = app.render_results_page(results, page)
+        expanded = {results.flight_id(row) for row in page}
+        render_page = lambda: app.render_results_page(results, page)
+        render_expanded = lambda: app.render_results_page(
+            results, page, passengers=2, expanded_rules=expanded, expanded_breakup=expanded
+        )
+
+        rows.append({
+            "size": size,
+            "unpaged_elements": len(all_cards),
+            "unpaged_bytes": sum(len(card.encode()) for card in all_cards),
+            "unpaged_render_ms": unpaged_ms,
+            "page_elements": 1,
+            "page_bytes": len(page_html.encode()),
+            "page_render_ms": cold_ms(app, render_page),
+            "page_cached_ms": best_ms(render_page),
+            "expanded_render_ms": cold_ms(app, render_expanded),
+            "expanded_cached_ms": best_ms(render_expanded)
+        })
+
+    # Booking steps: the progress bar and a summary row, built each time vs memoized
+    flight = results.record(ordered[0], app.airlines)
+    summary_row = lambda: app.fragments.get_or_render(("summary", flight["id"]), flight, lambda: app.render_summary_flight(flight))
+    for step in range(1, len(app.BOOKING_STEPS) + 1):
+        rows.append({
+            "step": step,
+            "progress_render_ms": best_ms(lambda: app.render_progress_bar(step), repeat=200),
+            "progress_cached_ms": best_ms(lambda: app.progress_bars[step], repeat=200),
+            "summary_render_ms": best_ms(lambda: app.render_summary_flight(flight), repeat=200),
+            "summary_cached_ms": best_ms(summary_row, repeat=200)
+        })
+    return rows
+
+
+if __name__ == "__main__":
+    for row in run():
+        if "size" in row:
+            print(
+                f"{row['size']:>6} flights  unpaged {row['unpaged_elements']:>6} elements "
+                f"{row['unpaged_bytes'] / 1024:9.1f} KiB {row['unpaged_render_ms']:8.2f} ms  |  "
+                f"page {row['page_bytes'] / 1024:5.1f} KiB {row['page_render_ms']:6.3f} ms cold "
+                f"{row['page_cached_ms']:6.3f} ms cached  |  expanded {row['expanded_render_ms']:6.3f} ms cold "
+                f"{row['expanded_cached_ms']:6.3f} ms cached"
+            )
+        else:
+            print(
+                f"step {row['step']}  progress bar {row['progress_render_ms'] * 1000:6.1f} µs built "
+                f"{row['progress_cached_ms'] * 1000:6.2f} µs memoized  |  summary row "
+                f"{row['summary_render_ms'] * 1000:6.1f} µs built {row['summary_cached_ms'] * 1000:6.2f} µs cached"
+            )
@@ -0,0 +1,134 @@
+"""Measure request throughput as worker processes are added, with state
+shared through the SQLite backend, and check the workers stayed consistent.
+
+Each worker is a separate process, like one Streamlit server behind a
+load balancer. It loops over page views: a search through the shared
+cache, a seat-change check for repricing, and seat counts for the flights
+on the page. One view in twenty books a seat: hold, confirm, store the
+booking. At the end, the seats sold in the shared inventory must equal the
+seats the workers booked, and every worker must have seen the same flights
+for every search.
+
+Run from the repository root:
+
+    python -m benchmarks.scale_out [seconds_per_run]
+"""
+import hashlib
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+from benchmarks.generation import AIRLINES, FARE_CLASSES
+from flight_inventory import generate_flight_columns
+from flight_results import FlightResults
+from search_cache import make_search_key
+from shared_state import InProcessBackend, SQLiteBackend
+
+ROUTES = [("BOM", "DEL"), ("DEL", "BLR"), ("MAA", "CCU"), ("PNQ", "GOI"), ("HYD", "JAI")]
+DAYS = [date(2026, 12, 1) + timedelta(days=i) for i in range(8)]
+FLIGHTS_PER_SEARCH = 50
+PAGE = 20
+BOOKING_SHARE = 0.05
+
+
+def build_results(key):
+    columns = generate_flight_columns(len(AIRLINES), FARE_CLASSES, FLIGHTS_PER_SEARCH)
+    return FlightResults(key, key[0], key[1], date.fromisoformat(key[2]), AIRLINES.keys(), FARE_CLASSES, columns)
+
+
+def worker(backend_kind, path, seconds, seed):
+    """Serve page views until time runs out; returns (views, seats booked, fingerprint per search)"""
+    if backend_kind == "sqlite":
+        backend = SQLiteBackend(Path(path) / "state.db", bookings_path=Path(path) / "bookings.db", pool_size=2)
+    else:
+        backend = InProcessBackend(bookings_path=Path(path) / f"bookings-{seed}.db")
+    cache = backend.search_cache()
+    inventory = backend.seat_inventory(FARE_CLASSES)
+    repository = backend.booking_repository()
+    rng = random.Random(seed)
+
+    views, booked, fingerprints = 0, 0, {}
+    version = inventory.version
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        from_city, to_city = rng.choice(ROUTES)
+        key = make_search_key(from_city, to_city, rng.choice(DAYS))
+        results = cache.get_or_compute(key, lambda: build_results(key))
+        fingerprints[key] = hashlib.blake2s(results.price.tobytes(), digest_size=8).hexdigest()
+
+        changed = inventory.changed_since(version)
+        version = inventory.version
+        rows = range(min(PAGE, len(results)))
+        seats = inventory.available_many(
+            [results.flight_id(row) for row in rows], [results.fare_class_name(row) for row in rows]
+        )
+        if changed is None or not seats:
+            raise RuntimeError("inventory change log lost")
+        views += 1
+
+        if rng.random() < BOOKING_SHARE:
+            row = rng.randrange(len(results))
+            hold = inventory.hold(results.flight_id(row), results.fare_class_name(row), 1)
+            if hold is not None and inventory.confirm_all([hold]):
+                flight = results.record(row, AIRLINES)
+                repository.create_booking(
+                    {"flight": flight, "total_price": flight["price"]},
+                    [{"first_name": "Load", "last_name": f"Worker{seed}"}]
+                )
+                booked += 1
+    return views, booked, fingerprints
+
+
+def _sold(path):
+    backend = SQLiteBackend(Path(path) / "state.db", bookings_path=Path(path) / "bookings.db")
+    with backend.pool.connection() as conn:
+        return conn.execute("SELECT COALESCE(SUM(sold), 0) FROM seats").fetchone()[0]
+
+
+def measure(backend_kind, workers, seconds):
+    with tempfile.TemporaryDirectory() as path:
+        # Create the schema once up front so workers do not race on it
+        if backend_kind == "sqlite":
+            SQLiteBackend(Path(path) / "state.db", bookings_path=Path(path) / "bookings.db")
+        with multiprocessing.get_context("spawn").Pool(workers) as pool:
+            outcomes = pool.starmap(worker, [(backend_kind, path, seconds, seed) for seed in range(workers)])
+        views = sum(outcome[0] for outcome in outcomes)
+        booked = sum(outcome[1] for outcome in outcomes)
+        consistent = True
+        if backend_kind == "sqlite":
+            seen = {}
+            for _, _, fingerprints in outcomes:
+                for key, fingerprint in fingerprints.items():
+                    consistent &= seen.setdefault(key, fingerprint) == fingerprint
+            consistent &= _sold(path) == booked
+        return {"workers": workers, "views_per_s": views / seconds, "booked": booked, "consistent": consistent}
+
+
+def run(seconds=3.0, worker_counts=None):
+    cpus = os.cpu_count() or 1
+    worker_counts = worker_counts or sorted({1, 2, 4, cpus})
+    rows = []
+    for backend_kind in ("memory", "sqlite"):
+        single = None
+        for workers in worker_counts:
+            row = measure(backend_kind, workers, seconds)
+            single = single or row["views_per_s"]
+            row.update(backend=backend_kind, speedup=row["views_per_s"] / single, cpus=cpus)
+            rows.append(row)
+    return rows
+
+
+if __name__ == "__main__":
+    rows = run(*map(float, sys.argv[1:2]))
+    print(f"{rows[0]['cpus']} CPUs")
+    for row in rows:
+        print(
+            f"{row['backend']:<7} {row['workers']:>2} workers  {row['views_per_s']:9.0f} views/s  "
+            f"speedup {row['speedup']:4.2f}x  booked {row['booked']:>5}  "
+            f"{'consistent' if row['consistent'] else 'INCONSISTENT'}"
+        )
@@ -0,0 +1,82 @@
+"""Stress the seat inventory with hundreds of threads and check for overselling.
+
+Run from the repository root:
+
+    python -m benchmarks.seats
+"""
+import random
+import threading
+import time
+
+from reference_data import FARE_CLASSES
+from seat_inventory import SeatInventory
+
+THREADS = 300
+ATTEMPTS_PER_THREAD = 200
+FLIGHTS = 500
+
+
+def run(threads=THREADS, attempts=ATTEMPTS_PER_THREAD, flights=FLIGHTS):
+    inventory = SeatInventory(FARE_CLASSES)
+    flight_ids = [f"bench-{i}" for i in range(flights)]
+    for flight_id in flight_ids:
+        inventory.register_flight(flight_id)
+
+    counts = {"holds": 0, "rejected": 0, "confirmed_seats": 0, "released": 0}
+    counts_lock = threading.Lock()
+    barrier = threading.Barrier(threads + 1)
+
+    def session(seed):
+        rng = random.Random(seed)
+        local = dict.fromkeys(counts, 0)
+        barrier.wait()
+        for _ in range(attempts):
+            flight_id = rng.choice(flight_ids)
+            fare_class = rng.choice(FARE_CLASSES)
+            seats = rng.randint(1, 4)
+            hold_id = inventory.hold(flight_id, fare_class, seats)
+            if hold_id is None:
+                local["rejected"] += 1
+                continue
+            local["holds"] += 1
+            # Most sessions pay, some abandon and release
+            if rng.random() < 0.7 and inventory.confirm(hold_id):
+                local["confirmed_seats"] += seats
+            elif inventory.release(hold_id):
+                local["released"] += 1
+        with counts_lock:
+            for key, value in local.items():
+                counts[key] += value
+
+    workers = [threading.Thread(target=session, args=(i,)) for i in range(threads)]
+    for worker in workers:
+        worker.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+
+    sold = sum(inventory.sold(f, c) for f in flight_ids for c in FARE_CLASSES)
+    available = sum(inventory.available(f, c) for f in flight_ids for c in FARE_CLASSES)
+    capacity = flights * int(inventory.default_capacity.sum())
+    oversold = any(
+        inventory.sold(f, c) > inventory.default_capacity[inventory.class_index[c]]
+        or inventory.available(f, c) < 0
+        for f in flight_ids for c in FARE_CLASSES
+    )
+    return dict(
+        counts,
+        threads=threads,
+        holds_per_s=(counts["holds"] + counts["rejected"]) / elapsed,
+        sold_seats=sold,
+        consistent=(sold == counts["confirmed_seats"] and sold + available == capacity and inventory.active_holds() == 0),
+        oversold=oversold
+    )
+
+
+if __name__ == "__main__":
+    result = run()
+    for name, value in result.items():
+        print(f"{name:<16} {value:12.0f}" if isinstance(value, float) else f"{name:<16} {value!s:>12}")
+    assert result["consistent"] and not result["oversold"], "seat inventory oversold or leaked seats"
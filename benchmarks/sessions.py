@@ -0,0 +1,82 @@
+"""Soak test for session-state growth under session churn.
+
+Each round opens a batch of sessions. Every session runs several searches,
+expands fare rules on many flights and starts a booking. The sessions are
+then dropped, as closed tabs are. The report shows each round's largest
+session and the memory still traced once the round's sessions are gone.
+Both should level off rather than grow with the number of rounds or with
+how long a session is used.
+
+Run from the repository root (Streamlit runs in bare mode):
+
+    python -m benchmarks.sessions [rounds] [sessions_per_round]
+"""
+import gc
+import sys
+import tracemalloc
+from pathlib import Path
+
+from streamlit.testing.v1 import AppTest
+
+APP_SCRIPT = str(Path(__file__).resolve().parent.parent / "app.py")
+
+ROUTES = [
+    ("Mumbai (BOM)", "Delhi (DEL)"),
+    ("Delhi (DEL)", "Bangalore (BLR)"),
+    ("Chennai (MAA)", "Kolkata (CCU)"),
+    ("Pune (PNQ)", "Goa (GOI)"),
+    ("Kochi (COK)", "Jaipur (JAI)")
+]
+
+
+def use_session(session, searches=3, toggles=8):
+    """Drive one session; returns (own bytes, fare-rule toggles held) at its largest, and toggles made"""
+    from app import get_app
+
+    manager = get_app().session_manager
+    at = AppTest.from_file(APP_SCRIPT, default_timeout=60).run()
+    largest, toggles_held, toggles_made = 0, 0, 0
+    for search in range(searches):
+        from_city, to_city = ROUTES[(session + search) % len(ROUTES)]
+        at.selectbox(key="from_city_input").set_value(from_city)
+        at.selectbox(key="to_city_input").set_value(to_city)
+        at.button(key="search_button").click().run()
+        shown = len(at.selectbox(key="selected_flight_choice").options)
+        for i in range(min(toggles, shown)):
+            at.selectbox(key="selected_flight_choice").select_index(i)
+            at.button(key="rules_selected_flight").click().run()
+            toggles_made += 1
+        per_key, _ = manager.footprint(at.session_state)
+        largest = max(largest, sum(per_key.values()))
+        toggles_held = max(toggles_held, len(at.session_state.show_fare_rules))
+    # Leave mid-booking, as an abandoned tab would
+    at.button(key="select_selected_flight").click().run()
+    at.button(key="continue_to_passengers").click().run()
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+    return largest, toggles_held, toggles_made
+
+
+def run(rounds=4, sessions=2):
+    tracemalloc.start()
+    rows = []
+    for round_number in range(rounds):
+        outcomes = [use_session(round_number * sessions + s) for s in range(sessions)]
+        gc.collect()
+        rows.append({
+            "round": round_number + 1,
+            "max_session_kb": max(size for size, _, _ in outcomes) / 1024,
+            "max_toggles_held": max(held for _, held, _ in outcomes),
+            "toggles_made": max(made for _, _, made in outcomes),
+            "traced_mb": tracemalloc.get_traced_memory()[0] / 2**20
+        })
+    tracemalloc.stop()
+    return rows
+
+
+if __name__ == "__main__":
+    for row in run(*map(int, sys.argv[1:3])):
+        print(
+            f"round {row['round']:>2}  largest session {row['max_session_kb']:6.1f} KiB  "
+            f"fare-rule toggles held {row['max_toggles_held']:>3} of {row['toggles_made']:>3}  traced after churn {row['traced_mb']:7.2f} MiB"
+        )
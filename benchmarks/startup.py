@@ -0,0 +1,90 @@
+"""Report import time, app construction time and per-rerun overhead.
+
+Run from the repository root:
+
+    python -m benchmarks.startup
+
+"Rebuilt" reruns clear st.cache_resource first, reproducing the old
+behaviour of constructing FlightBookingApp (and its assets) on every rerun.
+"""
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+APP_SCRIPT = str(Path(__file__).resolve().parent.parent / "app.py")
+
+IMPORT_PROBE = """
+import sys, time
+start = time.perf_counter()
+import streamlit
+streamlit_done = time.perf_counter()
+import app
+app_done = time.perf_counter()
+print(streamlit_done - start, app_done - streamlit_done, "pandas" in sys.modules, "PIL" in sys.modules)
+"""
+
+
+def measure_import(repeat=3):
+    """Fresh-interpreter import times (seconds) and whether heavy modules got loaded"""
+    samples = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", IMPORT_PROBE], capture_output=True, text=True, check=True
+        ).stdout.split()
+        samples.append(output)
+    streamlit_s = min(float(s[0]) for s in samples)
+    app_s = min(float(s[1]) for s in samples)
+    return {
+        "streamlit_import_ms": streamlit_s * 1000,
+        "app_import_ms": app_s * 1000,
+        "pandas_loaded": samples[0][2] == "True",
+        "pil_loaded": samples[0][3] == "True"
+    }
+
+
+def measure_construction(repeat=50):
+    import app
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        app.FlightBookingApp()
+        timings.append((time.perf_counter() - start) * 1000)
+    return {"construction_ms": statistics.median(timings)}
+
+
+def measure_reruns(repeat=20):
+    import streamlit as st
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(APP_SCRIPT, default_timeout=30).run()
+    at.button(key="search_button").click().run()
+
+    # Interleave the two modes so warm-up and drift affect both equally
+    timings = {False: [], True: []}
+    for _ in range(repeat):
+        for clear in (False, True):
+            if clear:
+                st.cache_resource.clear()
+            start = time.perf_counter()
+            at.run()
+            timings[clear].append((time.perf_counter() - start) * 1000)
+
+    return {
+        "rerun_cached_ms": statistics.median(timings[False]),
+        "rerun_rebuilt_ms": statistics.median(timings[True])
+    }
+
+
+def run():
+    result = measure_import()
+    result.update(measure_construction())
+    result.update(measure_reruns())
+    return result
+
+
+if __name__ == "__main__":
+    for name, value in run().items():
+        print(f"{name:<22} {value:10.2f}" if isinstance(value, float) else f"{name:<22} {value!s:>10}")
@@ -0,0 +1,77 @@
+"""Measure time to first result against total search time, and the cost of
+keeping the streamed results sorted as answers arrive.
+
+Run from the repository root:
+
+    python -m benchmarks.streaming
+"""
+import time
+from datetime import date
+
+import numpy as np
+
+from benchmarks.generation import AIRLINES, FARE_CLASSES, best_of
+from flight_inventory import generate_flight_columns
+from flight_results import FlightResults
+from search_stream import ResultStream
+from suppliers import DEFAULT_SUPPLIER_PROFILES, FanOutSearch, SimulatedSupplier, SupplierResult
+
+SEARCHES = 50
+SIZES = [100, 10_000, 100_000]
+
+
+def latency():
+    columns = generate_flight_columns(len(AIRLINES), FARE_CLASSES, 60)
+    suppliers = []
+    for airline, info in enumerate(AIRLINES.values()):
+        latency_ms, failure_rate = DEFAULT_SUPPLIER_PROFILES[info["code"]]
+        suppliers.append(SimulatedSupplier(
+            info["code"], airline, lambda *_: columns, latency_ms=latency_ms, failure_rate=failure_rate
+        ))
+    fan_out = FanOutSearch(suppliers)
+    first, total = [], []
+    for _ in range(SEARCHES):
+        started = time.perf_counter()
+        stream = ResultStream(FlightResults(("bench",), "BOM", "DEL", None, AIRLINES, FARE_CLASSES, columns),
+                              columns["price"], started=started)
+        for answer in fan_out.iter_results("BOM", "DEL", None):
+            stream.add(answer)
+        first.append(stream.first_result_ms)
+        total.append((time.perf_counter() - started) * 1000)
+    return np.percentile(first, [50, 99]), np.percentile(total, [50, 99])
+
+
+def merge_cost(size):
+    """Per-search cost of keeping the order as six answers arrive: merging vs re-sorting"""
+    columns = generate_flight_columns(len(AIRLINES), FARE_CLASSES, size)
+    preview = FlightResults(("bench", size), "BOM", "DEL", date(2026, 1, 15), AIRLINES, FARE_CLASSES, columns)
+    answers = [
+        SupplierResult(code, np.flatnonzero(columns["airline"] == airline), "ok", 0.0)
+        for airline, code in enumerate(info["code"] for info in AIRLINES.values())
+    ]
+
+    def merged():
+        stream = ResultStream(preview, columns["price"])
+        for answer in answers:
+            stream.add(answer)
+        return stream.order
+
+    def resorted():
+        rows = np.zeros(0, dtype=np.int64)
+        for answer in answers:
+            rows = np.concatenate([rows, answer.rows])
+            order = rows[np.argsort(columns["price"][rows], kind="stable")]
+        return order
+
+    return best_of(merged), best_of(resorted)
+
+
+if __name__ == "__main__":
+    (first_p50, first_p99), (total_p50, total_p99) = latency()
+    print(
+        f"{SEARCHES} searches over {len(AIRLINES)} simulated suppliers  "
+        f"first result p50/p99 {first_p50:6.1f}/{first_p99:6.1f} ms  total p50/p99 {total_p50:6.1f}/{total_p99:6.1f} ms"
+    )
+    for size in SIZES:
+        merged_ms, resorted_ms = merge_cost(size)
+        print(f"{size:>7} flights  running merge {merged_ms:7.2f} ms  re-sort per answer {resorted_ms:7.2f} ms")
@@ -0,0 +1,149 @@
+"""Run the benchmark suite, write the results as JSON and optionally compare
+them with a stored baseline.
+
+Microbenchmarks (generation, filtering/sorting, formatting, rendering) run at
+several data sizes with fixed seeds; the end-to-end booking flow is driven
+headlessly with AppTest. Every timing is flattened to a metric name such as
+``query[size=10000].index_query_ms``.
+
+Run from the repository root:
+
+    python -m benchmarks.suite                      # everything, to benchmark-results.json
+    python -m benchmarks.suite --only query,formatting
+    python -m benchmarks.suite --save-baseline      # also store as benchmarks/baseline.json
+    python -m benchmarks.suite --compare            # exit 1 if anything regressed
+
+A metric regresses when it is worse than the baseline by more than
+``--tolerance`` (relative) and by more than ``--min-ms``, so noise on
+sub-millisecond timings does not fail the comparison.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+from benchmarks import booking_flow, formatting, generation, query, rendering
+
+BENCHMARKS = {
+    "generation": generation.run,
+    "query": query.run,
+    "formatting": formatting.run,
+    "rendering": rendering.run,
+    "booking_flow": lambda: booking_flow.run(sessions=12, concurrency=3)
+}
+
+DEFAULT_OUTPUT = "benchmark-results.json"
+DEFAULT_BASELINE = Path(__file__).parent / "baseline.json"
+
+# Keys that label a result row rather than measure it
+ROW_LABELS = ("size", "step", "page")
+
+
+def flatten(name, result):
+    """Metric name -> value for every timing (``*_ms``) and rate (``*_per_s``) in a benchmark result"""
+    metrics = {}
+    if isinstance(result, list):
+        for row in result:
+            label = next((f"{key}={row[key]}" for key in ROW_LABELS if key in row), None)
+            metrics.update(flatten(f"{name}[{label}]" if label else name, row))
+    elif isinstance(result, dict):
+        for key, value in result.items():
+            if isinstance(value, (list, dict)):
+                metrics.update(flatten(name, value))
+            elif isinstance(value, (int, float)) and key.endswith(("_ms", "_per_s")):
+                metrics[f"{name}.{key}"] = float(value)
+    return metrics
+
+
+def environment():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "processor_count": os.cpu_count()
+    }
+
+
+def run(names=None):
+    results, metrics, durations = {}, {}, {}
+    for name in names or BENCHMARKS:
+        started = time.perf_counter()
+        results[name] = BENCHMARKS[name]()
+        durations[name] = time.perf_counter() - started
+        metrics.update(flatten(name, results[name]))
+        print(f"{name:<13} {durations[name]:6.1f} s  {sum(key.startswith(name) for key in metrics)} metrics", file=sys.stderr)
+    return {"environment": environment(), "metrics": metrics, "results": results}
+
+
+def compare(current, baseline, tolerance=0.25, min_ms=0.5):
+    """Rows of (metric, baseline, current, change, regressed) for metrics present in both runs"""
+    rows = []
+    for metric, base in sorted(baseline["metrics"].items()):
+        value = current["metrics"].get(metric)
+        if value is None or base == 0:
+            continue
+        change = value / base - 1
+        if metric.endswith("_per_s"):
+            # Rates: lower is worse
+            regressed = change < -tolerance
+        else:
+            regressed = change > tolerance and value - base > min_ms
+        rows.append((metric, base, value, change, regressed))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--only", help="comma-separated benchmarks to run: " + ",".join(BENCHMARKS))
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE))
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the baseline")
+    parser.add_argument("--compare", action="store_true", help="compare with the baseline and fail on regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative slowdown (default 0.25)")
+    parser.add_argument("--min-ms", type=float, default=0.5, help="ignore slowdowns smaller than this")
+    args = parser.parse_args(argv)
+
+    names = args.only.split(",") if args.only else None
+    unknown = set(names or ()) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    report = run(names)
+    Path(args.output).write_text(json.dumps(report, indent=2, default=str))
+    print(f"Wrote {len(report['metrics'])} metrics to {args.output}")
+    if args.save_baseline:
+        Path(args.baseline).write_text(json.dumps(report, indent=2, default=str))
+        print(f"Saved baseline to {args.baseline}")
+
+    if not args.compare:
+        return 0
+    baseline = json.loads(Path(args.baseline).read_text())
+    rows = compare(report, baseline, args.tolerance, args.min_ms)
+    regressions = [row for row in rows if row[4]]
+    for metric, base, value, change, regressed in rows:
+        flag = "REGRESSED" if regressed else ""
+        print(f"{metric:<58} {base:10.2f} -> {value:10.2f}  {change:+7.1%}  {flag}")
+    print(
+        f"{len(regressions)} of {len(rows)} metrics regressed beyond {args.tolerance:.0%} "
+        f"(baseline {baseline['environment'].get('commit')}, {baseline['environment'].get('created')})"
+    )
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+"""Measure fan-out search latency as supplier count and latency variance grow.
+
+Every supplier is a simulated stand-in with a 20 ms median latency; jitter
+is the sigma of its log-normal latency. Reports p50/p99 time to the first
+answer and to the complete result, with and without hedged requests.
+
+Run from the repository root:
+
+    python -m benchmarks.suppliers
+"""
+import asyncio
+import time
+
+import numpy as np
+
+from suppliers import FanOutSearch, SimulatedSupplier
+
+SUPPLIER_COUNTS = [3, 6, 12, 24]
+JITTERS = [0.25, 0.75, 1.25]
+SEARCHES = 200
+CONCURRENCY = 20
+MEDIAN_LATENCY_MS = 20
+TIMEOUT = 0.25
+
+
+def source(from_city, to_city, day):
+    return {"airline": np.arange(48) % 24}
+
+
+async def timed_search(fan_out):
+    started = time.perf_counter()
+    first = None
+    async for _ in fan_out.stream("BOM", "DEL", None):
+        if first is None:
+            first = time.perf_counter() - started
+    return first * 1000, (time.perf_counter() - started) * 1000
+
+
+async def measure(fan_out):
+    timings = []
+    for start in range(0, SEARCHES, CONCURRENCY):
+        batch = min(CONCURRENCY, SEARCHES - start)
+        timings += await asyncio.gather(*(timed_search(fan_out) for _ in range(batch)))
+    return np.array(timings)
+
+
+def run():
+    rows = []
+    for count in SUPPLIER_COUNTS:
+        for jitter in JITTERS:
+            row = {"suppliers": count, "jitter": jitter}
+            for label, hedge_after in (("plain", None), ("hedged", 0.05)):
+                suppliers = [
+                    SimulatedSupplier(f"S{i}", i, source, latency_ms=MEDIAN_LATENCY_MS, jitter=jitter,
+                                      failure_rate=0.01, seed=i)
+                    for i in range(count)
+                ]
+                fan_out = FanOutSearch(suppliers, timeout=TIMEOUT, hedge_after=hedge_after)
+                timings = asyncio.run(measure(fan_out))
+                row[f"{label}_first_p50"], row[f"{label}_first_p99"] = np.percentile(timings[:, 0], [50, 99])
+                row[f"{label}_all_p50"], row[f"{label}_all_p99"] = np.percentile(timings[:, 1], [50, 99])
+            rows.append(row)
+    return rows
+
+
+if __name__ == "__main__":
+    for row in run():
+        print(
+            f"{row['suppliers']:>3} suppliers  jitter {row['jitter']:.2f}  "
+            f"first answer p50/p99 {row['plain_first_p50']:6.1f}/{row['plain_first_p99']:6.1f} ms  "
+            f"complete p50/p99 {row['plain_all_p50']:6.1f}/{row['plain_all_p99']:6.1f} ms  |  "
+            f"hedged complete p50/p99 {row['hedged_all_p50']:6.1f}/{row['hedged_all_p99']:6.1f} ms"
+        )
@@ -0,0 +1,433 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+
+from search_cache import normalize_city
+from seat_inventory import DEFAULT_CAPACITY
+
+DEFAULT_EXPORT_PATH = Path(__file__).parent / "booking_exports"
+
+# Export progress per dataset, kept beside the bookings so every worker sees it
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS booking_exports (
+    root TEXT PRIMARY KEY,
+    created_at REAL NOT NULL DEFAULT 0,
+    reference TEXT NOT NULL DEFAULT '',
+    lease_until REAL NOT NULL DEFAULT 0
+);
+"""
+
+# One row per flight leg: a round trip is two rows, each under its own departure day and route
+LEG_COLUMNS = (
+    "reference", "booked_at", "day", "route", "airline", "flight_number", "flight_id", "fare_class",
+    "trip_type", "payment_method", "leg", "passengers", "fare", "revenue", "capacity"
+)
+
+
+def _arrow():
+    """pyarrow and the submodules used here; only imported once an export or query needs them"""
+    try:
+        import pyarrow
+        import pyarrow.acero
+        import pyarrow.compute
+        import pyarrow.dataset
+        import pyarrow.fs
+        import pyarrow.parquet
+    except ImportError as err:
+        raise ImportError("Booking exports and analytics need pyarrow: pip install pyarrow") from err
+    return SimpleNamespace(
+        pa=pyarrow, acero=pyarrow.acero, pc=pyarrow.compute, ds=pyarrow.dataset, fs=pyarrow.fs, pq=pyarrow.parquet
+    )
+
+
+def leg_schema():
+    pa = _arrow().pa
+    return pa.schema([
+        ("reference", pa.string()), ("booked_at", pa.timestamp("ms")), ("day", pa.date32()),
+        ("route", pa.string()), ("airline", pa.string()), ("flight_number", pa.string()),
+        ("flight_id", pa.string()), ("fare_class", pa.string()), ("trip_type", pa.string()),
+        ("payment_method", pa.string()), ("leg", pa.int8()), ("passengers", pa.int16()),
+        ("fare", pa.int32()), ("revenue", pa.int64()), ("capacity", pa.int16())
+    ])
+
+
+def booking_legs(bookings, capacity=DEFAULT_CAPACITY):
+    """Legs of stored bookings as an Arrow table, each booking's total split across its legs by fare"""
+    columns = {name: [] for name in LEG_COLUMNS}
+    for booking in bookings:
+        legs = [flight for flight in booking["flights"] if flight]
+        fare_total = sum(flight["price"] for flight in legs) or 1
+        remaining = booking["total_price"]
+        for leg, flight in enumerate(legs):
+            # The last leg takes the rounding remainder, so legs always add up to the booking
+            revenue = remaining if leg == len(legs) - 1 else round(booking["total_price"] * flight["price"] / fare_total)
+            remaining -= revenue
+            day = flight["date"]
+            row = {
+                "reference": booking["reference"],
+                "booked_at": int(booking["created_at"] * 1000),
+                "day": date.fromisoformat(day) if isinstance(day, str) else day,
+                "route": f"{normalize_city(flight['from_city'])}-{normalize_city(flight['to_city'])}",
+                "airline": flight.get("airline") or flight["flight_number"].split()[0],
+                "flight_number": flight["flight_number"],
+                "flight_id": flight.get("id") or f"{flight['flight_number']} {day}",
+                "fare_class": flight["fare_class"],
+                "trip_type": booking["trip_type"],
+                "payment_method": booking["payment_method"],
+                "leg": leg,
+                "passengers": booking["passengers"],
+                "fare": flight["price"],
+                "revenue": revenue,
+                "capacity": capacity.get(flight["fare_class"], 0)
+            }
+            for name, value in row.items():
+                columns[name].append(value)
+    return _arrow().pa.table(columns, schema=leg_schema())
+
+
+def _month_directory(root, day):
+    return Path(root) / f"month={day:%Y-%m}"
+
+
+def _batch_id(*parts):
+    return hashlib.blake2s("|".join(parts).encode(), digest_size=8).hexdigest()
+
+
+class BookingExporter:
+    """Appends completed bookings to a Parquet dataset for analytics, on a daemon thread.
+
+    Each round reads the bookings stored since the last one, oldest first,
+    and writes their legs under one ``month=YYYY-MM`` directory per
+    departure month, sorted by day and then route, so readers skip other
+    months by directory and other days and routes by row-group statistics.
+    Bookings younger than ``settle_seconds`` wait for the next round, so a
+    slow transaction in another worker cannot commit behind the watermark.
+
+    The watermark lives beside the bookings and a round holds a lease on
+    it, so one worker exports at a time however many processes share the
+    database. File names derive from the bookings in them: a round that
+    dies before moving the watermark is redone over the same files rather
+    than duplicated. Once a month gathers ``compact_after`` files under
+    ``compact_rows`` rows, they are merged into one.
+    """
+
+    def __init__(self, repository, root=DEFAULT_EXPORT_PATH, batch_size=50_000, interval=30, settle_seconds=30,
+                 compact_after=16, compact_rows=1_000_000, row_group_rows=32_768, capacity=DEFAULT_CAPACITY,
+                 lease_seconds=300):
+        _arrow()
+        self.repository = repository
+        self.root = Path(root)
+        self.batch_size = batch_size
+        self.interval = interval
+        self.settle_seconds = settle_seconds
+        self.compact_after = compact_after
+        self.compact_rows = compact_rows
+        self.row_group_rows = row_group_rows
+        self.capacity = capacity
+        self.lease_seconds = lease_seconds
+        self.pool = repository.pool
+        self._name = str(self.root.resolve())
+        with self.pool.connection() as conn:
+            conn.executescript(SCHEMA)
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+        self.counters = {"rounds": 0, "skipped": 0, "bookings": 0, "legs": 0, "files": 0, "compacted": 0, "errors": 0}
+        self.last_round = None
+
+    def _count(self, **amounts):
+        with self._lock:
+            for name, amount in amounts.items():
+                self.counters[name] += amount
+
+    def _claim(self):
+        """Take the export lease; returns the watermark, or None while another worker holds it"""
+        now = time.time()
+        with self.pool.transaction() as conn:
+            conn.execute("INSERT OR IGNORE INTO booking_exports (root) VALUES (?)", (self._name,))
+            claimed = conn.execute(
+                "UPDATE booking_exports SET lease_until = ? WHERE root = ? AND lease_until < ?",
+                (now + self.lease_seconds, self._name, now)
+            ).rowcount
+            if not claimed:
+                return None
+            row = conn.execute("SELECT created_at, reference FROM booking_exports WHERE root = ?", (self._name,)).fetchone()
+        return row["created_at"], row["reference"]
+
+    def _advance(self, position):
+        with self.pool.transaction() as conn:
+            conn.execute(
+                "UPDATE booking_exports SET created_at = ?, reference = ?, lease_until = ? WHERE root = ?",
+                (*position, time.time() + self.lease_seconds, self._name)
+            )
+
+    def _release(self):
+        with self.pool.transaction() as conn:
+            conn.execute("UPDATE booking_exports SET lease_until = 0 WHERE root = ?", (self._name,))
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+
+        def loop():
+            while not self._stop.is_set():
+                try:
+                    self.run_once()
+                except Exception:
+                    # A failed round is retried next interval rather than ending the thread
+                    self._count(errors=1)
+                self._stop.wait(self.interval)
+
+        self._thread = threading.Thread(target=loop, name="booking-exporter", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def run_once(self):
+        """Export the bookings stored since the last round; returns its figures, or None if another worker is exporting"""
+        started = time.perf_counter()
+        position = self._claim()
+        if position is None:
+            self._count(skipped=1)
+            return None
+        round_stats = {"bookings": 0, "legs": 0, "files": 0, "compacted": 0}
+        touched = set()
+        try:
+            settled = time.time() - self.settle_seconds
+            while not self._stop.is_set():
+                bookings = self.repository.created_between(position, settled, limit=self.batch_size)
+                if not bookings:
+                    break
+                legs = booking_legs(bookings, self.capacity)
+                months = self.write_table(legs, _batch_id(bookings[0]["reference"], bookings[-1]["reference"]))
+                position = (bookings[-1]["created_at"], bookings[-1]["reference"])
+                self._advance(position)
+                touched.update(months)
+                round_stats["bookings"] += len(bookings)
+                round_stats["legs"] += len(legs)
+                round_stats["files"] += len(months)
+            for month in sorted(touched):
+                round_stats["compacted"] += self.compact(month)
+        finally:
+            self._release()
+
+        round_stats["ms"] = (time.perf_counter() - started) * 1000
+        self._count(rounds=1, **{name: round_stats[name] for name in ("bookings", "legs", "files", "compacted")})
+        self.last_round = dict(round_stats, finished_at=time.time())
+        return round_stats
+
+    def _write_file(self, path, table):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Written aside and renamed, so readers never see a partial file
+        partial = path.with_suffix(".tmp")
+        _arrow().pq.write_table(table, partial, row_group_size=self.row_group_rows, compression="zstd")
+        os.replace(partial, path)
+
+    def write_table(self, legs, batch_id):
+        """Write legs into their month directories, one file per month named after ``batch_id``; returns the months"""
+        pa = _arrow().pa
+        legs = legs.sort_by([("day", "ascending"), ("route", "ascending")])
+        months = legs.column("day").cast(pa.int32()).to_numpy().astype("datetime64[D]").astype("datetime64[M]")
+        firsts, starts = np.unique(months, return_index=True)
+        ends = np.append(starts[1:], len(legs))
+        written = []
+        for first, start, end in zip(firsts.astype("datetime64[D]").tolist(), starts.tolist(), ends.tolist()):
+            self._write_file(_month_directory(self.root, first) / f"part-{batch_id}.parquet", legs.slice(start, end - start))
+            written.append(first)
+        return written
+
+    def compact(self, month):
+        """Merge a month's small files into one, once there are ``compact_after``; returns how many were merged"""
+        arrow = _arrow()
+        directory = _month_directory(self.root, month)
+        files = [path for path in sorted(directory.glob("*.parquet")) if arrow.pq.read_metadata(path).num_rows < self.compact_rows]
+        if len(files) < self.compact_after:
+            return 0
+        legs = arrow.ds.dataset([str(path) for path in files], format="parquet", schema=leg_schema()).to_table()
+        merged = directory / f"part-{_batch_id(*(path.name for path in files))}.parquet"
+        self._write_file(merged, legs.sort_by([("day", "ascending"), ("route", "ascending")]))
+        for path in files:
+            if path != merged:
+                path.unlink(missing_ok=True)
+        return len(files)
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counters, running=self._thread is not None, last_round=self.last_round)
+
+
+class BookingAnalytics:
+    """Aggregates over an exported bookings dataset, streamed so memory stays flat as it grows.
+
+    A query lists only the month directories its days fall in and reads
+    their files memory-mapped. Day, route and airline filters are pushed
+    down to the scan, which skips row groups whose statistics rule them
+    out, and only the columns an aggregate needs are decoded. Grouping runs
+    in Arrow's streaming engine, holding one row per group rather than the
+    bookings.
+
+    Results are kept until the files they were computed from change, so a
+    page rerun with the same filters does not scan again. File names are
+    derived from their contents, so the list of names is the version.
+    """
+
+    def __init__(self, root=DEFAULT_EXPORT_PATH, max_results=64):
+        self.root = Path(root)
+        self.max_results = max_results
+        self._filesystem = _arrow().fs.LocalFileSystem(use_mmap=True)
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+        self.counters = {"queries": 0, "cached": 0}
+
+    def months(self):
+        """First day of every month with exported bookings, in order"""
+        if not self.root.is_dir():
+            return []
+        return sorted(
+            date.fromisoformat(path.name[len("month="):] + "-01") for path in self.root.iterdir()
+            if path.is_dir() and path.name.startswith("month=")
+        )
+
+    def files(self, start=None, end=None):
+        """Exported files that may hold departure days from ``start`` to ``end`` inclusive"""
+        return [
+            str(path) for month in self.months()
+            if (start is None or month >= start.replace(day=1)) and (end is None or month <= end)
+            for path in sorted(_month_directory(self.root, month).glob("*.parquet"))
+        ]
+
+    def size(self):
+        """(files, bytes) in the whole dataset"""
+        files = self.files()
+        return len(files), sum(os.path.getsize(path) for path in files)
+
+    def day_range(self):
+        """First and last departure day exported, from file statistics alone, or None"""
+        pq = _arrow().pq
+        first, last = None, None
+        for path in self.files():
+            metadata = pq.read_metadata(path)
+            column = metadata.schema.names.index("day")
+            for group in range(metadata.num_row_groups):
+                statistics = metadata.row_group(group).column(column).statistics
+                first = statistics.min if first is None else min(first, statistics.min)
+                last = statistics.max if last is None else max(last, statistics.max)
+        return None if first is None else (first, last)
+
+    def _aggregate(self, start, end, columns, stages, routes=None, airlines=None):
+        """Run ``stages`` of (aggregates, keys) over the matching legs, reading only ``columns``"""
+        key = repr((start, end, columns, stages, sorted(routes or ()), sorted(airlines or ())))
+        version = tuple(self.files(start, end))
+        with self._lock:
+            entry = self._results.get(key)
+            if entry is not None and entry[0] == version:
+                self._results.move_to_end(key)
+                self.counters["cached"] += 1
+                return entry[1]
+
+        result = self._scan(start, end, columns, stages, routes, airlines)
+        with self._lock:
+            self.counters["queries"] += 1
+            self._results[key] = (version, result)
+            self._results.move_to_end(key)
+            while len(self._results) > self.max_results:
+                self._results.popitem(last=False)
+        return result
+
+    def _condition(self, start, end, routes, airlines):
+        pc = _arrow().pc
+        clauses = []
+        if start is not None:
+            clauses.append(pc.field("day") >= pc.scalar(start))
+        if end is not None:
+            clauses.append(pc.field("day") <= pc.scalar(end))
+        for name, values in (("route", routes), ("airline", airlines)):
+            if values:
+                clauses.append(pc.field(name).isin(list(values)))
+        condition = None
+        for clause in clauses:
+            condition = clause if condition is None else condition & clause
+        return condition
+
+    def _dataset(self, start, end):
+        return _arrow().ds.dataset(self.files(start, end), format="parquet", schema=leg_schema(), filesystem=self._filesystem)
+
+    def row_groups(self, start=None, end=None, routes=None, airlines=None):
+        """(row groups a query with these filters reads, row groups in the files it lists)"""
+        condition = self._condition(start, end, routes, airlines)
+        read, total = 0, 0
+        for fragment in self._dataset(start, end).get_fragments():
+            total += fragment.num_row_groups
+            read += len(fragment.split_by_row_group(condition)) if condition is not None else fragment.num_row_groups
+        return read, total
+
+    def _scan(self, start, end, columns, stages, routes, airlines):
+        acero = _arrow().acero
+        condition = self._condition(start, end, routes, airlines)
+        for attempt in range(2):
+            dataset = self._dataset(start, end)
+            # The scan filter only prunes row groups; the filter node drops the remaining rows
+            nodes = [acero.Declaration("scan", acero.ScanNodeOptions(dataset, columns=columns, filter=condition))]
+            if condition is not None:
+                nodes.append(acero.Declaration("filter", acero.FilterNodeOptions(condition)))
+            nodes.extend(
+                acero.Declaration("aggregate", acero.AggregateNodeOptions(aggregates, keys=keys))
+                for aggregates, keys in stages
+            )
+            try:
+                return acero.Declaration.from_sequence(nodes).to_table()
+            except FileNotFoundError:
+                # A compaction replaced a file after it was listed; list again
+                if attempt:
+                    raise
+
+    def revenue_by_airline(self, start=None, end=None, routes=None, airlines=None):
+        """Revenue, passengers and legs flown per airline, highest revenue first"""
+        totals = self._aggregate(start, end, ["airline", "revenue", "passengers"], [(
+            [("revenue", "hash_sum", None, "revenue"), ("passengers", "hash_sum", None, "passengers"),
+             ("passengers", "hash_count", None, "legs")],
+            ["airline"]
+        )], routes=routes, airlines=airlines)
+        return totals.select(["airline", "revenue", "passengers", "legs"]).sort_by([("revenue", "descending")])
+
+    def load_factor_by_route(self, start=None, end=None, airlines=None):
+        """Seats sold over seats offered per route, counting the flights (and classes) with any booking"""
+        pc = _arrow().pc
+        # Per flight and class first, so each one's capacity counts once however many bookings it has;
+        # a flight number flies every day, so flights are told apart by id, which names the day
+        totals = self._aggregate(start, end, ["route", "flight_id", "fare_class", "passengers", "capacity"], [
+            ([("passengers", "hash_sum", None, "passengers"), ("capacity", "hash_max", None, "capacity")],
+             ["route", "flight_id", "fare_class"]),
+            ([("passengers", "hash_sum", None, "passengers"), ("capacity", "hash_sum", None, "seats")], ["route"])
+        ], airlines=airlines)
+        load_factor = pc.divide(pc.cast(totals.column("passengers"), "float64"), totals.column("seats"))
+        return (
+            totals.select(["route", "passengers", "seats"])
+            .append_column("load_factor", load_factor)
+            .sort_by([("load_factor", "descending")])
+        )
+
+    def class_mix_by_day(self, start=None, end=None, routes=None, airlines=None):
+        """Passengers per fare class on each departure day, with each class's share of the day"""
+        pc = _arrow().pc
+        mix = self._aggregate(start, end, ["day", "fare_class", "passengers"], [
+            ([("passengers", "hash_sum", None, "passengers")], ["day", "fare_class"])
+        ], routes=routes, airlines=airlines).select(["day", "fare_class", "passengers"])
+        daily = mix.group_by("day").aggregate([("passengers", "sum")])
+        mix = mix.join(daily, "day")
+        share = pc.divide(pc.cast(mix.column("passengers"), "float64"), mix.column("passengers_sum"))
+        return mix.drop_columns(["passengers_sum"]).append_column("share", share).sort_by(
+            [("day", "ascending"), ("fare_class", "ascending")]
+        )
@@ -0,0 +1,538 @@
+import json
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import date
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+from airport_search import load_airports
+from booking_store import PENDING
+from fare_calendar import BOOKING_WINDOW_DAYS, FareCalendars
+from flight_results import flight_id_prefix
+from flight_search import FlightSearch
+from pricing import PricingEngine, booking_quote
+from reference_data import AIRLINES, AIRPORTS, FARE_CLASSES
+from search_cache import normalize_city
+from shared_state import backend_from_url
+from suppliers import FanOutSearch, simulated_suppliers
+
+# Largest passenger manifest booked by one request (the UI stops at 9)
+MAX_PARTY = 50
+
+# Largest request body read, room for a batch of full manifests
+MAX_BODY_BYTES = 2 * 1024 * 1024
+
+GENDERS = ("Female", "Male", "Other")
+PAYMENT_METHODS = ("Credit/Debit Card", "UPI", "Net Banking", "Invoice")
+
+DEFAULT_PORT = 8510
+
+
+def validate_passengers(passengers, email, phone):
+    """Problems with a party's names and contact details, worded for whoever entered them"""
+    errors = []
+    if any(not p["first_name"] or not p["last_name"] for p in passengers):
+        errors.append("Enter a first and last name for every passenger.")
+    if "@" not in email:
+        errors.append("Enter a valid email address.")
+    digits = phone.strip().lstrip("+")
+    if not digits.isdigit() or len(digits) < 10:
+        errors.append("Enter a valid mobile number.")
+    return errors
+
+
+class BookingRequestError(ValueError):
+    """A request the booking service refused, with every problem found in it and the HTTP status to answer with"""
+
+    def __init__(self, errors, status=HTTPStatus.BAD_REQUEST):
+        super().__init__(" ".join(errors))
+        self.errors = list(errors)
+        self.status = HTTPStatus(status)
+
+
+def read_manifest(request, max_party=MAX_PARTY):
+    """The passenger dicts of a booking request, contact details on the first as the UI stores them"""
+    entries = request.get("passengers")
+    if not isinstance(entries, list) or not entries:
+        raise BookingRequestError(["List the passengers to book."])
+    if len(entries) > max_party:
+        raise BookingRequestError([f"Book at most {max_party} passengers per request."])
+
+    passengers, errors = [], []
+    for number, entry in enumerate(entries, 1):
+        if not isinstance(entry, dict):
+            errors.append(f"Passenger {number}: expected an object with first_name and last_name.")
+            continue
+        age, gender = entry.get("age"), entry.get("gender")
+        if age is not None and (type(age) is not int or not 0 <= age <= 120):
+            errors.append(f"Passenger {number}: age must be a whole number from 0 to 120.")
+        if gender is not None and gender not in GENDERS:
+            errors.append(f"Passenger {number}: gender must be one of {', '.join(GENDERS)}.")
+        passengers.append({
+            "first_name": str(entry.get("first_name") or "").strip(),
+            "last_name": str(entry.get("last_name") or "").strip(),
+            "age": age,
+            "gender": gender
+        })
+    email = str(request.get("email") or "").strip()
+    phone = str(request.get("phone") or "").strip()
+    errors.extend(validate_passengers(passengers, email, phone))
+    if errors:
+        raise BookingRequestError(errors)
+    passengers[0].update(email=email, phone=phone)
+    return passengers
+
+
+def _day(value, today):
+    if isinstance(value, str):
+        try:
+            value = date.fromisoformat(value)
+        except ValueError:
+            raise BookingRequestError([f"Dates must be YYYY-MM-DD, not {value!r}."]) from None
+    if not isinstance(value, date):
+        raise BookingRequestError(["Give every flight a date."])
+    if not 0 <= (value - today).days < BOOKING_WINDOW_DAYS:
+        raise BookingRequestError([f"{value} is outside the {BOOKING_WINDOW_DAYS} days on sale from {today}."])
+    return value
+
+
+class BookingService:
+    """Searches, prices and books whole passenger manifests without the UI.
+
+    Runs the sessions' own searches (``FlightSearch``), current fares
+    (``PricingEngine`` snapshots) and group fare rules (``booking_quote``)
+    over the same seat inventory and booking store, so a booking made here
+    holds seats and shows up exactly as one made in the app. A request
+    names flights by the ids a search returned. An id names the physical
+    flight (route, day and calendar row), so it books the same seats
+    whatever party size or trip type it was searched for.
+
+    ``book_many`` validates and seats every manifest first, then stores all
+    of the accepted ones, pending, in a single transaction and sells their
+    seats; the sold ones are confirmed together, and a booking whose seats
+    are gone by then is deleted and refused without ever having been
+    visible to lookups or the exporter. Every call's latency is
+    kept per operation (the HTTP front end adds one per route) for
+    ``stats``.
+    """
+
+    def __init__(self, flight_search, engine, inventory, repository, airlines=AIRLINES,
+                 max_party=MAX_PARTY, metrics=None, keep_latencies=2000, clock=time.perf_counter):
+        self.flight_search = flight_search
+        self.engine = engine
+        self.inventory = inventory
+        self.repository = repository
+        # Records are persisted without their logo, so there is no point encoding one
+        self.airlines = {name: dict(info, logo=None) for name, info in airlines.items()}
+        self.max_party = max_party
+        self.metrics = metrics
+        self.keep_latencies = keep_latencies
+        self._clock = clock
+        self._latencies = {}
+        self._lock = threading.Lock()
+        self.counters = {
+            "searches": 0, "quotes": 0, "batches": 0, "requests": 0, "bookings": 0,
+            "passengers": 0, "rejected": 0, "sold_out": 0, "unconfirmed": 0
+        }
+
+    def _count(self, **amounts):
+        with self._lock:
+            for name, amount in amounts.items():
+                self.counters[name] += amount
+
+    def observe(self, operation, elapsed_ms):
+        """Record one call's latency under ``operation``"""
+        with self._lock:
+            samples = self._latencies.get(operation)
+            if samples is None:
+                samples = self._latencies[operation] = deque(maxlen=self.keep_latencies)
+            samples.append(elapsed_ms)
+        if self.metrics is not None:
+            self.metrics.observe(f"booking_service {operation}", elapsed_ms)
+
+    def _city(self, value):
+        code = normalize_city(str(value or ""))
+        if code not in self.engine.locations:
+            raise BookingRequestError([f"Unknown airport {value!r}."])
+        return code
+
+    def _party_size(self, value):
+        if type(value) is not int or not 1 <= value <= self.max_party:
+            raise BookingRequestError([f"Passengers must be a whole number from 1 to {self.max_party}."])
+        return value
+
+    def search(self, from_city, to_city, day, passengers=1, trip_type="one_way"):
+        """Flights on sale for a party, cheapest first, with their current fare and seats left"""
+        started = self._clock()
+        today = date.today()
+        from_city, to_city = self._city(from_city), self._city(to_city)
+        day = _day(day, today)
+        passengers = self._party_size(passengers)
+        if trip_type not in ("one_way", "round_trip"):
+            raise BookingRequestError(["Trip type must be one_way or round_trip."])
+        results = self.flight_search.search(from_city, to_city, day)
+        prices = self.engine.snapshot(results, passengers, today, self.inventory)
+        rows = prices.price_order.tolist()
+        seats_left = self.inventory.available_many(
+            [results.flight_id(row) for row in rows], [results.fare_class_name(row) for row in rows]
+        )
+        flights = []
+        for row, seats in zip(rows, seats_left):
+            flight = results.record(row, self.airlines, int(prices.price[row]))
+            del flight["logo"]
+            flight["seats_left"] = int(seats)
+            flights.append(flight)
+        self._count(searches=1)
+        self.observe("search", (self._clock() - started) * 1000)
+        return flights
+
+    def _flight(self, leg, passengers, today):
+        """The flight record a leg of a request picks, at its current fare for the party"""
+        if not isinstance(leg, dict):
+            raise BookingRequestError(["Each flight needs from_city, to_city, date and flight_id."])
+        from_city, to_city = self._city(leg.get("from_city")), self._city(leg.get("to_city"))
+        day = _day(leg.get("date"), today)
+        flight_id = str(leg.get("flight_id") or "")
+        prefix, _, position = flight_id.rpartition("-")
+        if prefix != flight_id_prefix(from_city, to_city, day) or not position.isdigit() or (
+                int(position) >= self.flight_search.calendar(from_city, to_city, today).flights_per_day):
+            raise BookingRequestError([
+                f"Flight {flight_id!r} is not a {from_city} → {to_city} flight on {day}; "
+                "use an id from a search of that route and date."
+            ], HTTPStatus.NOT_FOUND)
+        # Every party's search of the day is the same shared store, which holds the flight if its airline answered
+        results = self.flight_search.search(from_city, to_city, day)
+        rows = np.flatnonzero(results.position == int(position))
+        if not len(rows):
+            raise BookingRequestError([
+                f"Flight {flight_id!r} is not on sale right now (its airline did not answer); search again."
+            ], HTTPStatus.CONFLICT)
+        row = int(rows[0])
+        prices = self.engine.snapshot(results, passengers, today, self.inventory)
+        return results.record(row, self.airlines, int(prices.price[row]))
+
+    def prepare(self, request, today=None):
+        """Validate a request and price it; returns (flights, passengers, booking, quote)"""
+        today = today or date.today()
+        if not isinstance(request, dict):
+            raise BookingRequestError(["Each booking request must be a JSON object."])
+        passengers = read_manifest(request, self.max_party)
+        legs = request.get("flights")
+        if not isinstance(legs, list) or not 1 <= len(legs) <= 2:
+            raise BookingRequestError(["Give one flight, or an outbound and a return flight."])
+        payment_method = request.get("payment_method", "Invoice")
+        if payment_method not in PAYMENT_METHODS:
+            raise BookingRequestError([f"Payment method must be one of {', '.join(PAYMENT_METHODS)}."])
+
+        trip_type = "round_trip" if len(legs) == 2 else "one_way"
+        flights = [self._flight(leg, len(passengers), today) for leg in legs]
+        if len(flights) == 2:
+            outbound, inbound = flights
+            if (normalize_city(inbound["from_city"]), normalize_city(inbound["to_city"])) != (
+                    normalize_city(outbound["to_city"]), normalize_city(outbound["from_city"])):
+                raise BookingRequestError(["The return flight must fly the outbound route in reverse."])
+            if inbound["date"] < outbound["date"]:
+                raise BookingRequestError(["The return flight cannot leave before the outbound one."])
+
+        quote = booking_quote(flights, len(passengers))
+        booking = {
+            "trip_type": trip_type,
+            "flight": flights[0],
+            "return_flight": flights[1] if len(flights) > 1 else None,
+            "payment_method": payment_method,
+            "total_price": quote["Total"]
+        }
+        return flights, passengers, booking, quote
+
+    def quote(self, request):
+        """Price a request, group discount included, without holding seats or booking"""
+        started = self._clock()
+        flights, passengers, _, quote = self.prepare(request)
+        self._count(quotes=1)
+        self.observe("quote", (self._clock() - started) * 1000)
+        return {"flights": flights, "passengers": len(passengers), "quote": quote}
+
+    def _hold(self, flights, seats):
+        """Hold ``seats`` on every flight, all or nothing; returns the hold ids or None"""
+        holds = []
+        for flight in flights:
+            hold_id = self.inventory.hold(flight["id"], flight["fare_class"], seats)
+            if hold_id is None:
+                for held in holds:
+                    self.inventory.release(held)
+                return None
+            holds.append(hold_id)
+        return holds
+
+    def _confirm(self, flights, seats, holds):
+        """Sell held seats; a hold swept meanwhile is taken again once. False if the seats are gone"""
+        if self.inventory.confirm_all(holds):
+            return True
+        for hold_id in holds:
+            self.inventory.release(hold_id)
+        holds = self._hold(flights, seats)
+        return holds is not None and self.inventory.confirm_all(holds)
+
+    def book(self, request):
+        """Book one manifest; returns its reference and quote, or raises BookingRequestError"""
+        result = self.book_many([request])[0]
+        if "errors" in result:
+            raise BookingRequestError(result["errors"], result["status"])
+        return result
+
+    def book_many(self, requests):
+        """Book several manifests, storing every accepted one in a single transaction.
+
+        Returns one result per request, in order: the booking reference,
+        passenger count and quote, or the errors and HTTP status that
+        stopped it. One refused request does not stop the others.
+        """
+        started = self._clock()
+        today = date.today()
+        results = [None] * len(requests)
+        accepted, confirmed = [], []
+        for i, request in enumerate(requests):
+            try:
+                flights, passengers, booking, quote = self.prepare(request, today)
+            except BookingRequestError as exc:
+                results[i] = {"errors": exc.errors, "status": int(exc.status)}
+                self._count(rejected=1)
+                continue
+            holds = self._hold(flights, len(passengers))
+            if holds is None:
+                numbers = " and ".join(flight["flight_number"] for flight in flights)
+                results[i] = {
+                    "errors": [f"Not enough seats left on {numbers} for {len(passengers)} passengers."],
+                    "status": int(HTTPStatus.CONFLICT)
+                }
+                self._count(sold_out=1)
+                continue
+            accepted.append((i, flights, booking, passengers, quote, holds))
+
+        if accepted:
+            # Seats are held first and sold only once the bookings are stored, so a failed write gives them back
+            try:
+                references = self.repository.create_bookings(
+                    [(booking, passengers) for _, _, booking, passengers, _, _ in accepted], status=PENDING
+                )
+            except BaseException:
+                for *_, holds in accepted:
+                    for hold_id in holds:
+                        self.inventory.release(hold_id)
+                raise
+            sold, lost = [], []
+            for (i, flights, _, passengers, quote, holds), reference in zip(accepted, references):
+                if not self._confirm(flights, len(passengers), holds):
+                    # Pending but unsold: take the booking back out rather than oversell the flight
+                    lost.append(reference)
+                    numbers = " and ".join(flight["flight_number"] for flight in flights)
+                    results[i] = {
+                        "errors": [f"The seats held on {numbers} expired and are no longer available; search again."],
+                        "status": int(HTTPStatus.CONFLICT)
+                    }
+                    continue
+                sold.append(reference)
+                confirmed.append(passengers)
+                results[i] = {"reference": reference, "passengers": len(passengers), "quote": quote}
+            if sold:
+                self.repository.confirm_bookings(sold)
+            if lost:
+                self.repository.delete_bookings(lost)
+                self._count(unconfirmed=len(lost))
+
+        elapsed_ms = (self._clock() - started) * 1000
+        for result in results:
+            result["ms"] = elapsed_ms
+        self._count(
+            batches=1, requests=len(requests), bookings=len(confirmed),
+            passengers=sum(len(passengers) for passengers in confirmed)
+        )
+        self.observe("book", elapsed_ms)
+        return results
+
+    def get_booking(self, reference, last_name_or_email):
+        """A stored booking, given its reference and a passenger's last name or the booking email"""
+        if not str(last_name_or_email or "").strip():
+            raise BookingRequestError(["Give a passenger's last_name or the booking email with the reference."])
+        booking = self.repository.get_for_passenger(reference, last_name_or_email)
+        if booking is None:
+            raise BookingRequestError([f"No booking {reference!r} for that name or email."], HTTPStatus.NOT_FOUND)
+        return booking
+
+    def stats(self):
+        """Counters plus p50/p95/max latency of recent calls per operation"""
+        with self._lock:
+            samples = {operation: np.array(values) for operation, values in self._latencies.items()}
+            counters = dict(self.counters)
+        latency = {
+            operation: {
+                "calls": len(values),
+                "p50_ms": float(np.percentile(values, 50)),
+                "p95_ms": float(np.percentile(values, 95)),
+                "max_ms": float(values.max())
+            }
+            for operation, values in samples.items()
+        }
+        return dict(counters, latency=latency)
+
+
+class BookingRequestHandler(BaseHTTPRequestHandler):
+    """JSON over HTTP for a BookingService:
+
+        GET  /flights?from_city=BOM&to_city=DEL&date=2026-11-02&passengers=30[&trip_type=round_trip]
+        POST /quotes              one booking request
+        POST /bookings            one booking request, or a list of them stored in one transaction
+        GET  /bookings/<reference>?last_name=Rao   (or ?email=)
+        GET  /stats
+
+    A booking request is ``{"flights": [{"from_city", "to_city", "date",
+    "flight_id"}, ...], "passengers": [{"first_name", "last_name", "age",
+    "gender"}, ...], "email", "phone", "payment_method"}``. Every response
+    carries its server time in a ``Server-Timing`` header.
+    """
+
+    service = None
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out as separate writes; with Nagle on, a kept-alive client waits ~40 ms on the second
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/flights":
+            self._respond("GET /flights", lambda: self._get_flights(url.query))
+        elif url.path.startswith("/bookings/"):
+            self._respond("GET /bookings", lambda: self._get_booking(url))
+        elif url.path == "/stats":
+            self._respond("GET /stats", self.service.stats)
+        else:
+            self._respond("not found", self._not_found)
+
+    def _get_booking(self, url):
+        query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        return self.service.get_booking(url.path.removeprefix("/bookings/"), query.get("last_name") or query.get("email"))
+
+    def _get_flights(self, query):
+        query = {name: values[-1] for name, values in parse_qs(query).items()}
+        passengers = query.get("passengers", "1")
+        return {"flights": self.service.search(
+            query.get("from_city"), query.get("to_city"), query.get("date"),
+            int(passengers) if passengers.isdigit() else passengers, query.get("trip_type", "one_way")
+        )}
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path == "/quotes":
+            self._respond("POST /quotes", lambda: self.service.quote(self._body()))
+        elif url.path == "/bookings":
+            self._respond("POST /bookings", self._post_bookings)
+        else:
+            self._respond("not found", self._not_found)
+
+    def _not_found(self):
+        raise BookingRequestError([f"No such endpoint {self.command} {urlparse(self.path).path}."], HTTPStatus.NOT_FOUND)
+
+    def _post_bookings(self):
+        body = self._body()
+        if isinstance(body, list):
+            return {"results": self.service.book_many(body)}
+        return HTTPStatus.CREATED, self.service.book(body)
+
+    def _body(self):
+        header = (self.headers.get("Content-Length") or "0").strip()
+        if not (header.isascii() and header.isdigit()):
+            # The body's end is unknown, so the connection cannot carry another request
+            self.close_connection = True
+            raise BookingRequestError(["Content-Length must be a whole number of bytes."])
+        length = int(header)
+        if length > MAX_BODY_BYTES:
+            self.close_connection = True
+            raise BookingRequestError(
+                [f"The request body must be at most {MAX_BODY_BYTES:,} bytes."], HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+            )
+        try:
+            return json.loads(self.rfile.read(length) or b"null")
+        except ValueError:
+            raise BookingRequestError(["The request body must be JSON."]) from None
+
+    def _respond(self, route, handle):
+        started = time.perf_counter()
+        try:
+            outcome = handle()
+            status, body = outcome if isinstance(outcome, tuple) else (HTTPStatus.OK, outcome)
+        except BookingRequestError as exc:
+            status, body = exc.status, {"errors": exc.errors}
+        except Exception:
+            # The details stay in the server's log; clients only learn that it failed
+            self.log_error("%s failed\n%s", route, traceback.format_exc())
+            status, body = HTTPStatus.INTERNAL_SERVER_ERROR, {"errors": ["Internal server error."]}
+        payload = json.dumps(body, default=str).encode()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.send_header("Server-Timing", f"app;dur={elapsed_ms:.2f}")
+        if self.close_connection:
+            self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(payload)
+        self.service.observe(route, elapsed_ms)
+
+    def log_request(self, code="-", size="-"):
+        # Latency per route is in /stats; a log line per request would cost more than many of them take
+        pass
+
+
+def build_service(backend, metrics=None):
+    """A BookingService over ``backend``'s stores, with its own searches wired as the app wires its sessions'"""
+    airports = {airport["iata"]: airport for airport in load_airports()}
+    engine = PricingEngine(AIRLINES, FARE_CLASSES, airports=dict(airports, **AIRPORTS))
+    calendars = FareCalendars(engine, len(AIRLINES), FARE_CLASSES, max_routes=256)
+    inventory = backend.seat_inventory(FARE_CLASSES)
+    inventory.start_sweeper()
+
+    def day_columns(from_city, to_city, day):
+        return calendars.get(normalize_city(from_city), normalize_city(to_city), date.today()).day_columns(day)
+
+    flight_search = FlightSearch(
+        backend.search_cache(max_entries=256, ttl_seconds=300), calendars, inventory,
+        FanOutSearch(simulated_suppliers(AIRLINES, day_columns), timeout=1.0),
+        engine, AIRLINES.keys(), FARE_CLASSES
+    )
+    return BookingService(flight_search, engine, inventory, backend.booking_repository(), metrics=metrics)
+
+
+def make_server(service, host="127.0.0.1", port=DEFAULT_PORT):
+    """A threaded HTTP server answering for ``service``; call ``serve_forever()`` on it"""
+    handler = type("BoundBookingRequestHandler", (BookingRequestHandler,), {"service": service})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main(argv):
+    """Serve the booking API over the state backend the app uses (FLIGHT_STATE_BACKEND).
+
+    Seats are only shared with running app workers through a shared
+    backend, e.g. ``FLIGHT_STATE_BACKEND=sqlite``:
+
+        python booking_service.py [port]
+    """
+    port = int(argv[1]) if len(argv) > 1 else DEFAULT_PORT
+    service = build_service(backend_from_url(os.environ.get("FLIGHT_STATE_BACKEND", "memory")))
+    server = make_server(service, port=port)
+    print(f"Booking service listening on http://127.0.0.1:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,267 @@
+import json
+import queue
+import sqlite3
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+
+DEFAULT_DB_PATH = Path(__file__).parent / "bookings.db"
+
+# A booking is stored pending while its seats are being sold, and only confirmed bookings are ever read
+PENDING = "pending"
+CONFIRMED = "confirmed"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS bookings (
+    reference TEXT PRIMARY KEY,
+    created_at REAL NOT NULL,
+    trip_type TEXT NOT NULL,
+    from_city TEXT NOT NULL,
+    to_city TEXT NOT NULL,
+    depart_date TEXT,
+    return_date TEXT,
+    flight_number TEXT NOT NULL,
+    return_flight_number TEXT,
+    passengers INTEGER NOT NULL,
+    payment_method TEXT,
+    total_price INTEGER NOT NULL,
+    flights TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'confirmed'
+);
+CREATE TABLE IF NOT EXISTS passengers (
+    booking_reference TEXT NOT NULL REFERENCES bookings(reference) ON DELETE CASCADE,
+    seq INTEGER NOT NULL,
+    first_name TEXT NOT NULL,
+    last_name TEXT NOT NULL,
+    age INTEGER,
+    gender TEXT,
+    email TEXT,
+    phone TEXT,
+    PRIMARY KEY (booking_reference, seq)
+);
+CREATE INDEX IF NOT EXISTS idx_passengers_name
+    ON passengers (last_name COLLATE NOCASE, first_name COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_bookings_flight ON bookings (flight_number, depart_date);
+CREATE INDEX IF NOT EXISTS idx_bookings_return_flight ON bookings (return_flight_number, return_date);
+CREATE INDEX IF NOT EXISTS idx_bookings_created ON bookings (created_at, reference);
+"""
+
+PASSENGER_FIELDS = ("first_name", "last_name", "age", "gender", "email", "phone")
+
+
+def new_booking_reference():
+    return "FB" + uuid.uuid4().hex[:12].upper()
+
+
+class ConnectionPool:
+    """Fixed-size pool of SQLite connections shared across threads.
+
+    Connections are opened lazily in WAL mode, so readers never block the
+    writer; a thread borrows one for the length of a ``with`` block.
+    """
+
+    def __init__(self, path, size=8, timeout=30.0):
+        self.path = str(path)
+        self.timeout = timeout
+        # None marks a slot whose connection has not been opened yet
+        self._connections = queue.LifoQueue(maxsize=size)
+        for _ in range(size):
+            self._connections.put(None)
+
+    def _open(self):
+        conn = sqlite3.connect(self.path, timeout=self.timeout, check_same_thread=False, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        return conn
+
+    @contextmanager
+    def connection(self):
+        conn = self._connections.get(timeout=self.timeout)
+        if conn is None:
+            conn = self._open()
+        try:
+            yield conn
+        finally:
+            self._connections.put(conn)
+
+    @contextmanager
+    def transaction(self):
+        """Borrow a connection inside a write transaction, taking the write lock up front"""
+        with self.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def close(self):
+        while True:
+            try:
+                conn = self._connections.get_nowait()
+            except queue.Empty:
+                break
+            if conn is not None:
+                conn.close()
+
+
+class BookingRepository:
+    """Durable store of completed bookings and their passengers.
+
+    Bookings stored ``PENDING`` (e.g. while a batch's seats are sold) are
+    invisible to every lookup and to the exporter until ``confirm_bookings``.
+    """
+
+    def __init__(self, path=DEFAULT_DB_PATH, pool_size=8):
+        self.pool = ConnectionPool(path, size=pool_size)
+        with self.pool.connection() as conn:
+            conn.executescript(SCHEMA)
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(bookings)")}
+            if "status" not in columns:
+                # Bookings stored before the status column were all sold
+                conn.execute("ALTER TABLE bookings ADD COLUMN status TEXT NOT NULL DEFAULT 'confirmed'")
+
+    def create_booking(self, booking, passengers):
+        """Store one booking and its passengers atomically; returns the reference"""
+        return self.create_bookings([(booking, passengers)])[0]
+
+    def create_bookings(self, items, attempts=3, status=CONFIRMED):
+        """Store many (booking, passengers) pairs in a single transaction"""
+        for attempt in range(attempts):
+            references = [booking.get("reference") or new_booking_reference() for booking, _ in items]
+            booking_rows, passenger_rows = self._rows(items, references, status)
+            try:
+                with self.pool.transaction() as conn:
+                    conn.executemany("INSERT INTO bookings VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", booking_rows)
+                    conn.executemany("INSERT INTO passengers VALUES (?, ?, ?, ?, ?, ?, ?, ?)", passenger_rows)
+                return references
+            except sqlite3.IntegrityError:
+                # A generated reference collided; retry with fresh ones unless the caller chose them
+                if attempt == attempts - 1 or any(booking.get("reference") for booking, _ in items):
+                    raise
+
+    def _rows(self, items, references, status):
+        booking_rows, passenger_rows = [], []
+        now = time.time()
+        for (booking, passengers), reference in zip(items, references):
+            flight = booking["flight"]
+            return_flight = booking.get("return_flight")
+            booking_rows.append((
+                reference, now, booking.get("trip_type", "one_way"),
+                flight["from_city"], flight["to_city"],
+                _iso(flight.get("date")), _iso(return_flight.get("date")) if return_flight else None,
+                flight["flight_number"], return_flight["flight_number"] if return_flight else None,
+                len(passengers), booking.get("payment_method"), int(booking["total_price"]),
+                json.dumps([_without_logo(flight), _without_logo(return_flight)], default=str),
+                status
+            ))
+            passenger_rows.extend(
+                (reference, seq) + tuple(passenger.get(field) for field in PASSENGER_FIELDS)
+                for seq, passenger in enumerate(passengers)
+            )
+        return booking_rows, passenger_rows
+
+    def confirm_bookings(self, references):
+        """Make pending bookings visible, timestamped now so an export round that has moved on still picks them up"""
+        with self.pool.transaction() as conn:
+            conn.executemany(
+                "UPDATE bookings SET status = ?, created_at = ? WHERE reference = ? AND status = ?",
+                [(CONFIRMED, time.time(), reference, PENDING) for reference in references]
+            )
+
+    def delete_bookings(self, references):
+        """Remove bookings and their passengers, e.g. pending ones whose seats could not be sold after all"""
+        with self.pool.transaction() as conn:
+            conn.executemany("DELETE FROM bookings WHERE reference = ?", [(reference,) for reference in references])
+
+    def get_by_reference(self, reference):
+        """Return a booking with its passengers, or None"""
+        with self.pool.connection() as conn:
+            row = conn.execute(
+                "SELECT * FROM bookings WHERE reference = ? AND status = ?", (reference.strip().upper(), CONFIRMED)
+            ).fetchone()
+            if row is None:
+                return None
+            passengers = conn.execute(
+                "SELECT * FROM passengers WHERE booking_reference = ? ORDER BY seq", (row["reference"],)
+            ).fetchall()
+        return _booking_dict(row, passengers)
+
+    def get_for_passenger(self, reference, last_name_or_email):
+        """A booking by reference, only if a passenger has that last name or it was booked under that email; else None"""
+        value = last_name_or_email.strip()
+        if not reference.strip() or not value:
+            return None
+        column = "email" if "@" in value else "last_name"
+        with self.pool.connection() as conn:
+            match = conn.execute(
+                f"SELECT 1 FROM passengers WHERE booking_reference = ? AND {column} = ? COLLATE NOCASE LIMIT 1",
+                (reference.strip().upper(), value)
+            ).fetchone()
+        return self.get_by_reference(reference) if match else None
+
+    def find_by_passenger(self, last_name, first_name=None, limit=50):
+        """Bookings with a passenger of that name (case-insensitive), newest first"""
+        query = """
+            SELECT DISTINCT b.* FROM passengers p JOIN bookings b ON b.reference = p.booking_reference
+            WHERE p.last_name = ? COLLATE NOCASE AND b.status = ?
+        """
+        params = [last_name.strip(), CONFIRMED]
+        if first_name:
+            query += " AND p.first_name = ? COLLATE NOCASE"
+            params.append(first_name.strip())
+        query += " ORDER BY b.created_at DESC LIMIT ?"
+        params.append(limit)
+        with self.pool.connection() as conn:
+            return [_booking_dict(row) for row in conn.execute(query, params).fetchall()]
+
+    def find_by_flight(self, flight_number, date=None, limit=500):
+        """Bookings on a flight (outbound or return), optionally on one date"""
+        outbound = "SELECT * FROM bookings WHERE flight_number = ? AND status = ?"
+        inbound = "SELECT * FROM bookings WHERE return_flight_number = ? AND status = ?"
+        params = [flight_number, CONFIRMED, flight_number, CONFIRMED]
+        if date is not None:
+            outbound += " AND depart_date = ?"
+            inbound += " AND return_date = ?"
+            params = [flight_number, CONFIRMED, _iso(date), flight_number, CONFIRMED, _iso(date)]
+        with self.pool.connection() as conn:
+            rows = conn.execute(f"{outbound} UNION ALL {inbound} LIMIT ?", params + [limit]).fetchall()
+        return [_booking_dict(row) for row in rows]
+
+    def created_between(self, after, before, limit=10_000):
+        """Bookings stored after the (created_at, reference) position ``after`` and before ``before``, oldest first"""
+        with self.pool.connection() as conn:
+            rows = conn.execute(
+                "SELECT * FROM bookings WHERE (created_at, reference) > (?, ?) AND created_at < ? AND status = ? "
+                "ORDER BY created_at, reference LIMIT ?", (*after, before, CONFIRMED, limit)
+            ).fetchall()
+        return [_booking_dict(row) for row in rows]
+
+    def count(self):
+        with self.pool.connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM bookings WHERE status = ?", (CONFIRMED,)).fetchone()[0]
+
+
+def _without_logo(flight):
+    # Logos are display-only data URIs; no point persisting them per booking
+    if flight is None:
+        return None
+    return {key: value for key, value in flight.items() if key != "logo"}
+
+
+def _iso(value):
+    return value.isoformat() if hasattr(value, "isoformat") else value
+
+
+def _booking_dict(row, passengers=None):
+    booking = dict(row)
+    booking["flights"] = json.loads(booking["flights"])
+    if passengers is not None:
+        booking["passenger_details"] = [
+            {field: passenger[field] for field in PASSENGER_FIELDS} for passenger in passengers
+        ]
+    return booking
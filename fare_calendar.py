@@ -0,0 +1,196 @@
+import hashlib
+import threading
+from datetime import date, timedelta
+
+import numpy as np
+
+from flight_inventory import generate_flight_columns
+from flight_results import flight_id_prefix
+from pricing import current_fares
+from search_cache import SearchCache
+
+# Departure dates on sale, counted from today
+BOOKING_WINDOW_DAYS = 330
+
+# Days either side of the chosen date shown in the calendar
+CALENDAR_RADIUS_DAYS = 30
+
+
+def calendar_seed(from_city, to_city, month):
+    """Stable seed for a route's flights in one month, so every worker process and every day's calendar agree"""
+    digest = hashlib.blake2s(f"{from_city}-{to_city}-{month:%Y-%m}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+
+def _next_month(month):
+    return (month + timedelta(days=32)).replace(day=1)
+
+
+class FareCalendar:
+    """The whole booking window of flights on one route, with the lowest fare per day.
+
+    Every day's flights are generated and priced in one batched pass, stored
+    as NumPy columns grouped by day and sorted by departure inside each day.
+    A search for a date in the window takes that day's block as a zero-copy
+    slice, so the calendar and the results always agree. Without an
+    ``rng``, each month is generated from its own seed (``calendar_seed``),
+    so a date has the same flights, and flight ids, in the calendar of
+    every start date and every process. Its flights carry
+    the ids every search of them uses, so when the seat inventory of a day
+    changes, only that day is repriced, whichever search sold the seats.
+    """
+
+    def __init__(self, from_city, to_city, start, engine, airline_count, fare_classes,
+                 flights_per_day=10, days=BOOKING_WINDOW_DAYS, rng=None):
+        self.from_city = from_city
+        self.to_city = to_city
+        self.start = start
+        self.days = days
+        self.flights_per_day = flights_per_day
+        self.seeded = rng is None
+
+        if rng is not None:
+            columns = self._generate(engine, airline_count, fare_classes, days, rng)
+        else:
+            blocks = []
+            end = start + timedelta(days=days)
+            month = start.replace(day=1)
+            while month < end:
+                next_month = _next_month(month)
+                block = self._generate(
+                    engine, airline_count, fare_classes, (next_month - month).days,
+                    np.random.default_rng(calendar_seed(from_city, to_city, month))
+                )
+                first = max((start - month).days, 0) * flights_per_day
+                last = min((end - month).days, (next_month - month).days) * flights_per_day
+                blocks.append({name: column[first:last] for name, column in block.items()})
+                month = next_month
+            columns = {name: np.concatenate([block[name] for block in blocks]) for name in blocks[0]}
+        self.columns = {}
+        for name, column in columns.items():
+            column = np.ascontiguousarray(column)
+            column.setflags(write=False)
+            self.columns[name] = column
+
+        self.bounds = np.arange(days + 1) * flights_per_day
+        days_out = np.repeat(np.arange(days), flights_per_day)
+        self.fares = current_fares(self.columns["price"], days_out, 0.0)
+        self.lowest = np.minimum.reduceat(self.fares, self.bounds[:-1])
+
+        self.inventory_version = 0
+        self._lock = threading.Lock()
+
+    def _generate(self, engine, airline_count, fare_classes, days, rng):
+        """``days`` days of flights in one batched pass, grouped by day and by departure inside each"""
+        columns = generate_flight_columns(airline_count, fare_classes, days * self.flights_per_day, rng)
+        columns["price"] = engine.base_fares(self.from_city, self.to_city, columns["airline"], columns["fare_class"], rng)
+        # Deal the batch out to days, then order each day's block by departure
+        day = rng.permutation(np.repeat(np.arange(days, dtype=np.int16), self.flights_per_day))
+        order = np.lexsort((columns["departure_mins"], day))
+        return {name: column[order] for name, column in columns.items()}
+
+    def day_index(self, day):
+        return (day - self.start).days
+
+    def covers(self, day):
+        return 0 <= self.day_index(day) < self.days
+
+    def day_fares(self, day):
+        """Fares on sale now for one day's flights, in departure order"""
+        i = self.day_index(day)
+        return self.fares[self.bounds[i]:self.bounds[i + 1]]
+
+    def day_columns(self, day):
+        """One day's flights as column slices of the calendar (no copy)"""
+        i = self.day_index(day)
+        start, end = self.bounds[i], self.bounds[i + 1]
+        return {name: column[start:end] for name, column in self.columns.items()}
+
+    def schedule(self, day):
+        """Seed a day's flights were generated from, or None when the calendar was built from an ``rng``"""
+        return calendar_seed(self.from_city, self.to_city, day.replace(day=1)) if self.seeded else None
+
+    def flight_ids(self, day):
+        """Ids of one day's flights, in departure order, as every search of the day names them"""
+        prefix = flight_id_prefix(self.from_city, self.to_city, day)
+        return [f"{prefix}-{position}" for position in range(self.flights_per_day)]
+
+    def _changed_days(self, flight_ids):
+        route = f"{self.from_city}-{self.to_city}-"
+        days = set()
+        for flight_id in flight_ids:
+            if flight_id.startswith(route):
+                try:
+                    day = date.fromisoformat(flight_id[len(route):len(route) + 8])
+                except ValueError:
+                    continue
+                if self.covers(day):
+                    days.add(self.day_index(day))
+        return days
+
+    def refresh(self, inventory):
+        """Reprice the days whose flights changed in ``inventory``; returns their indexes"""
+        with self._lock:
+            version = inventory.version
+            changed = inventory.changed_since(self.inventory_version)
+            # Too many changes to list: reprice the whole window from the seats sold
+            days = set(range(self.days)) if changed is None else self._changed_days(changed)
+            if days:
+                self._reprice_days(days, inventory)
+            self.inventory_version = version
+        return days
+
+    def _reprice_days(self, days, inventory):
+        # Caller holds the lock
+        fares = self.fares.copy()
+        lowest = self.lowest.copy()
+        for day in days:
+            start, end = self.bounds[day], self.bounds[day + 1]
+            flight_ids = self.flight_ids(self.start + timedelta(days=int(day)))
+            load = inventory.load_factors(flight_ids, self.columns["fare_class"][start:end])
+            fares[start:end] = current_fares(self.columns["price"][start:end], day, load)
+            lowest[day] = fares[start:end].min()
+        # Swap whole arrays so concurrent readers never see a half-updated day
+        self.fares, self.lowest = fares, lowest
+
+    def window(self, center, radius=CALENDAR_RADIUS_DAYS):
+        """Dates and lowest fares for ``radius`` days either side of ``center``, clipped to the calendar"""
+        low = max(self.day_index(center) - radius, 0)
+        high = min(self.day_index(center) + radius + 1, self.days)
+        dates = [self.start + timedelta(days=i) for i in range(low, high)]
+        return dates, self.lowest[low:high]
+
+
+class FareCalendars:
+    """Every route's calendar for the booking window starting today, built once and shared.
+
+    Kept in a plain object rather than only behind Streamlit's cache so
+    background threads (the price watcher) can reach the same calendars,
+    with the same repricing, as the sessions.
+    """
+
+    def __init__(self, engine, airline_count, fare_classes, max_routes=256):
+        self.engine = engine
+        self.airline_count = airline_count
+        self.fare_classes = fare_classes
+        # A calendar is keyed by its start date, so a day's TTL only bounds how long yesterday's lingers;
+        # today's has the same flights for every date the two share
+        self._cache = SearchCache(max_entries=max_routes, ttl_seconds=86_400)
+
+    def get(self, from_city, to_city, today):
+        return self._cache.get_or_compute((from_city, to_city, today), lambda: FareCalendar(
+            from_city, to_city, today, self.engine, self.airline_count, self.fare_classes
+        ))
+
+
+def round_trip_matrix(outbound, inbound, depart_dates, return_dates):
+    """Cheapest combined fare for every (depart, return) date pair.
+
+    ``outbound`` and ``inbound`` are the lowest fares for ``depart_dates``
+    and ``return_dates``. Pairs that return before departing are NaN.
+    """
+    combined = outbound[:, None].astype(np.float64) + inbound[None, :]
+    depart = np.array([d.toordinal() for d in depart_dates])
+    back = np.array([d.toordinal() for d in return_dates])
+    combined[back[None, :] < depart[:, None]] = np.nan
+    return combined
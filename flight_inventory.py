@@ -0,0 +1,128 @@
+import uuid
+from functools import lru_cache
+
+import numpy as np
+
+# Inclusive price band (in ₹) for each fare class
+FARE_PRICE_RANGES = {
+    "Economy": (2500, 5000),
+    "Premium Economy": (5000, 8000),
+    "Business": (10000, 20000)
+}
+
+MINUTES_PER_DAY = 24 * 60
+
+# "HH:MM" label for every minute of the day, built once so formatting is a lookup
+CLOCK_LABELS = np.array([f"{m // 60:02d}:{m % 60:02d}" for m in range(MINUTES_PER_DAY)])
+
+
+def day_offset_label(offset):
+    """"+1 day"-style note for a time that falls ``offset`` days after the departure day ("" on the day)"""
+    if offset == 0:
+        return ""
+    return f"+{offset} day" if offset == 1 else f"+{offset} days"
+
+
+@lru_cache(maxsize=8192)
+def time_label(minutes):
+    """Clock label for minutes after the departure day's midnight, with a "+1 day" note once it rolls over"""
+    offset, minute = divmod(minutes, MINUTES_PER_DAY)
+    label = str(CLOCK_LABELS[minute])
+    return f"{label} {day_offset_label(offset)}" if offset else label
+
+
+@lru_cache(maxsize=8192)
+def format_duration(minutes):
+    """"2h 5m"-style label for a number of minutes"""
+    return f"{minutes // 60}h {minutes % 60}m"
+
+
+def generate_flight_columns(airline_count, fare_classes, count, rng=None):
+    """Generate a batch of random flights as NumPy columns sorted by departure.
+
+    Airlines and fare classes are returned as integer codes indexing into the
+    caller's airline list and ``fare_classes``. Times are minutes after
+    midnight; ``arrival_mins`` is not wrapped, so values >= 1440 land on the
+    next day. Sorting and filtering use these integers; labels are only made
+    for display.
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+
+    departure = np.sort(rng.integers(0, MINUTES_PER_DAY, size=count, dtype=np.int16))
+    duration = rng.integers(60, 241, size=count, dtype=np.int16)
+    fare_class = rng.integers(0, len(fare_classes), size=count, dtype=np.int8)
+
+    # Draw every price in one call using the band of each row's fare class
+    low = np.array([FARE_PRICE_RANGES[c][0] for c in fare_classes], dtype=np.int32)
+    high = np.array([FARE_PRICE_RANGES[c][1] for c in fare_classes], dtype=np.int32)
+    price = rng.integers(low[fare_class], high[fare_class] + 1).astype(np.int32)
+
+    return {
+        "airline": rng.integers(0, airline_count, size=count, dtype=np.int8),
+        "flight_number": rng.integers(100, 1000, size=count, dtype=np.int16),
+        "departure_mins": departure,
+        "arrival_mins": departure + duration,
+        "duration_mins": duration,
+        "fare_class": fare_class,
+        "price": price
+    }
+
+
+def flight_columns_to_frame(columns, airline_names, fare_classes):
+    """Wrap generated columns in a DataFrame with categorical airline and class"""
+    # pandas is only needed on this path, so keep it off the import path of the app
+    import pandas as pd
+
+    frame = pd.DataFrame({
+        "airline": pd.Categorical.from_codes(columns["airline"], categories=airline_names),
+        "flight_number": columns["flight_number"],
+        "departure_mins": columns["departure_mins"],
+        "arrival_mins": columns["arrival_mins"],
+        "duration_mins": columns["duration_mins"],
+        "fare_class": pd.Categorical.from_codes(columns["fare_class"], categories=fare_classes),
+        "price": columns["price"]
+    })
+    return frame
+
+
+def flight_columns_to_records(columns, airlines, fare_classes, from_city, to_city, date):
+    """Convert generated columns to the list of flight dicts used by the UI"""
+    airline_names = list(airlines.keys())
+    departure_labels = CLOCK_LABELS[columns["departure_mins"]].tolist()
+    arrivals = columns["arrival_mins"].tolist()
+
+    # Convert each column to Python scalars once rather than indexing arrays per row
+    airline_codes = columns["airline"].tolist()
+    numbers = columns["flight_number"].tolist()
+    durations = columns["duration_mins"].tolist()
+    classes = columns["fare_class"].tolist()
+    prices = columns["price"].tolist()
+
+    # One random token per batch keeps ids unique without a uuid per row
+    batch_id = uuid.uuid4().hex[:8]
+
+    flights = []
+    for i in range(len(prices)):
+        airline = airline_names[airline_codes[i]]
+        airline_info = airlines[airline]
+        duration_mins = durations[i]
+        flights.append({
+            "id": f"{batch_id}-{i}",
+            "airline": airline,
+            "airline_code": airline_info["code"],
+            "flight_number": f"{airline_info['code']} {numbers[i]}",
+            "logo": airline_info["logo"],
+            "color": airline_info["color"],
+            "from_city": from_city,
+            "to_city": to_city,
+            "date": date,
+            "departure_time": departure_labels[i],
+            "arrival_time": time_label(arrivals[i]),
+            "arrival_day_offset": arrivals[i] // MINUTES_PER_DAY,
+            "duration": format_duration(duration_mins),
+            "duration_mins": duration_mins,
+            "fare_class": fare_classes[classes[i]],
+            "price": prices[i]
+        })
+    return flights
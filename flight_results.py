@@ -0,0 +1,173 @@
+import hashlib
+import itertools
+
+import numpy as np
+
+from flight_inventory import CLOCK_LABELS, MINUTES_PER_DAY, format_duration, time_label
+from results_query import ResultsIndex
+from search_cache import normalize_city
+
+# Columns held by every FlightResults store, in generation order
+COLUMNS = ("airline", "flight_number", "departure_mins", "arrival_mins", "duration_mins", "fare_class", "price")
+
+# Numbers every store built or loaded in this process, so a rebuilt search differs from the store it replaces
+_generations = itertools.count()
+
+
+def flight_id_prefix(from_city, to_city, day):
+    """Prefix of the ids of a route's flights on one day, (e.g. BOM-DEL-20261102)"""
+    return f"{normalize_city(from_city)}-{normalize_city(to_city)}-{day:%Y%m%d}"
+
+
+class FlightResults:
+    """Read-only columnar store of the flights found for one search.
+
+    Each column is a NumPy array stored once and shared by every session that
+    ran the same search. Airlines and fare classes are integer codes into
+    ``airline_names`` and ``fare_classes``. A row's id is ``id_prefix``
+    (route and day) plus its ``position`` among the day's flights on sale
+    (its fare calendar row), so a flight keeps its id, and its seats,
+    whatever the party size or trip type searched and however many
+    suppliers answered. ``key_hash`` and ``generation`` together name this
+    store without holding it, for caches keyed on what it was built from.
+    ``schedule`` is the seed the flights were generated from, when they came
+    from a seeded schedule: under one schedule an id always names the same
+    flight, whichever store holds it.
+    """
+
+    __slots__ = (
+        "key", "key_hash", "generation", "id_prefix", "schedule", "from_city", "to_city", "date", "airline_names", "fare_classes",
+        "airline", "flight_number", "departure_mins", "arrival_mins",
+        "duration_mins", "fare_class", "price", "position", "suppliers", "_index"
+    )
+
+    def __init__(self, key, from_city, to_city, date, airline_names, fare_classes, columns, suppliers=(),
+                 positions=None, id_prefix=None, schedule=None):
+        self.key = key
+        self.key_hash = hashlib.blake2s(repr(key).encode(), digest_size=4).hexdigest()
+        self.generation = next(_generations)
+        # Stores built outside a search (benchmarks) fall back to ids scoped to their key
+        self.id_prefix = self.key_hash if id_prefix is None else id_prefix
+        self.schedule = schedule
+        self.from_city = from_city
+        self.to_city = to_city
+        self.date = date
+        self.airline_names = tuple(airline_names)
+        self.fare_classes = tuple(fare_classes)
+        for name in COLUMNS:
+            column = np.ascontiguousarray(columns[name])
+            column.setflags(write=False)
+            setattr(self, name, column)
+        self.position = np.arange(len(self.price), dtype=np.int32) if positions is None else np.asarray(positions, dtype=np.int32)
+        self.position.setflags(write=False)
+        # SupplierResult per airline asked, when the flights came from a supplier fan-out
+        self.suppliers = tuple(suppliers)
+        self._index = None
+
+    def __len__(self):
+        return len(self.price)
+
+    def __getstate__(self):
+        # The filter/sort index is rebuilt on first use rather than shipped between processes,
+        # and the generation is numbered by the process that loads the store
+        return {name: getattr(self, name) for name in self.__slots__ if name not in ("_index", "generation")}
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            if isinstance(value, np.ndarray):
+                value.setflags(write=False)
+            setattr(self, name, value)
+        self.generation = next(_generations)
+        self._index = None
+
+    @property
+    def flight_version(self):
+        """What a flight's static details depend on besides its id: its schedule, or else this very store"""
+        return (self.key_hash, self.generation) if self.schedule is None else self.schedule
+
+    @property
+    def missing_suppliers(self):
+        """Codes of the suppliers asked for these flights that did not answer"""
+        return tuple(answer.code for answer in self.suppliers if not answer.ok)
+
+    @property
+    def nbytes(self):
+        """Bytes held by the column arrays"""
+        return sum(getattr(self, name).nbytes for name in COLUMNS)
+
+    @property
+    def index(self):
+        """Filter/sort indexes, built on first use and then reused by every session"""
+        if self._index is None:
+            self._index = ResultsIndex(self)
+        return self._index
+
+    def flight_id(self, row):
+        """Stable id of the physical flight in a row, the same in every store that holds it"""
+        return f"{self.id_prefix}-{self.position[row]}"
+
+    def airline_name(self, row):
+        return self.airline_names[self.airline[row]]
+
+    def fare_class_name(self, row):
+        return self.fare_classes[self.fare_class[row]]
+
+    def departure_label(self, row):
+        return str(CLOCK_LABELS[self.departure_mins[row]])
+
+    def arrival_clock(self, row):
+        """Arrival time of day, without the day it falls on"""
+        return str(CLOCK_LABELS[self.arrival_mins[row] % MINUTES_PER_DAY])
+
+    def arrival_day_offset(self, row):
+        """Days after the departure day that a flight lands (1 for red-eyes past midnight)"""
+        return int(self.arrival_mins[row]) // MINUTES_PER_DAY
+
+    def arrival_label(self, row):
+        return time_label(int(self.arrival_mins[row]))
+
+    def record(self, row, airlines, price=None):
+        """Materialize a single row as a flight dict, e.g. for the booking step"""
+        airline = self.airline_name(row)
+        airline_info = airlines[airline]
+        duration_mins = int(self.duration_mins[row])
+        arrival_mins = int(self.arrival_mins[row])
+        return {
+            "id": self.flight_id(row),
+            "airline": airline,
+            "airline_code": airline_info["code"],
+            "flight_number": f"{airline_info['code']} {self.flight_number[row]}",
+            "logo": airline_info["logo"],
+            "color": airline_info["color"],
+            "from_city": self.from_city,
+            "to_city": self.to_city,
+            "date": self.date,
+            "departure_time": self.departure_label(row),
+            "arrival_time": time_label(arrival_mins),
+            "arrival_day_offset": arrival_mins // MINUTES_PER_DAY,
+            "duration": format_duration(duration_mins),
+            "duration_mins": duration_mins,
+            "fare_class": self.fare_class_name(row),
+            "price": int(self.price[row]) if price is None else price
+        }
+
+
+class ResultView:
+    """A session's handle on a shared FlightResults: the search key and row order"""
+
+    __slots__ = ("key", "results", "rows")
+
+    def __init__(self, results, rows=None):
+        self.key = results.key
+        self.results = results
+        self.rows = np.arange(len(results), dtype=np.int32) if rows is None else rows
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __iter__(self):
+        return iter(self.rows.tolist())
+
+    def filtered(self, airlines=None, fare_classes=None, sort_by="price", prices=None):
+        """Return a new view restricted to the given airlines/classes and sorted"""
+        return ResultView(self.results, self.results.index.query(airlines, fare_classes, sort_by, prices))
@@ -0,0 +1,92 @@
+import hashlib
+from datetime import date
+
+import numpy as np
+
+from flight_inventory import generate_flight_columns
+from flight_results import FlightResults, flight_id_prefix
+from instrumentation import span
+from search_cache import make_search_key, normalize_city
+from suppliers import merge_rows
+
+# Seconds a search missing some airlines is cached before those airlines are asked again
+PARTIAL_RESULTS_TTL = 15
+
+
+class FlightSearch:
+    """Runs searches and shares their results through the search cache.
+
+    Dates in the booking window come from the airlines' suppliers, which
+    sell the route's fare calendar; other dates are generated, seeded by
+    route, day and count so every search of them sees the same flights.
+    Flight ids name the route, day and row, not the search, so every party
+    size and trip type books from one seat pool per flight. A search some
+    suppliers did not answer is cached for ``partial_ttl_seconds`` only,
+    and then just those suppliers are asked again. It holds the
+    shared stores themselves rather than their getters, so the booking
+    service runs exactly the searches the sessions do, outside Streamlit.
+    """
+
+    def __init__(self, cache, calendars, inventory, supplier_search, engine, airline_names, fare_classes,
+                 partial_ttl_seconds=PARTIAL_RESULTS_TTL):
+        self.cache = cache
+        self.calendars = calendars
+        self.inventory = inventory
+        self.supplier_search = supplier_search
+        self.engine = engine
+        self.airline_names = tuple(airline_names)
+        self.fare_classes = fare_classes
+        self.partial_ttl_seconds = partial_ttl_seconds
+
+    def calendar(self, from_city, to_city, today=None):
+        """The route's fare calendar, repriced for any seat changes on searched days"""
+        calendar = self.calendars.get(normalize_city(from_city), normalize_city(to_city), today or date.today())
+        calendar.refresh(self.inventory)
+        return calendar
+
+    def search(self, from_city, to_city, day, count=10, on_answer=None):
+        """The shared FlightResults for a search, built on a cache miss.
+
+        While a miss is served by the suppliers, ``on_answer(day_columns, answer)``
+        is called as each supplier answers, before the full result exists.
+        """
+        key = make_search_key(from_city, to_city, day) + (count,)
+        id_prefix = flight_id_prefix(from_city, to_city, day)
+
+        def build(previous=None):
+            calendar = self.calendar(from_city, to_city)
+            if count == calendar.flights_per_day and calendar.covers(day):
+                day_columns = calendar.day_columns(day)
+                # After a partial answer, keep the airlines that answered and ask only the others again
+                retry = () if previous is None else previous.missing_suppliers
+                answers = [answer for answer in previous.suppliers if answer.ok] if retry else []
+                if on_answer is not None:
+                    for answer in answers:
+                        on_answer(day_columns, answer)
+                with span("supplier_fan_out"):
+                    for answer in self.supplier_search.iter_results(from_city, to_city, day, retry or None):
+                        answers.append(answer)
+                        if on_answer is not None:
+                            on_answer(day_columns, answer)
+                rows = merge_rows(answers)
+                columns = {name: column[rows] for name, column in day_columns.items()}
+                return FlightResults(
+                    key, from_city, to_city, day, self.airline_names, self.fare_classes, columns, answers,
+                    positions=rows, id_prefix=id_prefix, schedule=calendar.schedule(day)
+                )
+            # Not the calendar's flights, so their ids must not collide with its rows for the day
+            generated_prefix = f"{id_prefix}-{count}"
+            seed = int.from_bytes(hashlib.blake2s(generated_prefix.encode(), digest_size=8).digest(), "big")
+            rng = np.random.default_rng(seed)
+            with span("generate_flights"):
+                columns = generate_flight_columns(len(self.airline_names), self.fare_classes, count, rng)
+                columns["price"] = self.engine.base_fares(from_city, to_city, columns["airline"], columns["fare_class"], rng)
+            return FlightResults(
+                key, from_city, to_city, day, self.airline_names, self.fare_classes, columns,
+                id_prefix=generated_prefix, schedule=seed
+            )
+
+        return self.cache.get_or_compute(key, build, refresh=build, ttl_of=self._ttl)
+
+    def _ttl(self, results):
+        return self.partial_ttl_seconds if results.missing_suppliers else None
@@ -0,0 +1,199 @@
+import re
+import string
+import threading
+from collections import OrderedDict
+
+# Indentation and line breaks in template sources are only there for readability
+_LINE_BREAKS = re.compile(r"\s*\n\s*")
+_BETWEEN_TAGS = re.compile(r">\s+(?=[<{])|(?<=})\s+<")
+
+_formatter = string.Formatter()
+
+
+def _minify(source):
+    source = _LINE_BREAKS.sub(" ", source.strip())
+    return _BETWEEN_TAGS.sub(lambda m: m.group(0).strip(), source)
+
+
+def _escape(text):
+    return text.replace("{", "{{").replace("}", "}}")
+
+
+class _Filled:
+    """A value for ``partial``: formatted now, with braces escaped for the template it ends up in"""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __format__(self, spec):
+        return _escape(format(self.value, spec))
+
+
+class _Open:
+    """A field ``partial`` leaves for later: formats back to its own placeholder"""
+
+    __slots__ = ("name",)
+
+    def __init__(self, name):
+        self.name = name
+
+    def __format__(self, spec):
+        return "{" + self.name + (":" + spec if spec else "") + "}"
+
+
+class Template:
+    """An HTML fragment parsed once, then filled with ``str.format_map``.
+
+    Whitespace between tags is dropped when the template is compiled, so
+    fragments are smaller and Markdown never reads indented HTML as a code
+    block. ``partial`` fills some fields now and returns a template for the
+    rest, e.g. a flight's fixed details rendered once, its price per rerun.
+    Fields are plain names with an optional format spec.
+    """
+
+    __slots__ = ("source", "fields", "formatted")
+
+    def __init__(self, source, minify=True):
+        self.source = _minify(source) if minify else source
+        parsed = [(name, spec, conversion) for _, name, spec, conversion in _formatter.parse(self.source) if name is not None]
+        if any(not name.isidentifier() or conversion for name, _, conversion in parsed):
+            raise ValueError(f"Template fields must be plain names: {self.source[:60]!r}")
+        self.fields = tuple(dict.fromkeys(name for name, _, _ in parsed))
+        # Fields with a format spec; the rest can be filled in by partial() as plain text
+        self.formatted = frozenset(name for name, spec, _ in parsed if spec)
+
+    def render(self, **values):
+        return self.source.format_map(values)
+
+    def partial(self, **values):
+        """A template with the given fields filled in and the others left open"""
+        slots = {
+            name: _Filled(value) if name in self.formatted else _escape(str(value))
+            for name, value in values.items()
+        }
+        open_fields = tuple(name for name in self.fields if name not in values)
+        slots.update((name, _Open(name)) for name in open_fields)
+        # Built directly: the remaining fields are already known, so there is nothing to parse
+        template = Template.__new__(Template)
+        template.source = self.source.format_map(slots)
+        template.fields = open_fields
+        template.formatted = self.formatted.intersection(open_fields)
+        return template
+
+
+class FragmentCache:
+    """Process-wide LRU of rendered fragments, each stored with the version it was rendered from.
+
+    A lookup whose version differs from the stored one (a new price, a
+    result store regenerated under the same flight ids) renders again and
+    replaces the entry, so callers never invalidate anything. Versions are
+    compared with ``==`` and stay referenced until their entry is evicted,
+    so a version should be a small value naming the source (such as a
+    store's ``(key_hash, generation)``), not a large object itself.
+    """
+
+    def __init__(self, max_entries=4096):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.counters = {"hits": 0, "misses": 0, "stale": 0, "evictions": 0}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get_or_render(self, key, version, render):
+        """Return the fragment for ``key`` at ``version``, rendering it if needed"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                self.counters["hits"] += 1
+                return entry[1]
+            self.counters["misses" if entry is None else "stale"] += 1
+
+        # Rendering is cheap next to a lock wait, so two sessions may both render a missing fragment
+        html = render()
+        with self._lock:
+            self._entries[key] = (version, html)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.counters["evictions"] += 1
+        return html
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counters, size=len(self._entries), max_entries=self.max_entries)
+
+
+FLIGHT_CARD = Template("""
+    <div class="{card_class}">
+        <div style="display: flex; justify-content: space-between; align-items: center;">
+            <div class="airline-logo-container">
+                {logo}
+                <div>
+                    <div class="airline-name">{airline}</div>
+                    <div class="flight-detail">{airline_code} {flight_number}</div>
+                </div>
+            </div>
+            <div style="text-align: center;">
+                <div class="flight-time">{departure}</div>
+                <div class="date-info">{from_city} · {date_label}</div>
+            </div>
+            <div class="flight-duration">{duration}</div>
+            <div style="text-align: center;">
+                <div class="flight-time">{arrival}{arrival_note}</div>
+                <div class="date-info">{to_city}</div>
+            </div>
+            <div style="text-align: right;">
+                <div class="flight-price">₹{price:,}</div>
+                <span class="flight-class-tag">{fare_class}</span>
+                {seats_note}
+            </div>
+        </div>
+    </div>
+""")
+
+DAY_OFFSET_NOTE = Template('<span class="day-offset">{label}</span>')
+SEATS_NOTE = Template('<div class="date-info">{seats_left} seats left</div>')
+SOLD_OUT_NOTE = '<div class="date-info">Sold out</div>'
+
+FARE_RULES_BLOCK = Template('<div class="fare-rules">{items}</div>')
+FARE_RULE_ITEM = Template('<div class="fare-rule-item"><span>{rule}</span><span>{value}</span></div>')
+
+FARE_BREAKUP_BLOCK = Template('<div class="fare-breakup">{items}</div>')
+FARE_BREAKUP_ITEM = Template('<div class="fare-breakup-item"><span>{label}</span><span>₹{amount:,}</span></div>')
+
+PROGRESS_BAR = Template("""
+    <div class="progress-container">
+        <div class="progress-line"></div>
+        <div class="progress-line-filled" style="width: {filled:.0f}%;"></div>
+        {items}
+    </div>
+""")
+PROGRESS_STEP = Template("""
+    <div class="progress-step {state}"><div class="step-circle">{circle}</div><div class="step-title">{title}</div></div>
+""")
+
+BOOKING_SUMMARY = Template("""
+    <div class="booking-summary">
+        {flights}{discount}
+        <div class="flight-price">Total for {passengers} passenger{plural}: ₹{total:,}</div>
+    </div>
+""")
+BOOKING_SUMMARY_FLIGHT = Template("""
+    <div class="booking-flight-info">
+        {logo}
+        <div style="margin-left: 1rem;">
+            <div class="airline-name">{flight_number} · {fare_class}</div>
+            <div class="flight-detail">{from_city} {departure_time} → {to_city} {arrival_time} · {date_label}</div>
+        </div>
+    </div>
+""")
+BOOKING_DISCOUNT = Template('<div class="flight-detail">Same-airline round-trip discount: −₹{discount:,}</div>')
@@ -0,0 +1,248 @@
+import contextvars
+import cProfile
+import io
+import json
+import pstats
+import threading
+import time
+import tracemalloc
+from collections import deque
+from functools import wraps
+
+# Upper bounds (ms) of the span duration histogram buckets
+SPAN_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+# The rerun being traced on this thread (Streamlit runs each session's script in its own thread)
+_current_trace = contextvars.ContextVar("current_trace", default=None)
+
+# cProfile allows one active profiler per process, so concurrent profile requests take turns
+_profile_lock = threading.Lock()
+
+
+class Trace:
+    """Spans and counters recorded during one rerun"""
+
+    def __init__(self, recorder, session=None):
+        self.recorder = recorder
+        self.session = session
+        self.started = time.perf_counter()
+        self.timestamp = time.time()
+        self.wall_ms = None
+        self.spans = []
+        self.counters = {}
+        self.profile = None
+        self.depth = 0
+        self._token = None
+
+    def totals(self):
+        """Calls and total milliseconds per span name"""
+        totals = {}
+        for name, _, _, elapsed in self.spans:
+            calls, total = totals.get(name, (0, 0.0))
+            totals[name] = (calls + 1, total + elapsed)
+        return totals
+
+    def to_dict(self):
+        return {
+            "timestamp": self.timestamp,
+            "session": self.session,
+            "wall_ms": self.wall_ms,
+            "spans": [
+                {"name": name, "depth": depth, "start_ms": start, "ms": elapsed}
+                for name, depth, start, elapsed in self.spans
+            ],
+            "counters": self.counters
+        }
+
+
+class _Span:
+    """Times a block into the current rerun's trace; a no-op outside a traced rerun"""
+
+    __slots__ = ("name", "trace", "started")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.trace = trace = _current_trace.get()
+        if trace is not None:
+            trace.depth += 1
+            self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        trace = self.trace
+        if trace is not None:
+            elapsed = (time.perf_counter() - self.started) * 1000
+            trace.depth -= 1
+            trace.spans.append((self.name, trace.depth, (self.started - trace.started) * 1000, elapsed))
+            trace.recorder.observe(self.name, elapsed)
+        return False
+
+
+def span(name):
+    """Context manager timing a block as ``name``"""
+    return _Span(name)
+
+
+def timed(name):
+    """Decorator timing every call of a function as ``name``"""
+    def decorate(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with _Span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def count(name, amount=1):
+    """Add to a counter of the current rerun (and the process totals)"""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.counters[name] = trace.counters.get(name, 0) + amount
+        trace.recorder.increment(name, amount)
+
+
+class RerunProfile:
+    """cProfile and tracemalloc capture of a single rerun"""
+
+    def __init__(self, limit=25):
+        self.limit = limit
+        self.stats_text = None
+        self.allocations = []
+        self.peak_kb = None
+        self._profiler = None
+        self._started_tracing = False
+
+    def start(self):
+        if not _profile_lock.acquire(blocking=False):
+            self.stats_text = "Another session is being profiled; try again."
+            return
+        self._started_tracing = not tracemalloc.is_tracing()
+        if self._started_tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        self._profiler = cProfile.Profile()
+        self._profiler.enable()
+
+    def stop(self):
+        if self._profiler is None:
+            return
+        try:
+            self._profiler.disable()
+            snapshot = tracemalloc.take_snapshot().filter_traces([
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap*>")
+            ])
+            self.peak_kb = tracemalloc.get_traced_memory()[1] / 1024
+            if self._started_tracing:
+                tracemalloc.stop()
+            # Keep only the rendered summaries so the profile holds no frames or traces
+            out = io.StringIO()
+            pstats.Stats(self._profiler, stream=out).sort_stats("cumulative").print_stats(self.limit)
+            self.stats_text = out.getvalue()
+            self.allocations = [
+                {"where": str(stat.traceback[0]), "kb": stat.size / 1024, "blocks": stat.count}
+                for stat in snapshot.statistics("lineno")[:self.limit]
+            ]
+        finally:
+            self._profiler = None
+            _profile_lock.release()
+
+
+class Recorder:
+    """Process-wide span and counter aggregates, fed by every session's reruns.
+
+    ``start_rerun``/``finish_rerun`` bracket a rerun; in between, ``span``,
+    ``timed`` and ``count`` anywhere on the rerun's thread record into its
+    Trace and into the per-name totals and duration histograms here. Code
+    running outside a traced rerun pays only a context-variable lookup.
+    Finished traces are kept in a short ring and, when ``jsonl_path`` is
+    set, appended to it one JSON object per line.
+    """
+
+    def __init__(self, keep_traces=100, jsonl_path=None):
+        self.jsonl_path = jsonl_path
+        self.recent = deque(maxlen=keep_traces)
+        self.spans = {}
+        self.counters = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name, elapsed_ms):
+        with self._lock:
+            stats = self.spans.get(name)
+            if stats is None:
+                stats = self.spans[name] = {
+                    "count": 0, "total_ms": 0.0, "max_ms": 0.0,
+                    "buckets": [0] * (len(SPAN_BUCKETS_MS) + 1)
+                }
+            stats["count"] += 1
+            stats["total_ms"] += elapsed_ms
+            stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+            bucket = len(SPAN_BUCKETS_MS)
+            for i, bound in enumerate(SPAN_BUCKETS_MS):
+                if elapsed_ms <= bound:
+                    bucket = i
+                    break
+            stats["buckets"][bucket] += 1
+
+    def increment(self, name, amount=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def start_rerun(self, session=None, profile=False):
+        """Begin tracing a rerun on the calling thread"""
+        trace = Trace(self, session)
+        if profile:
+            trace.profile = RerunProfile()
+            trace.profile.start()
+        trace._token = _current_trace.set(trace)
+        return trace
+
+    def finish_rerun(self, trace):
+        """Stop tracing ``trace``, fold it into the totals and log it"""
+        _current_trace.reset(trace._token)
+        if trace.profile is not None:
+            trace.profile.stop()
+        trace.wall_ms = (time.perf_counter() - trace.started) * 1000
+        self.observe("rerun", trace.wall_ms)
+        self.recent.append(trace)
+        if self.jsonl_path is not None:
+            with self._lock, open(self.jsonl_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(trace.to_dict()) + "\n")
+        return trace
+
+    def summary(self):
+        """Per-span count, mean and max, slowest total first"""
+        with self._lock:
+            rows = [
+                {
+                    "span": name,
+                    "calls": stats["count"],
+                    "total_ms": stats["total_ms"],
+                    "mean_ms": stats["total_ms"] / stats["count"],
+                    "max_ms": stats["max_ms"]
+                }
+                for name, stats in self.spans.items()
+            ]
+        return sorted(rows, key=lambda row: -row["total_ms"])
+
+    def to_prometheus(self, name="flight_app"):
+        """Render span histograms and counters in Prometheus text exposition format"""
+        with self._lock:
+            spans = {span_name: dict(stats, buckets=list(stats["buckets"])) for span_name, stats in self.spans.items()}
+            counters = dict(self.counters)
+        lines = [f"# TYPE {name}_span_seconds histogram"]
+        for span_name, stats in sorted(spans.items()):
+            cumulative = 0
+            for bound, hits in zip(SPAN_BUCKETS_MS + ("+Inf",), stats["buckets"]):
+                cumulative += hits
+                le = bound if bound == "+Inf" else bound / 1000
+                lines.append(f'{name}_span_seconds_bucket{{span="{span_name}",le="{le}"}} {cumulative}')
+            lines.append(f'{name}_span_seconds_sum{{span="{span_name}"}} {stats["total_ms"] / 1000:.6f}')
+            lines.append(f'{name}_span_seconds_count{{span="{span_name}"}} {stats["count"]}')
+        lines.append(f"# TYPE {name}_events_total counter")
+        for counter, value in sorted(counters.items()):
+            lines.append(f'{name}_events_total{{event="{counter}"}} {value}')
+        return "\n".join(lines) + "\n"
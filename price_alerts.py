@@ -0,0 +1,348 @@
+import hashlib
+import secrets
+import threading
+import time
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import date
+
+import numpy as np
+
+from booking_store import DEFAULT_DB_PATH, ConnectionPool
+from search_cache import normalize_city
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS saved_searches (
+    id TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    from_city TEXT NOT NULL,
+    to_city TEXT NOT NULL,
+    depart_date TEXT NOT NULL,
+    passengers INTEGER NOT NULL,
+    max_price INTEGER,
+    created_at REAL NOT NULL,
+    last_price INTEGER,
+    last_checked REAL,
+    watch_key_hash TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_saved_searches_date ON saved_searches (depart_date);
+CREATE TABLE IF NOT EXISTS price_alerts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    owner TEXT NOT NULL,
+    saved_search_id TEXT NOT NULL REFERENCES saved_searches(id) ON DELETE CASCADE,
+    created_at REAL NOT NULL,
+    old_price INTEGER,
+    new_price INTEGER NOT NULL,
+    message TEXT NOT NULL,
+    read INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_price_alerts_search ON price_alerts (saved_search_id, read);
+"""
+
+
+def normalize_owner(email):
+    return email.strip().lower()
+
+
+def new_watch_key():
+    """A secret that opens the saved searches and alerts filed under it"""
+    return secrets.token_urlsafe(12)
+
+
+def _key_hash(watch_key):
+    # Only a hash is stored, so reading the database does not hand out working keys
+    return hashlib.sha256(watch_key.strip().encode()).hexdigest()
+
+
+class SavedSearchStore:
+    """Saved searches and their price alerts, kept beside the bookings.
+
+    Searches are filed under a watch key (``new_watch_key``) rather than
+    looked up by email: only whoever holds the key, e.g. the session that
+    saved them, can list, delete or read the alerts of its searches. The
+    email is kept as the contact the alerts are for.
+    """
+
+    def __init__(self, path=DEFAULT_DB_PATH, pool_size=4):
+        self.pool = ConnectionPool(path, size=pool_size)
+        with self.pool.connection() as conn:
+            conn.executescript(SCHEMA)
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(saved_searches)")}
+            if "watch_key_hash" not in columns:
+                # Searches saved before watch keys have no key, so nobody can open them any more
+                conn.execute("ALTER TABLE saved_searches ADD COLUMN watch_key_hash TEXT")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_saved_searches_key ON saved_searches (watch_key_hash)")
+
+    def save(self, watch_key, owner, from_city, to_city, depart_date, passengers=1, max_price=None):
+        """Store a search to watch under ``watch_key``; returns its id"""
+        search_id = uuid.uuid4().hex[:12]
+        with self.pool.transaction() as conn:
+            conn.execute(
+                "INSERT INTO saved_searches (id, owner, from_city, to_city, depart_date, passengers, max_price, "
+                "created_at, watch_key_hash) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (search_id, normalize_owner(owner), from_city, to_city, depart_date.isoformat(),
+                 passengers, max_price, time.time(), _key_hash(watch_key))
+            )
+        return search_id
+
+    def delete(self, watch_key, search_id):
+        with self.pool.transaction() as conn:
+            conn.execute(
+                "DELETE FROM saved_searches WHERE id = ? AND watch_key_hash = ?", (search_id, _key_hash(watch_key))
+            )
+
+    def for_key(self, watch_key):
+        """The saved searches filed under a watch key, soonest departure first"""
+        with self.pool.connection() as conn:
+            rows = conn.execute(
+                "SELECT * FROM saved_searches WHERE watch_key_hash = ? ORDER BY depart_date, created_at",
+                (_key_hash(watch_key),)
+            ).fetchall()
+        return [_saved_search_dict(row) for row in rows]
+
+    def watched(self, today):
+        """Every saved search still to fly, grouped by (from, to) route and then by date"""
+        with self.pool.connection() as conn:
+            rows = conn.execute(
+                "SELECT * FROM saved_searches WHERE depart_date >= ? ORDER BY from_city, to_city, depart_date",
+                (today.isoformat(),)
+            ).fetchall()
+        routes = defaultdict(lambda: defaultdict(list))
+        for row in rows:
+            search = _saved_search_dict(row)
+            route = (normalize_city(search["from_city"]), normalize_city(search["to_city"]))
+            routes[route][search["depart_date"]].append(search)
+        return routes
+
+    def record(self, checked, alerts):
+        """Store one batch of evaluations in a single transaction.
+
+        ``checked`` holds (search id, price seen before, lowest price now);
+        ``alerts`` holds (search id, owner, old price, new price, message).
+        A search another process updated meanwhile keeps that update and
+        drops its alert here, so a drop is never reported twice.
+        """
+        now = time.time()
+        with self.pool.transaction() as conn:
+            updated = set()
+            for search_id, before, price in checked:
+                changed = conn.execute(
+                    "UPDATE saved_searches SET last_price = ?, last_checked = ? WHERE id = ? AND last_price IS ?",
+                    (price, now, search_id, before)
+                ).rowcount
+                if changed:
+                    updated.add(search_id)
+            rows = [(owner, search_id, now, old, new, message) for search_id, owner, old, new, message in alerts if search_id in updated]
+            conn.executemany(
+                "INSERT INTO price_alerts (owner, saved_search_id, created_at, old_price, new_price, message) "
+                "VALUES (?, ?, ?, ?, ?, ?)", rows
+            )
+        return len(rows)
+
+    def inbox(self, watch_key, limit=50):
+        """Alerts on the searches filed under a watch key, newest first"""
+        with self.pool.connection() as conn:
+            return [dict(row) for row in conn.execute(
+                "SELECT a.* FROM price_alerts a JOIN saved_searches s ON s.id = a.saved_search_id "
+                "WHERE s.watch_key_hash = ? ORDER BY a.id DESC LIMIT ?", (_key_hash(watch_key), limit)
+            ).fetchall()]
+
+    def unread(self, watch_key):
+        with self.pool.connection() as conn:
+            return conn.execute(
+                "SELECT COUNT(*) FROM price_alerts a JOIN saved_searches s ON s.id = a.saved_search_id "
+                "WHERE s.watch_key_hash = ? AND a.read = 0", (_key_hash(watch_key),)
+            ).fetchone()[0]
+
+    def mark_read(self, watch_key):
+        with self.pool.transaction() as conn:
+            conn.execute(
+                "UPDATE price_alerts SET read = 1 WHERE read = 0 AND saved_search_id IN "
+                "(SELECT id FROM saved_searches WHERE watch_key_hash = ?)", (_key_hash(watch_key),)
+            )
+
+
+def _saved_search_dict(row):
+    search = dict(row)
+    search["depart_date"] = date.fromisoformat(search["depart_date"])
+    return search
+
+
+class PriceWatcher:
+    """Re-evaluates every saved search on a daemon thread and files an alert when a fare drops.
+
+    Saved searches are grouped by route, so one fare-calendar lookup serves
+    every date watched on it, and by date, so one evaluation serves every
+    user watching that day. Each day's fares are diffed against the last
+    snapshot taken of them; an unchanged day costs a comparison and touches
+    neither the database nor the watchers that have already seen its fares
+    (searches saved since the snapshot are still evaluated). Changed days are written back in
+    batches of ``batch_size``, one transaction each.
+
+    The watcher stays out of the way of interactive searches: it evaluates
+    at most ``max_days_per_second`` days, and waits (up to ``max_defer``
+    seconds) while any search is running inside ``interactive()``.
+    ``route_fares(from_city, to_city, days)`` returns each day's current
+    fares, or None for days it does not sell.
+    """
+
+    def __init__(self, store, route_fares, interval=300, batch_size=25, max_days_per_second=50,
+                 max_defer=5.0, metrics=None, clock=time.monotonic):
+        self.store = store
+        self.route_fares = route_fares
+        self.interval = interval
+        self.batch_size = batch_size
+        self.max_days_per_second = max_days_per_second
+        self.max_defer = max_defer
+        self.metrics = metrics
+        self._clock = clock
+        self._snapshots = {}
+        self._interactive = 0
+        self._quiet = threading.Condition()
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+        self.counters = {
+            "rounds": 0, "days_evaluated": 0, "days_unchanged": 0, "watchers_checked": 0,
+            "alerts": 0, "deferrals": 0, "deferred_ms": 0.0, "errors": 0
+        }
+        self.last_round = None
+
+    @contextmanager
+    def interactive(self):
+        """Mark an interactive search as running; the watcher pauses until it ends"""
+        with self._quiet:
+            self._interactive += 1
+        try:
+            yield
+        finally:
+            with self._quiet:
+                self._interactive -= 1
+                self._quiet.notify_all()
+
+    def _wait_for_quiet(self):
+        with self._quiet:
+            if not self._interactive:
+                return
+            started = self._clock()
+            self._quiet.wait_for(lambda: not self._interactive or self._stop.is_set(), timeout=self.max_defer)
+        self._count(deferrals=1, deferred_ms=(self._clock() - started) * 1000)
+
+    def _count(self, **amounts):
+        with self._lock:
+            for name, amount in amounts.items():
+                self.counters[name] += amount
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+
+        def loop():
+            while not self._stop.is_set():
+                try:
+                    self.run_once()
+                except Exception:
+                    # A failed round is retried next interval rather than ending the thread
+                    self._count(errors=1)
+                self._stop.wait(self.interval)
+
+        self._thread = threading.Thread(target=loop, name="price-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            with self._quiet:
+                self._quiet.notify_all()
+            self._thread.join()
+            self._thread = None
+
+    def run_once(self, today=None):
+        """Evaluate every saved search once; returns this round's figures"""
+        today = today or date.today()
+        started = self._clock()
+        round_stats = {"routes": 0, "days": 0, "unchanged": 0, "watchers": 0, "alerts": 0}
+        checked, alerts, pending_days = [], [], 0
+        seen = set()
+        min_gap = 1 / self.max_days_per_second if self.max_days_per_second else 0
+        next_day_at = started
+
+        for (from_code, to_code), days in self.store.watched(today).items():
+            if self._stop.is_set():
+                break
+            round_stats["routes"] += 1
+            for day, fares in self.route_fares(from_code, to_code, list(days)).items():
+                # Rate limit, then give way to any interactive search before doing the work
+                delay = next_day_at - self._clock()
+                if delay > 0 and self._stop.wait(delay):
+                    break
+                self._wait_for_quiet()
+                next_day_at = self._clock() + min_gap
+
+                day_started = self._clock()
+                round_stats["days"] += 1
+                if fares is None:
+                    continue
+                key = (from_code, to_code, day)
+                seen.add(key)
+                previous = self._snapshots.get(key)
+                lowest = int(fares.min())
+                if previous is not None and np.array_equal(previous, fares):
+                    # Searches saved since the snapshot (or whose last update lost a race) have not seen these fares
+                    searches = [search for search in days[day] if search["last_price"] != lowest]
+                    if not searches:
+                        round_stats["unchanged"] += 1
+                        continue
+                else:
+                    self._snapshots[key] = np.array(fares)
+                    searches = days[day]
+                for search in searches:
+                    round_stats["watchers"] += 1
+                    alert = self.evaluate(search, lowest)
+                    if search["last_price"] != lowest:
+                        checked.append((search["id"], search["last_price"], lowest))
+                    if alert is not None:
+                        alerts.append((search["id"], search["owner"], search["last_price"], lowest, alert))
+                pending_days += 1
+                if self.metrics is not None:
+                    self.metrics.observe("price_watch_day", (self._clock() - day_started) * 1000)
+
+                if pending_days >= self.batch_size:
+                    round_stats["alerts"] += self.store.record(checked, alerts)
+                    checked, alerts, pending_days = [], [], 0
+
+        if checked:
+            round_stats["alerts"] += self.store.record(checked, alerts)
+        if not self._stop.is_set():
+            # Forget snapshots of days nobody watches any more
+            self._snapshots = {key: self._snapshots[key] for key in seen}
+
+        round_stats["ms"] = (self._clock() - started) * 1000
+        self._count(
+            rounds=1, days_evaluated=round_stats["days"], days_unchanged=round_stats["unchanged"],
+            watchers_checked=round_stats["watchers"], alerts=round_stats["alerts"]
+        )
+        if self.metrics is not None:
+            self.metrics.observe("price_watch_round", round_stats["ms"])
+            self.metrics.increment("price_alerts", round_stats["alerts"])
+        self.last_round = dict(round_stats, finished_at=time.time())
+        return round_stats
+
+    def evaluate(self, search, lowest):
+        """The alert message for a saved search now that its lowest fare is ``lowest``, or None"""
+        last, target = search["last_price"], search["max_price"]
+        route = f"{search['from_city']} → {search['to_city']} on {search['depart_date']:%d %b}"
+        if target is not None and lowest > target:
+            return None
+        if last is None:
+            # First look: only worth telling if the fare already meets the user's target
+            return None if target is None else f"{route}: fares from ₹{lowest:,}, within your ₹{target:,} target"
+        if lowest < last:
+            return f"{route}: lowest fare fell from ₹{last:,} to ₹{lowest:,}"
+        return None
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counters, running=self._thread is not None, last_round=self.last_round)
@@ -0,0 +1,184 @@
+import itertools
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from reference_data import AIRPORTS
+from route_network import great_circle_km
+from search_cache import normalize_city
+
+TAX_RATE = 0.12
+CONVENIENCE_FEE = 250
+
+# Fare multipliers relative to an Economy seat on a mid-priced carrier
+CLASS_MULTIPLIERS = {"Economy": 1.0, "Premium Economy": 1.8, "Business": 3.4}
+AIRLINE_FACTORS = {"6E": 0.95, "AI": 1.10, "SG": 0.93, "UK": 1.12, "QP": 0.92, "9I": 0.90}
+
+# Share of the combined fare taken off a round trip flown out and back on one airline
+SAME_AIRLINE_DISCOUNT = 0.05
+
+# Share of a group's combined base fare taken off, by the smallest party that qualifies (largest first)
+GROUP_FARE_TIERS = ((40, 0.12), (20, 0.08), (10, 0.05))
+
+# Distance assumed for routes with an airport missing from AIRPORTS
+DEFAULT_ROUTE_KM = 1000
+
+
+def fare_breakup(prices, passengers):
+    """Vectorized base fare / taxes / convenience fee / total for a whole party"""
+    base_fare = np.asarray(prices, dtype=np.int64) * passengers
+    taxes = np.rint(base_fare * TAX_RATE).astype(np.int64)
+    convenience_fee = np.full_like(base_fare, CONVENIENCE_FEE * passengers)
+    return {
+        "Base Fare": base_fare,
+        "Taxes & Surcharges": taxes,
+        "Convenience Fee": convenience_fee,
+        "Total": base_fare + taxes + convenience_fee
+    }
+
+
+def same_airline_discount(outbound_price, return_price):
+    """Per-passenger discount on a round trip flown on one airline"""
+    return int(round(SAME_AIRLINE_DISCOUNT * (outbound_price + return_price)))
+
+
+def group_discount(base_fare, passengers):
+    """Discount on a party's combined base fare; nothing for parties below the smallest group tier"""
+    for min_passengers, rate in GROUP_FARE_TIERS:
+        if passengers >= min_passengers:
+            return int(round(rate * base_fare))
+    return 0
+
+
+def booking_quote(flights, passengers):
+    """Fare breakup for a party on the chosen flights (outbound first), after every discount that applies"""
+    breakup = fare_breakup([flight["price"] for flight in flights], passengers)
+    quote = {label: int(amounts.sum()) for label, amounts in breakup.items()}
+    total = quote.pop("Total")
+    same_airline = 0
+    if len(flights) == 2 and flights[0]["airline"] == flights[1]["airline"]:
+        same_airline = same_airline_discount(flights[0]["price"], flights[1]["price"]) * passengers
+    group = group_discount(quote["Base Fare"], passengers)
+    quote["Same-airline Discount"] = -same_airline
+    quote["Group Discount"] = -group
+    quote["Total"] = total - same_airline - group
+    return quote
+
+
+def days_to_departure_factor(days):
+    """Fares climb as departure approaches: x1.6 on the day, ~x1.2 a week out"""
+    return 1 + 0.6 * np.exp(-np.maximum(days, 0) / 7)
+
+
+def load_factor_multiplier(load_factor):
+    """Fares climb as a class fills up: x1.8 when full"""
+    return 1 + 0.8 * np.asarray(load_factor) ** 2
+
+
+def current_fares(base_fares, days, load_factor):
+    """Fares on sale now from published fares, days to departure and load factor, rounded to ₹10"""
+    fares = base_fares * days_to_departure_factor(days) * load_factor_multiplier(load_factor)
+    return (np.rint(fares / 10) * 10).astype(np.int32)
+
+
+class PriceSnapshot:
+    """Fares and fare breakups for every row of one search, read-only once built.
+
+    Built in one vectorized pass and shared by every rerun (and session) that
+    shows the same search to the same party size, until the seat inventory
+    of one of its flights changes.
+    """
+
+    __slots__ = ("results", "token", "inventory_version", "price", "breakup", "price_order")
+
+    def __init__(self, results, token, inventory_version, price, passengers):
+        self.results = results
+        self.token = token
+        self.inventory_version = inventory_version
+        self.price = price
+        self.breakup = fare_breakup(price, passengers)
+        self.price_order = np.argsort(price, kind="stable").astype(np.int32)
+        for column in (self.price, self.price_order, *self.breakup.values()):
+            column.setflags(write=False)
+
+    def row_breakup(self, row):
+        return {label: int(amounts[row]) for label, amounts in self.breakup.items()}
+
+
+class PricingEngine:
+    """Computes published fares and memoized per-search price snapshots.
+
+    Snapshots are shared between threads and never change once built; the
+    engine keeps, beside each one, the inventory version it was last found
+    valid at, so the next check only looks at the changes since.
+    """
+
+    def __init__(self, airlines, fare_classes, airports=AIRPORTS, max_snapshots=512):
+        self.airline_factors = np.array([AIRLINE_FACTORS.get(info["code"], 1.0) for info in airlines.values()])
+        self.class_multipliers = np.array([CLASS_MULTIPLIERS[name] for name in fare_classes])
+        self.locations = {code: airport["location"] for code, airport in airports.items()}
+        self.max_snapshots = max_snapshots
+        self._snapshots = OrderedDict()
+        self._tokens = itertools.count(1)
+        self._lock = threading.Lock()
+        self.counters = {"hits": 0, "builds": 0, "invalidations": 0}
+
+    def route_km(self, from_city, to_city):
+        origin = self.locations.get(normalize_city(from_city))
+        destination = self.locations.get(normalize_city(to_city))
+        if origin is None or destination is None:
+            return DEFAULT_ROUTE_KM
+        return float(great_circle_km([origin, destination])[0, 1])
+
+    def base_fares(self, from_city, to_city, airline_codes, fare_class_codes, rng=None):
+        """Published fare per flight: route x class x airline, with per-flight jitter"""
+        if rng is None:
+            rng = np.random.default_rng()
+        route_fare = 1200 + 3.2 * self.route_km(from_city, to_city)
+        fares = (
+            route_fare
+            * self.class_multipliers[fare_class_codes]
+            * self.airline_factors[airline_codes]
+            * rng.uniform(0.9, 1.15, size=len(airline_codes))
+        )
+        return (np.rint(fares / 10) * 10).astype(np.int32)
+
+    def snapshot(self, results, passengers, today, inventory):
+        """Current fares for a result store, memoized until its seat inventory changes"""
+        key = (results.key, passengers, today)
+        with self._lock:
+            entry = self._snapshots.get(key)
+            if entry is not None:
+                snapshot, checked = entry
+                version = inventory.version
+                # A regenerated store under the same search key has different base fares
+                if snapshot.results is results and self._still_valid(checked, results, inventory):
+                    # Nothing of ours changed; remember how far we checked so the next check is O(1)
+                    self._snapshots[key] = (snapshot, version)
+                    self._snapshots.move_to_end(key)
+                    self.counters["hits"] += 1
+                    return snapshot
+                del self._snapshots[key]
+                self.counters["invalidations"] += 1
+
+        # Read the version before the load factors so a concurrent change invalidates us next time
+        version = inventory.version
+        flight_ids = [results.flight_id(row) for row in range(len(results))]
+        load = inventory.load_factors(flight_ids, results.fare_class)
+        days = (results.date - today).days if results.date else 0
+        snapshot = PriceSnapshot(results, next(self._tokens), version, current_fares(results.price, days, load), passengers)
+
+        with self._lock:
+            self._snapshots[key] = (snapshot, version)
+            self.counters["builds"] += 1
+            while len(self._snapshots) > self.max_snapshots:
+                self._snapshots.popitem(last=False)
+        return snapshot
+
+    def _still_valid(self, checked, results, inventory):
+        changed = inventory.changed_since(checked)
+        if changed is None:
+            return False
+        prefix = f"{results.id_prefix}-"
+        return not any(flight_id.startswith(prefix) for flight_id in changed)
@@ -0,0 +1,63 @@
+# Static reference data, shared read-only by every session
+
+CITIES = [
+    "Mumbai (BOM)", "Delhi (DEL)", "Bangalore (BLR)",
+    "Chennai (MAA)", "Kolkata (CCU)", "Hyderabad (HYD)",
+    "Pune (PNQ)", "Ahmedabad (AMD)", "Goa (GOI)", "Jaipur (JAI)",
+    "Lucknow (LKO)", "Kochi (COK)", "Guwahati (GAU)"
+]
+
+AIRLINES = {
+    "IndiGo": {"code": "6E", "color": "#0052CC"},
+    "Air India": {"code": "AI", "color": "#e31837"},
+    "SpiceJet": {"code": "SG", "color": "#ff4e00"},
+    "Vistara": {"code": "UK", "color": "#4b286d"},
+    "Akasa Air": {"code": "QP", "color": "#FF6D38"},
+    "Alliance Air": {"code": "9I", "color": "#2B3990"}
+}
+
+FARE_CLASSES = ["Economy", "Premium Economy", "Business"]
+
+FARE_RULES = {
+    "Economy": {
+        "Cancellation Fee": "₹3,500 per passenger",
+        "Date Change Fee": "₹3,000 per passenger",
+        "Seat Selection": "Chargeable",
+        "Baggage Allowance": "15 kg",
+        "Meal": "Not Included",
+        "Refundable": "Partial"
+    },
+    "Premium Economy": {
+        "Cancellation Fee": "₹2,500 per passenger",
+        "Date Change Fee": "₹2,000 per passenger",
+        "Seat Selection": "Free",
+        "Baggage Allowance": "20 kg",
+        "Meal": "Included",
+        "Refundable": "Yes"
+    },
+    "Business": {
+        "Cancellation Fee": "₹2,000 per passenger",
+        "Date Change Fee": "₹1,500 per passenger",
+        "Seat Selection": "Free",
+        "Baggage Allowance": "35 kg",
+        "Meal": "Included",
+        "Refundable": "Yes"
+    }
+}
+
+# Airport coordinates (latitude, longitude) and relative traffic weight, by IATA code
+AIRPORTS = {
+    "BOM": {"location": (19.09, 72.87), "traffic": 10},
+    "DEL": {"location": (28.56, 77.10), "traffic": 10},
+    "BLR": {"location": (13.20, 77.71), "traffic": 8},
+    "MAA": {"location": (12.99, 80.17), "traffic": 6},
+    "CCU": {"location": (22.65, 88.45), "traffic": 6},
+    "HYD": {"location": (17.24, 78.43), "traffic": 6},
+    "PNQ": {"location": (18.58, 73.92), "traffic": 4},
+    "AMD": {"location": (23.07, 72.63), "traffic": 4},
+    "GOI": {"location": (15.38, 73.83), "traffic": 3},
+    "JAI": {"location": (26.82, 75.81), "traffic": 3},
+    "LKO": {"location": (26.76, 80.89), "traffic": 3},
+    "COK": {"location": (10.15, 76.40), "traffic": 3},
+    "GAU": {"location": (26.11, 91.59), "traffic": 2}
+}
@@ -0,0 +1,93 @@
+import threading
+
+import numpy as np
+
+# Column each sort option orders by
+SORT_COLUMNS = {
+    "price": "price",
+    "departure": "departure_mins",
+    "arrival": "arrival_mins",
+    "duration": "duration_mins"
+}
+
+
+class ResultsIndex:
+    """Filter/sort indexes built once per FlightResults store.
+
+    Every airline and fare class gets a packed bitmap of the rows it covers,
+    and every sort option gets a precomputed stable permutation. A query ORs
+    the selected bitmaps, ANDs the two groups and walks the permutation, so
+    no query ever re-sorts the data.
+    """
+
+    # Distinct filter/sort combinations remembered per store
+    MAX_MEMOIZED = 64
+
+    def __init__(self, results):
+        self.size = len(results)
+        self.airline_bitmaps = self._bitmaps(results.airline, len(results.airline_names))
+        self.class_bitmaps = self._bitmaps(results.fare_class, len(results.fare_classes))
+        self.airline_codes = {name: code for code, name in enumerate(results.airline_names)}
+        self.class_codes = {name: code for code, name in enumerate(results.fare_classes)}
+        self.permutations = {
+            sort_by: np.argsort(getattr(results, column), kind="stable").astype(np.int32)
+            for sort_by, column in SORT_COLUMNS.items()
+        }
+        self._memo = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _bitmaps(codes, categories):
+        return np.stack([np.packbits(codes == code) for code in range(categories)])
+
+    def _union(self, bitmaps, lookup, names):
+        if names is None:
+            return None
+        selected = [lookup[name] for name in names if name in lookup]
+        if not selected:
+            return np.zeros(bitmaps.shape[1], dtype=np.uint8)
+        return np.bitwise_or.reduce(bitmaps[selected], axis=0)
+
+    def query(self, airlines=None, fare_classes=None, sort_by="price", prices=None):
+        """Return the row indexes matching the filters, in ``sort_by`` order.
+
+        ``prices`` is an optional price snapshot whose ``price_order``
+        replaces the published-fare order when sorting by price.
+        """
+        if sort_by != "price":
+            prices = None
+        memo_key = (
+            None if airlines is None else frozenset(airlines),
+            None if fare_classes is None else frozenset(fare_classes),
+            sort_by,
+            None if prices is None else prices.token
+        )
+        rows = self._memo.get(memo_key)
+        if rows is not None:
+            return rows
+
+        if prices is not None:
+            permutation = prices.price_order
+        else:
+            permutation = self.permutations.get(sort_by, self.permutations["price"])
+        airline_bits = self._union(self.airline_bitmaps, self.airline_codes, airlines)
+        class_bits = self._union(self.class_bitmaps, self.class_codes, fare_classes)
+
+        if airline_bits is None and class_bits is None:
+            rows = permutation
+        else:
+            if airline_bits is None:
+                bits = class_bits
+            elif class_bits is None:
+                bits = airline_bits
+            else:
+                bits = airline_bits & class_bits
+            mask = np.unpackbits(bits, count=self.size).view(bool)
+            rows = permutation[mask[permutation]]
+        rows.setflags(write=False)
+
+        with self._lock:
+            if len(self._memo) >= self.MAX_MEMOIZED:
+                self._memo.pop(next(iter(self._memo)))
+            self._memo[memo_key] = rows
+        return rows
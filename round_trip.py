@@ -0,0 +1,109 @@
+import heapq
+
+import numpy as np
+
+from flight_inventory import MINUTES_PER_DAY
+from pricing import SAME_AIRLINE_DISCOUNT, same_airline_discount
+
+# Rupees a minute of travel time is worth when ranking by weighted score
+DEFAULT_MINUTE_VALUE = 20
+
+COMBINATION_SORTS = ("price", "duration", "score")
+
+
+def k_smallest_sums(left, right, k, feasible=None):
+    """The ``k`` smallest ``left[i] + right[j]`` pairs, for ascending ``left`` and ``right``.
+
+    Walks the sorted grid from the corner with a heap, so only about ``k``
+    pairs (plus any rejected by ``feasible(i, j)``) are ever looked at
+    instead of the full cross product. Returns (sum, i, j) tuples, best first.
+    """
+    if k <= 0 or not left or not right:
+        return []
+    best = []
+    heap = [(left[0] + right[0], 0, 0)]
+    seen = {(0, 0)}
+    while heap and len(best) < k:
+        total, i, j = heapq.heappop(heap)
+        if feasible is None or feasible(i, j):
+            best.append((total, i, j))
+        for ni, nj in ((i + 1, j), (i, j + 1)):
+            if ni < len(left) and nj < len(right) and (ni, nj) not in seen:
+                seen.add((ni, nj))
+                heapq.heappush(heap, (left[ni] + right[nj], ni, nj))
+    return best
+
+
+def best_combinations(outbound, inbound, outbound_prices, inbound_prices, k=10, sort_by="price",
+                      minute_value=DEFAULT_MINUTE_VALUE, min_stay_mins=0, discount=SAME_AIRLINE_DISCOUNT):
+    """Rank the top ``k`` outbound/return pairs of two result views.
+
+    ``sort_by`` is "price" (total fare after any same-airline discount),
+    "duration" (total time in the air) or "score" (fare plus
+    ``minute_value`` rupees per minute). Pairs where the return leaves less
+    than ``min_stay_mins`` after the outbound lands are skipped.
+
+    The discount is not additive over the two legs, so the search runs
+    once over all pairs without it and once per airline over same-airline
+    pairs with it. The true top ``k`` is always inside that union, which is
+    then rescored and re-ranked.
+    """
+    out_results, in_results = outbound.results, inbound.results
+    out_rows, in_rows = outbound.rows, inbound.rows
+    if len(out_rows) == 0 or len(in_rows) == 0:
+        return []
+
+    price_weight = 0.0 if sort_by == "duration" else 1.0
+    time_weight = {"price": 0.0, "duration": 1.0, "score": minute_value}[sort_by]
+    out_price = outbound_prices[out_rows].astype(np.float64)
+    in_price = inbound_prices[in_rows].astype(np.float64)
+    out_time = out_results.duration_mins[out_rows].astype(np.float64)
+    in_time = in_results.duration_mins[in_rows].astype(np.float64)
+    out_airline = out_results.airline[out_rows]
+    in_airline = in_results.airline[in_rows]
+
+    # Absolute minutes of the outbound landing and the return take-off
+    out_lands = out_results.arrival_mins[out_rows].astype(np.int64)
+    in_leaves = in_results.departure_mins[in_rows].astype(np.int64)
+    if out_results.date and in_results.date:
+        in_leaves = in_leaves + (in_results.date - out_results.date).days * MINUTES_PER_DAY
+
+    def search(out_positions, in_positions, price_factor):
+        out_cost = price_factor * price_weight * out_price[out_positions] + time_weight * out_time[out_positions]
+        in_cost = price_factor * price_weight * in_price[in_positions] + time_weight * in_time[in_positions]
+        out_order = np.argsort(out_cost, kind="stable")
+        in_order = np.argsort(in_cost, kind="stable")
+        out_sorted, in_sorted = out_positions[out_order], in_positions[in_order]
+        out_lands_sorted, in_leaves_sorted = out_lands[out_sorted].tolist(), in_leaves[in_sorted].tolist()
+
+        def feasible(i, j):
+            return in_leaves_sorted[j] - out_lands_sorted[i] >= min_stay_mins
+
+        pairs = k_smallest_sums(out_cost[out_order].tolist(), in_cost[in_order].tolist(), k, feasible)
+        return [(int(out_sorted[i]), int(in_sorted[j])) for _, i, j in pairs]
+
+    candidates = set(search(np.arange(len(out_rows)), np.arange(len(in_rows)), 1.0))
+    if discount:
+        for airline in np.intersect1d(out_airline, in_airline):
+            candidates.update(search(
+                np.flatnonzero(out_airline == airline), np.flatnonzero(in_airline == airline), 1.0 - discount
+            ))
+
+    combinations = []
+    for i, j in candidates:
+        price = int(out_price[i] + in_price[j])
+        saving = 0
+        if discount and out_airline[i] == in_airline[j]:
+            saving = same_airline_discount(int(out_price[i]), int(in_price[j]))
+        duration = int(out_time[i] + in_time[j])
+        combinations.append({
+            "outbound_row": int(out_rows[i]),
+            "return_row": int(in_rows[j]),
+            "price": price - saving,
+            "discount": saving,
+            "duration_mins": duration,
+            "stay_mins": int(in_leaves[j] - out_lands[i]),
+            "score": price_weight * (price - saving) + time_weight * duration
+        })
+    combinations.sort(key=lambda c: (c["score"], c["price"], c["duration_mins"]))
+    return combinations[:k]
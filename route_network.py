@@ -0,0 +1,322 @@
+import numpy as np
+
+from flight_inventory import MINUTES_PER_DAY, time_label
+from reference_data import AIRPORTS
+
+# Shortest allowed gap between arriving and departing on a connection
+MINIMUM_CONNECTION_MINS = 45
+
+# Longest layover offered on a connection
+MAXIMUM_LAYOVER_MINS = 6 * 60
+
+DEFAULT_LEGS_PER_DAY = 20_000
+
+# Bound for "no such leg", small enough that adding fares or minutes to it cannot overflow int64
+_NO_LEG = 1 << 40
+
+LEG_COLUMNS = ("origin", "destination", "departure_mins", "arrival_mins", "airline", "flight_number", "price")
+
+
+def great_circle_km(locations):
+    """Pairwise great-circle distances (km) between (lat, lon) points"""
+    lat, lon = np.radians(np.asarray(locations, dtype=float)).T
+    dlat = lat[:, None] - lat[None, :]
+    dlon = lon[:, None] - lon[None, :]
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat[:, None]) * np.cos(lat[None, :]) * np.sin(dlon / 2) ** 2
+    return 2 * 6371 * np.arcsin(np.sqrt(a))
+
+
+class RouteNetwork:
+    """One day's schedule of flight legs, indexed for connection search.
+
+    Legs are stored as NumPy columns grouped by (origin, destination) and
+    sorted by departure inside each group, so the onward legs that fit a
+    connection window are found with ``searchsorted``. Each group also
+    keeps the lowest arrival and fare of the legs departing at or after
+    each of its legs, so a partial itinerary's best completion is bounded
+    in one lookup. A second ordering by departure drives the Connection
+    Scan Algorithm in ``earliest_arrival``. Legs built from the app's own
+    flights (``from_flights``) carry their flight ids.
+    """
+
+    def __init__(self, airports, legs):
+        self.airports = tuple(airports)
+        self.airport_index = {code: i for i, code in enumerate(self.airports)}
+
+        order = np.lexsort((legs["departure_mins"], legs["destination"], legs["origin"]))
+        for name in LEG_COLUMNS:
+            column = np.ascontiguousarray(legs[name][order])
+            column.setflags(write=False)
+            setattr(self, name, column)
+        self.flight_id = None if "flight_id" not in legs else np.asarray(legs["flight_id"])[order]
+
+        # Contiguous [start, end) block of legs for every (origin, destination) pair
+        airport_count = len(self.airports)
+        route = self.origin.astype(np.int32) * airport_count + self.destination
+        bounds = np.searchsorted(route, np.arange(airport_count * airport_count + 1))
+        self.route_start = bounds[:-1].reshape(airport_count, airport_count)
+        self.route_end = bounds[1:].reshape(airport_count, airport_count)
+
+        # Running minimum from the back of each group: the best leg departing at or after this one
+        self.best_arrival_after = np.empty(len(route), dtype=np.int64)
+        self.best_price_after = np.empty(len(route), dtype=np.int64)
+        for start, end in zip(bounds[:-1].tolist(), bounds[1:].tolist()):
+            if start < end:
+                self.best_arrival_after[start:end] = np.minimum.accumulate(self.arrival_mins[start:end][::-1])[::-1]
+                self.best_price_after[start:end] = np.minimum.accumulate(self.price[start:end][::-1])[::-1]
+        durations = (self.arrival_mins - self.departure_mins).astype(np.int64)
+        nonempty = bounds[:-1] < bounds[1:]
+        self.route_min_price = np.full(airport_count * airport_count, _NO_LEG, dtype=np.int64)
+        self.route_min_duration = np.full(airport_count * airport_count, _NO_LEG, dtype=np.int64)
+        if len(route):
+            self.route_min_price[nonempty] = np.minimum.reduceat(self.price, bounds[:-1][nonempty])
+            self.route_min_duration[nonempty] = np.minimum.reduceat(durations, bounds[:-1][nonempty])
+        self.route_min_price = self.route_min_price.reshape(airport_count, airport_count)
+        self.route_min_duration = self.route_min_duration.reshape(airport_count, airport_count)
+
+        self.scan_order = np.argsort(self.departure_mins, kind="stable").astype(np.int32)
+
+    def __len__(self):
+        return len(self.origin)
+
+    @classmethod
+    def generate(cls, legs_per_day=DEFAULT_LEGS_PER_DAY, airline_count=6, rng=None, airports=AIRPORTS):
+        """Generate a plausible daily schedule weighted by airport traffic"""
+        if rng is None:
+            rng = np.random.default_rng()
+
+        codes = list(airports)
+        count = len(codes)
+        distance = great_circle_km([airports[code]["location"] for code in codes])
+        traffic = np.array([airports[code]["traffic"] for code in codes], dtype=float)
+        weights = np.outer(traffic, traffic)
+        np.fill_diagonal(weights, 0)
+
+        route = rng.choice(count * count, size=legs_per_day, p=weights.ravel() / weights.sum())
+        origin = (route // count).astype(np.int8)
+        destination = (route % count).astype(np.int8)
+        leg_km = distance[origin, destination]
+
+        # Block time: taxi/climb allowance plus cruise at ~750 km/h, with a little jitter
+        duration = np.round(30 + leg_km / 12.5).astype(np.int32) + rng.integers(-5, 16, size=legs_per_day)
+        departure = rng.integers(5 * 60, 23 * 60 + 30, size=legs_per_day, dtype=np.int32)
+        price = (1500 + leg_km * 4.0 * rng.uniform(0.85, 1.3, size=legs_per_day)).astype(np.int32)
+
+        return cls(codes, {
+            "origin": origin,
+            "destination": destination,
+            "departure_mins": departure,
+            "arrival_mins": departure + duration,
+            "airline": rng.integers(0, airline_count, size=legs_per_day, dtype=np.int8),
+            "flight_number": rng.integers(100, 10000, size=legs_per_day, dtype=np.int16),
+            "price": price
+        })
+
+    @classmethod
+    def from_flights(cls, airports, flights):
+        """The network of flights the app sells.
+
+        ``flights`` yields (origin, destination, day columns, fares, flight
+        ids) per route, e.g. one day of each route's fare calendar.
+        """
+        index = {code: i for i, code in enumerate(airports)}
+        parts = {name: [] for name in LEG_COLUMNS + ("flight_id",)}
+        for origin, destination, columns, fares, flight_ids in flights:
+            parts["origin"].append(np.full(len(fares), index[origin], dtype=np.int8))
+            parts["destination"].append(np.full(len(fares), index[destination], dtype=np.int8))
+            for name in ("departure_mins", "arrival_mins", "airline", "flight_number"):
+                parts[name].append(columns[name])
+            parts["price"].append(fares)
+            parts["flight_id"].append(np.asarray(flight_ids))
+        legs = {name: np.concatenate(columns) for name, columns in parts.items()}
+        for name in ("departure_mins", "arrival_mins", "price"):
+            legs[name] = legs[name].astype(np.int32)
+        return cls(airports, legs)
+
+    def _route(self, origin, destination):
+        return self.route_start[origin, destination], self.route_end[origin, destination]
+
+    def _onward(self, ready_mins, via, destination, max_layover):
+        """Pair each arrival at ``via`` with every onward leg to ``destination`` in its connection window.
+
+        Returns (source position, onward leg index) arrays.
+        """
+        start, end = self._route(via, destination)
+        departures = self.departure_mins[start:end]
+        low = np.searchsorted(departures, ready_mins)
+        high = np.searchsorted(departures, ready_mins + (max_layover - MINIMUM_CONNECTION_MINS), side="right")
+        counts = high - low
+        sources = np.repeat(np.arange(len(counts)), counts)
+        # Position of each pair inside its source's window
+        offsets = np.arange(len(sources)) - np.repeat(np.cumsum(counts) - counts, counts)
+        return sources, start + low[sources] + offsets
+
+    def _best_after(self, ready_mins, via, destination):
+        """Lowest arrival and lowest fare of the legs from ``via`` departing at or after each ready time.
+
+        Lower bounds for the leg that follows (_NO_LEG where none departs).
+        """
+        start, end = self._route(via, destination)
+        index = start + np.searchsorted(self.departure_mins[start:end], ready_mins)
+        found = index < end
+        index = np.minimum(index, max(end - 1, 0))
+        return (np.where(found, self.best_arrival_after[index], _NO_LEG),
+                np.where(found, self.best_price_after[index], _NO_LEG))
+
+    def _sort_keys(self, legs, sort_by):
+        """Lexsort keys (primary last) for rows of leg indexes padded with -1"""
+        stops = (legs[:, 1] >= 0).astype(np.int32) + (legs[:, 2] >= 0)
+        arrival = self.arrival_mins[legs[np.arange(len(legs)), stops]]
+        price = self.price[legs[:, 0]].astype(np.int64)
+        price += np.where(legs[:, 1] >= 0, self.price[legs[:, 1]], 0)
+        price += np.where(legs[:, 2] >= 0, self.price[legs[:, 2]], 0)
+        duration = arrival - self.departure_mins[legs[:, 0]]
+        return {
+            "arrival": (price, stops, arrival),
+            "price": (arrival, stops, price),
+            "duration": (price, stops, duration)
+        }[sort_by]
+
+    def find_itineraries(self, origin, destination, max_stops=2, depart_after=0, sort_by="arrival",
+                         limit=20, max_layover=MAXIMUM_LAYOVER_MINS):
+        """The best direct, one-stop and two-stop itineraries between two airports.
+
+        Each connection respects MINIMUM_CONNECTION_MINS and ``max_layover``,
+        and every onward leg in that window counts, so the ranking is exact
+        for each sort. Hubs the Connection Scan (``earliest_arrival``) cannot
+        reach are skipped. A first pass takes each arrival's first onward
+        leg to find ``limit`` real itineraries; the primary key of the last
+        of them is a cutoff, and a partial itinerary is only extended while
+        a lower bound of its best completion (``_best_after``) is within it.
+        Returns an (n, 3) array of leg indexes padded with -1, best first.
+        """
+        o = self.airport_index[origin]
+        d = self.airport_index[destination]
+        reachable = self.earliest_arrival(origin, depart_after) < np.iinfo(np.int32).max
+        vias = [v for v in range(len(self.airports)) if v not in (o, d) and reachable[v]]
+        one_stop = vias if max_stops >= 1 else []
+        two_stop = vias if max_stops >= 2 else []
+
+        def first_legs(via):
+            start, end = self._route(o, via)
+            return np.arange(start + np.searchsorted(self.departure_mins[start:end], depart_after), end)
+
+        def ready(legs):
+            return self.arrival_mins[legs] + MINIMUM_CONNECTION_MINS
+
+        def rows(*legs):
+            padding = [np.full(len(legs[0]), -1)] * (3 - len(legs))
+            return np.column_stack(list(legs) + padding).astype(np.int32)
+
+        def bound(price, first, arrival):
+            # Lower bound of the primary key from lower bounds of the fare and the final arrival
+            return {"price": price, "arrival": arrival, "duration": arrival - self.departure_mins[first]}[sort_by]
+
+        def primary(legs):
+            return self._sort_keys(legs, sort_by)[-1]
+
+        # Cutoff: the limit-th best of the direct flights and each arrival's first onward leg
+        direct = rows(first_legs(d))
+        sample = [direct]
+        for via in one_stop:
+            first = first_legs(via)
+            start, end = self._route(via, d)
+            onward = start + np.searchsorted(self.departure_mins[start:end], ready(first))
+            fits = onward < end
+            fits[fits] = self.departure_mins[onward[fits]] <= ready(first[fits]) + max_layover - MINIMUM_CONNECTION_MINS
+            sample.append(rows(first[fits], onward[fits]))
+        sample = np.concatenate(sample)
+        cutoff = _NO_LEG
+        if len(sample) >= limit:
+            cutoff = np.partition(primary(sample), limit - 1)[limit - 1]
+
+        itineraries = [direct]
+        for via in one_stop:
+            first = first_legs(via)
+            arrival, price = self._best_after(ready(first), via, d)
+            first = first[bound(self.price[first] + price, first, arrival) <= cutoff]
+            source, second = self._onward(ready(first), via, d, max_layover)
+            itineraries.append(rows(first[source], second))
+
+        for via in two_stop:
+            for via2 in vias:
+                if via2 == via:
+                    continue
+                first = first_legs(via)
+                arrival, price = self._best_after(ready(first), via, via2)
+                arrival = arrival + MINIMUM_CONNECTION_MINS + self.route_min_duration[via2, d]
+                price = self.price[first] + price + self.route_min_price[via2, d]
+                first = first[bound(price, first, arrival) <= cutoff]
+                if len(first) == 0:
+                    continue
+                source, middle = self._onward(ready(first), via, via2, max_layover)
+                first = first[source]
+                arrival, price = self._best_after(ready(middle), via2, d)
+                keep = bound(self.price[first] + self.price[middle] + price, first, arrival) <= cutoff
+                first, middle = first[keep], middle[keep]
+                source, last = self._onward(ready(middle), via2, d, max_layover)
+                itineraries.append(rows(first[source], middle[source], last))
+
+        legs = np.concatenate(itineraries)
+        keys = self._sort_keys(legs, sort_by)
+        # Narrow to rows that can make the top ``limit`` on the primary key before the full sort
+        primary = keys[-1]
+        if len(primary) > limit:
+            cutoff = np.partition(primary, limit - 1)[limit - 1]
+            candidates = np.flatnonzero(primary <= cutoff)
+            legs = legs[candidates]
+            keys = tuple(key[candidates] for key in keys)
+        return legs[np.lexsort(keys)[:limit]]
+
+    def earliest_arrival(self, origin, depart_after=0):
+        """Earliest arrival minute at every airport via the Connection Scan Algorithm.
+
+        Unreachable airports get ``np.iinfo(np.int32).max``.
+        """
+        unreachable = np.iinfo(np.int32).max
+        o = self.airport_index[origin]
+        earliest = [unreachable] * len(self.airports)
+        earliest[o] = depart_after
+
+        order = self.scan_order[np.searchsorted(self.departure_mins[self.scan_order], depart_after):]
+        origins = self.origin[order].tolist()
+        destinations = self.destination[order].tolist()
+        departures = self.departure_mins[order].tolist()
+        arrivals = self.arrival_mins[order].tolist()
+
+        for source, target, departure, arrival in zip(origins, destinations, departures, arrivals):
+            ready = earliest[source] if source == o else earliest[source] + MINIMUM_CONNECTION_MINS
+            if departure >= ready and arrival < earliest[target]:
+                earliest[target] = arrival
+        return np.array(earliest, dtype=np.int64)
+
+    def describe(self, legs, airline_names, airline_codes):
+        """Turn one row of leg indexes into an itinerary dict for display"""
+        legs = [int(leg) for leg in legs if leg >= 0]
+        details = []
+        for leg in legs:
+            airline = airline_names[self.airline[leg]]
+            details.append({
+                "flight_id": None if self.flight_id is None else str(self.flight_id[leg]),
+                "airline": airline,
+                "flight_number": f"{airline_codes[airline]} {self.flight_number[leg]}",
+                "from": self.airports[self.origin[leg]],
+                "to": self.airports[self.destination[leg]],
+                # Times count from the itinerary's departure day, so legs after midnight read "+1 day"
+                "departure_time": time_label(int(self.departure_mins[leg])),
+                "arrival_time": time_label(int(self.arrival_mins[leg])),
+                "price": int(self.price[leg])
+            })
+
+        departure = int(self.departure_mins[legs[0]])
+        arrival = int(self.arrival_mins[legs[-1]])
+        return {
+            "stops": len(legs) - 1,
+            "legs": details,
+            "via": [leg["to"] for leg in details[:-1]],
+            "departure_time": details[0]["departure_time"],
+            "arrival_time": details[-1]["arrival_time"],
+            "arrival_day_offset": arrival // MINUTES_PER_DAY,
+            "duration_mins": arrival - departure,
+            "price": sum(leg["price"] for leg in details)
+        }
@@ -0,0 +1,178 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+
+_IATA_CODE = re.compile(r"\(([A-Za-z]{3})\)\s*$")
+
+
+def normalize_city(city):
+    """Reduce a city label like "Mumbai (BOM)" to its IATA code"""
+    city = city.strip()
+    match = _IATA_CODE.search(city)
+    return match.group(1).upper() if match else city.upper()
+
+
+def make_search_key(from_city, to_city, date):
+    """Build the cache key for a search so equivalent queries collide.
+
+    Party size and trip type only change what the flights cost, which is
+    priced per party on top of the shared results, so they are left out.
+    """
+    return (
+        normalize_city(from_city),
+        normalize_city(to_city),
+        date.isoformat() if hasattr(date, "isoformat") else date
+    )
+
+
+class _Pending:
+    """A computation in progress that concurrent callers wait on"""
+
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SearchCache:
+    """Process-wide LRU cache with TTL expiry and single-flight computation.
+
+    Concurrent ``get_or_compute`` calls for a key that is not cached yet run
+    ``compute`` once; the other callers block until it finishes and share its
+    result (or exception). A value can be given a shorter life than
+    ``ttl_seconds`` (e.g. an incomplete result), and an expired value can be
+    handed to a ``refresh`` that rebuilds only the parts it is missing.
+    """
+
+    def __init__(self, max_entries=256, ttl_seconds=300, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._pending = {}
+        self._lock = threading.Lock()
+        self.counters = {
+            "hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "refreshes": 0,
+            "errors": 0
+        }
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """Return the cached value for ``key`` or None, counting a hit or miss"""
+        with self._lock:
+            value = self._lookup(key)
+            self.counters["hits" if value is not None else "misses"] += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._store(key, value)
+
+    def invalidate(self, key=None):
+        """Drop one key, or everything when ``key`` is None"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def get_or_compute(self, key, compute, refresh=None, ttl_of=None):
+        """Return the cached value for ``key``, computing it at most once.
+
+        ``ttl_of(value)`` gives the seconds a new value lives (None for
+        ``ttl_seconds``). If the key's entry has expired but is still held,
+        ``refresh(expired_value)`` builds the new value instead of ``compute()``.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            value = self._lookup(key)
+            if value is not None:
+                self.counters["hits"] += 1
+                return value
+
+            pending = self._pending.get(key)
+            if pending is None:
+                pending = self._pending[key] = _Pending()
+                leader = True
+                self.counters["misses"] += 1
+                previous = entry[0] if entry is not None and refresh is not None else None
+                if previous is not None:
+                    self.counters["refreshes"] += 1
+            else:
+                leader = False
+                self.counters["coalesced"] += 1
+
+        if not leader:
+            pending.done.wait()
+            if pending.error is not None:
+                raise pending.error
+            return pending.value
+
+        try:
+            pending.value = compute() if previous is None else refresh(previous)
+        except BaseException as exc:
+            pending.error = exc
+            with self._lock:
+                self.counters["errors"] += 1
+            raise
+        else:
+            with self._lock:
+                self._store(key, pending.value, None if ttl_of is None else ttl_of(pending.value))
+            return pending.value
+        finally:
+            with self._lock:
+                del self._pending[key]
+            pending.done.set()
+
+    def count(self, **amounts):
+        """Add to counters under the cache's lock, e.g. ones a wrapping cache keeps beside these"""
+        with self._lock:
+            for name, amount in amounts.items():
+                self.counters[name] = self.counters.get(name, 0) + amount
+
+    def stats(self):
+        """Snapshot of the counters plus current size"""
+        with self._lock:
+            return dict(self.counters, size=len(self._entries), max_entries=self.max_entries)
+
+    def to_prometheus(self, name="flight_search_cache"):
+        """Render the counters in Prometheus text exposition format"""
+        stats = self.stats()
+        lines = []
+        for counter in self.counters:
+            lines.append(f"# TYPE {name}_{counter}_total counter")
+            lines.append(f"{name}_{counter}_total {stats[counter]}")
+        lines.append(f"# TYPE {name}_size gauge")
+        lines.append(f"{name}_size {stats['size']}")
+        return "\n".join(lines) + "\n"
+
+    def _lookup(self, key):
+        # Caller holds the lock
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at <= self._clock():
+            del self._entries[key]
+            self.counters["expirations"] += 1
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _store(self, key, value, ttl_seconds=None):
+        # Caller holds the lock
+        self._entries[key] = (value, self._clock() + (self.ttl_seconds if ttl_seconds is None else ttl_seconds))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.counters["evictions"] += 1
@@ -0,0 +1,58 @@
+import time
+
+import numpy as np
+
+
+class ResultStream:
+    """A search's flights as supplier answers arrive, kept in display order.
+
+    ``preview`` is a FlightResults over every flight the answers can refer
+    to (e.g. the whole day of the route's fare calendar); ``sort_keys``
+    holds the active sort key for each of its rows, ``prices`` the fare to
+    show for each. Every answer is merged into the running order with
+    ``searchsorted`` so the page can be redrawn after each one without
+    re-sorting what already arrived, and the per-airline and per-class
+    counts are kept up to date alongside.
+    """
+
+    def __init__(self, preview, sort_keys, prices=None, started=None):
+        self.preview = preview
+        self.sort_keys = np.asarray(sort_keys)
+        self.prices = preview.price if prices is None else prices
+        self.started = time.perf_counter() if started is None else started
+        self.order = np.zeros(0, dtype=np.int64)
+        self._order_keys = self.sort_keys[:0]
+        self.airline_counts = np.zeros(len(preview.airline_names), dtype=np.int64)
+        self.class_counts = np.zeros(len(preview.fare_classes), dtype=np.int64)
+        self.answers = []
+        self.first_result_ms = None
+
+    def __len__(self):
+        return len(self.order)
+
+    def add(self, answer):
+        """Merge one SupplierResult into the running order"""
+        self.answers.append(answer)
+        if not answer.ok or len(answer.rows) == 0:
+            return
+        keys = self.sort_keys[answer.rows]
+        ranked = np.argsort(keys, kind="stable")
+        # side="right" keeps earlier answers ahead of later ones on equal keys
+        at = np.searchsorted(self._order_keys, keys[ranked], side="right")
+        self.order = np.insert(self.order, at, answer.rows[ranked])
+        self._order_keys = np.insert(self._order_keys, at, keys[ranked])
+        self.airline_counts += np.bincount(self.preview.airline[answer.rows], minlength=len(self.airline_counts))
+        self.class_counts += np.bincount(self.preview.fare_class[answer.rows], minlength=len(self.class_counts))
+        if self.first_result_ms is None:
+            self.first_result_ms = (time.perf_counter() - self.started) * 1000
+
+    def matching(self, airlines=None, fare_classes=None):
+        """Rows received so far that pass the filters, in running sort order"""
+        mask = np.ones(len(self.order), dtype=bool)
+        if airlines is not None:
+            codes = [code for code, name in enumerate(self.preview.airline_names) if name in airlines]
+            mask &= np.isin(self.preview.airline[self.order], codes)
+        if fare_classes is not None:
+            codes = [code for code, name in enumerate(self.preview.fare_classes) if name in fare_classes]
+            mask &= np.isin(self.preview.fare_class[self.order], codes)
+        return self.order[mask]
@@ -0,0 +1,248 @@
+import itertools
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+# Seats offered per fare class on every flight unless registered otherwise
+DEFAULT_CAPACITY = {"Economy": 150, "Premium Economy": 24, "Business": 12}
+
+# How long a hold keeps seats out of sale before the sweeper returns them
+DEFAULT_HOLD_SECONDS = 10 * 60
+
+_CHUNK_ROWS = 4096
+
+# Recent changes remembered for changed_since(); older versions report "unknown"
+_CHANGE_LOG_SIZE = 10_000
+
+
+def _hold_stripe(hold_id):
+    # Hold ids are "<stripe>:<serial>"
+    return int(hold_id.split(":", 1)[0])
+
+
+class _Hold:
+    __slots__ = ("hold_id", "flight_id", "chunk", "offset", "fare_class", "seats", "expires_at")
+
+    def __init__(self, hold_id, flight_id, chunk, offset, fare_class, seats, expires_at):
+        self.hold_id = hold_id
+        self.flight_id = flight_id
+        self.chunk = chunk
+        self.offset = offset
+        self.fare_class = fare_class
+        self.seats = seats
+        self.expires_at = expires_at
+
+
+class HoldSweeper:
+    """Releases an inventory's expired holds (its ``sweep_expired``) on a daemon thread"""
+
+    _sweeper = None
+
+    def start_sweeper(self, interval=5.0):
+        """Release expired holds every ``interval`` seconds on a daemon thread"""
+        if self._sweeper is not None:
+            return
+        stop = self._stop_sweeper = threading.Event()
+
+        def sweep():
+            while not stop.wait(interval):
+                self.sweep_expired()
+
+        self._sweeper = threading.Thread(target=sweep, name="seat-hold-sweeper", daemon=True)
+        self._sweeper.start()
+
+    def stop_sweeper(self):
+        if self._sweeper is not None:
+            self._stop_sweeper.set()
+            self._sweeper.join()
+            self._sweeper = None
+
+
+class SeatInventory(HoldSweeper):
+    """Per-flight, per-fare-class seat counts with atomic holds.
+
+    Counts live in fixed-size NumPy chunks (rows never move, so a chunk can
+    be updated while another flight is being registered). Every flight maps
+    to one of ``stripes`` locks, so sessions booking different flights do
+    not contend. A hold takes seats out of ``available`` until it is
+    confirmed (the seats become ``sold``), released, or expires.
+    """
+
+    def __init__(self, fare_classes, capacity=DEFAULT_CAPACITY, stripes=64,
+                 hold_seconds=DEFAULT_HOLD_SECONDS, clock=time.monotonic):
+        self.fare_classes = tuple(fare_classes)
+        self.class_index = {name: i for i, name in enumerate(self.fare_classes)}
+        self.default_capacity = np.array([capacity[name] for name in self.fare_classes], dtype=np.int32)
+        self.hold_seconds = hold_seconds
+        self._clock = clock
+
+        self._rows = {}
+        self._capacity = []
+        self._available = []
+        self._sold = []
+        self._versions = []
+        self._register_lock = threading.Lock()
+
+        self._locks = [threading.Lock() for _ in range(stripes)]
+        self._holds = [{} for _ in range(stripes)]
+        self._hold_ids = itertools.count(1)
+
+        # Inventory-wide change counter plus a bounded log of which flight each change touched
+        self.version = 0
+        self._changes = deque(maxlen=_CHANGE_LOG_SIZE)
+        self._change_lock = threading.Lock()
+
+    def _stripe(self, flight_id):
+        return hash(flight_id) % len(self._locks)
+
+    def _row(self, flight_id, capacity=None):
+        """Chunk and offset of a flight's counts, registering it on first use"""
+        row = self._rows.get(flight_id)
+        if row is not None:
+            return row
+        with self._register_lock:
+            row = self._rows.get(flight_id)
+            if row is not None:
+                return row
+            count = len(self._rows)
+            if count % _CHUNK_ROWS == 0:
+                self._capacity.append(np.zeros((_CHUNK_ROWS, len(self.fare_classes)), dtype=np.int32))
+                self._available.append(np.zeros((_CHUNK_ROWS, len(self.fare_classes)), dtype=np.int32))
+                self._sold.append(np.zeros((_CHUNK_ROWS, len(self.fare_classes)), dtype=np.int32))
+                self._versions.append(np.zeros(_CHUNK_ROWS, dtype=np.int64))
+            chunk, offset = divmod(count, _CHUNK_ROWS)
+            self._capacity[chunk][offset] = self.default_capacity if capacity is None else capacity
+            self._available[chunk][offset] = self._capacity[chunk][offset]
+            row = self._rows[flight_id] = (chunk, offset)
+            return row
+
+    def register_flight(self, flight_id, capacity=None):
+        """Add a flight with its own per-class capacity (defaults otherwise)"""
+        if capacity is not None:
+            capacity = np.array([capacity[name] for name in self.fare_classes], dtype=np.int32)
+        self._row(flight_id, capacity)
+
+    def available(self, flight_id, fare_class):
+        chunk, offset = self._row(flight_id)
+        return int(self._available[chunk][offset, self.class_index[fare_class]])
+
+    def available_many(self, flight_ids, fare_classes):
+        """available() for several flights at once"""
+        return [self.available(flight_id, fare_class) for flight_id, fare_class in zip(flight_ids, fare_classes)]
+
+    def sold(self, flight_id, fare_class):
+        chunk, offset = self._row(flight_id)
+        return int(self._sold[chunk][offset, self.class_index[fare_class]])
+
+    def flight_version(self, flight_id):
+        """Counter bumped whenever the flight's seat counts change"""
+        row = self._rows.get(flight_id)
+        return 0 if row is None else int(self._versions[row[0]][row[1]])
+
+    def changed_since(self, version):
+        """Flight ids changed after inventory ``version``, or None if the log no longer reaches back that far"""
+        with self._change_lock:
+            if self.version == version:
+                return set()
+            if not self._changes or self._changes[0][0] > version + 1:
+                return None
+            return {flight_id for change, flight_id in self._changes if change > version}
+
+    def load_factors(self, flight_ids, fare_class_codes):
+        """Share of each flight's class capacity that is sold or held (0 for unseen flights)"""
+        factors = np.zeros(len(flight_ids), dtype=np.float64)
+        for i, (flight_id, column) in enumerate(zip(flight_ids, fare_class_codes)):
+            row = self._rows.get(flight_id)
+            if row is not None:
+                capacity = self._capacity[row[0]][row[1], column]
+                factors[i] = (capacity - self._available[row[0]][row[1], column]) / capacity
+        return factors
+
+    def _touch(self, chunk, offset, flight_id):
+        # Caller holds the flight's stripe lock
+        self._versions[chunk][offset] += 1
+        with self._change_lock:
+            self.version += 1
+            self._changes.append((self.version, flight_id))
+
+    def hold(self, flight_id, fare_class, seats, hold_seconds=None):
+        """Take ``seats`` out of sale; returns a hold id, or None if not enough are left"""
+        chunk, offset = self._row(flight_id)
+        column = self.class_index[fare_class]
+        stripe = self._stripe(flight_id)
+        expires_at = self._clock() + (self.hold_seconds if hold_seconds is None else hold_seconds)
+
+        with self._locks[stripe]:
+            available = self._available[chunk]
+            if available[offset, column] < seats:
+                return None
+            available[offset, column] -= seats
+            self._touch(chunk, offset, flight_id)
+            hold_id = f"{stripe}:{next(self._hold_ids)}"
+            self._holds[stripe][hold_id] = _Hold(hold_id, flight_id, chunk, offset, column, seats, expires_at)
+        return hold_id
+
+    def confirm(self, hold_id):
+        """Turn a live hold into sold seats; False if it expired or is unknown"""
+        return self.confirm_all([hold_id])
+
+    def confirm_all(self, hold_ids):
+        """Confirm several holds (e.g. both legs of a round trip) all or nothing.
+
+        If any hold is unknown or expired, none are confirmed; expired holds
+        are released and the rest stay held.
+        """
+        stripes = sorted({_hold_stripe(hold_id) for hold_id in hold_ids})
+        # Lock stripes in a fixed order so two multi-confirms cannot deadlock
+        for stripe in stripes:
+            self._locks[stripe].acquire()
+        try:
+            now = self._clock()
+            holds = [self._holds[_hold_stripe(hold_id)].get(hold_id) for hold_id in hold_ids]
+            if all(hold is not None and hold.expires_at > now for hold in holds):
+                for hold in holds:
+                    del self._holds[_hold_stripe(hold.hold_id)][hold.hold_id]
+                    self._sold[hold.chunk][hold.offset, hold.fare_class] += hold.seats
+                    self._touch(hold.chunk, hold.offset, hold.flight_id)
+                return True
+            for hold in holds:
+                if hold is not None and hold.expires_at <= now:
+                    del self._holds[_hold_stripe(hold.hold_id)][hold.hold_id]
+                    self._return_seats(hold)
+            return False
+        finally:
+            for stripe in reversed(stripes):
+                self._locks[stripe].release()
+
+    def release(self, hold_id):
+        """Give a hold's seats back; False if it was already confirmed, released or swept"""
+        stripe = _hold_stripe(hold_id)
+        with self._locks[stripe]:
+            hold = self._holds[stripe].pop(hold_id, None)
+            if hold is None:
+                return False
+            self._return_seats(hold)
+            return True
+
+    def _return_seats(self, hold):
+        # Caller holds the hold's stripe lock
+        self._available[hold.chunk][hold.offset, hold.fare_class] += hold.seats
+        self._touch(hold.chunk, hold.offset, hold.flight_id)
+
+    def sweep_expired(self):
+        """Release every expired hold; returns how many were released"""
+        released = 0
+        now = self._clock()
+        for lock, holds in zip(self._locks, self._holds):
+            with lock:
+                expired = [hold for hold in holds.values() if hold.expires_at <= now]
+                for hold in expired:
+                    del holds[hold.hold_id]
+                    self._return_seats(hold)
+            released += len(expired)
+        return released
+
+    def active_holds(self):
+        return sum(len(holds) for holds in self._holds)
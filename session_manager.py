@@ -0,0 +1,204 @@
+import sys
+import threading
+import time
+
+import numpy as np
+
+# Key lifetimes: how long a session value stays before it is reset to its default
+PERSISTENT = "persistent"   # form choices and preferences, kept for the whole session
+SEARCH = "search"           # one search's results, dropped by a new search or a finished booking
+BOOKING = "booking"         # the booking in progress, dropped when it is finished or abandoned
+VIEW = "view"               # results-page display state, dropped when the user leaves the results page
+
+# Manager bookkeeping stored in each session
+_STEP_KEY = "_session_step"
+_SEEN_KEY = "_session_seen"
+_RERUNS_KEY = "_session_reruns"
+
+
+class SessionKey:
+    """A declared session-state key: its lifetime, default and size bound"""
+
+    __slots__ = ("name", "lifetime", "default", "max_entries")
+
+    def __init__(self, name, lifetime, default=None, max_entries=None):
+        self.name = name
+        self.lifetime = lifetime
+        self.default = default
+        # For dict values: keep at most this many entries, newest first
+        self.max_entries = max_entries
+
+    def initial(self):
+        return self.default() if callable(self.default) else self.default
+
+
+class SessionStateManager:
+    """Keeps each session's state to what its current step needs, and accounts for it.
+
+    Every key is declared with a lifetime. ``begin_rerun`` resets the keys
+    whose lifetime ended since the session's last rerun: entering a step
+    listed in ``on_enter`` drops the lifetimes mapped to it, and a session
+    idle for longer than ``idle_reset_after`` seconds loses its search (the
+    prices are stale by then anyway). Bounded dict keys are compacted to
+    their truthy, newest ``max_entries`` entries.
+
+    ``report`` measures a session's state after its first rerun and every
+    ``report_every`` reruns after that (or when forced, e.g. while the admin
+    panel shows it), since the walk grows with the state it measures.
+    Objects reachable from ``shared_roots`` or of ``shared_types``
+    (process-wide caches and reference data) are counted once as shared,
+    not against the session.
+    Each session only changes its own state, on its own rerun, since
+    Streamlit session state must not be touched from another session's
+    thread; the process-wide registry holds just the measured sizes.
+    """
+
+    def __init__(self, keys, on_enter=None, idle_reset_after=900, session_ttl=3600, report_every=20,
+                 shared_roots=(), shared_types=(), clock=time.monotonic):
+        self.keys = {key.name: key for key in keys}
+        self.on_enter = dict(on_enter or {})
+        self.idle_reset_after = idle_reset_after
+        self.session_ttl = session_ttl
+        self.report_every = report_every
+        self.shared_types = tuple(shared_types)
+        self._clock = clock
+        self._shared_ids = set()
+        for root in shared_roots:
+            self._collect_ids(root, self._shared_ids)
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self.counters = {"resets": 0, "idle_resets": 0, "pruned_entries": 0, "reports": 0, "reports_skipped": 0}
+
+    def _collect_ids(self, value, ids):
+        if id(value) in ids:
+            return
+        ids.add(id(value))
+        if isinstance(value, dict):
+            for item in value.items():
+                self._collect_ids(item[0], ids)
+                self._collect_ids(item[1], ids)
+        elif isinstance(value, (list, tuple, set, frozenset)):
+            for item in value:
+                self._collect_ids(item, ids)
+
+    def initialize(self, state):
+        """Set every declared key that is missing to its default"""
+        for key in self.keys.values():
+            if key.name not in state:
+                state[key.name] = key.initial()
+
+    def reset(self, state, *lifetimes):
+        """Return the keys of the given lifetimes to their defaults"""
+        for key in self.keys.values():
+            if key.lifetime in lifetimes:
+                state[key.name] = key.initial()
+        with self._lock:
+            self.counters["resets"] += 1
+
+    def begin_rerun(self, state, step):
+        """Apply the lifetime changes since the last rerun, then compact bounded keys"""
+        now = self._clock()
+        seen = state.get(_SEEN_KEY)
+        if seen is not None and now - seen > self.idle_reset_after:
+            self.reset(state, SEARCH, VIEW)
+            with self._lock:
+                self.counters["idle_resets"] += 1
+        state[_SEEN_KEY] = now
+
+        if state.get(_STEP_KEY) != step:
+            if step in self.on_enter:
+                self.reset(state, *self.on_enter[step])
+            state[_STEP_KEY] = step
+        self.compact(state)
+
+    def compact(self, state):
+        """Trim bounded dict keys to their truthy, newest entries"""
+        pruned = 0
+        for key in self.keys.values():
+            value = state.get(key.name)
+            if key.max_entries is None or not isinstance(value, dict):
+                continue
+            kept = [(k, v) for k, v in value.items() if v]
+            kept = kept[-key.max_entries:]
+            if len(kept) < len(value):
+                pruned += len(value) - len(kept)
+                state[key.name] = dict(kept)
+        if pruned:
+            with self._lock:
+                self.counters["pruned_entries"] += pruned
+
+    def footprint(self, state):
+        """Bytes held by a session: (own bytes per key, bytes of shared objects it refers to)"""
+        seen = set()
+        shared = {}
+        per_key = {}
+        for name in list(state.keys()):
+            per_key[name] = self._size(state[name], seen, shared)
+        return per_key, sum(shared.values())
+
+    def _size(self, value, seen, shared):
+        if id(value) in seen or id(value) in self._shared_ids:
+            return 0
+        seen.add(id(value))
+        if self.shared_types and isinstance(value, self.shared_types):
+            shared[id(value)] = getattr(value, "nbytes", None) or sys.getsizeof(value)
+            return 0
+        size = sys.getsizeof(value)
+        if isinstance(value, np.ndarray):
+            # getsizeof already includes owned data; a view of a shared array owns nothing
+            return size
+        if isinstance(value, dict):
+            size += sum(self._size(k, seen, shared) + self._size(v, seen, shared) for k, v in value.items())
+        elif isinstance(value, (list, tuple, set, frozenset)):
+            size += sum(self._size(item, seen, shared) for item in value)
+        elif hasattr(value, "__dict__"):
+            size += self._size(vars(value), seen, shared)
+        elif hasattr(type(value), "__slots__"):
+            for slot in type(value).__slots__:
+                size += self._size(getattr(value, slot, None), seen, shared)
+        return size
+
+    def report(self, session_id, state, force=False):
+        """Measure a session if it is due (or ``force``), forget sessions not seen for ``session_ttl``.
+
+        Returns (own bytes per key, shared bytes) when measured, else None.
+        """
+        reruns = state.get(_RERUNS_KEY, 0)
+        state[_RERUNS_KEY] = reruns + 1
+        now = self._clock()
+        if not force and reruns % self.report_every:
+            with self._lock:
+                self.counters["reports_skipped"] += 1
+                entry = self._sessions.get(session_id)
+                if entry is not None:
+                    entry["last_seen"] = now
+            if entry is not None:
+                return None
+
+        per_key, shared_bytes = self.footprint(state)
+        with self._lock:
+            self.counters["reports"] += 1
+            self._sessions[session_id] = {
+                "bytes": sum(per_key.values()),
+                "shared_bytes": shared_bytes,
+                "keys": len(per_key),
+                "last_seen": now
+            }
+            for stale in [sid for sid, entry in self._sessions.items() if now - entry["last_seen"] > self.session_ttl]:
+                del self._sessions[stale]
+        return per_key, shared_bytes
+
+    def forget(self, session_id):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def totals(self):
+        """Sessions tracked, their total and largest own bytes"""
+        with self._lock:
+            sizes = [entry["bytes"] for entry in self._sessions.values()]
+        return {
+            "sessions": len(sizes),
+            "total_bytes": sum(sizes),
+            "max_session_bytes": max(sizes, default=0),
+            "mean_session_bytes": sum(sizes) / len(sizes) if sizes else 0
+        }
@@ -0,0 +1,479 @@
+import io
+import itertools
+import json
+import time
+import uuid
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+
+from booking_store import DEFAULT_DB_PATH, BookingRepository, ConnectionPool
+from flight_results import COLUMNS, FlightResults
+from price_alerts import SavedSearchStore
+from search_cache import SearchCache
+from seat_inventory import DEFAULT_CAPACITY, DEFAULT_HOLD_SECONDS, HoldSweeper, SeatInventory
+from suppliers import SupplierResult
+
+DEFAULT_STATE_PATH = Path(__file__).parent / "shared_state.db"
+
+# Seat changes kept for changed_since(); older versions report "unknown", as in SeatInventory
+CHANGE_LOG_SIZE = 10_000
+
+# SQLite's default limit on parameters in one statement is 999
+_MAX_PARAMS = 900
+
+# Bumped when cached values change format; older entries are dropped on open
+CACHE_FORMAT_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS search_cache (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS seats (
+    flight_id TEXT NOT NULL,
+    fare_class INTEGER NOT NULL,
+    capacity INTEGER NOT NULL,
+    available INTEGER NOT NULL,
+    sold INTEGER NOT NULL DEFAULT 0,
+    version INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (flight_id, fare_class)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS seat_holds (
+    hold_id TEXT PRIMARY KEY,
+    flight_id TEXT NOT NULL,
+    fare_class INTEGER NOT NULL,
+    seats INTEGER NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_seat_holds_expiry ON seat_holds (expires_at);
+CREATE TABLE IF NOT EXISTS seat_changes (
+    version INTEGER PRIMARY KEY AUTOINCREMENT,
+    flight_id TEXT NOT NULL
+);
+"""
+
+
+class StateBackend:
+    """Where the state shared between sessions lives: search results, seat counts and bookings.
+
+    The app asks its backend for each store once per process. Every store
+    keeps the interface of the in-process class it stands in for
+    (SearchCache, SeatInventory, BookingRepository), so nothing above
+    them changes when the backend does.
+    """
+
+    name = None
+
+    def search_cache(self, max_entries=256, ttl_seconds=300):
+        raise NotImplementedError
+
+    def seat_inventory(self, fare_classes):
+        raise NotImplementedError
+
+    def booking_repository(self):
+        return BookingRepository(self.bookings_path)
+
+    def saved_searches(self):
+        return SavedSearchStore(self.bookings_path)
+
+
+class InProcessBackend(StateBackend):
+    """State held in this process: fastest, but every worker process has its own searches and seats"""
+
+    name = "memory"
+
+    def __init__(self, bookings_path=DEFAULT_DB_PATH):
+        self.bookings_path = bookings_path
+
+    def search_cache(self, max_entries=256, ttl_seconds=300):
+        return SearchCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+
+    def seat_inventory(self, fare_classes):
+        return SeatInventory(fare_classes)
+
+
+class SQLiteBackend(StateBackend):
+    """State in one SQLite file, so every worker process on the host sees the same searches and seats"""
+
+    name = "sqlite"
+
+    def __init__(self, path=DEFAULT_STATE_PATH, bookings_path=DEFAULT_DB_PATH, pool_size=8):
+        self.path = path
+        self.bookings_path = bookings_path
+        self.pool = ConnectionPool(path, size=pool_size)
+        with self.pool.connection() as conn:
+            conn.executescript(SCHEMA)
+        with self.pool.transaction() as conn:
+            if conn.execute("PRAGMA user_version").fetchone()[0] < CACHE_FORMAT_VERSION:
+                # Only a cache: entries in an older (e.g. pickled) format are recomputed rather than read
+                conn.execute("DELETE FROM search_cache")
+                conn.execute(f"PRAGMA user_version = {CACHE_FORMAT_VERSION}")
+
+    def search_cache(self, max_entries=256, ttl_seconds=300):
+        return SQLiteSearchCache(self.pool, max_entries=max_entries, ttl_seconds=ttl_seconds)
+
+    def seat_inventory(self, fare_classes):
+        return SQLiteSeatInventory(self.pool, fare_classes)
+
+
+def encode_cached(value):
+    """A search-cache value as .npz bytes: NumPy columns plus JSON metadata, nothing that loads as code"""
+    arrays = {}
+    if isinstance(value, FlightResults):
+        meta = {
+            "type": "flights", "from_city": value.from_city, "to_city": value.to_city,
+            "date": value.date.isoformat() if value.date else None, "airline_names": list(value.airline_names),
+            "fare_classes": list(value.fare_classes), "id_prefix": value.id_prefix,
+            "schedule": value.schedule, "suppliers": []
+        }
+        for name in COLUMNS + ("position",):
+            arrays[name] = getattr(value, name)
+        for i, answer in enumerate(value.suppliers):
+            meta["suppliers"].append({
+                "code": answer.code, "status": answer.status, "elapsed_ms": answer.elapsed_ms,
+                "hedged": answer.hedged, "rows": answer.rows is not None
+            })
+            if answer.rows is not None:
+                arrays[f"supplier_{i}"] = answer.rows
+    elif isinstance(value, tuple):
+        # Plain data such as connecting itineraries
+        meta = {"type": "tuple", "items": list(value)}
+    else:
+        raise TypeError(f"Cannot share a {type(value).__name__} through the search cache")
+    buffer = io.BytesIO()
+    np.savez(buffer, meta=np.array(json.dumps(meta)), **arrays)
+    return buffer.getvalue()
+
+
+def decode_cached(blob, key):
+    """The value ``encode_cached`` stored for ``key``; refuses pickled objects"""
+    with np.load(io.BytesIO(blob), allow_pickle=False) as data:
+        meta = json.loads(data["meta"].item())
+        if meta["type"] == "tuple":
+            return tuple(meta["items"])
+        suppliers = [
+            SupplierResult(answer["code"], data[f"supplier_{i}"] if answer["rows"] else None,
+                           answer["status"], answer["elapsed_ms"], answer["hedged"])
+            for i, answer in enumerate(meta["suppliers"])
+        ]
+        return FlightResults(
+            key, meta["from_city"], meta["to_city"], meta["date"] and date.fromisoformat(meta["date"]),
+            meta["airline_names"], meta["fare_classes"], {name: data[name] for name in COLUMNS}, suppliers,
+            positions=data["position"], id_prefix=meta["id_prefix"], schedule=meta.get("schedule")
+        )
+
+
+def backend_from_url(url):
+    """Build a backend from "memory", "sqlite" or "sqlite:<path>" """
+    scheme, _, path = (url or "memory").partition(":")
+    if scheme == "memory":
+        return InProcessBackend()
+    if scheme == "sqlite":
+        return SQLiteBackend(path.removeprefix("//") or DEFAULT_STATE_PATH)
+    raise ValueError(f"Unknown state backend {url!r}; expected 'memory' or 'sqlite[:path]'")
+
+
+class SQLiteSearchCache:
+    """Search cache shared by every process using the same SQLite file.
+
+    Each process keeps its own SearchCache in front (same LRU, TTL and
+    single-flight behaviour), so repeated searches never leave the process.
+    A local miss reads the shared table; a shared miss computes the value
+    and inserts it unless another process got there first, in which case
+    that process's value is used, so all workers agree on a search's
+    flights (and the flight ids seats are held against). Values are stored
+    as NumPy columns and JSON (``encode_cached``), never pickled, so
+    whoever can write the file cannot make a worker run code.
+    """
+
+    def __init__(self, pool, max_entries=256, ttl_seconds=300, clock=time.time):
+        self.pool = pool
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self.local = SearchCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        # The shared counters sit in the local cache's dict, so they share its lock and its stats
+        self.counters = self.local.counters
+        self.local.count(shared_hits=0, shared_writes=0, shared_conflicts=0)
+        self._writes = itertools.count(1)
+
+    def __len__(self):
+        return len(self.local)
+
+    def _load(self, key):
+        """The shared value for ``key`` and whether it is still live; (None, False) if there is none"""
+        with self.pool.connection() as conn:
+            row = conn.execute("SELECT value, expires_at FROM search_cache WHERE key = ?", (repr(key),)).fetchone()
+        if row is None:
+            return None, False
+        return decode_cached(row["value"], key), row["expires_at"] > self._clock()
+
+    def _save(self, key, value, ttl_seconds=None):
+        """Insert ``value`` unless a live entry exists; returns whichever value is stored"""
+        blob = encode_cached(value)
+        now = self._clock()
+        expires_at = now + (self.ttl_seconds if ttl_seconds is None else ttl_seconds)
+        with self.pool.transaction() as conn:
+            conn.execute("DELETE FROM search_cache WHERE key = ? AND expires_at <= ?", (repr(key), now))
+            inserted = conn.execute(
+                "INSERT OR IGNORE INTO search_cache VALUES (?, ?, ?)", (repr(key), blob, expires_at)
+            ).rowcount
+            if not inserted:
+                stored = conn.execute("SELECT value FROM search_cache WHERE key = ?", (repr(key),)).fetchone()
+            if next(self._writes) % 100 == 0:
+                conn.execute("DELETE FROM search_cache WHERE expires_at <= ?", (now,))
+        if inserted:
+            self.local.count(shared_writes=1)
+            return value
+        self.local.count(shared_conflicts=1)
+        return decode_cached(stored["value"], key)
+
+    def _shared(self, key, compute, refresh=None, ttl_of=None, previous=None):
+        value, live = self._load(key)
+        if live:
+            self.local.count(shared_hits=1)
+            return value
+        # Another worker's expired entry may be newer than this process's
+        previous = value if value is not None else previous
+        value = compute() if refresh is None or previous is None else refresh(previous)
+        return self._save(key, value, None if ttl_of is None else ttl_of(value))
+
+    def get(self, key):
+        value = self.local.get(key)
+        if value is None:
+            value, live = self._load(key)
+            if not live:
+                return None
+            self.local.put(key, value)
+        return value
+
+    def put(self, key, value):
+        self.local.put(key, value)
+        blob = encode_cached(value)
+        with self.pool.transaction() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO search_cache VALUES (?, ?, ?)", (repr(key), blob, self._clock() + self.ttl_seconds)
+            )
+
+    def invalidate(self, key=None):
+        self.local.invalidate(key)
+        with self.pool.transaction() as conn:
+            if key is None:
+                conn.execute("DELETE FROM search_cache")
+            else:
+                conn.execute("DELETE FROM search_cache WHERE key = ?", (repr(key),))
+
+    def get_or_compute(self, key, compute, refresh=None, ttl_of=None):
+        """Return the value for ``key`` from this process, then the shared table, computing it at most once per process"""
+        return self.local.get_or_compute(
+            key, lambda: self._shared(key, compute, refresh, ttl_of),
+            refresh=None if refresh is None else lambda previous: self._shared(key, compute, refresh, ttl_of, previous),
+            ttl_of=ttl_of
+        )
+
+    def stats(self):
+        with self.pool.connection() as conn:
+            shared_size = conn.execute("SELECT COUNT(*) FROM search_cache").fetchone()[0]
+        return dict(self.local.stats(), shared_size=shared_size)
+
+    def to_prometheus(self, name="flight_search_cache"):
+        return self.local.to_prometheus(name) + f"# TYPE {name}_shared_size gauge\n{name}_shared_size {self.stats()['shared_size']}\n"
+
+
+class SQLiteSeatInventory(HoldSweeper):
+    """SeatInventory kept in SQLite, so holds and sales are atomic across worker processes.
+
+    Each hold, confirmation or release is one write transaction taken with
+    ``BEGIN IMMEDIATE``; the seat-count update is conditional
+    (``available >= seats``), so two processes can never oversell a class.
+    Every change appends to a change log whose AUTOINCREMENT id is the
+    inventory version, which the pricing and fare-calendar caches use to
+    find flights changed by any process. Hold expiry uses wall-clock time
+    because it is compared across processes.
+    """
+
+    def __init__(self, pool, fare_classes, capacity=DEFAULT_CAPACITY,
+                 hold_seconds=DEFAULT_HOLD_SECONDS, clock=time.time):
+        self.pool = pool
+        self.fare_classes = tuple(fare_classes)
+        self.class_index = {name: i for i, name in enumerate(self.fare_classes)}
+        self.default_capacity = np.array([capacity[name] for name in self.fare_classes], dtype=np.int32)
+        self.hold_seconds = hold_seconds
+        self._clock = clock
+
+    def _ensure(self, conn, flight_id, capacity=None):
+        # Caller is inside a write transaction
+        capacity = self.default_capacity if capacity is None else capacity
+        conn.executemany(
+            "INSERT OR IGNORE INTO seats (flight_id, fare_class, capacity, available) VALUES (?, ?, ?, ?)",
+            [(flight_id, column, int(seats), int(seats)) for column, seats in enumerate(capacity)]
+        )
+
+    def _touch(self, conn, flight_id, column):
+        version = conn.execute("INSERT INTO seat_changes (flight_id) VALUES (?)", (flight_id,)).lastrowid
+        conn.execute("UPDATE seats SET version = ? WHERE flight_id = ? AND fare_class = ?", (version, flight_id, column))
+        if version % 1000 == 0:
+            conn.execute("DELETE FROM seat_changes WHERE version <= ?", (version - CHANGE_LOG_SIZE,))
+
+    def register_flight(self, flight_id, capacity=None):
+        """Add a flight with its own per-class capacity (defaults otherwise)"""
+        if capacity is not None:
+            capacity = [capacity[name] for name in self.fare_classes]
+        with self.pool.transaction() as conn:
+            self._ensure(conn, flight_id, capacity)
+
+    def _count(self, column_name, flight_id, fare_class):
+        column = self.class_index[fare_class]
+        with self.pool.connection() as conn:
+            row = conn.execute(
+                f"SELECT {column_name} FROM seats WHERE flight_id = ? AND fare_class = ?", (flight_id, column)
+            ).fetchone()
+        if row is None:
+            return int(self.default_capacity[column]) if column_name == "available" else 0
+        return row[0]
+
+    def available(self, flight_id, fare_class):
+        return self._count("available", flight_id, fare_class)
+
+    def available_many(self, flight_ids, fare_classes):
+        """available() for several flights in one query"""
+        flight_ids = list(flight_ids)
+        columns = [self.class_index[fare_class] for fare_class in fare_classes]
+        counts = {}
+        unique = list(dict.fromkeys(flight_ids))
+        with self.pool.connection() as conn:
+            for start in range(0, len(unique), _MAX_PARAMS):
+                batch = unique[start:start + _MAX_PARAMS]
+                rows = conn.execute(
+                    f"SELECT flight_id, fare_class, available FROM seats "
+                    f"WHERE flight_id IN ({','.join('?' * len(batch))})", batch
+                ).fetchall()
+                counts.update(((row[0], row[1]), row[2]) for row in rows)
+        return [
+            counts.get((flight_id, column), int(self.default_capacity[column]))
+            for flight_id, column in zip(flight_ids, columns)
+        ]
+
+    def sold(self, flight_id, fare_class):
+        return self._count("sold", flight_id, fare_class)
+
+    @property
+    def version(self):
+        with self.pool.connection() as conn:
+            row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'seat_changes'").fetchone()
+        return 0 if row is None else row[0]
+
+    def flight_version(self, flight_id):
+        """Counter bumped whenever the flight's seat counts change"""
+        with self.pool.connection() as conn:
+            row = conn.execute("SELECT MAX(version) FROM seats WHERE flight_id = ?", (flight_id,)).fetchone()
+        return row[0] or 0
+
+    def changed_since(self, version):
+        """Flight ids changed after inventory ``version``, or None if the log no longer reaches back that far"""
+        with self.pool.connection() as conn:
+            oldest, latest = conn.execute("SELECT MIN(version), MAX(version) FROM seat_changes").fetchone()
+            if latest is None or latest <= version:
+                return set()
+            if oldest > version + 1:
+                return None
+            rows = conn.execute("SELECT DISTINCT flight_id FROM seat_changes WHERE version > ?", (version,)).fetchall()
+        return {row[0] for row in rows}
+
+    def load_factors(self, flight_ids, fare_class_codes):
+        """Share of each flight's class capacity that is sold or held (0 for unseen flights)"""
+        flight_ids = list(flight_ids)
+        counts = {}
+        unique = list(dict.fromkeys(flight_ids))
+        with self.pool.connection() as conn:
+            for start in range(0, len(unique), _MAX_PARAMS):
+                batch = unique[start:start + _MAX_PARAMS]
+                rows = conn.execute(
+                    f"SELECT flight_id, fare_class, capacity, available FROM seats "
+                    f"WHERE flight_id IN ({','.join('?' * len(batch))})", batch
+                ).fetchall()
+                for row in rows:
+                    counts[row[0], row[1]] = (row[2] - row[3]) / row[2]
+        return np.array(
+            [counts.get((flight_id, int(column)), 0.0) for flight_id, column in zip(flight_ids, fare_class_codes)],
+            dtype=np.float64
+        )
+
+    def hold(self, flight_id, fare_class, seats, hold_seconds=None):
+        """Take ``seats`` out of sale; returns a hold id, or None if not enough are left"""
+        column = self.class_index[fare_class]
+        expires_at = self._clock() + (self.hold_seconds if hold_seconds is None else hold_seconds)
+        with self.pool.transaction() as conn:
+            self._ensure(conn, flight_id)
+            taken = conn.execute(
+                "UPDATE seats SET available = available - ? WHERE flight_id = ? AND fare_class = ? AND available >= ?",
+                (seats, flight_id, column, seats)
+            ).rowcount
+            if not taken:
+                return None
+            hold_id = uuid.uuid4().hex
+            conn.execute("INSERT INTO seat_holds VALUES (?, ?, ?, ?, ?)", (hold_id, flight_id, column, seats, expires_at))
+            self._touch(conn, flight_id, column)
+        return hold_id
+
+    def confirm(self, hold_id):
+        """Turn a live hold into sold seats; False if it expired or is unknown"""
+        return self.confirm_all([hold_id])
+
+    def confirm_all(self, hold_ids):
+        """Confirm several holds (e.g. both legs of a round trip) all or nothing.
+
+        If any hold is unknown or expired, none are confirmed; expired holds
+        are released and the rest stay held.
+        """
+        hold_ids = list(hold_ids)
+        with self.pool.transaction() as conn:
+            now = self._clock()
+            holds = conn.execute(
+                f"SELECT * FROM seat_holds WHERE hold_id IN ({','.join('?' * len(hold_ids))})", hold_ids
+            ).fetchall()
+            if len(holds) == len(set(hold_ids)) and all(hold["expires_at"] > now for hold in holds):
+                for hold in holds:
+                    conn.execute("DELETE FROM seat_holds WHERE hold_id = ?", (hold["hold_id"],))
+                    conn.execute(
+                        "UPDATE seats SET sold = sold + ? WHERE flight_id = ? AND fare_class = ?",
+                        (hold["seats"], hold["flight_id"], hold["fare_class"])
+                    )
+                    self._touch(conn, hold["flight_id"], hold["fare_class"])
+                return True
+            for hold in holds:
+                if hold["expires_at"] <= now:
+                    self._return_seats(conn, hold)
+            return False
+
+    def release(self, hold_id):
+        """Give a hold's seats back; False if it was already confirmed, released or swept"""
+        with self.pool.transaction() as conn:
+            hold = conn.execute("SELECT * FROM seat_holds WHERE hold_id = ?", (hold_id,)).fetchone()
+            if hold is None:
+                return False
+            self._return_seats(conn, hold)
+            return True
+
+    def _return_seats(self, conn, hold):
+        # Caller is inside a write transaction
+        conn.execute("DELETE FROM seat_holds WHERE hold_id = ?", (hold["hold_id"],))
+        conn.execute(
+            "UPDATE seats SET available = available + ? WHERE flight_id = ? AND fare_class = ?",
+            (hold["seats"], hold["flight_id"], hold["fare_class"])
+        )
+        self._touch(conn, hold["flight_id"], hold["fare_class"])
+
+    def sweep_expired(self):
+        """Release every expired hold; returns how many were released"""
+        with self.pool.transaction() as conn:
+            expired = conn.execute("SELECT * FROM seat_holds WHERE expires_at <= ?", (self._clock(),)).fetchall()
+            for hold in expired:
+                self._return_seats(conn, hold)
+        return len(expired)
+
+    def active_holds(self):
+        with self.pool.connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM seat_holds").fetchone()[0]
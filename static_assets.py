@@ -0,0 +1,46 @@
+import base64
+import hashlib
+import re
+from pathlib import Path
+
+STATIC_DIR = Path(__file__).parent / "static"
+
+# URL prefix Streamlit serves ./static under when server.enableStaticServing is on
+STATIC_URL = "app/static"
+
+_LOGO_URL = re.compile(r'url\("logos/([^".]+)\.svg"\)')
+
+
+class StaticAssets:
+    """Logos and stylesheet loaded and encoded once per process.
+
+    The stylesheet in ``static/flight-app.css`` refers to each airline logo by
+    a ``.logo-<code>`` class, so cards only carry that short class name. When
+    Streamlit static file serving is enabled the browser fetches and caches
+    the stylesheet and logos itself; otherwise the stylesheet is inlined with
+    the logos embedded once as data URIs.
+    """
+
+    def __init__(self, static_dir=STATIC_DIR, static_serving=False):
+        self.static_serving = static_serving
+
+        self.logo_uris = {}
+        for path in sorted((static_dir / "logos").glob("*.svg")):
+            encoded = base64.b64encode(path.read_bytes()).decode()
+            self.logo_uris[path.stem] = f"data:image/svg+xml;base64,{encoded}"
+
+        css = (static_dir / "flight-app.css").read_text()
+        self.stylesheet_hash = hashlib.sha256(css.encode()).hexdigest()[:12]
+        self.inline_stylesheet = _LOGO_URL.sub(lambda m: f'url("{self.logo_uris[m.group(1)]}")', css)
+
+        if static_serving:
+            # Versioned by content hash so browsers cache it until the CSS changes
+            self.stylesheet_tag = (
+                f'<style>@import url("{STATIC_URL}/flight-app.css?v={self.stylesheet_hash}");</style>'
+            )
+        else:
+            self.stylesheet_tag = f"<style>{self.inline_stylesheet}</style>"
+
+    def logo_html(self, code):
+        """Markup for an airline logo, referencing the stylesheet by code"""
+        return f'<span class="airline-logo logo-{code}"></span>'
@@ -0,0 +1,237 @@
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+# Simulated median latency (ms) and failure rate of each carrier's availability API
+DEFAULT_SUPPLIER_PROFILES = {
+    "6E": (90, 0.01),
+    "AI": (180, 0.03),
+    "SG": (120, 0.02),
+    "UK": (150, 0.01),
+    "QP": (70, 0.02),
+    "9I": (110, 0.02)
+}
+
+# Latency samples needed before a supplier's hedge delay tracks its own percentile
+_MIN_HEDGE_SAMPLES = 20
+
+
+class SupplierError(Exception):
+    """A supplier failed to answer a search"""
+
+
+class CircuitBreaker:
+    """Stops calling a failing supplier for a while, then lets one trial call through.
+
+    Closed: calls go through. After ``failure_threshold`` consecutive
+    failures it opens and calls are refused for ``reset_after`` seconds.
+    It then goes half-open: one trial call decides whether it closes again
+    or re-opens.
+    """
+
+    def __init__(self, failure_threshold=5, reset_after=30.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_after = reset_after
+        self._clock = clock
+        self.state = "closed"
+        self.failures = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == "open" and self._clock() - self._opened_at >= self.reset_after:
+                self.state = "half_open"
+            if self.state == "closed":
+                return True
+            if self.state == "half_open" and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_running = False
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                self.state = "open"
+                self._opened_at = self._clock()
+
+
+class SimulatedSupplier:
+    """Local stand-in for one airline's availability API.
+
+    Answers with the rows of ``source(from_city, to_city, day)`` flown by
+    its airline, after a log-normally distributed delay around
+    ``latency_ms``, and fails at ``failure_rate``.
+    """
+
+    def __init__(self, code, airline, source, latency_ms=100, jitter=0.5, failure_rate=0.0, seed=None):
+        self.code = code
+        self.airline = airline
+        self.source = source
+        self.latency_ms = latency_ms
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        # random.Random is safe to share between the sessions' threads
+        self._random = random.Random(seed)
+
+    async def search(self, from_city, to_city, day):
+        await asyncio.sleep(self.latency_ms * self._random.lognormvariate(0, self.jitter) / 1000)
+        if self._random.random() < self.failure_rate:
+            raise SupplierError(f"{self.code} availability request failed")
+        columns = self.source(from_city, to_city, day)
+        return np.flatnonzero(columns["airline"] == self.airline)
+
+
+class SupplierResult:
+    """One supplier's answer to a fan-out search"""
+
+    __slots__ = ("code", "rows", "status", "elapsed_ms", "hedged")
+
+    def __init__(self, code, rows, status, elapsed_ms, hedged=False):
+        self.code = code
+        self.rows = rows
+        self.status = status
+        self.elapsed_ms = elapsed_ms
+        self.hedged = hedged
+
+    @property
+    def ok(self):
+        return self.status == "ok"
+
+
+def simulated_suppliers(airlines, source, profiles=DEFAULT_SUPPLIER_PROFILES):
+    """One SimulatedSupplier per airline, answering from ``source`` with its carrier's latency profile"""
+    suppliers = []
+    for airline, info in enumerate(airlines.values()):
+        latency_ms, failure_rate = profiles[info["code"]]
+        suppliers.append(SimulatedSupplier(info["code"], airline, source, latency_ms=latency_ms, failure_rate=failure_rate))
+    return suppliers
+
+
+def _consume(task):
+    # The losing request of a hedged pair may still fail after the call has returned
+    if not task.cancelled():
+        task.exception()
+
+
+def merge_rows(answers):
+    """Rows from every successful answer, in source (departure) order"""
+    parts = [answer.rows for answer in answers if answer.ok]
+    if not parts:
+        return np.zeros(0, dtype=np.int64)
+    return np.sort(np.concatenate(parts))
+
+
+class FanOutSearch:
+    """Queries every supplier concurrently and streams each answer as it arrives.
+
+    Each call has its own ``timeout`` and circuit breaker. A call still
+    running after the supplier's recent ``hedge_quantile`` latency gets a
+    duplicate request, and whichever answers first wins, which cuts the
+    tail without doubling the load. ``hedge_after`` is the delay used until
+    enough latencies have been seen (None disables hedging).
+    """
+
+    def __init__(self, suppliers, timeout=1.0, hedge_after=0.3, hedge_quantile=0.95,
+                 breaker_factory=CircuitBreaker, clock=time.perf_counter):
+        self.suppliers = list(suppliers)
+        self.timeout = timeout
+        self.hedge_after = hedge_after
+        self.hedge_quantile = hedge_quantile
+        self._clock = clock
+        self.breakers = {supplier.code: breaker_factory() for supplier in self.suppliers}
+        self._latencies = {supplier.code: deque(maxlen=200) for supplier in self.suppliers}
+
+    def hedge_delay(self, code):
+        """Seconds to wait before hedging a call to ``code``, or None if hedging is off"""
+        if self.hedge_after is None:
+            return None
+        samples = list(self._latencies[code])
+        if len(samples) < _MIN_HEDGE_SAMPLES:
+            return self.hedge_after
+        return float(np.quantile(samples, self.hedge_quantile))
+
+    def _request(self, supplier, from_city, to_city, day):
+        task = asyncio.ensure_future(supplier.search(from_city, to_city, day))
+        task.add_done_callback(_consume)
+        return task
+
+    async def _call(self, supplier, from_city, to_city, day):
+        breaker = self.breakers[supplier.code]
+        if not breaker.allow():
+            return SupplierResult(supplier.code, None, "circuit_open", 0.0)
+
+        started = self._clock()
+        deadline = started + self.timeout
+        hedge_delay = self.hedge_delay(supplier.code)
+        hedge_at = None if hedge_delay is None else started + hedge_delay
+        pending = {self._request(supplier, from_city, to_city, day)}
+        hedged = False
+        status = "timeout"
+        try:
+            while pending:
+                wake_at = deadline if hedged or hedge_at is None else min(hedge_at, deadline)
+                done, pending = await asyncio.wait(
+                    pending, timeout=max(wake_at - self._clock(), 0), return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        elapsed = self._clock() - started
+                        self._latencies[supplier.code].append(elapsed)
+                        breaker.record_success()
+                        return SupplierResult(supplier.code, task.result(), "ok", elapsed * 1000, hedged)
+                    status = "error"
+                if self._clock() >= deadline:
+                    status = "timeout"
+                    break
+                if not hedged and hedge_at is not None and self._clock() >= hedge_at:
+                    pending.add(self._request(supplier, from_city, to_city, day))
+                    hedged = True
+        finally:
+            for task in pending:
+                task.cancel()
+        breaker.record_failure()
+        return SupplierResult(supplier.code, None, status, (self._clock() - started) * 1000, hedged)
+
+    async def stream(self, from_city, to_city, day, codes=None):
+        """Yield a SupplierResult per supplier (or per supplier in ``codes``), fastest first"""
+        calls = [
+            asyncio.ensure_future(self._call(supplier, from_city, to_city, day))
+            for supplier in self.suppliers if codes is None or supplier.code in codes
+        ]
+        try:
+            for call in asyncio.as_completed(calls):
+                yield await call
+        finally:
+            for call in calls:
+                call.cancel()
+
+    async def search(self, from_city, to_city, day, codes=None):
+        return [answer async for answer in self.stream(from_city, to_city, day, codes)]
+
+    def iter_results(self, from_city, to_city, day, codes=None):
+        """Blocking iterator over stream() for callers without an event loop (e.g. a Streamlit rerun)"""
+        loop = asyncio.new_event_loop()
+        answers = self.stream(from_city, to_city, day, codes)
+        try:
+            while True:
+                try:
+                    yield loop.run_until_complete(answers.__anext__())
+                except StopAsyncIteration:
+                    return
+        finally:
+            loop.run_until_complete(answers.aclose())
+            loop.close()
@@ -0,0 +1,27 @@
+from datetime import date
+
+import pytest
+
+from fare_calendar import FareCalendars
+from flight_search import FlightSearch
+from pricing import PricingEngine
+from reference_data import AIRLINES, FARE_CLASSES
+from search_cache import SearchCache, normalize_city
+from seat_inventory import SeatInventory
+from suppliers import FanOutSearch, simulated_suppliers
+
+
+@pytest.fixture
+def flight_search():
+    """A FlightSearch wired as the app wires it, with fast suppliers that never fail"""
+    engine = PricingEngine(AIRLINES, FARE_CLASSES)
+    calendars = FareCalendars(engine, len(AIRLINES), FARE_CLASSES)
+
+    def day_columns(from_city, to_city, day):
+        return calendars.get(normalize_city(from_city), normalize_city(to_city), date.today()).day_columns(day)
+
+    profiles = {info["code"]: (1, 0.0) for info in AIRLINES.values()}
+    supplier_search = FanOutSearch(simulated_suppliers(AIRLINES, day_columns, profiles), hedge_after=None)
+    return FlightSearch(
+        SearchCache(), calendars, SeatInventory(FARE_CLASSES), supplier_search, engine, AIRLINES.keys(), FARE_CLASSES
+    )
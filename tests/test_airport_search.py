@@ -0,0 +1,35 @@
+import pytest
+
+from airport_search import SHORT_PREFIX_TOP, AirportIndex, load_airports, normalize_text
+
+
+@pytest.fixture(scope="module")
+def index():
+    return AirportIndex(load_airports())
+
+
+def test_an_exact_airport_code_comes_before_more_popular_prefix_matches(index):
+    assert index.labels[index.prefix_matches("pat")[0]] != "Patna (PAT)"
+    assert index.search("PAT")[0] == "Patna (PAT)"
+
+
+def test_names_aliases_and_words_match_by_prefix_most_popular_first(index):
+    assert index.search("heathrow") == ["London (LHR)"]
+    assert index.search("  new   york", limit=2) == ["New York (JFK)", "Newark (EWR)"]
+    assert index.search("l", limit=2) == ["London (LHR)", "Newark (EWR)"]
+    popularity = [index.popularity[i] for i in index.prefix_matches("l")]
+    assert popularity == sorted(popularity, reverse=True)
+
+
+def test_typos_fall_back_to_trigram_matches(index):
+    assert index.search("mumbia") == ["Mumbai (BOM)"]
+    assert index.search("bangaluru")[0] == "Bangalore (BLR)"
+    assert index.search("zzzz") == [] and index.search("  ") == []
+    assert normalize_text("São-Paulo ") == "sao paulo"
+
+
+def test_short_prefixes_rank_the_same_airports_as_a_full_scan(index):
+    for prefix in index.short_prefixes:
+        assert index.prefix_matches(prefix) == index._scan(prefix, 10)
+    assert index.prefix_matches("qx") == []
+    assert len(index.prefix_matches("a", limit=SHORT_PREFIX_TOP + 1)) > SHORT_PREFIX_TOP
@@ -0,0 +1,92 @@
+from datetime import date
+
+import pytest
+
+from booking_export import BookingAnalytics, BookingExporter
+from booking_store import BookingRepository
+
+# The exporter needs the optional analytics dependency
+pytest.importorskip("pyarrow")
+
+
+def flight(day, flight_number, from_city="Mumbai (BOM)", to_city="Delhi (DEL)", price=5000):
+    return {
+        "id": f"BOM-DEL-{day:%Y%m%d}-0", "airline": "IndiGo", "flight_number": flight_number,
+        "from_city": from_city, "to_city": to_city, "date": day, "fare_class": "Economy", "price": price
+    }
+
+
+def book(repository, outbound, return_flight=None, passengers=2):
+    total = (outbound["price"] + (return_flight["price"] if return_flight else 0)) * passengers
+    booking = {
+        "trip_type": "round_trip" if return_flight else "one_way", "flight": outbound,
+        "return_flight": return_flight, "payment_method": "UPI", "total_price": total
+    }
+    repository.create_booking(booking, [{"first_name": f"P{i}", "last_name": "Rao"} for i in range(passengers)])
+    return total
+
+
+def test_exported_bookings_read_back_with_their_totals(tmp_path):
+    repository = BookingRepository(tmp_path / "bookings.db")
+    exporter = BookingExporter(repository, root=tmp_path / "exports", settle_seconds=0)
+    analytics = BookingAnalytics(tmp_path / "exports")
+    revenue = book(repository, flight(date(2026, 11, 3), "6E 201"))
+    # A round trip over a month end puts one leg in each month's partition
+    revenue += book(repository, flight(date(2026, 11, 28), "6E 202", price=4000),
+                    flight(date(2026, 12, 2), "6E 203", "Delhi (DEL)", "Mumbai (BOM)", price=6000), passengers=3)
+
+    assert exporter.run_once()["bookings"] == 2
+    assert analytics.months() == [date(2026, 11, 1), date(2026, 12, 1)]
+    totals = analytics.revenue_by_airline().to_pylist()
+    assert totals == [{"airline": "IndiGo", "revenue": revenue, "passengers": 2 + 3 + 3, "legs": 3}]
+    november = analytics.revenue_by_airline(start=date(2026, 11, 1), end=date(2026, 11, 30)).to_pylist()
+    assert november[0]["legs"] == 2
+
+    # The watermark moved: a new round exports only the booking stored since
+    assert exporter.run_once()["bookings"] == 0
+    revenue += book(repository, flight(date(2026, 12, 9), "6E 204"))
+    assert exporter.run_once()["bookings"] == 1
+    assert analytics.revenue_by_airline().to_pylist()[0]["revenue"] == revenue
+
+
+def test_only_the_worker_holding_the_lease_exports(tmp_path):
+    repository = BookingRepository(tmp_path / "bookings.db")
+    exporter = BookingExporter(repository, root=tmp_path / "exports", settle_seconds=0)
+    other = BookingExporter(repository, root=tmp_path / "exports", settle_seconds=0)
+    book(repository, flight(date(2026, 11, 3), "6E 201"))
+
+    assert other._claim() is not None
+    assert exporter.run_once() is None
+    other._release()
+    assert exporter.run_once()["bookings"] == 1
+    assert other.run_once()["bookings"] == 0
+
+
+def test_a_daily_flight_number_counts_each_day_s_seats(tmp_path):
+    repository = BookingRepository(tmp_path / "bookings.db")
+    exporter = BookingExporter(repository, root=tmp_path / "exports", settle_seconds=0)
+    analytics = BookingAnalytics(tmp_path / "exports")
+    for day in (date(2026, 11, 3), date(2026, 11, 4)):
+        book(repository, flight(day, "6E 201"), passengers=3)
+    exporter.run_once()
+
+    assert analytics.load_factor_by_route().to_pylist() == [
+        {"route": "BOM-DEL", "passengers": 6, "seats": 2 * 150, "load_factor": 6 / 300}
+    ]
+
+
+def test_a_day_and_route_filter_skips_other_row_groups(tmp_path):
+    repository = BookingRepository(tmp_path / "bookings.db")
+    exporter = BookingExporter(repository, root=tmp_path / "exports", settle_seconds=0, row_group_rows=2)
+    analytics = BookingAnalytics(tmp_path / "exports")
+    for day in range(1, 6):
+        for _ in range(2):
+            book(repository, flight(date(2026, 11, day), "6E 201"))
+            book(repository, flight(date(2026, 11, day), "6E 301", "Delhi (DEL)", "Goa (GOI)"))
+    exporter.run_once()
+
+    november_3 = date(2026, 11, 3)
+    read, total = analytics.row_groups(november_3, november_3, routes=["BOM-DEL"])
+    assert total == 10 and read == 1
+    assert analytics.row_groups() == (total, total)
+    assert analytics.revenue_by_airline(november_3, november_3, routes=["BOM-DEL"]).to_pylist()[0]["legs"] == 2
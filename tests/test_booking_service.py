@@ -0,0 +1,152 @@
+import http.client
+import json
+import threading
+from datetime import date, timedelta
+
+import pytest
+
+from booking_service import BookingRequestError, BookingService, make_server
+from booking_store import BookingRepository
+
+DAY = date.today() + timedelta(days=10)
+# Fits any fare class, so every flight on the day can take the group
+PARTY = 10
+
+
+@pytest.fixture
+def service(flight_search, tmp_path):
+    return BookingService(
+        flight_search, flight_search.engine, flight_search.inventory, BookingRepository(tmp_path / "bookings.db")
+    )
+
+
+def booking_request(flight, party):
+    return {
+        "flights": [{"from_city": "BOM", "to_city": "DEL", "date": DAY.isoformat(), "flight_id": flight["id"]}],
+        "passengers": [{"first_name": f"Traveller{i}", "last_name": "Group"} for i in range(party)],
+        "email": "desk@example.com",
+        "phone": "+919876543210"
+    }
+
+
+def seats_left(service, flight_id, passengers):
+    return next(f["seats_left"] for f in service.search("BOM", "DEL", DAY, passengers) if f["id"] == flight_id)
+
+
+def test_an_id_from_a_single_passenger_search_books_a_group(service):
+    flight = service.search("BOM", "DEL", DAY, passengers=1)[0]
+    result = service.book(booking_request(flight, PARTY))
+    assert result["passengers"] == PARTY
+    assert seats_left(service, flight["id"], PARTY) == flight["seats_left"] - PARTY
+
+
+def test_a_hold_swept_before_it_is_confirmed_is_taken_again(service, monkeypatch):
+    inventory = service.inventory
+    confirm_all = inventory.confirm_all
+
+    def swept_first(hold_ids):
+        monkeypatch.setattr(inventory, "confirm_all", confirm_all)
+        for hold_id in hold_ids:
+            inventory.release(hold_id)
+        return confirm_all(hold_ids)
+
+    monkeypatch.setattr(inventory, "confirm_all", swept_first)
+    flight = service.search("BOM", "DEL", DAY)[0]
+    result = service.book(booking_request(flight, PARTY))
+    assert service.get_booking(result["reference"], "group")["passengers"] == PARTY
+    assert seats_left(service, flight["id"], 1) == flight["seats_left"] - PARTY
+    assert inventory.active_holds() == 0
+
+
+def test_a_booking_whose_seats_are_gone_is_refused_and_not_stored(service, monkeypatch):
+    inventory = service.inventory
+    confirm_all = inventory.confirm_all
+    flight = service.search("BOM", "DEL", DAY)[0]
+
+    def sold_meanwhile(hold_ids):
+        monkeypatch.setattr(inventory, "confirm_all", confirm_all)
+        for hold_id in hold_ids:
+            inventory.release(hold_id)
+        inventory.hold(flight["id"], flight["fare_class"], inventory.available(flight["id"], flight["fare_class"]))
+        return confirm_all(hold_ids)
+
+    monkeypatch.setattr(inventory, "confirm_all", sold_meanwhile)
+    result = service.book_many([booking_request(flight, PARTY)])[0]
+    assert result["status"] == 409
+    assert service.repository.count() == 0
+    assert service.stats()["unconfirmed"] == 1
+
+
+def test_an_internal_error_is_logged_but_not_sent_to_the_client(service, monkeypatch, capsys):
+    def broken_search(*args, **kwargs):
+        raise RuntimeError("connection string with a password")
+
+    monkeypatch.setattr(service, "search", broken_search)
+    server = make_server(service, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        conn = http.client.HTTPConnection("127.0.0.1", server.server_address[1])
+        conn.request("GET", f"/flights?from_city=BOM&to_city=DEL&date={DAY}")
+        response = conn.getresponse()
+        body = json.loads(response.read())
+        conn.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert response.status == 500
+    assert body == {"errors": ["Internal server error."]}
+    assert "connection string with a password" in capsys.readouterr().err
+
+
+def test_a_booking_is_found_only_with_a_passenger_name_or_the_booking_email(service):
+    flight = service.search("BOM", "DEL", DAY)[0]
+    reference = service.book(booking_request(flight, 2))["reference"]
+    assert service.get_booking(reference.lower(), "GROUP")["reference"] == reference
+    assert service.get_booking(reference, "Desk@Example.com")["reference"] == reference
+    for last_name_or_email in ("Other", "someone@example.com"):
+        with pytest.raises(BookingRequestError) as refused:
+            service.get_booking(reference, last_name_or_email)
+        assert refused.value.status == 404
+    with pytest.raises(BookingRequestError):
+        service.get_booking(reference, "")
+
+
+def test_a_booking_is_invisible_until_its_seats_are_sold(service, monkeypatch):
+    inventory = service.inventory
+    confirm_all = inventory.confirm_all
+    seen = []
+
+    def looking_meanwhile(hold_ids):
+        repository = service.repository
+        seen.append((
+            repository.find_by_passenger("Group"), repository.count(),
+            repository.created_between((0, ""), float("inf"))
+        ))
+        return confirm_all(hold_ids)
+
+    monkeypatch.setattr(inventory, "confirm_all", looking_meanwhile)
+    flight = service.search("BOM", "DEL", DAY)[0]
+    reference = service.book(booking_request(flight, 2))["reference"]
+    assert seen == [([], 0, [])]
+    assert service.get_booking(reference, "Group")["status"] == "confirmed"
+    assert [booking["reference"] for booking in service.repository.created_between((0, ""), float("inf"))] == [reference]
+
+
+@pytest.mark.parametrize("length, status", [("abc", 400), ("-1", 400), ("1.5", 400), (str(10 ** 9), 413)])
+def test_a_bad_content_length_is_refused_without_reading_the_body(service, length, status):
+    server = make_server(service, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        conn = http.client.HTTPConnection("127.0.0.1", server.server_address[1], timeout=5)
+        conn.putrequest("POST", "/bookings")
+        conn.putheader("Content-Length", length)
+        conn.endheaders()
+        response = conn.getresponse()
+        body = json.loads(response.read())
+        conn.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert response.status == status
+    assert response.getheader("Connection") == "close"
+    assert "Content-Length" in body["errors"][0] or "at most" in body["errors"][0]
@@ -0,0 +1,57 @@
+from datetime import date, timedelta
+
+DAY = date.today() + timedelta(days=10)
+
+
+def flight_ids(results):
+    return [results.flight_id(row) for row in range(len(results))]
+
+
+def test_every_spelling_of_a_search_shares_one_store(flight_search):
+    by_label = flight_search.search("Mumbai (BOM)", "Delhi (DEL)", DAY)
+    by_code = flight_search.search("BOM", "DEL", DAY)
+    assert by_label is by_code
+    assert flight_search.cache.stats()["size"] == 1
+
+    # Party size only changes the price, computed per party over the shared store
+    single = flight_search.engine.snapshot(by_code, 1, date.today(), flight_search.inventory)
+    four = flight_search.engine.snapshot(by_code, 4, date.today(), flight_search.inventory)
+    assert (single.price == four.price).all()
+    assert (four.breakup["Total"] > 3 * single.breakup["Total"]).all()
+
+
+def test_party_sizes_book_the_same_flight_from_one_seat_pool(flight_search):
+    inventory = flight_search.inventory
+    results = flight_search.search("BOM", "DEL", DAY)
+    fare_class = results.fare_class_name(0)
+    capacity = inventory.available(results.flight_id(0), fare_class)
+
+    assert inventory.hold(results.flight_id(0), fare_class, 2) is not None
+    assert inventory.available(results.flight_id(0), fare_class) == capacity - 2
+    assert inventory.hold(results.flight_id(0), fare_class, capacity - 2) is not None
+    assert inventory.hold(results.flight_id(0), fare_class, 2) is None
+
+
+def test_generated_flights_are_the_same_for_every_search_of_a_day(flight_search):
+    generated = flight_search.search("BOM", "DEL", DAY, count=25)
+    flight_search.cache.invalidate()
+    again = flight_search.search("BOM", "DEL", DAY, count=25)
+    calendar_day = flight_search.search("BOM", "DEL", DAY)
+    assert generated is not again
+    assert flight_ids(generated) == flight_ids(again)
+    assert (generated.price == again.price).all()
+    assert not set(flight_ids(generated)) & set(flight_ids(calendar_day))
+
+
+def test_seats_sold_through_any_search_reprice_the_calendar_day(flight_search):
+    inventory = flight_search.inventory
+    calendar = flight_search.calendar("BOM", "DEL")
+    before = calendar.day_fares(DAY).copy()
+    results = flight_search.search("BOM", "DEL", DAY)
+    fare_class = results.fare_class_name(0)
+    flight_id = results.flight_id(0)
+    inventory.hold(flight_id, fare_class, inventory.available(flight_id, fare_class) - 1)
+
+    after = flight_search.calendar("BOM", "DEL").day_fares(DAY)
+    position = results.position[0]
+    assert after[position] > before[position]
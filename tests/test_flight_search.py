@@ -0,0 +1,53 @@
+from collections import Counter
+from datetime import date, timedelta
+
+from search_cache import SearchCache
+
+DAY = date.today() + timedelta(days=10)
+
+
+def test_a_search_missing_an_airline_is_retried_with_only_that_supplier(flight_search):
+    now = [0.0]
+    flight_search.cache = SearchCache(clock=lambda: now[0])
+    calls = Counter()
+    for supplier in flight_search.supplier_search.suppliers:
+        search = supplier.search
+
+        async def counted(from_city, to_city, day, code=supplier.code, search=search):
+            calls[code] += 1
+            return await search(from_city, to_city, day)
+
+        supplier.search = counted
+    down = flight_search.supplier_search.suppliers[0]
+    down.failure_rate = 1.0
+
+    partial = flight_search.search("BOM", "DEL", DAY)
+    assert partial.missing_suppliers == (down.code,)
+    assert down.airline not in partial.airline.tolist()
+    assert flight_search.search("BOM", "DEL", DAY) is partial
+
+    down.failure_rate = 0.0
+    now[0] += flight_search.partial_ttl_seconds + 1
+    complete = flight_search.search("BOM", "DEL", DAY)
+    assert complete.missing_suppliers == ()
+    assert down.airline in complete.airline.tolist()
+    assert set(partial.position.tolist()) < set(complete.position.tolist())
+    assert calls[down.code] == 2
+    assert all(count == 1 for code, count in calls.items() if code != down.code)
+
+    # A complete search keeps the full TTL
+    now[0] += flight_search.partial_ttl_seconds + 1
+    assert flight_search.search("BOM", "DEL", DAY) is complete
+    assert flight_search.cache.stats()["refreshes"] == 1
+
+
+def test_a_rebuilt_search_keeps_its_flights_under_the_same_schedule(flight_search):
+    one = flight_search.search("BOM", "DEL", DAY)
+    flight_search.cache.invalidate()
+    again = flight_search.search("BOM", "DEL", DAY)
+    assert one is not again
+    assert one.flight_version == again.flight_version is not None
+    assert [one.flight_id(row) for row in range(len(one))] == [again.flight_id(row) for row in range(len(again))]
+
+    other_day = flight_search.search("BOM", "DEL", DAY + timedelta(days=40))
+    assert other_day.flight_version != one.flight_version
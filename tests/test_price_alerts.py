@@ -0,0 +1,42 @@
+from datetime import date, timedelta
+
+import numpy as np
+
+from price_alerts import PriceWatcher, SavedSearchStore, new_watch_key
+
+TODAY = date(2026, 11, 1)
+DAY = TODAY + timedelta(days=10)
+
+
+def test_a_search_saved_after_the_first_sweep_is_evaluated(tmp_path):
+    store = SavedSearchStore(tmp_path / "bookings.db")
+    watcher = PriceWatcher(store, lambda from_city, to_city, days: {day: np.array([4000, 5200]) for day in days},
+                           max_days_per_second=0)
+    store.save(new_watch_key(), "early@example.com", "Mumbai (BOM)", "Delhi (DEL)", DAY)
+    watcher.run_once(TODAY)
+
+    late = new_watch_key()
+    store.save(late, "late@example.com", "Mumbai (BOM)", "Delhi (DEL)", DAY, max_price=4500)
+    round_stats = watcher.run_once(TODAY)
+
+    assert round_stats["alerts"] == 1
+    assert [alert["new_price"] for alert in store.inbox(late)] == [4000]
+    assert [search["last_price"] for search in store.for_key(late)] == [4000]
+
+    # Once every watcher has seen the day's fares, the day is skipped again
+    assert watcher.run_once(TODAY)["unchanged"] == 1
+
+
+def test_alerts_open_only_with_the_watch_key_they_were_saved_under(tmp_path):
+    store = SavedSearchStore(tmp_path / "bookings.db")
+    watcher = PriceWatcher(store, lambda from_city, to_city, days: {day: np.array([4000]) for day in days},
+                           max_days_per_second=0)
+    mine, theirs = new_watch_key(), new_watch_key()
+    search_id = store.save(mine, "same@example.com", "Mumbai (BOM)", "Delhi (DEL)", DAY, max_price=4500)
+    watcher.run_once(TODAY)
+
+    assert store.unread(mine) == 1
+    assert store.inbox(theirs) == [] and store.for_key(theirs) == []
+    store.delete(theirs, search_id)
+    store.mark_read(theirs)
+    assert store.unread(mine) == 1 and len(store.for_key(mine)) == 1
@@ -0,0 +1,32 @@
+from datetime import date
+
+import numpy as np
+
+from flight_inventory import generate_flight_columns
+from flight_results import FlightResults
+from pricing import PricingEngine
+from reference_data import AIRLINES, FARE_CLASSES
+from seat_inventory import SeatInventory
+
+TODAY = date(2026, 1, 1)
+
+
+def test_a_snapshot_is_shared_unchanged_until_one_of_its_flights_changes():
+    engine = PricingEngine(AIRLINES, FARE_CLASSES)
+    rng = np.random.default_rng(3)
+    columns = generate_flight_columns(len(AIRLINES), FARE_CLASSES, 50, rng)
+    columns["price"] = engine.base_fares("BOM", "DEL", columns["airline"], columns["fare_class"], rng)
+    results = FlightResults(("BOM", "DEL", "2026-01-15"), "BOM", "DEL", date(2026, 1, 15), AIRLINES, FARE_CLASSES, columns)
+    inventory = SeatInventory(FARE_CLASSES)
+
+    first = engine.snapshot(results, 2, TODAY, inventory)
+    priced_at = first.inventory_version
+    inventory.hold("other-flight", "Economy", 1)
+    assert engine.snapshot(results, 2, TODAY, inventory) is first
+    assert first.inventory_version == priced_at
+
+    fare_class = results.fare_class_name(0)
+    inventory.hold(results.flight_id(0), fare_class, inventory.available(results.flight_id(0), fare_class) - 1)
+    after = engine.snapshot(results, 2, TODAY, inventory)
+    assert after is not first and after.price[0] > first.price[0]
+    assert engine.counters == {"hits": 1, "builds": 2, "invalidations": 1}
@@ -0,0 +1,60 @@
+from datetime import date, timedelta
+from itertools import product
+
+import numpy as np
+import pytest
+
+from flight_inventory import MINUTES_PER_DAY, generate_flight_columns
+from flight_results import FlightResults, ResultView
+from pricing import same_airline_discount
+from reference_data import AIRLINES, FARE_CLASSES
+from round_trip import best_combinations, k_smallest_sums
+
+DAY = date(2026, 11, 2)
+
+
+def view(from_city, to_city, day, size, rng):
+    columns = generate_flight_columns(len(AIRLINES), FARE_CLASSES, size, rng)
+    # Fares in steps of ₹20 keep the 5% same-airline discount a whole number of rupees
+    columns["price"] = rng.integers(100, 400, size=size) * 20
+    return ResultView(FlightResults((from_city, to_city, day.isoformat()), from_city, to_city, day, AIRLINES, FARE_CLASSES, columns))
+
+
+def every_pair_score(outbound, inbound, sort_by, min_stay_mins, minute_value=20):
+    out, back = outbound.results, inbound.results
+    scores = []
+    for i, j in product(outbound.rows.tolist(), inbound.rows.tolist()):
+        lands = int(out.arrival_mins[i])
+        leaves = int(back.departure_mins[j]) + (back.date - out.date).days * MINUTES_PER_DAY
+        if leaves - lands < min_stay_mins:
+            continue
+        price = int(out.price[i] + back.price[j])
+        if out.airline[i] == back.airline[j]:
+            price -= same_airline_discount(int(out.price[i]), int(back.price[j]))
+        duration = int(out.duration_mins[i] + back.duration_mins[j])
+        scores.append({"price": price, "duration": duration, "score": price + minute_value * duration}[sort_by])
+    return sorted(scores)
+
+
+def test_k_smallest_sums_matches_the_sorted_cross_product():
+    rng = np.random.default_rng(1)
+    left, right = sorted(rng.integers(0, 100, 30).tolist()), sorted(rng.integers(0, 100, 40).tolist())
+    expected = sorted(a + b for a, b in product(left, right))[:25]
+    assert [total for total, _, _ in k_smallest_sums(left, right, 25)] == expected
+
+    even = [(total, i, j) for total, i, j in k_smallest_sums(left, right, 10, lambda i, j: (i + j) % 2 == 0)]
+    assert all((i + j) % 2 == 0 for _, i, j in even) and len(even) == 10
+
+
+@pytest.mark.parametrize("sort_by", ["price", "duration", "score"])
+def test_best_combinations_are_the_best_of_every_pair(sort_by):
+    rng = np.random.default_rng(5)
+    outbound = view("BOM", "DEL", DAY, 60, rng)
+    inbound = view("DEL", "BOM", DAY + timedelta(days=1), 50, rng)
+    min_stay = 20 * 60
+
+    found = best_combinations(
+        outbound, inbound, outbound.results.price, inbound.results.price, k=15, sort_by=sort_by, min_stay_mins=min_stay
+    )
+    assert [combination["score"] for combination in found] == every_pair_score(outbound, inbound, sort_by, min_stay)[:15]
+    assert all(combination["stay_mins"] >= min_stay for combination in found)
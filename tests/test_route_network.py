@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+from route_network import MAXIMUM_LAYOVER_MINS, MINIMUM_CONNECTION_MINS, RouteNetwork
+
+
+@pytest.fixture(scope="module")
+def network():
+    return RouteNetwork.generate(1500, rng=np.random.default_rng(7))
+
+
+def every_itinerary(network, origin, destination):
+    """Every direct, one-stop and two-stop itinerary, by brute force"""
+    o, d = network.airport_index[origin], network.airport_index[destination]
+
+    def onward(leg, to):
+        start, end = network.route_start[network.destination[leg], to], network.route_end[network.destination[leg], to]
+        ready = network.arrival_mins[leg] + MINIMUM_CONNECTION_MINS
+        return [j for j in range(start, end) if ready <= network.departure_mins[j] <= ready - MINIMUM_CONNECTION_MINS + MAXIMUM_LAYOVER_MINS]
+
+    found = []
+    for via in range(len(network.airports)):
+        for first in range(network.route_start[o, via], network.route_end[o, via]):
+            if via == d:
+                found.append((first, -1, -1))
+                continue
+            found.extend((first, second, -1) for second in onward(first, d))
+            for via2 in set(range(len(network.airports))) - {o, d, via}:
+                found.extend((first, middle, last) for middle in onward(first, via2) for last in onward(middle, d))
+    return np.array(found, dtype=np.int32)
+
+
+@pytest.mark.parametrize("sort_by", ["arrival", "price", "duration"])
+def test_itineraries_are_the_exact_best_for_each_sort(network, sort_by):
+    for origin, destination in [("BOM", "DEL"), ("GAU", "GOI")]:
+        everything = every_itinerary(network, origin, destination)
+        keys = network._sort_keys(everything, sort_by)
+        expected = [tuple(key[i] for key in keys) for i in np.lexsort(keys)[:20]]
+
+        found = network.find_itineraries(origin, destination, sort_by=sort_by)
+        keys = network._sort_keys(found, sort_by)
+        assert [tuple(key[i] for key in keys) for i in range(len(found))] == expected
+
+
+def test_connection_scan_finds_every_airport_s_earliest_arrival(network):
+    # Relax every leg until nothing improves: slow, but plainly the earliest arrival
+    o = network.airport_index["BOM"]
+    expected = [np.iinfo(np.int32).max] * len(network.airports)
+    expected[o] = 6 * 60
+    changed = True
+    while changed:
+        changed = False
+        for leg in range(len(network)):
+            source, target = network.origin[leg], network.destination[leg]
+            ready = expected[source] + (0 if source == o else MINIMUM_CONNECTION_MINS)
+            if network.departure_mins[leg] >= ready and network.arrival_mins[leg] < expected[target]:
+                expected[target] = int(network.arrival_mins[leg])
+                changed = True
+    assert network.earliest_arrival("BOM", depart_after=6 * 60).tolist() == expected
+
+
+def test_earliest_arrival_matches_the_best_itinerary(network):
+    earliest = network.earliest_arrival("BOM", depart_after=6 * 60)
+    best = network.find_itineraries("BOM", "DEL", depart_after=6 * 60, sort_by="arrival", limit=1)[0]
+    assert earliest[network.airport_index["BOM"]] == 6 * 60
+    assert earliest[network.airport_index["DEL"]] <= network.arrival_mins[best[0]]
+
+
+def test_a_network_of_sold_flights_keeps_their_ids_and_fares():
+    columns = {
+        "departure_mins": np.array([360, 600], dtype=np.int16), "arrival_mins": np.array([480, 700], dtype=np.int16),
+        "airline": np.array([0, 1], dtype=np.int8), "flight_number": np.array([101, 202], dtype=np.int16)
+    }
+    network = RouteNetwork.from_flights(["BOM", "DEL", "GOI"], [
+        ("BOM", "DEL", columns, np.array([5000, 4000]), ["BOM-DEL-20261102-0", "BOM-DEL-20261102-1"]),
+        ("DEL", "GOI", columns, np.array([3000, 2000]), ["DEL-GOI-20261102-0", "DEL-GOI-20261102-1"])
+    ])
+    itinerary = network.describe(network.find_itineraries("BOM", "GOI", limit=1)[0], ["IndiGo", "Air India"], {"IndiGo": "6E", "Air India": "AI"})
+    assert [leg["flight_id"] for leg in itinerary["legs"]] == ["BOM-DEL-20261102-0", "DEL-GOI-20261102-1"]
+    assert itinerary["price"] == 5000 + 2000
@@ -0,0 +1,82 @@
+import threading
+import time
+
+import pytest
+
+from search_cache import SearchCache, make_search_key
+
+
+def test_least_recently_used_entries_are_evicted_first():
+    cache = SearchCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert cache.stats()["evictions"] == 1
+
+
+def test_entries_expire_after_their_ttl():
+    now = [0.0]
+    cache = SearchCache(ttl_seconds=10, clock=lambda: now[0])
+    cache.get_or_compute("full", lambda: "full")
+    cache.get_or_compute("short", lambda: "short", ttl_of=lambda value: 2)
+    now[0] = 5
+    assert cache.get("full") == "full" and cache.get("short") is None
+    now[0] = 10
+    assert cache.get("full") is None
+    assert cache.stats()["expirations"] == 2
+
+
+def test_an_expired_entry_is_handed_to_refresh():
+    now = [0.0]
+    cache = SearchCache(ttl_seconds=10, clock=lambda: now[0])
+    cache.get_or_compute("key", lambda: 1, refresh=lambda previous: previous + 1)
+    now[0] = 11
+    assert cache.get_or_compute("key", lambda: 1, refresh=lambda previous: previous + 1) == 2
+    assert cache.stats()["refreshes"] == 1
+
+
+def test_concurrent_misses_compute_once_and_share_the_value():
+    cache = SearchCache()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "value"
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(cache.get_or_compute("key", compute)))
+    leader.start()
+    started.wait(5)
+    followers = [threading.Thread(target=lambda: results.append(cache.get_or_compute("key", compute))) for _ in range(7)]
+    for thread in followers:
+        thread.start()
+    while cache.stats()["coalesced"] < 7:
+        time.sleep(0.001)
+    release.set()
+    for thread in [leader, *followers]:
+        thread.join(5)
+
+    assert results == ["value"] * 8 and len(calls) == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_a_failed_computation_is_raised_and_not_cached():
+    cache = SearchCache()
+
+    def fail():
+        raise ValueError("supplier down")
+
+    with pytest.raises(ValueError):
+        cache.get_or_compute("key", fail)
+    assert cache.get_or_compute("key", lambda: "value") == "value"
+    assert cache.stats()["errors"] == 1
+
+
+def test_search_keys_ignore_how_a_city_is_written():
+    assert make_search_key("Mumbai (BOM)", " delhi (del)", "2026-11-02") == make_search_key("BOM", "DEL", "2026-11-02")
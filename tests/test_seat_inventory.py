@@ -0,0 +1,77 @@
+import threading
+
+from reference_data import FARE_CLASSES
+from seat_inventory import SeatInventory
+
+
+def test_a_hold_takes_seats_until_confirmed_or_released():
+    inventory = SeatInventory(FARE_CLASSES)
+    inventory.register_flight("F1", {"Economy": 10, "Premium Economy": 2, "Business": 1})
+
+    hold = inventory.hold("F1", "Economy", 4)
+    assert inventory.available("F1", "Economy") == 6
+    assert inventory.hold("F1", "Economy", 7) is None
+    assert inventory.confirm(hold)
+    assert (inventory.available("F1", "Economy"), inventory.sold("F1", "Economy")) == (6, 4)
+    assert not inventory.release(hold)
+
+    other = inventory.hold("F1", "Economy", 6)
+    assert inventory.release(other)
+    assert inventory.available("F1", "Economy") == 6
+
+
+def test_expired_holds_are_swept_and_cannot_be_confirmed():
+    now = [0.0]
+    inventory = SeatInventory(FARE_CLASSES, hold_seconds=60, clock=lambda: now[0])
+    swept = inventory.hold("F1", "Business", 2)
+    late = inventory.hold("F2", "Business", 2)
+    now[0] = 61
+
+    assert inventory.sweep_expired() == 2
+    assert not inventory.confirm(late)
+    assert inventory.available("F1", "Business") == inventory.available("F2", "Business") == 12
+    assert inventory.active_holds() == 0 and swept is not None
+
+
+def test_a_round_trip_confirms_both_legs_or_neither():
+    now = [0.0]
+    inventory = SeatInventory(FARE_CLASSES, clock=lambda: now[0])
+    outbound = inventory.hold("OUT", "Economy", 2, hold_seconds=600)
+    inbound = inventory.hold("IN", "Economy", 2, hold_seconds=30)
+    now[0] = 31
+
+    assert not inventory.confirm_all([outbound, inbound])
+    assert inventory.sold("OUT", "Economy") == 0 and inventory.available("IN", "Economy") == 150
+    # The live leg stays held for another try
+    assert inventory.available("OUT", "Economy") == 148
+
+
+def test_concurrent_holds_across_stripes_never_oversell():
+    inventory = SeatInventory(FARE_CLASSES, stripes=4)
+    flights = [f"F{i}" for i in range(8)]
+    held = []
+
+    def book():
+        for _ in range(40):
+            for flight_id in flights:
+                if inventory.hold(flight_id, "Business", 1) is not None:
+                    held.append(flight_id)
+
+    threads = [threading.Thread(target=book) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(held) == sorted(flights * 12)
+    assert all(inventory.available(flight_id, "Business") == 0 for flight_id in flights)
+
+
+def test_changes_are_reported_per_flight_since_a_version():
+    inventory = SeatInventory(FARE_CLASSES)
+    version = inventory.version
+    inventory.hold("F1", "Economy", 1)
+    inventory.hold("F2", "Economy", 1)
+    assert inventory.changed_since(version) == {"F1", "F2"}
+    assert inventory.changed_since(inventory.version) == set()
+    assert inventory.flight_version("F1") == 1 and inventory.flight_version("F3") == 0
@@ -0,0 +1,13 @@
+from session_manager import PERSISTENT, SessionKey, SessionStateManager
+
+
+def test_session_state_is_measured_on_a_counter_or_when_forced():
+    manager = SessionStateManager([SessionKey("results", PERSISTENT, default=list)], report_every=3)
+    state = {"results": list(range(100))}
+
+    measured = [manager.report("s1", state) is not None for _ in range(7)]
+    assert measured == [True, False, False, True, False, False, True]
+    per_key, _ = manager.report("s1", state, force=True)
+    assert "results" in per_key
+    assert manager.counters["reports"] == 4 and manager.counters["reports_skipped"] == 4
+    assert manager.totals()["sessions"] == 1
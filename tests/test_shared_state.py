@@ -0,0 +1,41 @@
+import pickle
+from datetime import date, timedelta
+
+import pytest
+
+from fare_calendar import FareCalendar
+from pricing import PricingEngine
+from reference_data import AIRLINES, FARE_CLASSES
+from shared_state import SQLiteBackend, decode_cached, encode_cached
+
+DAY = date.today() + timedelta(days=10)
+
+
+def test_workers_share_a_search_without_pickling_it(flight_search, tmp_path):
+    results = flight_search.search("BOM", "DEL", DAY)
+    first = SQLiteBackend(tmp_path / "state.db", tmp_path / "bookings.db").search_cache()
+    second = SQLiteBackend(tmp_path / "state.db", tmp_path / "bookings.db").search_cache()
+
+    assert first.get_or_compute(results.key, lambda: results) is results
+    shared = second.get_or_compute(results.key, lambda: pytest.fail("computed again"))
+    assert [shared.flight_id(row) for row in range(len(shared))] == [results.flight_id(row) for row in range(len(results))]
+    assert (shared.price == results.price).all() and shared.date == results.date
+    assert [answer.code for answer in shared.suppliers] == [answer.code for answer in results.suppliers]
+    assert second.stats()["shared_hits"] == 1
+
+    itineraries = ({"stops": 1, "via": ["BLR"], "price": 9100},)
+    assert decode_cached(encode_cached(itineraries), ("connections",)) == itineraries
+
+
+def test_a_pickled_cache_entry_is_refused():
+    with pytest.raises(ValueError):
+        decode_cached(pickle.dumps({"anything": 1}), ("key",))
+
+
+def test_a_date_has_the_same_flights_in_every_day_s_calendar():
+    engine = PricingEngine(AIRLINES, FARE_CLASSES)
+    today = date.today()
+    calendars = [FareCalendar("BOM", "DEL", start, engine, len(AIRLINES), FARE_CLASSES)
+                 for start in (today, today + timedelta(days=1))]
+    for name, column in calendars[0].day_columns(DAY).items():
+        assert (column == calendars[1].day_columns(DAY)[name]).all()
@@ -0,0 +1,76 @@
+import asyncio
+
+import numpy as np
+
+from suppliers import CircuitBreaker, FanOutSearch, SupplierError, merge_rows
+
+
+class ScriptedSupplier:
+    """Answers after the next of ``delays`` seconds (repeating the last), or fails if ``fail``"""
+
+    def __init__(self, code, rows, delays=(0.0,), fail=False):
+        self.code = code
+        self.rows = np.array(rows)
+        self.delays = list(delays)
+        self.fail = fail
+        self.calls = 0
+
+    async def search(self, from_city, to_city, day):
+        delay = self.delays[min(self.calls, len(self.delays) - 1)]
+        self.calls += 1
+        await asyncio.sleep(delay)
+        if self.fail:
+            raise SupplierError(f"{self.code} failed")
+        return self.rows
+
+
+def answers(search, codes=None):
+    return {answer.code: answer for answer in search.iter_results("BOM", "DEL", None, codes)}
+
+
+def test_a_slow_call_is_hedged_and_the_faster_request_wins():
+    slow_first = ScriptedSupplier("6E", [0, 2], delays=(2.0, 0.0))
+    search = FanOutSearch([slow_first], timeout=1.0, hedge_after=0.05)
+    answer = answers(search)["6E"]
+    assert answer.ok and answer.hedged and answer.elapsed_ms < 500
+    assert slow_first.calls == 2
+
+
+def test_every_answer_is_streamed_and_merged_in_source_order():
+    search = FanOutSearch([
+        ScriptedSupplier("6E", [0, 4], delays=(0.05,)), ScriptedSupplier("AI", [1, 3]),
+        ScriptedSupplier("SG", [2], fail=True), ScriptedSupplier("UK", [5], delays=(2.0,))
+    ], timeout=0.2, hedge_after=None)
+    streamed = list(search.iter_results("BOM", "DEL", None))
+    # Fastest first: the instant answers, then the slower one, then the timeout
+    assert [answer.code for answer in streamed][2:] == ["6E", "UK"]
+    statuses = {answer.code: answer.status for answer in streamed}
+    assert statuses == {"6E": "ok", "AI": "ok", "SG": "error", "UK": "timeout"}
+    assert merge_rows(streamed).tolist() == [0, 1, 3, 4]
+    assert list(answers(search, codes=["AI"])) == ["AI"]
+
+
+def test_a_failing_supplier_is_skipped_while_its_circuit_is_open():
+    now = [0.0]
+    failing = ScriptedSupplier("6E", [0], fail=True)
+    search = FanOutSearch(
+        [failing], hedge_after=None, breaker_factory=lambda: CircuitBreaker(failure_threshold=2, reset_after=30, clock=lambda: now[0])
+    )
+    assert [answers(search)["6E"].status for _ in range(3)] == ["error", "error", "circuit_open"]
+    assert failing.calls == 2
+
+    now[0] = 31
+    failing.fail = False
+    assert answers(search)["6E"].ok
+    assert search.breakers["6E"].state == "closed"
+
+
+def test_a_half_open_circuit_lets_one_trial_through():
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=1, reset_after=10, clock=lambda: now[0])
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+    now[0] = 10
+    assert breaker.allow() and not breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()